@@ -12,11 +12,14 @@ import asyncio
 import hashlib
 import logging
 import re
+from bisect import bisect_right
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any
 
+from analyzers.rule_engine import PatternRule, RuleEngine, RuleMatch, line_offsets
+
 # ============================================================================
 # 數據模型 (Data Models)
 # ============================================================================
@@ -167,6 +170,26 @@ class BaseAnalyzer:
         raise NotImplementedError
 
 
+# ============================================================================
+# 安全規則 (Security Rules)
+# ============================================================================
+
+SECURITY_RULES = (
+    PatternRule("secrets.password", r"password\s*=\s*['\"].+['\"]", ("password",), "secrets"),
+    PatternRule("secrets.api_key", r"api_key\s*=\s*['\"].+['\"]", ("api_key",), "secrets"),
+    PatternRule("secrets.secret", r"secret\s*=\s*['\"].+['\"]", ("secret",), "secrets"),
+    PatternRule("secrets.token", r"token\s*=\s*['\"].+['\"]", ("token",), "secrets"),
+    PatternRule("sql.concat", r"(query|execute|sql)\s*=\s*['\"].*\+", ("query", "execute", "sql"), "sql"),
+    PatternRule("sql.percent", r"(query|execute|sql)\s*=\s*.*%\s*\(", ("query", "execute", "sql"), "sql"),
+    PatternRule("sql.cursor", r"cursor\.execute\([^)]*\+[^)]*\)", ("cursor.execute(",), "sql"),
+    PatternRule("xss.inner_html", r"innerHTML\s*=\s*[^(]", ("innerhtml",), "xss"),
+    PatternRule("xss.document_write", r"document\.write\(", ("document.write(",), "xss"),
+    PatternRule("xss.jquery_html", r"\.html\([^)]*\+[^)]*\)", (".html(",), "xss"),
+)
+
+SECURITY_RULE_ENGINE = RuleEngine(SECURITY_RULES)
+
+
 # ============================================================================
 # 靜態分析器 (Static Analyzer)
 # ============================================================================
@@ -179,6 +202,19 @@ class StaticAnalyzer(BaseAnalyzer):
         """
         執行靜態分析
 
+        Args:
+            code: 代碼內容
+            file_path: 文件路徑
+
+        Returns:
+            List[CodeIssue]: 問題列表
+        """
+        return self.analyze_sync(code, file_path)
+
+    def analyze_sync(self, code: str, file_path: str) -> list[CodeIssue]:
+        """
+        同步執行靜態分析（純 CPU 計算）
+
         Args:
             code: 代碼內容
             file_path: 文件路徑
@@ -189,20 +225,17 @@ class StaticAnalyzer(BaseAnalyzer):
         issues = []
 
         # 檢測安全漏洞
-        security_issues = await self._check_security(code, file_path)
-        issues.extend(security_issues)
+        issues.extend(self._check_security(code, file_path))
 
         # 檢測代碼質量
-        quality_issues = await self._check_code_quality(code, file_path)
-        issues.extend(quality_issues)
+        issues.extend(self._check_code_quality(code, file_path))
 
         # 檢測性能問題
-        performance_issues = await self._check_performance(code, file_path)
-        issues.extend(performance_issues)
+        issues.extend(self._check_performance(code, file_path))
 
         return issues
 
-    async def _check_security(self, code: str, file_path: str) -> list[CodeIssue]:
+    def _check_security(self, code: str, file_path: str) -> list[CodeIssue]:
         """
         檢測安全漏洞
 
@@ -214,16 +247,19 @@ class StaticAnalyzer(BaseAnalyzer):
             List[CodeIssue]: 安全問題列表
         """
         issues = []
+        first_hit: dict[str, RuleMatch] = {}
+        for match in SECURITY_RULE_ENGINE.scan(code):
+            first_hit.setdefault(match.rule.category, match)
 
         # 檢測硬編碼密鑰
-        if self._contains_hardcoded_secrets(code):
+        if "secrets" in first_hit:
             issues.append(
                 CodeIssue(
                     id="SEC-001",
                     type=IssueType.SECURITY,
                     severity=SeverityLevel.CRITICAL,
                     file=file_path,
-                    line=self._find_line_number(code, r"password\s*=\s*['\"]"),
+                    line=first_hit["secrets"].line,
                     column=1,
                     message="Hardcoded secrets detected",
                     description="代碼中檢測到硬編碼的密鑰或敏感信息",
@@ -233,14 +269,14 @@ class StaticAnalyzer(BaseAnalyzer):
             )
 
         # 檢測 SQL 注入
-        if self._contains_sql_injection_risk(code):
+        if "sql" in first_hit:
             issues.append(
                 CodeIssue(
                     id="SEC-002",
                     type=IssueType.SECURITY,
                     severity=SeverityLevel.HIGH,
                     file=file_path,
-                    line=self._find_line_number(code, r"(query|execute|sql)\s*=\s*['\"].*\+"),
+                    line=first_hit["sql"].line,
                     column=1,
                     message="SQL injection risk detected",
                     description="檢測到潛在的 SQL 注入風險",
@@ -250,14 +286,14 @@ class StaticAnalyzer(BaseAnalyzer):
             )
 
         # 檢測 XSS 漏洞
-        if self._contains_xss_risk(code):
+        if "xss" in first_hit:
             issues.append(
                 CodeIssue(
                     id="SEC-003",
                     type=IssueType.SECURITY,
                     severity=SeverityLevel.HIGH,
                     file=file_path,
-                    line=self._find_line_number(code, r"innerHTML\s*="),
+                    line=first_hit["xss"].line,
                     column=1,
                     message="XSS vulnerability detected",
                     description="檢測到跨站腳本攻擊漏洞",
@@ -268,7 +304,7 @@ class StaticAnalyzer(BaseAnalyzer):
 
         return issues
 
-    async def _check_code_quality(self, code: str, file_path: str) -> list[CodeIssue]:
+    def _check_code_quality(self, code: str, file_path: str) -> list[CodeIssue]:
         """
         檢測代碼質量問題
 
@@ -336,7 +372,7 @@ class StaticAnalyzer(BaseAnalyzer):
 
         return issues
 
-    async def _check_performance(self, code: str, file_path: str) -> list[CodeIssue]:
+    def _check_performance(self, code: str, file_path: str) -> list[CodeIssue]:
         """
         檢測性能問題
 
@@ -391,28 +427,15 @@ class StaticAnalyzer(BaseAnalyzer):
 
     def _contains_hardcoded_secrets(self, code: str) -> bool:
         """檢測硬編碼密鑰"""
-        secret_patterns = [
-            r"password\s*=\s*['\"][\w\W]+['\"]",
-            r"api_key\s*=\s*['\"][\w\W]+['\"]",
-            r"secret\s*=\s*['\"][\w\W]+['\"]",
-            r"token\s*=\s*['\"][\w\W]+['\"]",
-        ]
-        return any(re.search(pattern, code, re.IGNORECASE) for pattern in secret_patterns)
+        return bool(SECURITY_RULE_ENGINE.scan(code, categories=("secrets",)))
 
     def _contains_sql_injection_risk(self, code: str) -> bool:
-        """檢測 SQL 注入風險"""
-        # 檢測字符串連接的 SQL 查詢
-        patterns = [
-            r"(query|execute|sql)\s*=\s*['\"].*\+",
-            r"(query|execute|sql)\s*=\s*.*%\s*\(",
-            r"cursor\.execute\([^)]*\+[^)]*\)",
-        ]
-        return any(re.search(pattern, code, re.IGNORECASE) for pattern in patterns)
+        """檢測 SQL 注入風險（字符串連接的 SQL 查詢）"""
+        return bool(SECURITY_RULE_ENGINE.scan(code, categories=("sql",)))
 
     def _contains_xss_risk(self, code: str) -> bool:
         """檢測 XSS 風險"""
-        patterns = [r"innerHTML\s*=\s*[^(]", r"document\.write\(", r"\.html\([^)]*\+[^)]*\)"]
-        return any(re.search(pattern, code, re.IGNORECASE) for pattern in patterns)
+        return bool(SECURITY_RULE_ENGINE.scan(code, categories=("xss",)))
 
     def _calculate_cyclomatic_complexity(self, code: str) -> int:
         """計算圈複雜度"""
@@ -467,12 +490,11 @@ class StaticAnalyzer(BaseAnalyzer):
         return bool(re.search(pattern, code, re.DOTALL))
 
     def _find_line_number(self, code: str, pattern: str) -> int:
-        """查找模式所在行號"""
-        lines = code.split("\n")
-        for i, line in enumerate(lines, 1):
-            if re.search(pattern, line, re.IGNORECASE):
-                return i
-        return 1
+        """查找模式首次匹配的起始行號"""
+        match = re.search(pattern, code, re.IGNORECASE | re.MULTILINE)
+        if match is None:
+            return 1
+        return bisect_right(line_offsets(code), match.start())
 
 
 # ============================================================================
@@ -481,7 +503,12 @@ class StaticAnalyzer(BaseAnalyzer):
 
 
 class CodeAnalysisEngine:
-    """代碼分析引擎"""
+    """
+    代碼分析引擎（單文件）
+
+    代碼庫級分析（並行掃描與按 blob 哈希的增量存儲）由
+    services.code_analyzer.CodeAnalysisEngine 提供。
+    """
 
     def __init__(self, config: dict[str, Any]):
         self.config = config
@@ -512,35 +539,6 @@ class CodeAnalysisEngine:
             self.logger.error(f"分析文件失敗 {file_path}: {e}")
             return []
 
-    async def analyze_repository(self, repo_path: str, commit_hash: str) -> AnalysisResult:
-        """
-        分析整個代碼庫
-
-        Args:
-            repo_path: 代碼庫路徑
-            commit_hash: 提交哈希
-
-        Returns:
-            AnalysisResult: 分析結果
-        """
-        start_time = datetime.utcnow()
-        all_issues: list[CodeIssue] = []
-
-        # 這裡應該實現實際的文件掃描邏輯
-        # 為示例目的，暫時返回空結果
-
-        end_time = datetime.utcnow()
-        duration = (end_time - start_time).total_seconds()
-
-        return AnalysisResult(
-            repository=repo_path,
-            commit_hash=commit_hash,
-            analysis_timestamp=start_time,
-            duration=duration,
-            issues=all_issues,
-            metrics={"files_analyzed": 0, "lines_of_code": 0, "total_issues": len(all_issues)},
-        )
-
 
 # ============================================================================
 # 主程序入口 (Main Entry Point)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+============================================================================
+多模式規則引擎 (Multi-Pattern Rule Engine)
+============================================================================
+Project: SLASolve - Enterprise Code Intelligence Platform v2.0
+Version: 2.0.0
+============================================================================
+
+所有規則在構造時一次性編譯。每條規則聲明若干錨點字面量 (anchors)，
+規則的任何匹配所在行必須包含其中之一。掃描時先用由全部錨點組成的單個
+交替正則對整個文件做一次預過濾，通過行偏移表把命中位置映射到行號，
+再只在候選行上確認具體規則。掃描成本隨文件大小線性增長，而不是
+文件大小 × 規則數。
+============================================================================
+"""
+
+import re
+from bisect import bisect_right
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PatternRule:
+    """單條匹配規則（按行匹配）"""
+    rule_id: str
+    pattern: str
+    anchors: tuple[str, ...]
+    category: str = ""
+    label: str = ""
+
+
+@dataclass(frozen=True)
+class RuleMatch:
+    """規則命中"""
+    rule: PatternRule
+    line: int          # 1 起始
+    column: int        # 1 起始
+    line_text: str
+
+
+def line_offsets(code: str) -> list[int]:
+    """
+    計算每行起始偏移量
+
+    Returns:
+        List[int]: 第 i 行 (0 起始) 的起始偏移量
+    """
+    offsets = [0]
+    find = code.find
+    pos = find('\n')
+    while pos != -1:
+        offsets.append(pos + 1)
+        pos = find('\n', pos + 1)
+    return offsets
+
+
+class RuleEngine:
+    """
+    單遍多模式規則引擎
+
+    預過濾正則由所有錨點組成（最長優先），對整個文件只掃描一次；
+    同一行上的多個錨點只需命中其一即可使該行成為候選行，因此交替匹配
+    不重疊的特性不會漏掉規則。
+    """
+
+    def __init__(self, rules: Sequence[PatternRule], flags: int = re.IGNORECASE):
+        self.rules = tuple(rules)
+        self.flags = flags
+        for rule in self.rules:
+            if not rule.anchors:
+                raise ValueError(f"Rule {rule.rule_id} must declare at least one anchor")
+
+        self._ignore_case = bool(flags & re.IGNORECASE)
+        self._compiled = [
+            (
+                rule,
+                re.compile(rule.pattern, flags),
+                tuple(self._fold(anchor) for anchor in rule.anchors),
+            )
+            for rule in self.rules
+        ]
+        anchors = sorted({anchor for rule in self.rules for anchor in rule.anchors}, key=len, reverse=True)
+        self._prefilter = re.compile('|'.join(re.escape(anchor) for anchor in anchors), flags)
+
+    def _fold(self, text: str) -> str:
+        return text.lower() if self._ignore_case else text
+
+    def candidate_lines(self, code: str, offsets: list[int] | None = None) -> list[int]:
+        """
+        返回包含任一錨點的行號（1 起始，升序）
+
+        Args:
+            code: 代碼內容
+            offsets: 預先計算的行偏移表
+        """
+        if offsets is None:
+            offsets = line_offsets(code)
+        lines = []
+        last = 0
+        for match in self._prefilter.finditer(code):
+            line = bisect_right(offsets, match.start())
+            if line != last:
+                lines.append(line)
+                last = line
+        return lines
+
+    def scan(self, code: str, categories: Iterable[str] | None = None) -> list[RuleMatch]:
+        """
+        掃描代碼
+
+        Args:
+            code: 代碼內容
+            categories: 僅確認這些類別的規則（None 表示全部）
+
+        Returns:
+            List[RuleMatch]: 按行號、規則順序排列的命中列表，每行每條規則至多一次
+        """
+        wanted = set(categories) if categories is not None else None
+        compiled = [
+            entry for entry in self._compiled
+            if wanted is None or entry[0].category in wanted
+        ]
+        if not compiled or not code:
+            return []
+
+        offsets = line_offsets(code)
+        matches = []
+        for line in self.candidate_lines(code, offsets):
+            start = offsets[line - 1]
+            end = offsets[line] - 1 if line < len(offsets) else len(code)
+            text = code[start:end]
+            folded = self._fold(text)
+            for rule, regex, anchors in compiled:
+                if not any(anchor in folded for anchor in anchors):
+                    continue
+                found = regex.search(text)
+                if found is not None:
+                    matches.append(RuleMatch(rule, line, found.start() + 1, text))
+        return matches
+
+
+__all__ = [
+    'PatternRule',
+    'RuleEngine',
+    'RuleMatch',
+    'line_offsets',
+]
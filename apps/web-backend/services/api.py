@@ -7,11 +7,14 @@
 ============================================================================
 """
 
+import asyncio
 import logging
+import os
+import uuid
 from datetime import datetime
 from typing import Any
 
-from fastapi import BackgroundTasks, FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 # from fastapi.responses import JSONResponse
@@ -21,6 +24,8 @@ from .code_analyzer import (
     AnalysisStrategy,
     CodeAnalysisEngine,
 )
+from .jobs import AnalysisWorkerPool, JobStatus, JobStore
+from .repository import CommitNotFoundError
 
 # ============================================================================
 # API 數據模型
@@ -81,11 +86,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 服務數據目錄（任務庫與分析結果存儲），可通過 ANALYSIS_DATA_DIR 覆蓋
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
 # 全局分析引擎實例
 analysis_engine: CodeAnalysisEngine | None = None
 
-# 分析任務存儲（生產環境應使用 Redis 或數據庫）
-analysis_tasks: dict[str, dict[str, Any]] = {}
+# 分析任務存儲與有界工作池
+job_store: JobStore | None = None
+worker_pool: AnalysisWorkerPool | None = None
 
 
 # ============================================================================
@@ -95,18 +104,43 @@ analysis_tasks: dict[str, dict[str, Any]] = {}
 @app.on_event("startup")
 async def startup_event():
     """應用啟動事件"""
-    global analysis_engine
+    global analysis_engine, job_store, worker_pool
+    data_dir = os.environ.get('ANALYSIS_DATA_DIR', DEFAULT_DATA_DIR)
+    os.makedirs(data_dir, exist_ok=True)
+
     config = {
         'max_workers': 4,
         'cache_enabled': True,
+        'result_store_path': os.environ.get(
+            'ANALYSIS_RESULT_DB', os.path.join(data_dir, 'analysis_results.db')
+        ),
     }
     analysis_engine = CodeAnalysisEngine(config)
     logging.info("Code Analysis Engine initialized")
 
+    job_store = JobStore(
+        os.environ.get('ANALYSIS_JOB_DB', os.path.join(data_dir, 'analysis_jobs.db'))
+    )
+    worker_pool = AnalysisWorkerPool(
+        job_store,
+        run_analysis_job,
+        concurrency=int(os.environ.get('ANALYSIS_MAX_CONCURRENCY', '2')),
+        queue_size=int(os.environ.get('ANALYSIS_QUEUE_SIZE', '100')),
+        max_finished_jobs=int(os.environ.get('ANALYSIS_MAX_FINISHED_JOBS', '1000')),
+    )
+    worker_pool.start()
+    logging.info("Analysis worker pool started")
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """應用關閉事件"""
+    if worker_pool:
+        await worker_pool.stop()
+    if job_store:
+        job_store.close()
+    if analysis_engine:
+        analysis_engine.close()
     logging.info("Code Analysis API shutting down")
 
 
@@ -136,10 +170,7 @@ async def health_check():
 
 
 @app.post("/api/v1/analyze", response_model=AnalysisResponse)
-async def analyze_code(
-    request: AnalysisRequest,
-    background_tasks: BackgroundTasks
-):
+async def analyze_code(request: AnalysisRequest):
     """
     提交代碼分析任務
     
@@ -147,42 +178,44 @@ async def analyze_code(
     - **commit_hash**: 提交哈希
     - **branch**: 分支名稱（默認 main）
     - **strategy**: 分析策略（QUICK/STANDARD/DEEP/COMPREHENSIVE）
+
+    git 代碼庫中不存在的提交返回 400；隊列已滿時返回 429。
     """
-    if not analysis_engine:
+    if not analysis_engine or not worker_pool:
         raise HTTPException(status_code=503, detail="Analysis engine not initialized")
 
     # 驗證策略
     try:
-        strategy = AnalysisStrategy[request.strategy.upper()]
+        AnalysisStrategy[request.strategy.upper()]
     except KeyError:
         raise HTTPException(
             status_code=400,
             detail=f"Invalid strategy. Must be one of: {[s.value for s in AnalysisStrategy]}"
         )
 
-    # 生成分析 ID
-    import uuid
-    analysis_id = str(uuid.uuid4())
+    # 驗證提交（git 命令在線程中執行，不阻塞事件循環）
+    try:
+        await asyncio.to_thread(
+            analysis_engine.resolve_commit, request.repository, request.commit_hash
+        )
+    except CommitNotFoundError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # 記錄任務
-    analysis_tasks[analysis_id] = {
-        "status": "pending",
-        "request": request.dict(),
-        "created_at": datetime.utcnow().isoformat()
-    }
+    if worker_pool.is_full:
+        raise HTTPException(
+            status_code=429,
+            detail="Analysis queue is full, retry later",
+            headers={"Retry-After": "5"}
+        )
 
-    # 在背景執行分析
-    background_tasks.add_task(
-        run_analysis,
-        analysis_id,
-        request.repository,
-        request.commit_hash,
-        strategy
-    )
+    # 記錄並提交任務
+    analysis_id = str(uuid.uuid4())
+    job_store.create(analysis_id, request.model_dump())
+    worker_pool.submit(analysis_id)
 
     return AnalysisResponse(
         analysis_id=analysis_id,
-        status="pending",
+        status=JobStatus.PENDING.value,
         message="Analysis task submitted successfully"
     )
 
@@ -194,43 +227,58 @@ async def get_analysis_result(analysis_id: str):
     
     - **analysis_id**: 分析任務 ID
     """
-    if analysis_id not in analysis_tasks:
+    task = job_store.get(analysis_id) if job_store else None
+    if task is None:
         raise HTTPException(status_code=404, detail="Analysis not found")
 
-    task = analysis_tasks[analysis_id]
-
     return AnalysisResponse(
         analysis_id=analysis_id,
         status=task["status"],
-        message=task.get("message", ""),
-        result=task.get("result")
+        message=task["message"],
+        result=task["result"]
     )
 
 
 @app.get("/api/v1/analyze", response_model=list[dict[str, Any]])
 async def list_analyses(
-    limit: int = Query(default=10, le=100),
-    offset: int = Query(default=0, ge=0)
+    response: Response,
+    limit: int = Query(default=10, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="上一頁返回的 X-Next-Cursor"),
+    status: JobStatus | None = Query(default=None, description="按狀態過濾")
 ):
     """
-    列出分析任務
+    列出分析任務（按創建時間倒序）
     
     - **limit**: 返回數量限制（最大 100）
-    - **offset**: 偏移量
+    - **cursor**: 鍵集分頁游標，下一頁游標通過 X-Next-Cursor 響應頭返回
+    - **offset**: 偏移量（舊接口，建議改用 cursor）
+    - **status**: 按狀態過濾
     """
-    tasks = list(analysis_tasks.items())
-    tasks.sort(key=lambda x: x[1].get("created_at", ""), reverse=True)
+    if not job_store:
+        raise HTTPException(status_code=503, detail="Analysis engine not initialized")
 
-    paginated = tasks[offset:offset + limit]
+    try:
+        tasks, next_cursor = job_store.list_jobs(
+            limit=limit,
+            cursor=cursor,
+            status=status.value if status else None,
+            offset=offset
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return [
         {
-            "analysis_id": task_id,
+            "analysis_id": task["analysis_id"],
             "status": task["status"],
-            "created_at": task.get("created_at"),
-            "repository": task["request"].get("repository")
+            "created_at": task["created_at"],
+            "repository": task["repository"]
         }
-        for task_id, task in paginated
+        for task in tasks
     ]
 
 
@@ -241,31 +289,24 @@ async def delete_analysis(analysis_id: str):
     
     - **analysis_id**: 分析任務 ID
     """
-    if analysis_id not in analysis_tasks:
+    if not job_store or not job_store.delete(analysis_id):
         raise HTTPException(status_code=404, detail="Analysis not found")
 
-    del analysis_tasks[analysis_id]
-
     return {"message": "Analysis deleted successfully"}
 
 
 @app.get("/api/v1/metrics")
 async def get_metrics():
     """獲取引擎指標"""
-    if not analysis_engine:
+    if not analysis_engine or not job_store:
         raise HTTPException(status_code=503, detail="Analysis engine not initialized")
 
     metrics = analysis_engine.get_metrics()
 
     return {
         "engine_metrics": metrics,
-        "task_stats": {
-            "total": len(analysis_tasks),
-            "pending": sum(1 for t in analysis_tasks.values() if t["status"] == "pending"),
-            "running": sum(1 for t in analysis_tasks.values() if t["status"] == "running"),
-            "completed": sum(1 for t in analysis_tasks.values() if t["status"] == "completed"),
-            "failed": sum(1 for t in analysis_tasks.values() if t["status"] == "failed"),
-        }
+        "task_stats": job_store.count_by_status(),
+        "worker_pool": worker_pool.stats() if worker_pool else {}
     }
 
 
@@ -463,71 +504,61 @@ async def get_language_governance():
 # 背景任務
 # ============================================================================
 
-async def run_analysis(
-    analysis_id: str,
-    repository: str,
-    commit_hash: str,
-    strategy: AnalysisStrategy
-):
-    """執行分析任務"""
-    try:
-        # 更新狀態為運行中
-        analysis_tasks[analysis_id]["status"] = "running"
-        analysis_tasks[analysis_id]["started_at"] = datetime.utcnow().isoformat()
-
-        # 執行分析
-        result = await analysis_engine.analyze_repository(
-            repo_path=repository,
-            commit_hash=commit_hash,
-            strategy=strategy
-        )
+def run_analysis_job(request: dict[str, Any]) -> dict[str, Any]:
+    """
+    執行分析任務（在工作池線程中調用，使用獨立事件循環）
 
-        # 轉換結果為可序列化格式
-        result_dict = {
-            "id": result.id,
-            "repository": result.repository,
-            "commit_hash": result.commit_hash,
-            "branch": result.branch,
-            "analysis_timestamp": result.analysis_timestamp.isoformat(),
-            "duration": result.duration,
-            "strategy": result.strategy.value,
-            "total_issues": result.total_issues,
-            "critical_issues": result.critical_issues,
-            "quality_score": result.quality_score,
-            "risk_level": result.risk_level,
-            "files_analyzed": result.files_analyzed,
-            "languages_detected": list(result.languages_detected),
-            "issues": [
-                {
-                    "id": issue.id,
-                    "type": issue.type.value,
-                    "severity": issue.severity.value,
-                    "file": issue.file,
-                    "line": issue.line,
-                    "message": issue.message,
-                    "description": issue.description,
-                    "suggestion": issue.suggestion,
-                    "tags": issue.tags,
-                    "confidence": issue.confidence,
-                }
-                for issue in result.issues[:100]  # 限制返回數量
-            ],
-            "metrics": result.metrics.to_dict()
-        }
+    Args:
+        request: 任務請求
 
-        # 更新狀態為完成
-        analysis_tasks[analysis_id]["status"] = "completed"
-        analysis_tasks[analysis_id]["result"] = result_dict
-        analysis_tasks[analysis_id]["completed_at"] = datetime.utcnow().isoformat()
-        analysis_tasks[analysis_id]["message"] = "Analysis completed successfully"
-
-    except Exception as e:
-        # 更新狀態為失敗
-        analysis_tasks[analysis_id]["status"] = "failed"
-        analysis_tasks[analysis_id]["error"] = str(e)
-        analysis_tasks[analysis_id]["completed_at"] = datetime.utcnow().isoformat()
-        analysis_tasks[analysis_id]["message"] = f"Analysis failed: {str(e)}"
-        logging.error(f"Analysis {analysis_id} failed: {e}", exc_info=True)
+    Returns:
+        Dict: 可序列化的分析結果
+    """
+    strategy = AnalysisStrategy[request["strategy"].upper()]
+    result = asyncio.run(analysis_engine.analyze_repository(
+        repo_path=request["repository"],
+        commit_hash=request["commit_hash"],
+        strategy=strategy
+    ))
+
+    # 轉換結果為可序列化格式
+    return {
+        "id": result.id,
+        "repository": result.repository,
+        "commit_hash": result.commit_hash,
+        "branch": result.branch,
+        "analysis_timestamp": result.analysis_timestamp.isoformat(),
+        "duration": result.duration,
+        "strategy": result.strategy.value,
+        "total_issues": result.total_issues,
+        "critical_issues": result.critical_issues,
+        "quality_score": result.quality_score,
+        "risk_level": result.risk_level,
+        "files_analyzed": result.files_analyzed,
+        "languages_detected": list(result.languages_detected),
+        "issues": [
+            {
+                "id": issue.id,
+                "type": issue.type.value,
+                "severity": issue.severity.value,
+                "file": issue.file,
+                "line": issue.line,
+                "message": issue.message,
+                "description": issue.description,
+                "suggestion": issue.suggestion,
+                "tags": issue.tags,
+                "confidence": issue.confidence,
+            }
+            for issue in result.issues[:100]  # 限制返回數量
+        ],
+        "metrics": result.metrics.to_dict(),
+        "slowest_files": [
+            {"file": path, "duration": duration}
+            for path, duration in sorted(
+                result.file_timings.items(), key=lambda item: item[1], reverse=True
+            )[:10]
+        ]
+    }
 
 
 # ============================================================================
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+============================================================================
+分析任務子系統 (Analysis Job Subsystem)
+============================================================================
+Project: SLASolve - Enterprise Code Intelligence Platform v2.0
+Version: 2.0.0
+============================================================================
+
+- JobStore: SQLite 持久化任務表，按 created_at / status 建索引，
+  支持鍵集分頁 (keyset pagination) 與已完成任務的淘汰
+- AnalysisWorkerPool: 有界工作池，固定並發數 + 有界隊列，
+  隊列滿時拒絕提交（由 API 返回 429）；分析在獨立線程中執行，
+  不阻塞 API 自身的事件循環
+============================================================================
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from enum import Enum
+from typing import Any
+
+
+class JobStatus(str, Enum):
+    """任務狀態"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+FINISHED_STATUSES = (JobStatus.COMPLETED.value, JobStatus.FAILED.value)
+
+
+def _iso(timestamp: float | None) -> str | None:
+    """時間戳轉 ISO 8601 (UTC)"""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, UTC).isoformat()
+
+
+def encode_cursor(created_at: float, job_id: str) -> str:
+    """編碼分頁游標"""
+    raw = json.dumps([created_at, job_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[float, str]:
+    """
+    解碼分頁游標
+
+    Raises:
+        ValueError: 游標格式無效
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, job_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(created_at), str(job_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+# ============================================================================
+# 任務存儲
+# ============================================================================
+
+class JobStore:
+    """
+    SQLite 任務存儲
+
+    所有方法都是線程安全的，調用耗時為單次索引查詢或寫入。
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS analysis_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                repository TEXT NOT NULL,
+                request TEXT NOT NULL,
+                result TEXT,
+                message TEXT NOT NULL DEFAULT '',
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                completed_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_created ON analysis_jobs (created_at, id);
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON analysis_jobs (status, created_at, id);
+            """
+        )
+        self._conn.commit()
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor
+
+    def _fetch(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row, include_result: bool = True) -> dict[str, Any]:
+        job = {
+            "analysis_id": row["id"],
+            "status": row["status"],
+            "repository": row["repository"],
+            "request": json.loads(row["request"]),
+            "message": row["message"],
+            "error": row["error"],
+            "created_at": _iso(row["created_at"]),
+            "started_at": _iso(row["started_at"]),
+            "completed_at": _iso(row["completed_at"]),
+        }
+        if include_result:
+            job["result"] = json.loads(row["result"]) if row["result"] else None
+        return job
+
+    def create(self, job_id: str, request: dict[str, Any]) -> dict[str, Any]:
+        """創建待執行任務"""
+        now = time.time()
+        self._execute(
+            "INSERT INTO analysis_jobs (id, status, repository, request, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (job_id, JobStatus.PENDING.value, request.get("repository", ""), json.dumps(request), now)
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        """獲取任務"""
+        rows = self._fetch("SELECT * FROM analysis_jobs WHERE id = ?", (job_id,))
+        return self._to_dict(rows[0]) if rows else None
+
+    def mark_running(self, job_id: str) -> None:
+        """標記任務為運行中"""
+        self._execute(
+            "UPDATE analysis_jobs SET status = ?, started_at = ? WHERE id = ?",
+            (JobStatus.RUNNING.value, time.time(), job_id)
+        )
+
+    def mark_completed(self, job_id: str, result: dict[str, Any], message: str = "") -> None:
+        """標記任務完成並保存結果"""
+        self._execute(
+            "UPDATE analysis_jobs SET status = ?, result = ?, message = ?, completed_at = ? "
+            "WHERE id = ?",
+            (JobStatus.COMPLETED.value, json.dumps(result, default=str), message, time.time(), job_id)
+        )
+
+    def mark_failed(self, job_id: str, error: str, message: str = "") -> None:
+        """標記任務失敗"""
+        self._execute(
+            "UPDATE analysis_jobs SET status = ?, error = ?, message = ?, completed_at = ? "
+            "WHERE id = ?",
+            (JobStatus.FAILED.value, error, message, time.time(), job_id)
+        )
+
+    def delete(self, job_id: str) -> bool:
+        """刪除任務"""
+        return self._execute("DELETE FROM analysis_jobs WHERE id = ?", (job_id,)).rowcount > 0
+
+    def list_jobs(
+        self,
+        limit: int = 10,
+        cursor: str | None = None,
+        status: str | None = None,
+        offset: int = 0
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """
+        按創建時間倒序列出任務（鍵集分頁）
+
+        Args:
+            limit: 返回數量
+            cursor: 上一頁返回的游標
+            status: 按狀態過濾
+            offset: 兼容舊接口的偏移量（建議使用 cursor）
+
+        Returns:
+            (任務列表, 下一頁游標)；沒有更多數據時游標為 None
+        """
+        clauses = []
+        params: list[Any] = []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if cursor is not None:
+            created_at, job_id = decode_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params.extend([created_at, created_at, job_id])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._fetch(
+            "SELECT id, status, repository, request, message, error, created_at, started_at, "
+            f"completed_at FROM analysis_jobs {where} "
+            "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            (*params, limit + 1, offset)
+        )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return [self._to_dict(row, include_result=False) for row in rows], next_cursor
+
+    def count_by_status(self) -> dict[str, int]:
+        """按狀態統計任務數"""
+        counts = {status.value: 0 for status in JobStatus}
+        for row in self._fetch("SELECT status, COUNT(*) AS n FROM analysis_jobs GROUP BY status"):
+            counts[row["status"]] = row["n"]
+        counts["total"] = sum(counts.values())
+        return counts
+
+    def ids_with_status(self, status: str) -> list[str]:
+        """按創建順序列出某狀態的任務 ID"""
+        return [
+            row["id"] for row in self._fetch(
+                "SELECT id FROM analysis_jobs WHERE status = ? ORDER BY created_at, id", (status,)
+            )
+        ]
+
+    def evict(self, max_finished: int | None = None, max_age: float | None = None) -> int:
+        """
+        淘汰已結束的任務
+
+        Args:
+            max_finished: 保留的已結束任務數上限（保留最新的）
+            max_age: 已結束任務的最長保留秒數
+
+        Returns:
+            int: 刪除的任務數
+        """
+        removed = 0
+        placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+        if max_age is not None:
+            removed += self._execute(
+                f"DELETE FROM analysis_jobs WHERE status IN ({placeholders}) AND completed_at < ?",
+                (*FINISHED_STATUSES, time.time() - max_age)
+            ).rowcount
+        if max_finished is not None:
+            removed += self._execute(
+                f"DELETE FROM analysis_jobs WHERE id IN ("
+                f"SELECT id FROM analysis_jobs WHERE status IN ({placeholders}) "
+                "ORDER BY created_at DESC, id DESC LIMIT -1 OFFSET ?)",
+                (*FINISHED_STATUSES, max_finished)
+            ).rowcount
+        return removed
+
+    def close(self) -> None:
+        """關閉存儲"""
+        with self._lock:
+            self._conn.close()
+
+
+# ============================================================================
+# 有界工作池
+# ============================================================================
+
+class AnalysisWorkerPool:
+    """
+    有界分析工作池
+
+    ``runner`` 是同步函數，接收任務請求並返回可序列化的結果字典；
+    它在專用線程池中執行，並發數即線程數。
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        runner: Callable[[dict[str, Any]], dict[str, Any]],
+        concurrency: int = 2,
+        queue_size: int = 100,
+        max_finished_jobs: int | None = 1000,
+        result_ttl: float | None = None
+    ):
+        self.store = store
+        self.runner = runner
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(1, queue_size)
+        self.max_finished_jobs = max_finished_jobs
+        self.result_ttl = result_ttl
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=self.queue_size)
+        self._executor: ThreadPoolExecutor | None = None
+        self._workers: list[asyncio.Task] = []
+        self._active = 0
+
+    @property
+    def is_full(self) -> bool:
+        """隊列是否已滿"""
+        return self._queue.full()
+
+    def start(self) -> None:
+        """啟動工作者，並恢復上次未完成的任務"""
+        if self._workers:
+            return
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="analysis-worker"
+        )
+        for job_id in self.store.ids_with_status(JobStatus.RUNNING.value):
+            self.store.mark_failed(job_id, "interrupted", "Analysis interrupted by service restart")
+        for job_id in self.store.ids_with_status(JobStatus.PENDING.value):
+            if not self.submit(job_id):
+                self.store.mark_failed(job_id, "queue full", "Analysis dropped on restart: queue full")
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        """停止工作者"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, job_id: str) -> bool:
+        """
+        提交任務
+
+        Returns:
+            bool: 隊列已滿時返回 False
+        """
+        try:
+            self._queue.put_nowait(job_id)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def join(self) -> None:
+        """等待隊列中所有任務完成"""
+        await self._queue.join()
+
+    def stats(self) -> dict[str, int]:
+        """工作池統計"""
+        return {
+            "concurrency": self.concurrency,
+            "active": self._active,
+            "queued": self._queue.qsize(),
+            "queue_capacity": self.queue_size,
+        }
+
+    async def _worker(self, index: int) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self.store.get(job_id)
+                if job is None or job["status"] != JobStatus.PENDING.value:
+                    continue  # 已刪除或已處理
+                self.store.mark_running(job_id)
+                self._active += 1
+                try:
+                    result = await loop.run_in_executor(self._executor, self.runner, job["request"])
+                    self.store.mark_completed(job_id, result, "Analysis completed successfully")
+                except Exception as e:
+                    self.store.mark_failed(job_id, str(e), f"Analysis failed: {str(e)}")
+                    self.logger.error(f"Analysis {job_id} failed: {e}", exc_info=True)
+                finally:
+                    self._active -= 1
+                self.store.evict(self.max_finished_jobs, self.result_ttl)
+            finally:
+                self._queue.task_done()
+
+
+__all__ = [
+    'AnalysisWorkerPool',
+    'JobStatus',
+    'JobStore',
+    'decode_cursor',
+    'encode_cursor',
+]
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+============================================================================
+代碼庫遍歷 (Repository Traversal)
+============================================================================
+Project: SLASolve - Enterprise Code Intelligence Platform v2.0
+Version: 2.0.0
+============================================================================
+
+- iter_repository_files: 遍歷工作目錄，按 .gitignore 剪枝（非 git 代碼庫）
+- resolve_commit / list_git_tree / read_git_blobs: 直接讀取提交樹與 blob 內容
+  (git ls-tree / git cat-file --batch)
+============================================================================
+"""
+
+import os
+import re
+import subprocess
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+# 代碼庫掃描時分析的源碼副檔名
+SOURCE_EXTENSIONS = frozenset({
+    '.py', '.js', '.jsx', '.ts', '.tsx', '.go', '.rs', '.java',
+    '.c', '.h', '.cc', '.cpp', '.hpp', '.cs', '.rb', '.php', '.html',
+})
+
+# 永遠跳過的目錄（即使沒有 .gitignore）
+IGNORED_DIRS = frozenset({
+    '.git', '.hg', '.svn', 'node_modules', '__pycache__', '.venv', 'venv', '.tox',
+})
+
+
+class CommitNotFoundError(ValueError):
+    """代碼庫是 git 倉庫，但指定的提交不存在"""
+
+
+# ============================================================================
+# gitignore 匹配
+# ============================================================================
+
+def _glob_to_regex(pattern: str) -> str:
+    """將 gitignore glob 轉換為正則表達式"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            out.append('/.*')
+            i += 3
+        elif pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            out.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            out.append('[^/]')
+            i += 1
+        elif pattern[i] == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape(pattern[i]))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return ''.join(out)
+
+
+@dataclass
+class _IgnoreRule:
+    """單條 gitignore 規則"""
+    base: str
+    regex: re.Pattern[str]
+    negate: bool
+    dir_only: bool
+
+
+class GitIgnoreMatcher:
+    """
+    gitignore 規則匹配器
+
+    支持註釋、否定 (!)、僅目錄 (尾部 /)、錨定路徑 (含 /) 與 ** 通配。
+    嵌套 .gitignore 的規則只作用於其所在目錄之下，後出現的規則優先。
+    """
+
+    def __init__(self) -> None:
+        self._rules: list[_IgnoreRule] = []
+
+    def add_file(self, path: str, base: str = '') -> None:
+        """
+        載入 .gitignore 文件
+
+        Args:
+            path: .gitignore 文件路徑
+            base: 文件所在目錄（相對代碼庫根目錄，使用 / 分隔）
+        """
+        try:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                self.add_patterns(f.read().splitlines(), base)
+        except OSError:
+            pass
+
+    def add_patterns(self, lines: list[str], base: str = '') -> None:
+        """添加 gitignore 規則行"""
+        for raw in lines:
+            line = raw.rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            elif line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            if '/' in line:
+                regex = '^' + _glob_to_regex(line.lstrip('/')) + '$'
+            else:
+                regex = '^(?:.*/)?' + _glob_to_regex(line) + '$'
+            self._rules.append(_IgnoreRule(base, re.compile(regex), negate, dir_only))
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        判斷路徑是否被忽略
+
+        Args:
+            rel_path: 相對代碼庫根目錄的路徑（使用 / 分隔）
+            is_dir: 是否為目錄
+
+        Returns:
+            bool: 是否忽略
+        """
+        ignored = False
+        for rule in self._rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.base:
+                if not rel_path.startswith(rule.base + '/'):
+                    continue
+                candidate = rel_path[len(rule.base) + 1:]
+            else:
+                candidate = rel_path
+            if rule.regex.match(candidate):
+                ignored = not rule.negate
+        return ignored
+
+
+def iter_repository_files(
+    repo_path: str,
+    extensions: frozenset[str] | set[str] | None = SOURCE_EXTENSIONS,
+    max_file_size: int | None = None,
+    ignored_dirs: frozenset[str] | set[str] = IGNORED_DIRS,
+) -> Iterator[str]:
+    """
+    遍歷代碼庫中需要分析的文件
+
+    被 .gitignore 忽略的目錄會在遍歷時直接剪枝，不會進入。
+
+    Args:
+        repo_path: 代碼庫根目錄
+        extensions: 允許的副檔名（None 表示不過濾）
+        max_file_size: 文件大小上限（字節）
+        ignored_dirs: 總是跳過的目錄名
+
+    Yields:
+        str: 相對代碼庫根目錄的文件路徑（使用 / 分隔）
+    """
+    matcher = GitIgnoreMatcher()
+    for dirpath, dirnames, filenames in os.walk(repo_path):
+        rel_dir = os.path.relpath(dirpath, repo_path).replace(os.sep, '/')
+        if rel_dir == '.':
+            rel_dir = ''
+        if '.gitignore' in filenames:
+            matcher.add_file(os.path.join(dirpath, '.gitignore'), rel_dir)
+
+        prefix = f'{rel_dir}/' if rel_dir else ''
+        dirnames[:] = sorted(
+            d for d in dirnames
+            if d not in ignored_dirs and not matcher.is_ignored(prefix + d, is_dir=True)
+        )
+
+        for name in sorted(filenames):
+            if extensions is not None and os.path.splitext(name)[1].lower() not in extensions:
+                continue
+            rel_path = prefix + name
+            if matcher.is_ignored(rel_path):
+                continue
+            if max_file_size is not None:
+                try:
+                    if os.path.getsize(os.path.join(dirpath, name)) > max_file_size:
+                        continue
+                except OSError:
+                    continue
+            yield rel_path
+
+
+# ============================================================================
+# git 對象讀取
+# ============================================================================
+
+def is_git_repository(repo_path: str) -> bool:
+    """判斷路徑是否位於 git 工作樹或倉庫中"""
+    if not os.path.isdir(repo_path):
+        return False
+    try:
+        proc = subprocess.run(
+            ['git', '-C', repo_path, 'rev-parse', '--git-dir'],
+            capture_output=True,
+            check=False
+        )
+    except OSError:
+        return False
+    return proc.returncode == 0
+
+
+def resolve_commit(repo_path: str, commit_hash: str) -> str | None:
+    """
+    解析提交
+
+    Returns:
+        str | None: 完整提交哈希；非 git 代碼庫返回 None
+
+    Raises:
+        CommitNotFoundError: git 代碼庫中不存在該提交
+    """
+    if not is_git_repository(repo_path):
+        return None
+    if commit_hash.startswith('-'):
+        raise CommitNotFoundError(f"Commit {commit_hash} not found in {repo_path}")
+    proc = subprocess.run(
+        ['git', '-C', repo_path, 'rev-parse', '--verify', '--quiet', f'{commit_hash}^{{commit}}'],
+        capture_output=True,
+        check=False
+    )
+    if proc.returncode != 0:
+        raise CommitNotFoundError(f"Commit {commit_hash} not found in {repo_path}")
+    return proc.stdout.decode().strip()
+
+
+def list_git_tree(repo_path: str, commit_hash: str) -> list[tuple[str, str, int]]:
+    """
+    列出提交樹中的 blob
+
+    Returns:
+        (路徑, blob 哈希, 大小) 列表
+
+    Raises:
+        CommitNotFoundError: 提交無法解析
+    """
+    if commit_hash.startswith('-'):
+        raise CommitNotFoundError(f"Commit {commit_hash} not found in {repo_path}")
+    proc = subprocess.run(
+        ['git', '-C', repo_path, 'ls-tree', '-r', '-l', '-z', '--full-tree',
+         f'{commit_hash}^{{tree}}'],
+        capture_output=True,
+        check=False
+    )
+    if proc.returncode != 0:
+        raise CommitNotFoundError(f"Commit {commit_hash} not found in {repo_path}")
+
+    entries = []
+    for record in proc.stdout.split(b'\0'):
+        if not record:
+            continue
+        meta, _, path = record.partition(b'\t')
+        mode, obj_type, blob_hash, size = meta.split()
+        if obj_type != b'blob' or mode == b'120000':
+            continue
+        entries.append((path.decode('utf-8', errors='replace'), blob_hash.decode(), int(size)))
+    return entries
+
+
+def read_git_blobs(repo_path: str, blob_hashes: list[str]) -> dict[str, bytes]:
+    """通過 git cat-file --batch 批量讀取 blob 內容"""
+    contents: dict[str, bytes] = {}
+    batch_size = 512
+    for i in range(0, len(blob_hashes), batch_size):
+        batch = blob_hashes[i:i + batch_size]
+        proc = subprocess.run(
+            ['git', '-C', repo_path, 'cat-file', '--batch'],
+            input='\n'.join(batch).encode() + b'\n',
+            capture_output=True,
+            check=False
+        )
+        out = proc.stdout
+        pos = 0
+        while pos < len(out):
+            header_end = out.index(b'\n', pos)
+            header = out[pos:header_end].split()
+            pos = header_end + 1
+            if len(header) < 3:  # "<hash> missing"
+                continue
+            size = int(header[2])
+            contents[header[0].decode()] = out[pos:pos + size]
+            pos += size + 1
+    return contents
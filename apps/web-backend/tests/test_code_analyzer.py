@@ -9,6 +9,8 @@ Version: 2.0.0
 ============================================================================
 """
 
+import json
+import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -20,6 +22,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from services.code_analyzer import (
     AnalysisResult,
+    AnalysisResultStore,
     AnalysisStrategy,
     CodeAnalysisEngine,
     CodeIssue,
@@ -29,7 +32,9 @@ from services.code_analyzer import (
     PythonAnalyzer,
     SeverityLevel,
     StaticAnalyzer,
+    git_blob_hash,
 )
+from services.repository import CommitNotFoundError
 
 # ============================================================================
 # 測試數據模型
@@ -330,6 +335,198 @@ class TestCodeAnalysisEngine:
         assert 'cache_misses' in metrics
 
 
+# ============================================================================
+# 測試內容尋址結果存儲
+# ============================================================================
+
+def _git(repo, *args):
+    """在測試代碼庫中執行 git 命令"""
+    return subprocess.run(
+        ['git', '-C', str(repo), '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+        check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+class TestAnalysisResultStore:
+    """測試內容尋址分析結果存儲"""
+
+    def test_git_blob_hash_matches_git(self, tmp_path):
+        """測試 blob 哈希與 git 一致"""
+        path = tmp_path / "a.py"
+        path.write_bytes(b"print('hi')\n")
+        expected = subprocess.run(
+            ['git', 'hash-object', str(path)], check=True, capture_output=True, text=True
+        ).stdout.strip()
+        assert git_blob_hash(path.read_bytes()) == expected
+
+    def test_store_persists_across_instances(self, tmp_path):
+        """測試結果持久化到磁盤"""
+        db_path = str(tmp_path / "results.db")
+        issue = CodeIssue(file="a.py", line=3, message="Hardcoded secret")
+
+        store = AnalysisResultStore(db_path, memory_size=1)
+        store.put("abc", "StaticAnalyzer@2.0.0.py", "STANDARD", [issue], line_count=10)
+        store.close()
+
+        reopened = AnalysisResultStore(db_path, memory_size=1)
+        stored = reopened.get("abc", "StaticAnalyzer@2.0.0.py", "STANDARD")
+        assert stored.line_count == 10
+        assert stored.issues[0].message == "Hardcoded secret"
+        assert reopened.get("abc", "StaticAnalyzer@2.0.0.py", "DEEP") is None
+        assert reopened.stats['disk_hits'] == 1
+
+        reopened.get("abc", "StaticAnalyzer@2.0.0.py", "STANDARD")
+        assert reopened.stats['memory_hits'] == 1
+        reopened.close()
+
+    def test_store_round_trips_issues_as_json(self, tmp_path):
+        """測試問題以 JSON 存儲並完整還原，舊格式記錄視為未命中"""
+        db_path = str(tmp_path / "results.db")
+        issue = CodeIssue(
+            type=IssueType.SECURITY,
+            severity=SeverityLevel.CRITICAL,
+            file="a.py",
+            line=3,
+            tags=["secrets"],
+        )
+
+        store = AnalysisResultStore(db_path, memory_size=0)
+        store.put("abc", "StaticAnalyzer@2.0.0.py", "STANDARD", [issue], line_count=10)
+        store._conn.execute(
+            "INSERT INTO analysis_results VALUES ('old', 'StaticAnalyzer@2.0.0.py', 'STANDARD', 1, ?, 0)",
+            (b"\x80\x05legacy",)
+        )
+        raw = store._conn.execute(
+            "SELECT issues FROM analysis_results WHERE blob_hash = 'abc'"
+        ).fetchone()[0]
+
+        assert json.loads(raw)[0]["severity"] == "CRITICAL"
+        assert store.get("abc", "StaticAnalyzer@2.0.0.py", "STANDARD").issues == [issue]
+        assert store.get("old", "StaticAnalyzer@2.0.0.py", "STANDARD") is None
+        store.close()
+
+    @pytest.mark.asyncio
+    async def test_cached_issues_rebound_to_new_path(self):
+        """測試相同內容在不同路徑命中並改寫文件路徑"""
+        store = AnalysisResultStore()
+        analyzer = StaticAnalyzer({}, result_store=store)
+        code = 'password = "hardcoded"\n'
+
+        first = await analyzer.analyze(code, "a.py")
+        second = await analyzer.analyze(code, "b.py")
+
+        assert analyzer.metrics['cache_hits'] == 1
+        assert [i.message for i in first] == [i.message for i in second]
+        assert all(i.file == "b.py" for i in second)
+
+    @pytest.mark.asyncio
+    async def test_incremental_repository_analysis(self, tmp_path):
+        """測試新提交只分析變更的 blob"""
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        _git(repo, 'init', '-q')
+        for i in range(5):
+            (repo / f"mod_{i}.py").write_text(f"def f_{i}() -> int:\n    return {i}\n")
+        (repo / "README.md").write_text("docs\n")
+        _git(repo, 'add', '.')
+        _git(repo, 'commit', '-q', '-m', 'initial')
+        first_commit = _git(repo, 'rev-parse', 'HEAD')
+
+        (repo / "mod_0.py").write_text('password = "hunter2"\n')
+        _git(repo, 'commit', '-q', '-am', 'change')
+        second_commit = _git(repo, 'rev-parse', 'HEAD')
+
+        engine = CodeAnalysisEngine({'result_store_path': str(tmp_path / "results.db")})
+        try:
+            first = await engine.analyze_repository(str(repo), first_commit)
+            assert first.files_analyzed == 5
+            assert first.metrics.lines_of_code == 10
+            assert engine.result_store.stats['writes'] == 5
+
+            second = await engine.analyze_repository(str(repo), second_commit)
+            assert second.files_analyzed == 5
+            assert engine.result_store.stats['writes'] == 6
+            assert any(
+                i.file == "mod_0.py" and i.type == IssueType.SECURITY for i in second.issues
+            )
+            assert second.languages_detected == {"python"}
+        finally:
+            engine.close()
+
+
+# ============================================================================
+# 測試代碼庫並行掃描
+# ============================================================================
+
+@pytest.fixture
+def work_tree(tmp_path):
+    """構造非 git 的示例代碼庫"""
+    (tmp_path / ".gitignore").write_text("generated/\n*.min.js\n")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "db.py").write_text(
+        'def run(cursor, uid):\n    query = "SELECT * FROM users WHERE id=" + uid\n'
+    )
+    (tmp_path / "src" / "ok.py").write_text("def ok() -> int:\n    return 1\n")
+    (tmp_path / "src" / "page.js").write_text("el.innerHTML = data;\n")
+    (tmp_path / "src" / "vendor.min.js").write_text("el.innerHTML = data;\n")
+    (tmp_path / "generated").mkdir()
+    (tmp_path / "generated" / "out.py").write_text("password = 'hunter2'\n")
+    return tmp_path
+
+
+class TestRepositoryScan:
+    """測試代碼庫並行掃描"""
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    @pytest.mark.asyncio
+    async def test_work_tree_scan_respects_gitignore(self, work_tree, max_workers):
+        """測試串行與多進程掃描結果一致，且跳過 gitignore 忽略的文件"""
+        engine = CodeAnalysisEngine({'max_workers': max_workers, 'scan_chunk_size': 1})
+        try:
+            result = await engine.analyze_repository(str(work_tree), "abc123")
+
+            assert result.files_analyzed == 3
+            assert result.metrics.lines_of_code == 5
+            assert set(result.file_timings) == {"src/db.py", "src/ok.py", "src/page.js"}
+            assert [(i.file, i.type) for i in result.issues] == [
+                ("src/db.py", IssueType.SECURITY),
+                ("src/page.js", IssueType.SECURITY),
+            ]
+
+            again = await engine.analyze_repository(str(work_tree), "abc123")
+            assert again.files_analyzed == 3
+            assert again.file_timings == {}
+            assert engine.result_store.stats['writes'] == 3
+        finally:
+            engine.close()
+
+    @pytest.mark.asyncio
+    async def test_scan_repository_streams_file_results(self, work_tree):
+        """測試按文件流式產出結果"""
+        engine = CodeAnalysisEngine({'max_workers': 2, 'scan_chunk_size': 2})
+        try:
+            paths = [r.path async for r in engine.scan_repository(str(work_tree), "abc123")]
+            assert sorted(paths) == ["src/db.py", "src/ok.py", "src/page.js"]
+        finally:
+            engine.close()
+
+    @pytest.mark.asyncio
+    async def test_unknown_commit_is_rejected(self, tmp_path):
+        """測試 git 代碼庫中不存在的提交不會回退到工作目錄"""
+        _git(tmp_path, 'init', '-q')
+        (tmp_path / "a.py").write_text("x = 1\n")
+        _git(tmp_path, 'add', '.')
+        _git(tmp_path, 'commit', '-q', '-m', 'initial')
+
+        engine = CodeAnalysisEngine({})
+        try:
+            assert engine.resolve_commit(str(tmp_path), "HEAD") == _git(tmp_path, 'rev-parse', 'HEAD')
+            with pytest.raises(CommitNotFoundError):
+                await engine.analyze_repository(str(tmp_path), "0" * 40)
+        finally:
+            engine.close()
+
+
 # ============================================================================
 # 集成測試
 # ============================================================================
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+============================================================================
+分析任務子系統單元測試
+============================================================================
+Project: SLASolve - Enterprise Code Intelligence Platform v2.0
+============================================================================
+"""
+
+import asyncio
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.jobs import AnalysisWorkerPool, JobStatus, JobStore
+
+REQUEST = {"repository": "/tmp/repo", "commit_hash": "abc123", "strategy": "STANDARD"}
+
+
+# ============================================================================
+# 測試任務存儲
+# ============================================================================
+
+class TestJobStore:
+    """測試 SQLite 任務存儲"""
+
+    def test_lifecycle_persists(self, tmp_path):
+        """測試任務生命週期與持久化"""
+        db_path = str(tmp_path / "jobs.db")
+        store = JobStore(db_path)
+        store.create("job-1", REQUEST)
+        store.mark_running("job-1")
+        store.mark_completed("job-1", {"total_issues": 3}, "done")
+        store.close()
+
+        reopened = JobStore(db_path)
+        job = reopened.get("job-1")
+        assert job["status"] == JobStatus.COMPLETED.value
+        assert job["result"] == {"total_issues": 3}
+        assert job["repository"] == "/tmp/repo"
+        assert job["completed_at"] is not None
+        assert reopened.count_by_status()["completed"] == 1
+        assert reopened.delete("job-1")
+        assert reopened.get("job-1") is None
+        reopened.close()
+
+    def test_keyset_pagination(self):
+        """測試鍵集分頁按創建時間倒序且不重複"""
+        store = JobStore()
+        for i in range(7):
+            store.create(f"job-{i}", REQUEST)
+
+        seen = []
+        cursor = None
+        while True:
+            page, cursor = store.list_jobs(limit=3, cursor=cursor)
+            seen.extend(job["analysis_id"] for job in page)
+            if cursor is None:
+                break
+
+        assert seen == [f"job-{i}" for i in reversed(range(7))]
+
+        store.mark_failed("job-2", "boom")
+        failed, _ = store.list_jobs(status=JobStatus.FAILED.value)
+        assert [job["analysis_id"] for job in failed] == ["job-2"]
+
+        with pytest.raises(ValueError):
+            store.list_jobs(cursor="not-a-cursor")
+
+    def test_evict_finished_jobs(self):
+        """測試淘汰已結束的任務，保留進行中的任務"""
+        store = JobStore()
+        for i in range(5):
+            store.create(f"job-{i}", REQUEST)
+            store.mark_completed(f"job-{i}", {})
+        store.create("pending", REQUEST)
+
+        assert store.evict(max_finished=2) == 3
+        assert store.get("job-4") is not None
+        assert store.get("job-0") is None
+        assert store.get("pending") is not None
+        assert store.evict(max_age=0) == 2
+
+
+# ============================================================================
+# 測試有界工作池
+# ============================================================================
+
+class TestAnalysisWorkerPool:
+    """測試有界工作池"""
+
+    @pytest.mark.asyncio
+    async def test_runs_jobs_and_records_results(self):
+        """測試執行任務並記錄成功與失敗"""
+        store = JobStore()
+
+        def runner(request):
+            if request["commit_hash"] == "bad":
+                raise RuntimeError("boom")
+            return {"commit": request["commit_hash"]}
+
+        pool = AnalysisWorkerPool(store, runner, concurrency=2, queue_size=10)
+        pool.start()
+        try:
+            store.create("ok", REQUEST)
+            store.create("bad", {**REQUEST, "commit_hash": "bad"})
+            assert pool.submit("ok") and pool.submit("bad")
+            await asyncio.wait_for(pool.join(), timeout=5)
+        finally:
+            await pool.stop()
+
+        assert store.get("ok")["result"] == {"commit": "abc123"}
+        failed = store.get("bad")
+        assert failed["status"] == JobStatus.FAILED.value
+        assert failed["error"] == "boom"
+
+    @pytest.mark.asyncio
+    async def test_backpressure_and_concurrency_limit(self):
+        """測試隊列滿時拒絕提交，且並發數不超過上限"""
+        store = JobStore()
+        release = threading.Event()
+        running = []
+        peak = []
+
+        def runner(request):
+            running.append(1)
+            peak.append(len(running))
+            release.wait(5)
+            running.pop()
+            return {}
+
+        pool = AnalysisWorkerPool(store, runner, concurrency=1, queue_size=2)
+        pool.start()
+        try:
+            for i in range(3):
+                store.create(f"job-{i}", REQUEST)
+            assert pool.submit("job-0")
+            await asyncio.sleep(0.05)  # job-0 被取出並開始執行
+            assert pool.submit("job-1") and pool.submit("job-2")
+            assert pool.is_full
+            assert not pool.submit("job-3")
+            assert pool.stats()["active"] == 1
+
+            release.set()
+            await asyncio.wait_for(pool.join(), timeout=5)
+        finally:
+            await pool.stop()
+
+        assert max(peak) == 1
+        assert store.count_by_status()["completed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_start_recovers_interrupted_jobs(self):
+        """測試重啟時恢復待執行任務並標記中斷的任務"""
+        store = JobStore()
+        store.create("interrupted", REQUEST)
+        store.mark_running("interrupted")
+        store.create("queued", REQUEST)
+
+        pool = AnalysisWorkerPool(store, lambda request: {"ok": True}, concurrency=1)
+        pool.start()
+        try:
+            await asyncio.wait_for(pool.join(), timeout=5)
+        finally:
+            await pool.stop()
+
+        assert store.get("interrupted")["status"] == JobStatus.FAILED.value
+        assert store.get("queued")["status"] == JobStatus.COMPLETED.value
+
+
+# ============================================================================
+# 測試 API 背壓
+# ============================================================================
+
+def test_api_returns_429_when_queue_full(monkeypatch, tmp_path):
+    """測試隊列滿時 API 返回 429"""
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    from services import api
+
+    release = threading.Event()
+
+    def slow_runner(request):
+        release.wait(5)
+        return {}
+
+    monkeypatch.setenv("ANALYSIS_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("ANALYSIS_MAX_CONCURRENCY", "1")
+    monkeypatch.setenv("ANALYSIS_QUEUE_SIZE", "1")
+    monkeypatch.setattr(api, "run_analysis_job", slow_runner)
+
+    with fastapi_testclient.TestClient(api.app) as client:
+        statuses = [client.post("/api/v1/analyze", json=REQUEST).status_code for _ in range(5)]
+        assert statuses[0] == 200
+        assert 429 in statuses
+
+        listing = client.get("/api/v1/analyze", params={"limit": 1})
+        assert listing.status_code == 200
+        assert len(listing.json()) == 1
+        assert "x-next-cursor" in listing.headers
+        release.set()
+
+
+def test_api_rejects_unknown_commit(monkeypatch, tmp_path):
+    """測試 git 代碼庫中不存在的提交返回 400，且不會創建任務"""
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    from services import api
+
+    monkeypatch.setenv("ANALYSIS_DATA_DIR", str(tmp_path / "data"))
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    request = dict(REQUEST, repository=str(tmp_path), commit_hash="0" * 40)
+
+    with fastapi_testclient.TestClient(api.app) as client:
+        response = client.post("/api/v1/analyze", json=request)
+        assert response.status_code == 400
+        assert "not found" in response.json()["detail"]
+        assert client.get("/api/v1/analyze").json() == []
+
+
+def test_api_jobs_persist_in_data_dir(monkeypatch, tmp_path):
+    """測試任務默認寫入服務數據目錄，重啟後仍可查詢"""
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    from services import api
+
+    monkeypatch.setenv("ANALYSIS_DATA_DIR", str(tmp_path))
+    monkeypatch.delenv("ANALYSIS_JOB_DB", raising=False)
+    monkeypatch.setattr(api, "run_analysis_job", lambda request: {"branch": request["branch"]})
+
+    with fastapi_testclient.TestClient(api.app) as client:
+        analysis_id = client.post("/api/v1/analyze", json=REQUEST).json()["analysis_id"]
+
+    assert (tmp_path / "analysis_jobs.db").exists()
+    with fastapi_testclient.TestClient(api.app) as client:
+        job = client.get(f"/api/v1/analyze/{analysis_id}").json()
+        assert job["status"] == JobStatus.COMPLETED.value
+        assert job["result"] == {"branch": "main"}
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+============================================================================
+代碼庫遍歷單元測試
+============================================================================
+Project: SLASolve - Enterprise Code Intelligence Platform v2.0
+============================================================================
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.repository import GitIgnoreMatcher, iter_repository_files
+
+# ============================================================================
+# 測試 gitignore 過濾
+# ============================================================================
+
+class TestGitIgnoreMatcher:
+    """測試 gitignore 匹配器"""
+
+    def test_basename_and_anchored_patterns(self):
+        """測試文件名與錨定模式"""
+        matcher = GitIgnoreMatcher()
+        matcher.add_patterns(["*.log", "/build", "docs/**/*.tmp", "# comment", ""])
+
+        assert matcher.is_ignored("app.log")
+        assert matcher.is_ignored("src/deep/app.log")
+        assert matcher.is_ignored("build", is_dir=True)
+        assert not matcher.is_ignored("src/build", is_dir=True)
+        assert matcher.is_ignored("docs/a/b/x.tmp")
+        assert not matcher.is_ignored("src/x.tmp")
+
+    def test_negation_and_dir_only(self):
+        """測試否定與僅目錄規則"""
+        matcher = GitIgnoreMatcher()
+        matcher.add_patterns(["*.py", "!keep.py", "cache/"])
+
+        assert matcher.is_ignored("a.py")
+        assert not matcher.is_ignored("keep.py")
+        assert matcher.is_ignored("cache", is_dir=True)
+        assert not matcher.is_ignored("cache")
+
+    def test_nested_rules_scoped_to_directory(self):
+        """測試嵌套規則作用域"""
+        matcher = GitIgnoreMatcher()
+        matcher.add_patterns(["*.js"], base="web")
+
+        assert matcher.is_ignored("web/app.js")
+        assert not matcher.is_ignored("app.js")
+
+
+# ============================================================================
+# 測試代碼庫遍歷
+# ============================================================================
+
+@pytest.fixture
+def repo(tmp_path):
+    """構造示例代碼庫"""
+    (tmp_path / ".gitignore").write_text("generated/\n*.min.js\n")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "db.py").write_text(
+        'def run(cursor, uid):\n    query = "SELECT * FROM users WHERE id=" + uid\n'
+    )
+    (tmp_path / "src" / "ok.py").write_text("def ok() -> int:\n    return 1\n")
+    (tmp_path / "src" / "page.js").write_text("el.innerHTML = data;\n")
+    (tmp_path / "src" / "vendor.min.js").write_text("el.innerHTML = data;\n")
+    (tmp_path / "src" / "notes.txt").write_text("password = 'x'\n")
+    (tmp_path / "generated").mkdir()
+    (tmp_path / "generated" / "out.py").write_text("password = 'hunter2'\n")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "lib.js").write_text("document.write(x)\n")
+    return tmp_path
+
+
+class TestRepositoryScan:
+    """測試代碼庫遍歷"""
+
+    def test_iter_repository_files_respects_gitignore(self, repo):
+        """測試遍歷時應用 gitignore 與副檔名過濾"""
+        files = list(iter_repository_files(str(repo)))
+        assert files == ["src/db.py", "src/ok.py", "src/page.js"]
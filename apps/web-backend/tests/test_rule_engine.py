@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+============================================================================
+多模式規則引擎單元測試
+============================================================================
+Project: SLASolve - Enterprise Code Intelligence Platform v2.0
+============================================================================
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analyzers.rule_engine import PatternRule, RuleEngine, line_offsets
+from services.code_analyzer import SECURITY_RULE_ENGINE, StaticAnalyzer
+
+
+class TestRuleEngine:
+    """測試規則引擎"""
+
+    def test_line_offsets(self):
+        """測試行偏移表"""
+        assert line_offsets("") == [0]
+        assert line_offsets("a\nbc\n\nd") == [0, 2, 5, 6]
+
+    def test_scan_maps_hits_to_lines(self):
+        """測試命中映射到行號與列號"""
+        engine = RuleEngine([
+            PatternRule("eval", r"eval\(", ("eval(",), "exec"),
+            PatternRule("exec", r"exec\(", ("exec(",), "exec"),
+        ])
+        code = "x = 1\ny = EVAL(a)\n\nexec(b); eval(c)\n"
+        hits = [(m.rule.rule_id, m.line, m.column) for m in engine.scan(code)]
+        assert hits == [("eval", 2, 5), ("eval", 4, 10), ("exec", 4, 1)]
+
+    def test_overlapping_anchors_on_same_line(self):
+        """測試同一行重疊錨點不會漏報"""
+        engine = RuleEngine([
+            PatternRule("long", r"aws_secret_access_key\s*=", ("aws_secret_access_key",)),
+            PatternRule("short", r"secret", ("secret",)),
+        ])
+        hits = [m.rule.rule_id for m in engine.scan("aws_secret_access_key = 'x'")]
+        assert hits == ["long", "short"]
+
+    def test_category_filter_and_empty_input(self):
+        """測試類別過濾"""
+        assert SECURITY_RULE_ENGINE.scan("") == []
+        hits = SECURITY_RULE_ENGINE.scan('password = "x"\nel.innerHTML = y', categories=("xss",))
+        assert [m.line for m in hits] == [2]
+
+    def test_rule_requires_anchor(self):
+        """測試規則必須聲明錨點"""
+        with pytest.raises(ValueError):
+            RuleEngine([PatternRule("bad", r"x", ())])
+
+
+class TestSecurityRules:
+    """測試安全檢測使用單遍掃描"""
+
+    @pytest.mark.asyncio
+    async def test_check_security_reports_every_matching_line(self):
+        """測試每個命中行都產生問題"""
+        analyzer = StaticAnalyzer({})
+        code = (
+            'password = "a"\n'
+            'ok = 1\n'
+            'token = "b"\n'
+            'data = pickle.loads(blob)\n'
+            'digest = md5(data)\n'
+            '<form action="/x">\n'
+        )
+        issues = await analyzer._check_security(code, "app.py", "python")
+        summary = [(issue.line, issue.message) for issue in issues]
+        assert summary == [
+            (1, "Hardcoded Password detected"),
+            (3, "Hardcoded Token detected"),
+            (1, "Missing CSRF protection"),
+            (4, "Unsafe deserialization detected"),
+            (5, "Weak cryptographic algorithm: MD5"),
+        ]
+        assert issues[1].code_snippet == 'token = "b"'
+
+    def test_csrf_token_suppresses_issue(self):
+        """測試存在 CSRF 令牌時不報告"""
+        analyzer = StaticAnalyzer({})
+        code = '<form method="post">\n{{ csrf_token }}\n</form>'
+        assert analyzer._detect_csrf_vulnerabilities(code, "page.html") == []
@@ -23,11 +23,13 @@ import asyncio
 import hashlib
 import json
 import logging
+import sqlite3
 import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 from uuid import uuid4
 
 import yaml
@@ -79,6 +81,18 @@ class ValidationSeverity(Enum):
     INFO = "info"
 
 
+# =============================================================================
+# Exceptions | 異常
+# =============================================================================
+
+class ContractDependencyError(ValueError):
+    """Raised when contract dependencies form a cycle | 契約依賴形成循環"""
+    
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__(f"Dependency cycle detected: {' -> '.join(cycle)}")
+
+
 # =============================================================================
 # Data Classes | 數據類
 # =============================================================================
@@ -160,6 +174,202 @@ class ContractEvent:
     data: Dict[str, Any] = field(default_factory=dict)
 
 
+# =============================================================================
+# Contract Storage | 契約存儲
+# =============================================================================
+
+class SQLiteContractStore:
+    """
+    SQLite Contract Store
+    =====================
+    
+    Persistent storage backend for the contract registry.
+    契約註冊表的持久化存儲後端。
+    
+    The name/version and type indexes and the dependency graph are kept as
+    indexed tables, so lookups never require loading every contract.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS contracts (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            contract_id TEXT NOT NULL UNIQUE,
+            name TEXT NOT NULL,
+            version TEXT NOT NULL,
+            contract_type TEXT NOT NULL,
+            status TEXT NOT NULL,
+            checksum TEXT NOT NULL,
+            definition TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_contracts_name_version ON contracts (name, version);
+        CREATE INDEX IF NOT EXISTS idx_contracts_type ON contracts (contract_type);
+        CREATE INDEX IF NOT EXISTS idx_contracts_status ON contracts (status);
+        CREATE TABLE IF NOT EXISTS contract_dependencies (
+            contract_id TEXT NOT NULL,
+            dependency_id TEXT NOT NULL,
+            PRIMARY KEY (contract_id, dependency_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_dependencies_dependency ON contract_dependencies (dependency_id);
+    """
+    
+    def __init__(self, path: str):
+        """
+        Initialize SQLite contract store
+        
+        Args:
+            path: Database file path
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+    
+    def save_many(self, contracts: Iterable[ContractDefinition]):
+        """Insert contracts and their dependency edges in a single transaction"""
+        with self._conn:
+            for contract in contracts:
+                self._conn.execute(
+                    "INSERT INTO contracts "
+                    "(contract_id, name, version, contract_type, status, checksum, definition) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        contract.contract_id,
+                        contract.metadata.name,
+                        contract.metadata.version,
+                        contract.metadata.contract_type.value,
+                        contract.status.value,
+                        contract.checksum,
+                        json.dumps(self._to_record(contract), default=str)
+                    )
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO contract_dependencies (contract_id, dependency_id) "
+                    "VALUES (?, ?)",
+                    [(contract.contract_id, dep) for dep in contract.metadata.dependencies]
+                )
+    
+    def save(self, contract: ContractDefinition):
+        """Persist mutable fields (status, metadata) of a stored contract"""
+        with self._conn:
+            self._conn.execute(
+                "UPDATE contracts SET status = ?, definition = ? WHERE contract_id = ?",
+                (
+                    contract.status.value,
+                    json.dumps(self._to_record(contract), default=str),
+                    contract.contract_id
+                )
+            )
+    
+    def load(self, contract_id: str) -> Optional[ContractDefinition]:
+        """Load a contract by ID"""
+        row = self._conn.execute(
+            "SELECT definition FROM contracts WHERE contract_id = ?", (contract_id,)
+        ).fetchone()
+        return self._from_record(json.loads(row[0])) if row else None
+    
+    def ids_by_name(self, name: str, version: str) -> List[str]:
+        """Get contract IDs registered under name:version, oldest first"""
+        rows = self._conn.execute(
+            "SELECT contract_id FROM contracts WHERE name = ? AND version = ? ORDER BY seq",
+            (name, version)
+        )
+        return [row[0] for row in rows]
+    
+    def ids_by_type(self, contract_type: ContractType) -> List[str]:
+        """Get contract IDs of a contract type, oldest first"""
+        rows = self._conn.execute(
+            "SELECT contract_id FROM contracts WHERE contract_type = ? ORDER BY seq",
+            (contract_type.value,)
+        )
+        return [row[0] for row in rows]
+    
+    def ids(self, status: Optional[ContractStatus] = None) -> List[str]:
+        """Get all contract IDs, optionally filtered by status, oldest first"""
+        if status:
+            rows = self._conn.execute(
+                "SELECT contract_id FROM contracts WHERE status = ? ORDER BY seq",
+                (status.value,)
+            )
+        else:
+            rows = self._conn.execute("SELECT contract_id FROM contracts ORDER BY seq")
+        return [row[0] for row in rows]
+    
+    def dependencies(self, contract_id: str) -> Set[str]:
+        """Get direct dependencies of a contract"""
+        rows = self._conn.execute(
+            "SELECT dependency_id FROM contract_dependencies WHERE contract_id = ?",
+            (contract_id,)
+        )
+        return {row[0] for row in rows}
+    
+    def dependents(self, contract_id: str) -> Set[str]:
+        """Get contracts that directly depend on a contract"""
+        rows = self._conn.execute(
+            "SELECT contract_id FROM contract_dependencies WHERE dependency_id = ?",
+            (contract_id,)
+        )
+        return {row[0] for row in rows}
+    
+    def count(self) -> int:
+        """Get the number of stored contracts"""
+        return self._conn.execute("SELECT COUNT(*) FROM contracts").fetchone()[0]
+    
+    def close(self):
+        """Close the database connection"""
+        self._conn.close()
+    
+    @staticmethod
+    def _to_record(contract: ContractDefinition) -> Dict[str, Any]:
+        """Serialize a contract definition"""
+        metadata = contract.metadata
+        return {
+            "contract_id": contract.contract_id,
+            "status": contract.status.value,
+            "checksum": contract.checksum,
+            "schema": contract.schema,
+            "validation_rules": contract.validation_rules,
+            "execution_config": contract.execution_config,
+            "lifecycle_config": contract.lifecycle_config,
+            "metadata": {
+                "name": metadata.name,
+                "version": metadata.version,
+                "contract_type": metadata.contract_type.value,
+                "description": metadata.description,
+                "author": metadata.author,
+                "created_at": metadata.created_at.isoformat(),
+                "updated_at": metadata.updated_at.isoformat(),
+                "tags": metadata.tags,
+                "dependencies": metadata.dependencies
+            }
+        }
+    
+    @staticmethod
+    def _from_record(record: Dict[str, Any]) -> ContractDefinition:
+        """Deserialize a contract definition"""
+        metadata = record["metadata"]
+        return ContractDefinition(
+            metadata=ContractMetadata(
+                name=metadata["name"],
+                version=metadata["version"],
+                contract_type=ContractType(metadata["contract_type"]),
+                description=metadata["description"],
+                author=metadata["author"],
+                created_at=datetime.fromisoformat(metadata["created_at"]),
+                updated_at=datetime.fromisoformat(metadata["updated_at"]),
+                tags=metadata["tags"],
+                dependencies=metadata["dependencies"]
+            ),
+            schema=record["schema"],
+            validation_rules=record["validation_rules"],
+            execution_config=record["execution_config"],
+            lifecycle_config=record["lifecycle_config"],
+            contract_id=record["contract_id"],
+            status=ContractStatus(record["status"]),
+            checksum=record["checksum"]
+        )
+
+
 # =============================================================================
 # Contract Registry | 契約註冊表
 # =============================================================================
@@ -173,28 +383,51 @@ class ContractRegistry:
     管理契約存儲、檢索和版本控制。
     
     Features:
-    - In-memory storage with optional persistence
+    - In-memory storage, or persistent SQLite storage (``storage_backend="sqlite"``)
+      with lazily loaded contracts and an LRU of hot definitions
     - Version management
     - Contract lookup by ID, name, or type
-    - Dependency resolution
+    - Dependency resolution with cycle detection at registration and cached
+      transitive closures, invalidated only for the affected dependents
     """
     
-    def __init__(self, storage_backend: str = "memory", cache_enabled: bool = True):
+    def __init__(
+        self,
+        storage_backend: str = "memory",
+        cache_enabled: bool = True,
+        storage_path: Optional[str] = None,
+        cache_size: int = 1024
+    ):
         """
         Initialize contract registry
         
         Args:
-            storage_backend: Storage backend type (memory|postgresql|redis)
-            cache_enabled: Enable in-memory caching
+            storage_backend: Storage backend type (memory|sqlite); other values
+                (postgresql|redis) fall back to in-memory storage
+            cache_enabled: Enable in-memory caching of loaded contracts
+            storage_path: Database path for the sqlite backend
+            cache_size: Maximum number of cached contracts (sqlite backend)
         """
         self.storage_backend = storage_backend
         self.cache_enabled = cache_enabled
+        self.cache_size = cache_size
         
-        # In-memory storage
-        self._contracts: Dict[str, ContractDefinition] = {}
+        # In-memory storage (all contracts for the memory backend, hot LRU
+        # entries for persistent backends)
+        self._contracts: Dict[str, ContractDefinition] = OrderedDict()
         self._name_index: Dict[str, List[str]] = {}  # name -> [contract_ids]
         self._type_index: Dict[ContractType, List[str]] = {}  # type -> [contract_ids]
         self._dependency_graph: Dict[str, Set[str]] = {}  # contract_id -> {dependency_ids}
+        self._dependents: Dict[str, Set[str]] = {}  # contract_id -> {dependent_ids}
+        self._resolution_cache: Dict[str, Dict[str, None]] = {}  # contract_id -> ordered closure
+        
+        self._store: Optional[SQLiteContractStore] = None
+        if storage_backend == "sqlite":
+            if not storage_path:
+                raise ValueError("storage_path is required for the sqlite backend")
+            self._store = SQLiteContractStore(storage_path)
+        elif storage_backend != "memory":
+            logger.warning(f"Storage backend '{storage_backend}' not available, using memory")
         
         logger.info(f"Contract registry initialized: backend={storage_backend}, cache={cache_enabled}")
     
@@ -209,15 +442,71 @@ class ContractRegistry:
             Contract ID
             
         Raises:
-            ValueError: If contract already exists with same checksum
-        """
-        # Check for duplicates
-        existing = self.get_by_name(contract.metadata.name, contract.metadata.version)
-        if existing and existing.checksum == contract.checksum:
-            raise ValueError(
-                f"Contract {contract.metadata.name}:{contract.metadata.version} "
-                f"already registered with same checksum"
-            )
+            ValueError: If the contract ID is taken or a contract already
+                exists with same checksum
+        """
+        self.register_many([contract])
+        return contract.contract_id
+    
+    def register_many(self, contracts: List[ContractDefinition]) -> List[str]:
+        """
+        Register several contracts at once
+        
+        With a persistent backend all contracts are written in a single
+        transaction; if any contract is rejected none are registered.
+        
+        Args:
+            contracts: Contract definitions to register
+            
+        Returns:
+            Contract IDs in registration order
+            
+        Raises:
+            ValueError: If a contract ID is taken or a contract already exists
+                with same checksum
+            ContractDependencyError: If the contracts would create a dependency cycle
+        """
+        seen: Dict[str, str] = {}
+        seen_ids: Set[str] = set()
+        for contract in contracts:
+            if contract.contract_id in seen_ids or self.get(contract.contract_id) is not None:
+                raise ValueError(f"Contract ID {contract.contract_id} already registered")
+            seen_ids.add(contract.contract_id)
+            
+            name_key = f"{contract.metadata.name}:{contract.metadata.version}"
+            existing = self.get_by_name(contract.metadata.name, contract.metadata.version)
+            if (
+                (existing and existing.checksum == contract.checksum)
+                or seen.get(name_key) == contract.checksum
+            ):
+                raise ValueError(
+                    f"Contract {contract.metadata.name}:{contract.metadata.version} "
+                    f"already registered with same checksum"
+                )
+            seen.setdefault(name_key, contract.checksum)
+        
+        self._check_cycles(contracts)
+        
+        if self._store:
+            self._store.save_many(contracts)
+        
+        for contract in contracts:
+            self._index(contract)
+            self.invalidate(contract.contract_id)
+            logger.info(f"Contract registered: {contract.contract_id} ({contract.metadata.name})")
+        
+        return [contract.contract_id for contract in contracts]
+    
+    def _index(self, contract: ContractDefinition):
+        """Add a newly registered contract to the in-memory structures"""
+        if self._store:
+            self._cache_put(contract)
+            if contract.metadata.dependencies:
+                self._dependency_graph[contract.contract_id] = set(contract.metadata.dependencies)
+            for dep_id in contract.metadata.dependencies:
+                if dep_id in self._dependents:
+                    self._dependents[dep_id].add(contract.contract_id)
+            return
         
         # Store contract
         self._contracts[contract.contract_id] = contract
@@ -235,16 +524,39 @@ class ContractRegistry:
         # Build dependency graph
         if contract.metadata.dependencies:
             self._dependency_graph[contract.contract_id] = set(contract.metadata.dependencies)
-        
-        logger.info(f"Contract registered: {contract.contract_id} ({contract.metadata.name})")
-        return contract.contract_id
+        for dep_id in contract.metadata.dependencies:
+            self._dependents.setdefault(dep_id, set()).add(contract.contract_id)
+    
+    def _cache_put(self, contract: ContractDefinition):
+        """Insert a contract into the LRU of hot definitions"""
+        if not self.cache_enabled or self.cache_size <= 0:
+            return
+        self._contracts[contract.contract_id] = contract
+        self._contracts.move_to_end(contract.contract_id)
+        while len(self._contracts) > self.cache_size:
+            self._contracts.popitem(last=False)
     
     def get(self, contract_id: str) -> Optional[ContractDefinition]:
         """Get contract by ID"""
-        return self._contracts.get(contract_id)
+        contract = self._contracts.get(contract_id)
+        if self._store is None:
+            return contract
+        
+        if contract is not None:
+            self._contracts.move_to_end(contract_id)
+            return contract
+        
+        contract = self._store.load(contract_id)
+        if contract is not None:
+            self._cache_put(contract)
+        return contract
     
     def get_by_name(self, name: str, version: str) -> Optional[ContractDefinition]:
         """Get contract by name and version"""
+        if self._store:
+            contract_ids = self._store.ids_by_name(name, version)
+            return self.get(contract_ids[0]) if contract_ids else None
+        
         name_key = f"{name}:{version}"
         contract_ids = self._name_index.get(name_key, [])
         if contract_ids:
@@ -253,16 +565,28 @@ class ContractRegistry:
     
     def get_by_type(self, contract_type: ContractType) -> List[ContractDefinition]:
         """Get all contracts of a specific type"""
+        if self._store:
+            return [self.get(cid) for cid in self._store.ids_by_type(contract_type)]
+        
         contract_ids = self._type_index.get(contract_type, [])
         return [self._contracts[cid] for cid in contract_ids if cid in self._contracts]
     
     def list_all(self, status: Optional[ContractStatus] = None) -> List[ContractDefinition]:
         """List all contracts, optionally filtered by status"""
+        if self._store:
+            return [self.get(cid) for cid in self._store.ids(status)]
+        
         contracts = list(self._contracts.values())
         if status:
             contracts = [c for c in contracts if c.status == status]
         return contracts
     
+    def count(self) -> int:
+        """Get the number of registered contracts"""
+        if self._store:
+            return self._store.count()
+        return len(self._contracts)
+    
     def update_status(self, contract_id: str, new_status: ContractStatus) -> bool:
         """Update contract status"""
         contract = self.get(contract_id)
@@ -272,36 +596,139 @@ class ContractRegistry:
         old_status = contract.status
         contract.status = new_status
         contract.metadata.updated_at = datetime.utcnow()
+        if self._store:
+            self._store.save(contract)
+        self.invalidate(contract_id)
         
         logger.info(f"Contract status updated: {contract_id} {old_status} -> {new_status}")
         return True
     
+    def _get_dependencies(self, contract_id: str) -> Set[str]:
+        """Get direct dependencies, loading them lazily from persistent storage"""
+        dependencies = self._dependency_graph.get(contract_id)
+        if dependencies is None and self._store:
+            dependencies = self._store.dependencies(contract_id)
+            self._dependency_graph[contract_id] = dependencies
+        return dependencies or set()
+    
+    def _get_dependents(self, contract_id: str) -> Set[str]:
+        """Get direct dependents, loading them lazily from persistent storage"""
+        dependents = self._dependents.get(contract_id)
+        if dependents is None and self._store:
+            dependents = self._store.dependents(contract_id)
+            self._dependents[contract_id] = dependents
+        return dependents or set()
+    
+    def _check_cycles(self, contracts: List[ContractDefinition]):
+        """
+        Reject contracts whose dependencies lead back to themselves
+        
+        The registered graph is acyclic, so a new cycle must pass through a
+        new contract. Existing contracts are only walked when one of them
+        already points at a new contract ID; otherwise the check is confined
+        to the new contracts.
+        
+        Raises:
+            ContractDependencyError: With the offending cycle
+        """
+        pending = {c.contract_id: set(c.metadata.dependencies) for c in contracts}
+        reentry = any(self._get_dependents(cid) for cid in pending)
+        
+        def dependencies_of(cid: str) -> Set[str]:
+            return pending[cid] if cid in pending else self._get_dependencies(cid)
+        
+        # Iterative three-colour DFS: 1 = on the current path, 2 = finished
+        color: Dict[str, int] = {}
+        for root in pending:
+            if root in color:
+                continue
+            path = [root]
+            color[root] = 1
+            stack = [iter(dependencies_of(root))]
+            while stack:
+                dep_id = next(stack[-1], None)
+                if dep_id is None:
+                    stack.pop()
+                    color[path.pop()] = 2
+                    continue
+                if not reentry and dep_id not in pending:
+                    continue
+                state = color.get(dep_id)
+                if state == 1:
+                    raise ContractDependencyError(path[path.index(dep_id):] + [dep_id])
+                if state == 2:
+                    continue
+                color[dep_id] = 1
+                path.append(dep_id)
+                stack.append(iter(dependencies_of(dep_id)))
+    
+    def invalidate(self, contract_id: str):
+        """Drop cached resolutions of a contract and everything that depends on it"""
+        stack = [contract_id]
+        seen = {contract_id}
+        while stack:
+            cid = stack.pop()
+            self._resolution_cache.pop(cid, None)
+            for dependent_id in self._get_dependents(cid):
+                if dependent_id not in seen:
+                    seen.add(dependent_id)
+                    stack.append(dependent_id)
+    
+    def close(self):
+        """Close the persistent storage backend, if any"""
+        if self._store:
+            self._store.close()
+    
     def resolve_dependencies(self, contract_id: str) -> List[str]:
         """
         Resolve contract dependencies in topological order
         
+        Resolution is iterative and memoized; cached closures of dependencies
+        are spliced in instead of being walked again.
+        
         Args:
             contract_id: Contract ID to resolve dependencies for
             
         Returns:
             List of contract IDs in dependency order (dependencies first)
+            
+        Raises:
+            ContractDependencyError: If a dependency cycle is found
         """
-        visited: Set[str] = set()
-        order: List[str] = []
-        
-        def visit(cid: str):
-            if cid in visited:
-                return
-            visited.add(cid)
+        cached = self._resolution_cache.get(contract_id)
+        if cached is not None:
+            return list(cached)
+        
+        order: Dict[str, None] = {}
+        on_path: List[str] = [contract_id]
+        in_progress: Set[str] = {contract_id}
+        stack = [iter(self._get_dependencies(contract_id))]
+        
+        while stack:
+            dep_id = next(stack[-1], None)
+            if dep_id is None:
+                stack.pop()
+                finished = on_path.pop()
+                in_progress.discard(finished)
+                order[finished] = None
+                continue
+            if dep_id in in_progress:
+                raise ContractDependencyError(on_path[on_path.index(dep_id):] + [dep_id])
+            if dep_id in order:
+                continue
             
-            dependencies = self._dependency_graph.get(cid, set())
-            for dep_id in dependencies:
-                visit(dep_id)
+            cached = self._resolution_cache.get(dep_id)
+            if cached is not None:
+                for cid in cached:
+                    order.setdefault(cid, None)
+                continue
             
-            order.append(cid)
+            on_path.append(dep_id)
+            in_progress.add(dep_id)
+            stack.append(iter(self._get_dependencies(dep_id)))
         
-        visit(contract_id)
-        return order
+        self._resolution_cache[contract_id] = order
+        return list(order)
 
 
 # =============================================================================
@@ -861,7 +1288,9 @@ class ContractEngine:
         
         self.registry = ContractRegistry(
             storage_backend=self.config.get("storage_backend", "memory"),
-            cache_enabled=self.config.get("cache_enabled", True)
+            cache_enabled=self.config.get("cache_enabled", True),
+            storage_path=self.config.get("storage_path"),
+            cache_size=self.config.get("cache_size", 1024)
         )
         
         self.validator = ContractValidator(execution_mode=execution_mode)
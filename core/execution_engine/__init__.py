@@ -35,11 +35,23 @@ from .connector_manager import (
     ConnectionStatus,
 )
 
+from .connection_pool import (
+    ConnectionPool,
+    PoolConfig,
+    PoolTimeoutError,
+    PoolClosedError,
+    Transport,
+    HTTPTransport,
+    FileSystemTransport,
+    SQLiteTransport,
+)
+
 from .action_executor import (
     ActionExecutor,
     ActionPlan,
     ActionStep,
     StepResult,
+    compute_critical_path,
 )
 
 from .verification_engine import (
@@ -72,11 +84,21 @@ __all__ = [
     'Connector',
     'ConnectorType',
     'ConnectionStatus',
+    # Connection Pool
+    'ConnectionPool',
+    'PoolConfig',
+    'PoolTimeoutError',
+    'PoolClosedError',
+    'Transport',
+    'HTTPTransport',
+    'FileSystemTransport',
+    'SQLiteTransport',
     # Action Executor
     'ActionExecutor',
     'ActionPlan',
     'ActionStep',
     'StepResult',
+    'compute_critical_path',
     # Verification Engine
     'VerificationEngine',
     'VerificationResult',
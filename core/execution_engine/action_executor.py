@@ -9,12 +9,14 @@
 2. 執行步驟序列
 3. 處理步驟依賴
 4. 管理執行狀態
+5. 串流並行執行（依賴完成即啟動）與關鍵路徑分析
 """
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Any, Optional, Callable, Awaitable
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Tuple
 from datetime import datetime
+from collections import deque
 import asyncio
 import uuid
 
@@ -109,12 +111,38 @@ class ActionPlan:
     # 執行配置
     parallel: bool = False
     stop_on_failure: bool = True
+    max_concurrency: Optional[int] = None  # 並行上限（None 使用執行器設定）
     
     # 結果
     results: List[StepResult] = field(default_factory=list)
     
+    # 關鍵路徑（按步驟耗時計算的最長依賴鏈）
+    critical_path: List[str] = field(default_factory=list)
+    critical_path_ms: int = 0
+    
     # 元數據
     metadata: Dict[str, Any] = field(default_factory=dict)
+    
+    def __post_init__(self):
+        if self.max_concurrency is not None and self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+
+def _build_dependency_graph(
+    steps: List[ActionStep]
+) -> Tuple[Dict[str, int], Dict[str, List[str]]]:
+    """構建入度表與後繼表（忽略計劃外的依賴）"""
+    
+    in_degree: Dict[str, int] = {step.id: 0 for step in steps}
+    dependents: Dict[str, List[str]] = {step.id: [] for step in steps}
+    
+    for step in steps:
+        for dep in dict.fromkeys(step.depends_on):
+            if dep in dependents and dep != step.id:
+                dependents[dep].append(step.id)
+                in_degree[step.id] += 1
+    
+    return in_degree, dependents
 
 
 class ActionExecutor:
@@ -126,10 +154,22 @@ class ActionExecutor:
     2. 按照依賴順序執行
     3. 處理並行和串行執行
     4. 管理錯誤和重試
+    
+    並行計劃以 Kahn 入度追蹤串流執行：每個步驟在其自身依賴完成後
+    立即啟動，不等待同層其他步驟，並受 max_concurrency 限制。
     """
     
-    def __init__(self):
-        """初始化行動執行器"""
+    def __init__(self, max_concurrency: Optional[int] = None):
+        """
+        初始化行動執行器
+        
+        Args:
+            max_concurrency: 並行計劃同時執行的步驟上限（None 表示不限）
+        """
+        
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self._max_concurrency = max_concurrency
         
         # 步驟處理器
         self._handlers: Dict[str, Callable] = {}
@@ -202,6 +242,9 @@ class ActionExecutor:
         finally:
             plan.completed_at = datetime.now()
             
+            # 關鍵路徑
+            plan.critical_path, plan.critical_path_ms = compute_critical_path(plan)
+            
             # 從運行中移除
             if plan.id in self._running_plans:
                 del self._running_plans[plan.id]
@@ -254,85 +297,123 @@ class ActionExecutor:
                 break
     
     async def _execute_parallel(self, plan: ActionPlan):
-        """並行執行步驟"""
+        """
+        並行執行步驟（串流調度）
+        
+        以入度追蹤就緒步驟，步驟完成時只遞減其後繼者的入度，
+        新就緒的步驟立即啟動，因此慢步驟只會延遲真正依賴它的步驟。
+        """
         
-        # 分層：按依賴關係分組
-        layers = self._build_execution_layers(plan.steps)
+        step_map = {step.id: step for step in plan.steps}
+        order = {step.id: index for index, step in enumerate(plan.steps)}
+        in_degree, dependents = _build_dependency_graph(plan.steps)
         completed_steps: Dict[str, StepResult] = {}
         
-        for layer in layers:
-            # 並行執行同一層的步驟
-            tasks = []
-            for step in layer:
-                task = self._execute_step(step, completed_steps)
-                tasks.append(task)
-            
-            # 等待所有任務完成
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # 處理結果
-            for i, result in enumerate(results):
-                step = layer[i]
-                
-                if isinstance(result, Exception):
-                    step_result = StepResult(
-                        step_id=step.id,
-                        step_name=step.name,
-                        status=StepStatus.FAILED,
-                        started_at=datetime.now(),
-                        error=str(result),
-                    )
-                else:
-                    step_result = result
+        limit = plan.max_concurrency or self._max_concurrency or len(plan.steps) or 1
+        ready = deque(step.id for step in plan.steps if in_degree[step.id] == 0)
+        running: Dict[asyncio.Task, ActionStep] = {}
+        stop = False
+        
+        def finish(step: ActionStep, step_result: StepResult) -> None:
+            plan.results.append(step_result)
+            completed_steps[step.id] = step_result
+            for dependent_id in dependents[step.id]:
+                in_degree[dependent_id] -= 1
+                if in_degree[dependent_id] == 0:
+                    ready.append(dependent_id)
+        
+        try:
+            while ready or running:
+                # 啟動就緒步驟
+                while ready and not stop and len(running) < limit:
+                    if plan.status == "cancelled":
+                        stop = True
+                        break
+                    
+                    step = step_map[ready.popleft()]
+                    
+                    # 檢查依賴
+                    if not self._check_dependencies(step, completed_steps):
+                        step.status = StepStatus.SKIPPED
+                        finish(step, StepResult(
+                            step_id=step.id,
+                            step_name=step.name,
+                            status=StepStatus.SKIPPED,
+                            started_at=datetime.now(),
+                            error="Dependency not satisfied",
+                        ))
+                        continue
+                    
+                    # 檢查條件
+                    if step.condition is not None:
+                        try:
+                            should_run = await self._safe_call(step.condition, completed_steps)
+                            if not should_run:
+                                step.status = StepStatus.SKIPPED
+                                finish(step, StepResult(
+                                    step_id=step.id,
+                                    step_name=step.name,
+                                    status=StepStatus.SKIPPED,
+                                    started_at=datetime.now(),
+                                ))
+                                continue
+                        except Exception:
+                            pass
+                    
+                    task = asyncio.ensure_future(self._execute_step(step, completed_steps))
+                    running[task] = step
                 
-                plan.results.append(step_result)
-                completed_steps[step.id] = step_result
-            
-            # 檢查是否有失敗
-            if plan.stop_on_failure:
-                failed = any(r.status == StepStatus.FAILED for r in results 
-                            if isinstance(r, StepResult))
-                if failed:
+                if not running:
                     break
+                
+                # 等待任一步驟完成
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in sorted(done, key=lambda t: order[running[t].id]):
+                    step = running.pop(task)
+                    
+                    if task.exception() is not None:
+                        step_result = StepResult(
+                            step_id=step.id,
+                            step_name=step.name,
+                            status=StepStatus.FAILED,
+                            started_at=datetime.now(),
+                            error=str(task.exception()),
+                        )
+                    else:
+                        step_result = task.result()
+                    
+                    finish(step, step_result)
+                    
+                    # 失敗時停止啟動新步驟，已在執行的步驟繼續完成
+                    if step_result.status == StepStatus.FAILED and plan.stop_on_failure:
+                        stop = True
+        finally:
+            for task in running:
+                task.cancel()
     
     def _build_execution_layers(
         self,
         steps: List[ActionStep]
     ) -> List[List[ActionStep]]:
-        """構建執行層次（按依賴關係）"""
-        
-        # 計算每個步驟的依賴數
-        in_degree: Dict[str, int] = {}
-        step_map: Dict[str, ActionStep] = {}
+        """構建執行層次（按依賴關係，O(V+E)）"""
         
-        for step in steps:
-            step_map[step.id] = step
-            in_degree[step.id] = len(step.depends_on)
+        step_map = {step.id: step for step in steps}
+        in_degree, dependents = _build_dependency_graph(steps)
         
-        # 拓撲排序
         layers: List[List[ActionStep]] = []
-        remaining = set(step.id for step in steps)
-        
-        while remaining:
-            # 找出沒有未滿足依賴的步驟
-            layer = []
-            for step_id in list(remaining):
-                step = step_map[step_id]
-                deps_satisfied = all(
-                    dep not in remaining 
-                    for dep in step.depends_on
-                )
-                if deps_satisfied:
-                    layer.append(step)
-            
-            if not layer:
-                # 有循環依賴
-                break
-            
+        layer = [step for step in steps if in_degree[step.id] == 0]
+        
+        # 循環依賴中的步驟永遠不會就緒，自然被排除
+        while layer:
             layers.append(layer)
-            
+            next_layer = []
             for step in layer:
-                remaining.discard(step.id)
+                for dependent_id in dependents[step.id]:
+                    in_degree[dependent_id] -= 1
+                    if in_degree[dependent_id] == 0:
+                        next_layer.append(step_map[dependent_id])
+            layer = next_layer
         
         return layers
     
@@ -495,6 +576,7 @@ class ActionExecutor:
             description=kwargs.get("description", ""),
             parallel=kwargs.get("parallel", False),
             stop_on_failure=kwargs.get("stop_on_failure", True),
+            max_concurrency=kwargs.get("max_concurrency"),
             metadata=kwargs.get("metadata", {}),
         )
         
@@ -670,3 +752,51 @@ class ActionExecutor:
             "tests_passed": True,
             "test_suite": params.get("test_suite", "smoke"),
         }
+
+
+def compute_critical_path(plan: ActionPlan) -> Tuple[List[str], int]:
+    """
+    計算計劃的關鍵路徑
+    
+    以各步驟實際耗時為權重，求依賴圖上的最長路徑；即使並行度不限，
+    計劃也無法快於此路徑。未執行的步驟耗時為 0。
+    
+    Returns:
+        (關鍵路徑上的步驟 ID 列表, 路徑總耗時毫秒)
+    """
+    
+    step_map = {step.id: step for step in plan.steps}
+    in_degree, dependents = _build_dependency_graph(plan.steps)
+    
+    finish_ms: Dict[str, int] = {}
+    previous: Dict[str, Optional[str]] = {}
+    ready = deque(step_id for step_id, degree in in_degree.items() if degree == 0)
+    
+    while ready:
+        step_id = ready.popleft()
+        step = step_map[step_id]
+        
+        best_dep: Optional[str] = None
+        for dep in step.depends_on:
+            if dep in finish_ms and (best_dep is None or finish_ms[dep] > finish_ms[best_dep]):
+                best_dep = dep
+        start_ms = finish_ms[best_dep] if best_dep is not None else 0
+        finish_ms[step_id] = start_ms + max(step.duration_ms, 0)
+        previous[step_id] = best_dep
+        
+        for dependent_id in dependents[step_id]:
+            in_degree[dependent_id] -= 1
+            if in_degree[dependent_id] == 0:
+                ready.append(dependent_id)
+    
+    if not finish_ms:
+        return [], 0
+    
+    end = max(finish_ms, key=finish_ms.get)
+    path: List[str] = []
+    node: Optional[str] = end
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    path.reverse()
+    return path, finish_ms[end]
@@ -0,0 +1,742 @@
+"""
+═══════════════════════════════════════════════════════════
+        Connection Pool - 連接池
+        連接器的池化傳輸層
+═══════════════════════════════════════════════════════════
+
+核心功能：
+1. 最小/最大連接數與空閒回收
+2. 取出連接時的健康驗證
+3. 等待隊列與取出超時
+4. 連接池指標（使用中、空閒、等待時間）
+
+參考傳輸實現：
+- HTTPTransport: 基於 http.client 的 keep-alive 連接
+- FileSystemTransport: 限定在 base_path 內的文件操作
+- SQLiteTransport: 基於 sqlite3 的數據庫連接
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+from collections import deque
+from pathlib import Path
+import asyncio
+import http.client
+import json
+import select
+import shutil
+import sqlite3
+import ssl
+import time
+
+
+class PoolTimeoutError(Exception):
+    """在超時內無法取得連接"""
+    pass
+
+
+class PoolClosedError(Exception):
+    """連接池已關閉"""
+    pass
+
+
+class Transport(ABC):
+    """
+    傳輸層基類
+    
+    一個傳輸負責打開、驗證、關閉單條連接，並在連接上執行操作。
+    連接池保證同一時間只有一個調用方使用某條連接。
+    """
+    
+    name: str = "transport"
+    
+    @abstractmethod
+    async def open(self) -> Any:
+        """打開一條新連接"""
+        pass
+    
+    async def close(self, connection: Any) -> None:
+        """關閉連接"""
+        pass
+    
+    async def validate(self, connection: Any) -> bool:
+        """驗證連接是否仍然可用（每次取出時調用）"""
+        return True
+    
+    @abstractmethod
+    async def execute(
+        self,
+        connection: Any,
+        operation: str,
+        params: Dict[str, Any]
+    ) -> Any:
+        """在連接上執行操作"""
+        pass
+    
+    async def is_broken(self, connection: Any, error: BaseException) -> bool:
+        """操作失敗後判斷連接本身是否已損壞"""
+        return isinstance(error, OSError)
+
+
+@dataclass
+class PoolConfig:
+    """連接池配置"""
+    
+    min_size: int = 1
+    max_size: int = 10
+    
+    # 取出連接的最長等待時間（秒）
+    acquire_timeout: float = 30.0
+    
+    # 超過 min_size 的連接空閒多久後被回收（秒），0 表示不回收
+    idle_timeout: float = 300.0
+    
+    # 取出時驗證連接
+    validate_on_checkout: bool = True
+
+
+@dataclass
+class PoolMetrics:
+    """連接池指標"""
+    
+    created: int = 0
+    closed: int = 0
+    checkouts: int = 0
+    waits: int = 0
+    timeouts: int = 0
+    validation_failures: int = 0
+    broken: int = 0
+    evicted: int = 0
+    open_failures: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+
+
+class PooledConnection:
+    """連接池中的一條連接"""
+    
+    __slots__ = ("connection", "created_at", "last_used")
+    
+    def __init__(self, connection: Any, now: float):
+        self.connection = connection
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """
+    連接池
+    
+    空閒連接按後進先出取用，讓熱連接保持活躍、冷連接自然過期；
+    池滿時調用方按先來先服務排隊，釋放的連接直接交給隊首等待者。
+    """
+    
+    def __init__(self, transport: Transport, config: Optional[PoolConfig] = None):
+        self.transport = transport
+        self.config = config or PoolConfig()
+        if self.config.max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if not 0 <= self.config.min_size <= self.config.max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+        
+        self.metrics = PoolMetrics()
+        
+        self._idle: deque = deque()
+        self._waiters: deque = deque()
+        
+        # 已打開及正在打開的連接數
+        self._size = 0
+        self._in_use = 0
+        
+        self._closed = False
+        self._reaper: Optional[asyncio.Task] = None
+    
+    @property
+    def closed(self) -> bool:
+        return self._closed
+    
+    @property
+    def size(self) -> int:
+        return self._size
+    
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+    
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+    
+    @property
+    def waiting(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+    
+    async def start(self) -> None:
+        """預熱 min_size 條連接並啟動空閒回收"""
+        
+        if self._closed:
+            raise PoolClosedError("Connection pool is closed")
+        
+        await self._fill()
+        
+        if self.config.idle_timeout > 0 and self._reaper is None:
+            self._reaper = asyncio.ensure_future(self._reap())
+    
+    async def acquire(self, timeout: Optional[float] = None) -> PooledConnection:
+        """
+        取出一條連接
+        
+        Args:
+            timeout: 等待超時（秒），默認使用配置中的 acquire_timeout
+        
+        Returns:
+            池化連接，使用後必須調用 release
+        """
+        
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + (self.config.acquire_timeout if timeout is None else timeout)
+        waited = False
+        
+        while True:
+            if self._closed:
+                raise PoolClosedError("Connection pool is closed")
+            
+            # 優先使用空閒連接
+            while self._idle:
+                pooled = self._idle.pop()
+                if await self._checkout_valid(pooled):
+                    return self._checked_out(pooled, start, waited)
+            
+            # 未達上限時打開新連接
+            if self._size < self.config.max_size:
+                pooled = await self._open()
+                return self._checked_out(pooled, start, waited)
+            
+            # 池滿，排隊等待
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                self.metrics.timeouts += 1
+                raise PoolTimeoutError(
+                    f"Timed out after {deadline - start:.3f}s waiting for a "
+                    f"{self.transport.name} connection"
+                )
+            
+            waited = True
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                pooled = await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                await self._reclaim(waiter)
+                self.metrics.timeouts += 1
+                raise PoolTimeoutError(
+                    f"Timed out after {deadline - start:.3f}s waiting for a "
+                    f"{self.transport.name} connection"
+                ) from None
+            except BaseException:
+                await self._reclaim(waiter)
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            
+            # None 表示有容量空出，重新嘗試
+            if pooled is not None:
+                if await self._checkout_valid(pooled):
+                    return self._checked_out(pooled, start, waited)
+    
+    async def release(self, pooled: PooledConnection, discard: bool = False) -> None:
+        """
+        歸還連接
+        
+        Args:
+            pooled: acquire 返回的連接
+            discard: 連接已損壞時關閉而不是歸還
+        """
+        
+        self._in_use -= 1
+        if discard:
+            self.metrics.broken += 1
+            await self._discard(pooled)
+        else:
+            await self._return(pooled)
+    
+    async def execute(
+        self,
+        operation: str,
+        params: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> Any:
+        """取出連接、執行操作並歸還"""
+        
+        pooled = await self.acquire(timeout)
+        try:
+            result = await self.transport.execute(pooled.connection, operation, params)
+        except Exception as e:
+            await self.release(pooled, discard=await self.transport.is_broken(pooled.connection, e))
+            raise
+        except BaseException:
+            # 被取消時操作可能仍在線程中進行，不能再交給別人
+            await self.release(pooled, discard=True)
+            raise
+        await self.release(pooled)
+        return result
+    
+    async def evict_idle(self) -> int:
+        """回收空閒超時且超過 min_size 的連接"""
+        
+        now = time.monotonic()
+        evicted = 0
+        while (
+            self._idle
+            and self._size > self.config.min_size
+            and now - self._idle[0].last_used >= self.config.idle_timeout
+        ):
+            pooled = self._idle.popleft()
+            self.metrics.evicted += 1
+            await self._discard(pooled)
+            evicted += 1
+        return evicted
+    
+    async def close(self) -> None:
+        """關閉連接池及所有空閒連接，使用中的連接在歸還時關閉"""
+        
+        if self._closed:
+            return
+        self._closed = True
+        
+        if self._reaper is not None:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+        
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(PoolClosedError("Connection pool is closed"))
+        
+        while self._idle:
+            await self._discard(self._idle.popleft())
+    
+    def stats(self) -> Dict[str, Any]:
+        """獲取連接池指標"""
+        
+        metrics = self.metrics
+        return {
+            "transport": self.transport.name,
+            "closed": self._closed,
+            "size": self._size,
+            "in_use": self._in_use,
+            "idle": len(self._idle),
+            "waiting": self.waiting,
+            "min_size": self.config.min_size,
+            "max_size": self.config.max_size,
+            "created": metrics.created,
+            "closed_connections": metrics.closed,
+            "checkouts": metrics.checkouts,
+            "waits": metrics.waits,
+            "timeouts": metrics.timeouts,
+            "validation_failures": metrics.validation_failures,
+            "broken": metrics.broken,
+            "evicted": metrics.evicted,
+            "open_failures": metrics.open_failures,
+            "wait_time_ms": {
+                "total": round(metrics.total_wait_ms, 3),
+                "average": round(
+                    metrics.total_wait_ms / metrics.checkouts
+                    if metrics.checkouts else 0.0, 3
+                ),
+                "max": round(metrics.max_wait_ms, 3),
+            },
+        }
+    
+    # ============ 內部方法 ============
+    
+    def _checked_out(self, pooled: PooledConnection, start: float, waited: bool) -> PooledConnection:
+        """記錄一次成功取出"""
+        
+        wait_ms = (asyncio.get_running_loop().time() - start) * 1000
+        self._in_use += 1
+        self.metrics.checkouts += 1
+        self.metrics.total_wait_ms += wait_ms
+        self.metrics.max_wait_ms = max(self.metrics.max_wait_ms, wait_ms)
+        if waited:
+            self.metrics.waits += 1
+        return pooled
+    
+    async def _checkout_valid(self, pooled: PooledConnection) -> bool:
+        """取出前驗證連接，失效的連接直接關閉"""
+        
+        if not self.config.validate_on_checkout:
+            return True
+        try:
+            valid = await self.transport.validate(pooled.connection)
+        except Exception:
+            valid = False
+        if not valid:
+            self.metrics.validation_failures += 1
+            await self._discard(pooled)
+        return valid
+    
+    async def _open(self) -> PooledConnection:
+        """打開新連接（調用前容量已檢查）"""
+        
+        self._size += 1
+        try:
+            connection = await self.transport.open()
+        except BaseException:
+            self._size -= 1
+            self.metrics.open_failures += 1
+            self._wake_waiter(None)
+            raise
+        self.metrics.created += 1
+        return PooledConnection(connection, time.monotonic())
+    
+    async def _return(self, pooled: PooledConnection) -> None:
+        """把連接交給等待者或放回空閒隊列"""
+        
+        if self._closed:
+            await self._discard(pooled)
+            return
+        
+        pooled.last_used = time.monotonic()
+        if not self._wake_waiter(pooled):
+            self._idle.append(pooled)
+    
+    async def _discard(self, pooled: PooledConnection) -> None:
+        """關閉連接並釋放容量"""
+        
+        self._size -= 1
+        self.metrics.closed += 1
+        try:
+            await self.transport.close(pooled.connection)
+        except Exception:
+            pass
+        if not self._closed:
+            self._wake_waiter(None)
+    
+    async def _reclaim(self, waiter: asyncio.Future) -> None:
+        """等待者放棄時，已交付給它的連接或容量轉交下一位"""
+        
+        if not waiter.done() or waiter.cancelled() or waiter.exception() is not None:
+            return
+        pooled = waiter.result()
+        if pooled is not None:
+            await self._return(pooled)
+        else:
+            self._wake_waiter(None)
+    
+    def _wake_waiter(self, pooled: Optional[PooledConnection]) -> bool:
+        """喚醒隊首等待者，pooled 為 None 時表示有容量空出"""
+        
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(pooled)
+                return True
+        return False
+    
+    async def _fill(self) -> None:
+        """補足 min_size 條空閒連接"""
+        
+        while self._size < self.config.min_size and not self._closed:
+            pooled = await self._open()
+            await self._return(pooled)
+    
+    async def _reap(self) -> None:
+        """後台回收空閒連接並維持最小連接數"""
+        
+        interval = min(max(self.config.idle_timeout / 2, 0.01), 30.0)
+        while not self._closed:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+            try:
+                await self._fill()
+            except Exception:
+                # 打開失敗已記入 open_failures，下一輪重試
+                pass
+
+
+# ============ 參考傳輸實現 ============
+
+
+_HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+class HTTPTransport(Transport):
+    """
+    HTTP keep-alive 傳輸
+    
+    每條池化連接是一個 HTTP/1.1 持久連接，阻塞 I/O 在線程中執行。
+    操作名為 HTTP 方法時直接使用，否則使用 params["method"]（默認 GET）。
+    """
+    
+    name = "http"
+    
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        use_ssl: bool = False,
+        timeout: float = 30.0,
+        headers: Optional[Dict[str, str]] = None,
+        ssl_context: Optional[ssl.SSLContext] = None
+    ):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.ssl_context = ssl_context
+    
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.use_ssl:
+            return http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout, context=self.ssl_context
+            )
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+    
+    async def open(self) -> http.client.HTTPConnection:
+        connection = self._connection()
+        await asyncio.to_thread(connection.connect)
+        return connection
+    
+    async def close(self, connection: http.client.HTTPConnection) -> None:
+        connection.close()
+    
+    async def validate(self, connection: http.client.HTTPConnection) -> bool:
+        sock = connection.sock
+        if sock is None:
+            # 服務端要求關閉後 http.client 會在下次請求時自動重連
+            return True
+        try:
+            # 空閒的 keep-alive 連接不應有可讀數據，可讀意味著對端已關閉
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+    
+    async def execute(
+        self,
+        connection: http.client.HTTPConnection,
+        operation: str,
+        params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        method = operation.upper() if operation.upper() in _HTTP_METHODS else params.get("method", "GET")
+        headers = {**self.headers, **params.get("headers", {})}
+        body = params.get("body")
+        if "json" in params:
+            body = json.dumps(params["json"]).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        elif isinstance(body, str):
+            body = body.encode("utf-8")
+        
+        return await asyncio.to_thread(
+            self._request, connection, method.upper(), params.get("path", "/"), body, headers
+        )
+    
+    def _request(
+        self,
+        connection: http.client.HTTPConnection,
+        method: str,
+        path: str,
+        body: Optional[bytes],
+        headers: Dict[str, str]
+    ) -> Dict[str, Any]:
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        # 必須讀完響應體，連接才能復用
+        data = response.read()
+        
+        content_type = response.getheader("Content-Type", "")
+        payload: Any = data
+        if "json" in content_type and data:
+            payload = json.loads(data)
+        elif content_type.startswith("text/") or "json" in content_type:
+            payload = data.decode("utf-8", errors="replace")
+        
+        return {
+            "status": response.status,
+            "reason": response.reason,
+            "headers": dict(response.getheaders()),
+            "body": payload,
+        }
+    
+    async def is_broken(self, connection: Any, error: BaseException) -> bool:
+        return isinstance(error, (OSError, http.client.HTTPException))
+
+
+class FileSystemTransport(Transport):
+    """
+    文件系統傳輸
+    
+    所有路徑都相對於 base_path 解析，越界訪問會被拒絕。
+    支持的操作：read、write、append、list、exists、stat、mkdir、delete。
+    """
+    
+    name = "file_system"
+    
+    def __init__(self, base_path: str, encoding: str = "utf-8"):
+        self.base_path = Path(base_path)
+        self.encoding = encoding
+    
+    async def open(self) -> Path:
+        root = self.base_path.resolve()
+        if not root.is_dir():
+            raise FileNotFoundError(f"Base path is not a directory: {self.base_path}")
+        return root
+    
+    async def validate(self, connection: Path) -> bool:
+        return connection.is_dir()
+    
+    async def execute(self, connection: Path, operation: str, params: Dict[str, Any]) -> Any:
+        handler = getattr(self, f"_op_{operation}", None)
+        if handler is None:
+            raise ValueError(f"Unsupported file system operation: {operation}")
+        path = self._resolve(connection, params.get("path", "."))
+        return await asyncio.to_thread(handler, path, params)
+    
+    def _resolve(self, root: Path, relative: str) -> Path:
+        path = (root / relative).resolve()
+        if path != root and root not in path.parents:
+            raise PermissionError(f"Path escapes base path: {relative}")
+        return path
+    
+    def _op_read(self, path: Path, params: Dict[str, Any]) -> Any:
+        if params.get("binary"):
+            return path.read_bytes()
+        return path.read_text(encoding=self.encoding)
+    
+    def _op_write(self, path: Path, params: Dict[str, Any], mode: str = "w") -> Dict[str, Any]:
+        content = params.get("content", "")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            with open(path, mode + "b") as f:
+                written = f.write(content)
+        else:
+            with open(path, mode, encoding=self.encoding) as f:
+                written = f.write(content)
+        return {"path": str(path), "written": written}
+    
+    def _op_append(self, path: Path, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self._op_write(path, params, mode="a")
+    
+    def _op_list(self, path: Path, params: Dict[str, Any]) -> List[str]:
+        return sorted(entry.name for entry in path.iterdir())
+    
+    def _op_exists(self, path: Path, params: Dict[str, Any]) -> bool:
+        return path.exists()
+    
+    def _op_stat(self, path: Path, params: Dict[str, Any]) -> Dict[str, Any]:
+        stat = path.stat()
+        return {
+            "size": stat.st_size,
+            "modified": stat.st_mtime,
+            "is_dir": path.is_dir(),
+        }
+    
+    def _op_mkdir(self, path: Path, params: Dict[str, Any]) -> Dict[str, Any]:
+        path.mkdir(parents=True, exist_ok=True)
+        return {"path": str(path)}
+    
+    def _op_delete(self, path: Path, params: Dict[str, Any]) -> bool:
+        if not path.exists():
+            return False
+        if path.is_dir():
+            if not params.get("recursive"):
+                path.rmdir()
+            else:
+                shutil.rmtree(path)
+        else:
+            path.unlink()
+        return True
+    
+    async def is_broken(self, connection: Path, error: BaseException) -> bool:
+        # 單個文件的錯誤不影響連接，只有根目錄消失時才丟棄
+        return not connection.is_dir()
+
+
+class SQLiteTransport(Transport):
+    """
+    SQLite 數據庫傳輸
+    
+    文件數據庫使用 WAL 模式，讀寫可以在多條連接間並發。
+    注意 ":memory:" 數據庫每條連接各自獨立。
+    支持的操作：query、execute、executemany、script。
+    """
+    
+    name = "sqlite"
+    
+    def __init__(self, database: str, timeout: float = 30.0):
+        self.database = database
+        self.timeout = timeout
+    
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.database, timeout=self.timeout, check_same_thread=False
+        )
+        connection.row_factory = sqlite3.Row
+        if self.database != ":memory:":
+            connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+    
+    async def open(self) -> sqlite3.Connection:
+        return await asyncio.to_thread(self._connect)
+    
+    async def close(self, connection: sqlite3.Connection) -> None:
+        connection.close()
+    
+    async def validate(self, connection: sqlite3.Connection) -> bool:
+        return self._ping(connection)
+    
+    def _ping(self, connection: sqlite3.Connection) -> bool:
+        try:
+            connection.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+    
+    async def execute(
+        self,
+        connection: sqlite3.Connection,
+        operation: str,
+        params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if operation not in ("query", "execute", "executemany", "script"):
+            raise ValueError(f"Unsupported SQLite operation: {operation}")
+        return await asyncio.to_thread(self._run, connection, operation, params)
+    
+    def _run(
+        self,
+        connection: sqlite3.Connection,
+        operation: str,
+        params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        sql = params.get("sql", "")
+        parameters = params.get("parameters", ())
+        
+        if operation == "query":
+            cursor = connection.execute(sql, parameters)
+            columns = [column[0] for column in cursor.description or ()]
+            rows = [dict(row) for row in cursor.fetchall()]
+            return {"columns": columns, "rows": rows}
+        
+        # with 區塊在成功時提交、失敗時回滾
+        with connection:
+            if operation == "script":
+                connection.executescript(sql)
+                return {"rowcount": -1}
+            if operation == "executemany":
+                cursor = connection.executemany(sql, parameters)
+            else:
+                cursor = connection.execute(sql, parameters)
+            return {"rowcount": cursor.rowcount, "lastrowid": cursor.lastrowid}
+    
+    async def is_broken(self, connection: sqlite3.Connection, error: BaseException) -> bool:
+        # SQL 錯誤不代表連接損壞，以探測結果為準
+        return not self._ping(connection)
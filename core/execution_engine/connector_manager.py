@@ -9,6 +9,9 @@
 2. 提供連接池管理
 3. 處理連接重試和故障轉移
 4. 監控連接健康狀態
+
+配置了真實端點的 HTTP、FILE_SYSTEM、DATABASE(SQLite) 連接器
+通過連接池執行操作，其餘連接器保持模擬執行。
 """
 
 from dataclasses import dataclass, field
@@ -18,6 +21,15 @@ from datetime import datetime
 import asyncio
 import uuid
 
+from .connection_pool import (
+    ConnectionPool,
+    PoolConfig,
+    Transport,
+    HTTPTransport,
+    FileSystemTransport,
+    SQLiteTransport,
+)
+
 
 class ConnectorType(Enum):
     """連接器類型"""
@@ -66,6 +78,9 @@ class ConnectionConfig:
     pool_size: int = 10
     max_overflow: int = 5
     pool_timeout_seconds: int = 30
+    pool_min_size: int = 1
+    pool_idle_timeout_seconds: float = 300.0
+    pool_validate_on_checkout: bool = True
     
     # 重試
     retry_count: int = 3
@@ -98,6 +113,9 @@ class Connector:
     # 連接實例（實際的連接對象）
     connection: Any = None
     
+    # 連接池（配置了真實傳輸時創建）
+    pool: Optional[ConnectionPool] = None
+    
     # 時間戳
     created_at: datetime = field(default_factory=datetime.now)
     connected_at: Optional[datetime] = None
@@ -141,6 +159,9 @@ class ConnectorManager:
         # 連接工廠
         self._factories: Dict[ConnectorType, Callable] = {}
         
+        # 傳輸工廠（返回 None 表示沒有真實端點，使用模擬執行）
+        self._transports: Dict[ConnectorType, Callable[[ConnectionConfig], Optional[Transport]]] = {}
+        
         # 健康檢查任務
         self._health_check_task: Optional[asyncio.Task] = None
         self._health_check_interval: int = 30
@@ -150,6 +171,7 @@ class ConnectorManager:
         
         # 註冊默認工廠
         self._register_default_factories()
+        self._register_default_transports()
     
     def _register_default_factories(self):
         """註冊默認連接工廠"""
@@ -161,6 +183,13 @@ class ConnectorManager:
         self._factories[ConnectorType.FILE_SYSTEM] = self._create_filesystem_connector
         self._factories[ConnectorType.MESSAGE_QUEUE] = self._create_mq_connector
     
+    def _register_default_transports(self):
+        """註冊默認傳輸工廠"""
+        
+        self._transports[ConnectorType.HTTP] = self._create_http_transport
+        self._transports[ConnectorType.FILE_SYSTEM] = self._create_filesystem_transport
+        self._transports[ConnectorType.DATABASE] = self._create_database_transport
+    
     async def create(
         self,
         name: str,
@@ -224,8 +253,25 @@ class ConnectorManager:
         connector.status = ConnectionStatus.CONNECTING
         
         try:
-            # 模擬連接過程
-            await asyncio.sleep(0.1)
+            transport_factory = self._transports.get(connector.connector_type)
+            transport = transport_factory(connector.config) if transport_factory else None
+            
+            if transport is not None:
+                if connector.pool is not None:
+                    await connector.pool.close()
+                    connector.pool = None
+                
+                # 預熱最小連接數，之後的操作復用池中連接
+                pool = ConnectionPool(transport, self._pool_config(connector.config))
+                try:
+                    await pool.start()
+                except BaseException:
+                    await pool.close()
+                    raise
+                connector.pool = pool
+            else:
+                # 沒有真實端點時模擬連接過程
+                await asyncio.sleep(0.1)
             
             connector.status = ConnectionStatus.CONNECTED
             connector.connected_at = datetime.now()
@@ -261,8 +307,12 @@ class ConnectorManager:
             return False
         
         try:
-            # 模擬斷開連接
-            await asyncio.sleep(0.05)
+            if connector.pool is not None:
+                await connector.pool.close()
+                connector.pool = None
+            else:
+                # 模擬斷開連接
+                await asyncio.sleep(0.05)
             
             connector.status = ConnectionStatus.DISCONNECTED
             connector.connection = None
@@ -295,7 +345,7 @@ class ConnectorManager:
         connector.status = ConnectionStatus.RECONNECTING
         
         # 斷開現有連接
-        if connector.connection is not None:
+        if connector.connection is not None or connector.pool is not None:
             await self.disconnect(name)
         
         # 重試連接
@@ -409,8 +459,12 @@ class ConnectorManager:
         start_time = datetime.now()
         
         try:
-            # 模擬操作執行
-            await asyncio.sleep(0.05)
+            if connector.pool is not None:
+                result = await connector.pool.execute(operation, params)
+            else:
+                # 模擬操作執行
+                await asyncio.sleep(0.05)
+                result = params.get("expected_result", {})
             
             # 更新統計
             end_time = datetime.now()
@@ -430,7 +484,7 @@ class ConnectorManager:
             return {
                 "success": True,
                 "operation": operation,
-                "result": params.get("expected_result", {}),
+                "result": result,
                 "latency_ms": latency_ms,
             }
             
@@ -479,6 +533,22 @@ class ConnectorManager:
             "message": f"Status: {connector.status.value}",
         })
         
+        # 檢查連接池能否在超時內取出並驗證一條連接
+        if connector.pool is not None:
+            pool = connector.pool
+            try:
+                pooled = await pool.acquire(timeout=connector.config.connect_timeout_seconds)
+                await pool.release(pooled)
+                passed, message = True, f"In use: {pool.in_use}, idle: {pool.idle}"
+            except Exception as e:
+                passed, message = False, f"Error: {str(e)}"
+            result["checks"].append({
+                "name": "pool_checkout",
+                "passed": passed,
+                "message": message,
+            })
+            result["pool"] = pool.stats()
+        
         # 執行自定義健康檢查
         if connector.health_check is not None:
             try:
@@ -553,6 +623,11 @@ class ConnectorManager:
                 round(successful_requests / total_requests, 4) * 100
                 if total_requests > 0 else 0
             ),
+            "pools": {
+                name: c.pool.stats()
+                for name, c in self._connectors.items()
+                if c.pool is not None
+            },
         }
     
     def register_factory(
@@ -563,6 +638,25 @@ class ConnectorManager:
         """註冊連接工廠"""
         self._factories[connector_type] = factory
     
+    def register_transport(
+        self,
+        connector_type: ConnectorType,
+        factory: Callable[[ConnectionConfig], Optional[Transport]]
+    ):
+        """註冊傳輸工廠，返回 None 的配置使用模擬執行"""
+        self._transports[connector_type] = factory
+    
+    def _pool_config(self, config: ConnectionConfig) -> PoolConfig:
+        """由連接配置生成連接池配置"""
+        max_size = max(1, config.pool_size + config.max_overflow)
+        return PoolConfig(
+            min_size=min(max(0, config.pool_min_size), max_size),
+            max_size=max_size,
+            acquire_timeout=config.pool_timeout_seconds,
+            idle_timeout=config.pool_idle_timeout_seconds,
+            validate_on_checkout=config.pool_validate_on_checkout,
+        )
+    
     def add_listener(self, listener: Callable):
         """添加事件監聽器"""
         self._listeners.append(listener)
@@ -651,3 +745,48 @@ class ConnectorManager:
             "broker": f"{config.host}:{config.port}",
             "queue": config.extra.get("queue", "default"),
         }
+    
+    # ============ 默認傳輸工廠 ============
+    
+    def _create_http_transport(
+        self,
+        config: ConnectionConfig
+    ) -> Optional[Transport]:
+        """HTTP keep-alive 傳輸，需要配置端口"""
+        if not config.port:
+            return None
+        
+        headers = dict(config.extra.get("headers", {}))
+        if config.token:
+            headers.setdefault("Authorization", f"Bearer {config.token}")
+        elif config.api_key:
+            headers.setdefault("X-API-Key", config.api_key)
+        
+        return HTTPTransport(
+            host=config.host,
+            port=config.port,
+            use_ssl=config.use_ssl,
+            timeout=config.read_timeout_seconds,
+            headers=headers,
+        )
+    
+    def _create_filesystem_transport(
+        self,
+        config: ConnectionConfig
+    ) -> Optional[Transport]:
+        """文件系統傳輸，需要配置 extra["base_path"]"""
+        if "base_path" not in config.extra:
+            return None
+        return FileSystemTransport(config.extra["base_path"])
+    
+    def _create_database_transport(
+        self,
+        config: ConnectionConfig
+    ) -> Optional[Transport]:
+        """SQLite 數據庫傳輸，需要配置 extra["driver"] = "sqlite" 與 extra["database"]"""
+        if config.extra.get("driver") != "sqlite" or "database" not in config.extra:
+            return None
+        return SQLiteTransport(
+            config.extra["database"],
+            timeout=config.read_timeout_seconds,
+        )
@@ -14,7 +14,7 @@ Key Components:
 from .mcp_server_manager import MCPServerManager, MCPServer, MCPServerConfig
 from .tool_registry import ToolRegistry, ToolDefinition, ToolExecutionResult, ToolCategory
 from .workflow_orchestrator import WorkflowOrchestrator, WorkflowStep, WorkflowResult, Workflow
-from .realtime_connector import RealTimeConnector, ConnectionStatus, ConnectionConfig, TransportType
+from .realtime_connector import RealTimeConnector, ConnectionStatus, ConnectionConfig, TransportType, RPCError
 
 __all__ = [
     'MCPServerManager',
@@ -32,6 +32,7 @@ __all__ = [
     'ConnectionStatus',
     'ConnectionConfig',
     'TransportType',
+    'RPCError',
 ]
 
 __version__ = '1.0.0'
@@ -3,20 +3,67 @@ Real-Time Connector - Real-time connection management for MCP servers
 
 This module provides real-time connection management capabilities
 including WebSocket support, connection pooling, and automatic reconnection.
+
+STDIO connections with a configured ``command`` launch the MCP server as a
+subprocess and speak newline-delimited JSON-RPC over its stdin/stdout. Many
+requests can be in flight on the same pipe at once; responses are matched
+to callers by request id, so they may arrive in any order.
 """
 
 import asyncio
+import itertools
 import json
 import logging
+import os
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 from uuid import uuid4
 
+from core.unified_integration.latency_histogram import LatencyHistogram
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _dumps(payload: Any) -> bytes:
+    """Encode a JSON-RPC payload as compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(data: bytes) -> Any:
+    """Decode a JSON-RPC payload, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class RPCError(Exception):
+    """Error object returned by a JSON-RPC server"""
+    
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+        
+    @classmethod
+    def from_dict(cls, error: Dict[str, Any]) -> 'RPCError':
+        """Create an error from a JSON-RPC error object"""
+        return cls(
+            code=error.get('code', -32603),
+            message=error.get('message', 'Unknown error'),
+            data=error.get('data')
+        )
+
+
 class ConnectionStatus(Enum):
     """Connection status enumeration"""
     DISCONNECTED = 'disconnected'
@@ -51,6 +98,13 @@ class ConnectionConfig:
     ssl: bool = False
     ssl_verify: bool = True
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # stdio transport: server process to launch
+    command: Optional[str] = None
+    args: List[str] = field(default_factory=list)
+    env: Dict[str, str] = field(default_factory=dict)
+    cwd: Optional[str] = None
+    max_in_flight: int = 256  # requests awaiting a response per connection
+    read_chunk_size: int = 65536  # bytes
 
 
 @dataclass
@@ -65,7 +119,8 @@ class Connection:
     error_count: int = 0
     messages_sent: int = 0
     messages_received: int = 0
-    latency_ms: float = 0.0
+    latency_ms: float = 0.0  # mean of the latency histogram
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
     metadata: Dict[str, Any] = field(default_factory=dict)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -84,6 +139,7 @@ class Connection:
             'messages_sent': self.messages_sent,
             'messages_received': self.messages_received,
             'latency_ms': self.latency_ms,
+            'latency': self.latency.to_dict(),
             'metadata': self.metadata
         }
 
@@ -143,6 +199,121 @@ class Message:
         )
 
 
+class StdioChannel:
+    """
+    Newline-delimited JSON-RPC over a server subprocess' stdin/stdout
+    
+    The reader pulls large chunks and splits every complete line out of the
+    buffer at once, so a burst of responses costs one read instead of one
+    per message. Writers wait on the pipe's drain, and the ``permits``
+    semaphore bounds the number of requests awaiting a response.
+    """
+    
+    def __init__(
+        self,
+        config: ConnectionConfig,
+        on_message: Callable[[Any], None],
+        on_close: Callable[[Optional[Exception]], None]
+    ):
+        self.config = config
+        self.permits = asyncio.Semaphore(max(config.max_in_flight, 1))
+        self.batch_lock = asyncio.Lock()
+        self.pending: Set[str] = set()
+        self._on_message = on_message
+        self._on_close = on_close
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._tasks: List[asyncio.Task] = []
+        self._closing = False
+        
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid if self._process else None
+        
+    async def open(self) -> None:
+        """Launch the server process and start reading its output"""
+        env = {**os.environ, **self.config.env} if self.config.env else None
+        self._process = await asyncio.create_subprocess_exec(
+            self.config.command,
+            *self.config.args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            cwd=self.config.cwd
+        )
+        self._tasks = [
+            asyncio.create_task(self._read_loop()),
+            asyncio.create_task(self._drain_stderr())
+        ]
+        
+    async def send(self, data: bytes) -> None:
+        """Write one framed message, waiting while the pipe is backed up"""
+        if self._closing or self._process is None or self._process.stdin.is_closing():
+            raise ConnectionError(f'stdio channel closed: {self.config.server_name}')
+        self._process.stdin.write(data + b'\n')
+        await self._process.stdin.drain()
+        
+    async def close(self, timeout: float = 2.0) -> None:
+        """Close stdin and wait for the server to exit, killing it if needed"""
+        self._closing = True
+        process = self._process
+        if process is not None:
+            if not process.stdin.is_closing():
+                process.stdin.close()
+            try:
+                await asyncio.wait_for(process.wait(), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        
+    async def _read_loop(self) -> None:
+        """Split stdout into messages and hand each one to the connector"""
+        reader = self._process.stdout
+        buffer = bytearray()
+        error: Optional[Exception] = None
+        try:
+            while True:
+                chunk = await reader.read(self.config.read_chunk_size)
+                if not chunk:
+                    break
+                buffer += chunk
+                end = buffer.rfind(b'\n')
+                if end < 0:
+                    continue
+                lines = bytes(buffer[:end]).split(b'\n')
+                del buffer[:end + 1]
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    try:
+                        payload = _loads(line)
+                    except ValueError:
+                        logger.warning(f'Discarding malformed message from {self.config.server_name}')
+                        continue
+                    try:
+                        self._on_message(payload)
+                    except Exception as e:
+                        logger.error(f'Message dispatch error for {self.config.server_name}: {e}')
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e
+        if not self._closing:
+            self._on_close(error)
+            
+    async def _drain_stderr(self) -> None:
+        """Forward server logging so a full stderr pipe never stalls it"""
+        while True:
+            line = await self._process.stderr.readline()
+            if not line:
+                return
+            logger.debug(f'[{self.config.server_name}] {line.decode(errors="replace").rstrip()}')
+
+
 class RealTimeConnector:
     """
     Real-time connector for MCP server communication
@@ -153,6 +324,7 @@ class RealTimeConnector:
     - Automatic reconnection
     - Heartbeat monitoring
     - Message queuing
+    - Pipelined and batched JSON-RPC over stdio
     """
     
     def __init__(self):
@@ -161,6 +333,8 @@ class RealTimeConnector:
         self._message_handlers: Dict[str, List[Callable]] = {}
         self._heartbeat_tasks: Dict[str, asyncio.Task] = {}
         self._reconnect_tasks: Dict[str, asyncio.Task] = {}
+        self._channels: Dict[str, StdioChannel] = {}
+        self._request_ids = itertools.count(1)
         self._is_running: bool = False
         
     async def start(self) -> None:
@@ -213,7 +387,6 @@ class RealTimeConnector:
         self._connections[conn_id] = connection
         
         try:
-            # Simulate connection establishment
             await self._establish_connection(connection)
             connection.status = ConnectionStatus.CONNECTED
             connection.connect_time = datetime.now()
@@ -261,6 +434,12 @@ class RealTimeConnector:
         if task:
             task.cancel()
             
+        # Stop the server process
+        channel = self._channels.pop(connection_id, None)
+        if channel:
+            self._fail_pending(channel, ConnectionError(f'Disconnected from {connection.config.server_name}'))
+            await channel.close()
+            
         connection.status = ConnectionStatus.DISCONNECTED
         await self._emit_event('disconnected', connection)
         logger.info(f'Disconnected from {connection.config.server_name}')
@@ -310,7 +489,46 @@ class RealTimeConnector:
         Raises:
             ConnectionError: If not connected
             TimeoutError: If request times out
+            RPCError: If the server returns an error
+        """
+        results = await self._request(connection_id, [(method, params)], timeout, batch=False)
+        if isinstance(results[0], RPCError):
+            raise results[0]
+        return results[0]
+        
+    async def send_batch(
+        self,
+        connection_id: str,
+        requests: List[Tuple[str, Optional[Dict[str, Any]]]],
+        timeout: Optional[int] = None
+    ) -> List[Any]:
+        """
+        Send several requests as one JSON-RPC batch
+        
+        Args:
+            connection_id: Connection ID
+            requests: (method, params) pairs
+            timeout: Optional timeout in milliseconds for the whole batch
+            
+        Returns:
+            Results in request order; failed entries are RPCError instances
+            
+        Raises:
+            ConnectionError: If not connected
+            TimeoutError: If the batch times out
         """
+        if not requests:
+            return []
+        return await self._request(connection_id, requests, timeout, batch=True)
+        
+    async def _request(
+        self,
+        connection_id: str,
+        requests: List[Tuple[str, Optional[Dict[str, Any]]]],
+        timeout: Optional[int],
+        batch: bool
+    ) -> List[Any]:
+        """Send requests and wait for all of their responses"""
         connection = self._connections.get(connection_id)
         if not connection:
             raise ConnectionError(f'Connection not found: {connection_id}')
@@ -318,40 +536,71 @@ class RealTimeConnector:
         if connection.status != ConnectionStatus.CONNECTED:
             raise ConnectionError(f'Connection not active: {connection.status.value}')
             
-        # Create request message
-        request_id = str(uuid4())
-        message = Message(
-            id=request_id,
-            type='request',
-            method=method,
-            params=params
-        )
-        
-        # Create future for response
-        future = asyncio.Future()
-        self._pending_requests[request_id] = future
+        channel = self._channels.get(connection_id)
+        if channel and len(requests) > max(connection.config.max_in_flight, 1):
+            raise ValueError(f'Batch of {len(requests)} exceeds max_in_flight ({connection.config.max_in_flight})')
+            
+        loop = asyncio.get_running_loop()
+        timeout_sec = (timeout or connection.config.timeout) / 1000.0
+        deadline = loop.time() + timeout_sec
+        names = ', '.join(method for method, _ in requests)
+        
+        messages = [
+            Message(id=str(next(self._request_ids)), type='request', method=method, params=params)
+            for method, params in requests
+        ]
+        futures = [loop.create_future() for _ in messages]
+        acquired = 0
         
         try:
-            # Send message
-            await self._send_message(connection, message)
-            connection.messages_sent += 1
+            # Backpressure: wait for in-flight slots before writing
+            if channel:
+                async with channel.batch_lock:
+                    for _ in messages:
+                        await asyncio.wait_for(channel.permits.acquire(), deadline - loop.time())
+                        acquired += 1
+                        
+            for message, future in zip(messages, futures):
+                self._pending_requests[message.id] = future
+                if channel:
+                    channel.pending.add(message.id)
+                    
+            start = loop.time()
+            await self._send_message(connection, messages if batch else messages[0])
+            connection.messages_sent += len(messages)
             connection.last_activity = datetime.now()
             
-            # Wait for response
-            timeout_sec = (timeout or connection.config.timeout) / 1000.0
-            result = await asyncio.wait_for(future, timeout=timeout_sec)
+            # Wait for responses
+            results = await asyncio.wait_for(
+                asyncio.gather(*futures, return_exceptions=True),
+                deadline - loop.time()
+            )
             
-            # Calculate latency
-            latency = (datetime.now() - message.timestamp).total_seconds() * 1000
-            connection.latency_ms = (connection.latency_ms + latency) / 2
+            # Record latency
+            self._record_latency(connection, (loop.time() - start) * 1000)
             
-            return result
+            for result in results:
+                if isinstance(result, BaseException) and not isinstance(result, RPCError):
+                    raise result
+            return results
             
         except asyncio.TimeoutError:
-            raise TimeoutError(f'Request timed out: {method}')
+            raise TimeoutError(f'Request timed out: {names}')
         finally:
-            self._pending_requests.pop(request_id, None)
-            
+            for message, future in zip(messages, futures):
+                self._pending_requests.pop(message.id, None)
+                if not future.done():
+                    future.cancel()
+                if channel:
+                    channel.pending.discard(message.id)
+            for _ in range(acquired):
+                channel.permits.release()
+                
+    def _record_latency(self, connection: Connection, latency_ms: float) -> None:
+        """Add a round trip to the connection's latency histogram"""
+        connection.latency.observe(latency_ms)
+        connection.latency_ms = connection.latency.mean
+        
     async def send_notification(
         self,
         connection_id: str,
@@ -394,8 +643,9 @@ class RealTimeConnector:
         config = connection.config
         
         if config.transport == TransportType.STDIO:
-            # Simulate stdio connection
-            pass
+            if config.command:
+                await self._open_channel(connection)
+            # Without a command, stdio connections are simulated
         elif config.transport == TransportType.HTTP:
             # HTTP doesn't maintain persistent connection
             pass
@@ -406,15 +656,73 @@ class RealTimeConnector:
             # Simulate SSE connection
             await asyncio.sleep(0.1)
             
-    async def _send_message(self, connection: Connection, message: Message) -> None:
-        """Send a message over the connection"""
+    async def _open_channel(self, connection: Connection) -> None:
+        """Launch the stdio server process, replacing any previous one"""
+        previous = self._channels.pop(connection.id, None)
+        if previous:
+            self._fail_pending(previous, ConnectionError(f'Connection to {connection.config.server_name} was reset'))
+            await previous.close()
+            
+        def on_close(error: Optional[Exception]) -> None:
+            self._on_channel_closed(connection, channel, error)
+            
+        channel = StdioChannel(
+            connection.config,
+            on_message=lambda payload: self._dispatch(connection, payload),
+            on_close=on_close
+        )
+        await channel.open()
+        self._channels[connection.id] = channel
+        connection.metadata['pid'] = channel.pid
+        
+    def _on_channel_closed(
+        self,
+        connection: Connection,
+        channel: StdioChannel,
+        error: Optional[Exception]
+    ) -> None:
+        """Handle the server process exiting or its pipe failing"""
+        if self._channels.get(connection.id) is not channel:
+            return
+        del self._channels[connection.id]
+        
+        reason = f': {error}' if error else ''
+        self._fail_pending(channel, ConnectionError(f'{connection.config.server_name} closed the connection{reason}'))
+        
+        if connection.id not in self._connections:
+            return
+        connection.status = ConnectionStatus.ERROR
+        connection.error_count += 1
+        logger.warning(f'Lost stdio connection to {connection.config.server_name}{reason}')
+        
+        if connection.config.reconnect and self._is_running:
+            self._schedule_reconnect(connection)
+            
+    def _fail_pending(self, channel: StdioChannel, error: Exception) -> None:
+        """Fail every request still waiting on a channel"""
+        for request_id in list(channel.pending):
+            future = self._pending_requests.get(request_id)
+            if future and not future.done():
+                future.set_exception(error)
+        channel.pending.clear()
+        
+    async def _send_message(
+        self,
+        connection: Connection,
+        message: Union[Message, List[Message]]
+    ) -> None:
+        """Send a message (or a batch of messages) over the connection"""
         config = connection.config
-        data = json.dumps(message.to_dict())
+        messages = message if isinstance(message, list) else [message]
         
-        if config.transport == TransportType.STDIO:
-            # In real implementation, write to stdin
-            pass
-        elif config.transport == TransportType.HTTP:
+        channel = self._channels.get(connection.id)
+        if channel:
+            payload = [m.to_dict() for m in messages] if isinstance(message, list) else message.to_dict()
+            await channel.send(_dumps(payload))
+            logger.debug(f'Sent {len(messages)} message(s) to {config.server_name}')
+            return
+            
+        if config.transport == TransportType.HTTP:
             # In real implementation, make HTTP request
             pass
         elif config.transport == TransportType.WEBSOCKET:
@@ -422,12 +730,68 @@ class RealTimeConnector:
             pass
             
         # Simulate sending
-        logger.debug(f'Sent message to {connection.config.server_name}: {message.method}')
+        for msg in messages:
+            logger.debug(f'Sent message to {connection.config.server_name}: {msg.method}')
+            
+            # Simulate response for requests
+            if msg.type == 'request':
+                asyncio.create_task(self._simulate_response(connection, msg))
+                
+    def _dispatch(self, connection: Connection, payload: Any) -> None:
+        """Route a decoded message (or batch) read from a channel"""
+        items = payload if isinstance(payload, list) else [payload]
+        connection.messages_received += len(items)
+        connection.last_activity = datetime.now()
+        
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            if 'method' in item:
+                asyncio.create_task(self._handle_server_message(connection, item))
+            else:
+                self._resolve(item)
+                
+    def _resolve(self, data: Dict[str, Any]) -> None:
+        """Complete the pending request a response belongs to"""
+        future = self._pending_requests.get(str(data.get('id')))
+        if future is None or future.done():
+            return
+        error = data.get('error')
+        if error:
+            future.set_exception(RPCError.from_dict(error))
+        else:
+            future.set_result(data.get('result'))
+            
+    async def _handle_server_message(self, connection: Connection, data: Dict[str, Any]) -> None:
+        """Handle a request or notification sent by the server"""
+        method = data['method']
+        params = data.get('params')
         
-        # Simulate response for requests
-        if message.type == 'request':
-            asyncio.create_task(self._simulate_response(connection, message))
+        if 'id' not in data:
+            await self._emit_event(method, params)
+            return
             
+        handlers = self._message_handlers.get(method, [])
+        response: Dict[str, Any] = {'jsonrpc': '2.0', 'id': data['id']}
+        if not handlers:
+            response['error'] = {'code': -32601, 'message': f'Method not found: {method}'}
+        else:
+            try:
+                result = handlers[0](params)
+                if asyncio.iscoroutine(result):
+                    result = await result
+                response['result'] = result
+            except Exception as e:
+                response['error'] = {'code': -32603, 'message': str(e)}
+                
+        channel = self._channels.get(connection.id)
+        if channel:
+            try:
+                await channel.send(_dumps(response))
+                connection.messages_sent += 1
+            except ConnectionError as e:
+                logger.warning(f'Could not answer {method} from {connection.config.server_name}: {e}')
+                
     async def _simulate_response(self, connection: Connection, request: Message) -> None:
         """Simulate a response for testing"""
         await asyncio.sleep(0.05)  # Simulate latency
@@ -443,15 +807,8 @@ class RealTimeConnector:
         
     async def _handle_response(self, message: Message) -> None:
         """Handle an incoming response"""
-        future = self._pending_requests.get(message.id)
-        if future and not future.done():
-            if message.error:
-                future.set_exception(
-                    Exception(message.error.get('message', 'Unknown error'))
-                )
-            else:
-                future.set_result(message.result)
-                
+        self._resolve(message.to_dict())
+        
     async def _heartbeat_loop(self, connection: Connection) -> None:
         """Heartbeat loop for connection health monitoring"""
         while self._is_running and connection.id in self._connections:
@@ -537,13 +894,18 @@ class RealTimeConnector:
             max(len(self._connections), 1)
         )
         
+        latency = LatencyHistogram()
+        for conn in self._connections.values():
+            latency.merge(conn.latency)
+            
         return {
             'total_connections': len(self._connections),
             'status_distribution': status_counts,
             'pending_requests': len(self._pending_requests),
             'total_messages_sent': total_sent,
             'total_messages_received': total_received,
-            'average_latency_ms': avg_latency
+            'average_latency_ms': avg_latency,
+            'latency': latency.to_dict()
         }
 
 
@@ -0,0 +1,444 @@
+"""
+Schema Validator - Compiled JSON-Schema validation for tool arguments
+
+This module compiles a tool's input schema once into a tree of validator
+closures, so validating a call is a few direct checks instead of a walk
+over the schema dictionary. Compiled validators are cached by a hash of
+the schema's canonical JSON, so tools that share a schema share a validator.
+
+Supported keywords: type, enum, const, properties, required,
+additionalProperties, items, minItems, maxItems, uniqueItems, minLength,
+maxLength, pattern, format, minimum, maximum, exclusiveMinimum,
+exclusiveMaximum, multipleOf, allOf, anyOf and oneOf. Unknown keywords
+and formats are ignored, as JSON Schema treats them as annotations.
+"""
+
+import hashlib
+import ipaddress
+import json
+import re
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from uuid import UUID
+
+# validator(value, path, errors) appends a message to errors for each violation
+Validator = Callable[[Any, str, List[str]], None]
+
+_TYPES: Dict[str, Tuple[type, ...]] = {
+    'string': (str,),
+    'number': (int, float),
+    'integer': (int,),
+    'boolean': (bool,),
+    'array': (list, tuple),
+    'object': (dict,),
+    'null': (type(None),)
+}
+
+_EMAIL = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+_HOSTNAME = re.compile(
+    r'^(?=.{1,253}$)[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?'
+    r'(?:\.[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?)*$'
+)
+
+
+def _is_datetime(value: str) -> bool:
+    try:
+        datetime.fromisoformat(value.replace('Z', '+00:00').replace('z', '+00:00'))
+    except ValueError:
+        return False
+    return 'T' in value.upper() or ' ' in value
+
+
+def _is_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_uri(value: str) -> bool:
+    parsed = urlparse(value)
+    return bool(parsed.scheme) and bool(parsed.netloc or parsed.path)
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_ip(version: int) -> Callable[[str], bool]:
+    def check(value: str) -> bool:
+        try:
+            return ipaddress.ip_address(value).version == version
+        except ValueError:
+            return False
+    return check
+
+
+FORMAT_CHECKERS: Dict[str, Callable[[str], bool]] = {
+    'date-time': _is_datetime,
+    'date': _is_date,
+    'email': lambda value: _EMAIL.match(value) is not None,
+    'hostname': lambda value: _HOSTNAME.match(value) is not None,
+    'uri': _is_uri,
+    'uuid': _is_uuid,
+    'ipv4': _is_ip(4),
+    'ipv6': _is_ip(6)
+}
+
+
+def _join(path: str, name: str) -> str:
+    return f'{path}.{name}' if path else name
+
+
+def _label(path: str) -> str:
+    return f"Field '{path}'" if path else 'Arguments'
+
+
+def _accept(value: Any, path: str, errors: List[str]) -> None:
+    """Validator for an empty schema"""
+
+
+def schema_hash(schema: Any) -> str:
+    """Content hash of a schema, independent of key order"""
+    encoded = json.dumps(schema, sort_keys=True, separators=(',', ':'), default=repr)
+    return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def compile_schema(schema: Any) -> Validator:
+    """
+    Compile a JSON schema into a validator closure
+    
+    Raises:
+        ValueError: If the schema contains an invalid pattern
+    """
+    if not isinstance(schema, dict) or not schema:
+        return _accept
+        
+    checks: List[Validator] = []
+    
+    _compile_enum(schema, checks)
+    _compile_string(schema, checks)
+    _compile_number(schema, checks)
+    _compile_array(schema, checks)
+    _compile_object(schema, checks)
+    _compile_combinators(schema, checks)
+    
+    type_names = schema.get('type')
+    if isinstance(type_names, str):
+        type_names = [type_names]
+    type_names = [name for name in (type_names or []) if name in _TYPES]
+    
+    if not type_names:
+        if not checks:
+            return _accept
+        if len(checks) == 1:
+            return checks[0]
+            
+        def validate_untyped(value: Any, path: str, errors: List[str]) -> None:
+            for check in checks:
+                check(value, path, errors)
+        return validate_untyped
+        
+    allowed = tuple({t for name in type_names for t in _TYPES[name]})
+    # bool is a subclass of int, but JSON booleans are not numbers
+    reject_bool = 'boolean' not in type_names and ('integer' in type_names or 'number' in type_names)
+    expected = ' or '.join(type_names)
+    
+    def type_error(value: Any, path: str, errors: List[str]) -> None:
+        errors.append(f'{_label(path)} expected type {expected}, got {type(value).__name__}')
+        
+    # Specialize the common shapes: leaf type checks and a single keyword
+    if not checks:
+        def validate_type(value: Any, path: str, errors: List[str]) -> None:
+            if not isinstance(value, allowed) or (reject_bool and type(value) is bool):
+                type_error(value, path, errors)
+        return validate_type
+        
+    if len(checks) == 1:
+        check = checks[0]
+        
+        def validate_one(value: Any, path: str, errors: List[str]) -> None:
+            if not isinstance(value, allowed) or (reject_bool and type(value) is bool):
+                type_error(value, path, errors)
+            else:
+                check(value, path, errors)
+        return validate_one
+        
+    def validate(value: Any, path: str, errors: List[str]) -> None:
+        if not isinstance(value, allowed) or (reject_bool and type(value) is bool):
+            type_error(value, path, errors)
+            return
+        for check in checks:
+            check(value, path, errors)
+    return validate
+
+
+def _compile_enum(schema: Dict[str, Any], checks: List[Validator]) -> None:
+    if 'enum' in schema:
+        options = list(schema['enum'])
+        if all(isinstance(option, str) for option in options):
+            lookup = frozenset(options)
+            
+            def check_enum(value: Any, path: str, errors: List[str]) -> None:
+                if not isinstance(value, str) or value not in lookup:
+                    errors.append(f'{_label(path)} must be one of {options}')
+        else:
+            def check_enum(value: Any, path: str, errors: List[str]) -> None:
+                if not any(value == option and isinstance(value, bool) == isinstance(option, bool) for option in options):
+                    errors.append(f'{_label(path)} must be one of {options}')
+        checks.append(check_enum)
+        
+    if 'const' in schema:
+        const = schema['const']
+        
+        def check_const(value: Any, path: str, errors: List[str]) -> None:
+            if value != const or isinstance(value, bool) != isinstance(const, bool):
+                errors.append(f'{_label(path)} must equal {const!r}')
+        checks.append(check_const)
+
+
+def _compile_string(schema: Dict[str, Any], checks: List[Validator]) -> None:
+    min_length = schema.get('minLength')
+    max_length = schema.get('maxLength')
+    pattern = schema.get('pattern')
+    fmt = FORMAT_CHECKERS.get(schema.get('format'))
+    if min_length is None and max_length is None and pattern is None and fmt is None:
+        return
+        
+    if pattern is not None:
+        try:
+            regex = re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f'Invalid pattern {pattern!r}: {e}') from e
+    format_name = schema.get('format')
+    
+    def check_string(value: Any, path: str, errors: List[str]) -> None:
+        if not isinstance(value, str):
+            return
+        if min_length is not None and len(value) < min_length:
+            errors.append(f'{_label(path)} must be at least {min_length} characters')
+        if max_length is not None and len(value) > max_length:
+            errors.append(f'{_label(path)} must be at most {max_length} characters')
+        if pattern is not None and regex.search(value) is None:
+            errors.append(f'{_label(path)} must match pattern {pattern!r}')
+        if fmt is not None and not fmt(value):
+            errors.append(f'{_label(path)} is not a valid {format_name}')
+    checks.append(check_string)
+
+
+def _compile_number(schema: Dict[str, Any], checks: List[Validator]) -> None:
+    minimum = schema.get('minimum')
+    maximum = schema.get('maximum')
+    exclusive_min = schema.get('exclusiveMinimum')
+    exclusive_max = schema.get('exclusiveMaximum')
+    multiple_of = schema.get('multipleOf')
+    
+    # Draft 4 spells exclusive bounds as booleans next to minimum/maximum
+    if exclusive_min is True:
+        exclusive_min, minimum = minimum, None
+    elif exclusive_min is False:
+        exclusive_min = None
+    if exclusive_max is True:
+        exclusive_max, maximum = maximum, None
+    elif exclusive_max is False:
+        exclusive_max = None
+        
+    if minimum is None and maximum is None and exclusive_min is None and exclusive_max is None and not multiple_of:
+        return
+        
+    def check_number(value: Any, path: str, errors: List[str]) -> None:
+        if type(value) is bool or not isinstance(value, (int, float)):
+            return
+        if minimum is not None and value < minimum:
+            errors.append(f'{_label(path)} must be >= {minimum}')
+        if exclusive_min is not None and value <= exclusive_min:
+            errors.append(f'{_label(path)} must be > {exclusive_min}')
+        if maximum is not None and value > maximum:
+            errors.append(f'{_label(path)} must be <= {maximum}')
+        if exclusive_max is not None and value >= exclusive_max:
+            errors.append(f'{_label(path)} must be < {exclusive_max}')
+        if multiple_of and not _is_multiple(value, multiple_of):
+            errors.append(f'{_label(path)} must be a multiple of {multiple_of}')
+    checks.append(check_number)
+
+
+def _is_multiple(value: Any, divisor: Any) -> bool:
+    if isinstance(value, float) or isinstance(divisor, float):
+        return (value / divisor).is_integer()
+    return value % divisor == 0
+
+
+def _unique(items: Any) -> bool:
+    seen = set()
+    for item in items:
+        key = json.dumps(item, sort_keys=True, default=repr)
+        if key in seen:
+            return False
+        seen.add(key)
+    return True
+
+
+def _compile_array(schema: Dict[str, Any], checks: List[Validator]) -> None:
+    items = schema.get('items')
+    min_items = schema.get('minItems')
+    max_items = schema.get('maxItems')
+    unique = schema.get('uniqueItems', False)
+    
+    item_validator: Optional[Validator] = None
+    tuple_validators: Tuple[Validator, ...] = ()
+    if isinstance(items, dict):
+        item_validator = compile_schema(items)
+        if item_validator is _accept:
+            item_validator = None
+    elif isinstance(items, list):
+        tuple_validators = tuple(compile_schema(item) for item in items)
+        
+    if item_validator is None and not tuple_validators and min_items is None and max_items is None and not unique:
+        return
+        
+    def check_array(value: Any, path: str, errors: List[str]) -> None:
+        if not isinstance(value, (list, tuple)):
+            return
+        if min_items is not None and len(value) < min_items:
+            errors.append(f'{_label(path)} must have at least {min_items} items')
+        if max_items is not None and len(value) > max_items:
+            errors.append(f'{_label(path)} must have at most {max_items} items')
+        if unique and not _unique(value):
+            errors.append(f'{_label(path)} must not contain duplicate items')
+        if item_validator is not None:
+            for index, item in enumerate(value):
+                item_validator(item, f'{path}[{index}]', errors)
+        elif tuple_validators:
+            for index, (item, validator) in enumerate(zip(value, tuple_validators)):
+                validator(item, f'{path}[{index}]', errors)
+    checks.append(check_array)
+
+
+def _compile_object(schema: Dict[str, Any], checks: List[Validator]) -> None:
+    properties = schema.get('properties') or {}
+    required = tuple(schema.get('required') or ())
+    additional = schema.get('additionalProperties', True)
+    
+    compiled = tuple(
+        (name, validator)
+        for name, validator in ((name, compile_schema(sub)) for name, sub in properties.items())
+        if validator is not _accept
+    )
+    known = frozenset(properties)
+    extra_validator: Optional[Validator] = None
+    if isinstance(additional, dict):
+        extra_validator = compile_schema(additional)
+        if extra_validator is _accept:
+            extra_validator = None
+    reject_extra = additional is False
+    
+    if not compiled and not required and not reject_extra and extra_validator is None:
+        return
+        
+    def check_object(value: Any, path: str, errors: List[str]) -> None:
+        if not isinstance(value, dict):
+            return
+        for name in required:
+            if name not in value:
+                errors.append(f'Missing required field: {_join(path, name)}')
+        if path:
+            for name, validator in compiled:
+                if name in value:
+                    validator(value[name], f'{path}.{name}', errors)
+        else:
+            for name, validator in compiled:
+                if name in value:
+                    validator(value[name], name, errors)
+        if reject_extra:
+            for name in value:
+                if name not in known:
+                    errors.append(f'Unexpected field: {_join(path, name)}')
+        elif extra_validator is not None:
+            for name, item in value.items():
+                if name not in known:
+                    extra_validator(item, _join(path, name), errors)
+    checks.append(check_object)
+
+
+def _compile_combinators(schema: Dict[str, Any], checks: List[Validator]) -> None:
+    for sub in schema.get('allOf') or ():
+        validator = compile_schema(sub)
+        if validator is not _accept:
+            checks.append(validator)
+            
+    any_of = tuple(compile_schema(sub) for sub in schema.get('anyOf') or ())
+    if any_of:
+        def check_any_of(value: Any, path: str, errors: List[str]) -> None:
+            for validator in any_of:
+                attempt: List[str] = []
+                validator(value, path, attempt)
+                if not attempt:
+                    return
+            errors.append(f'{_label(path)} does not match any of the allowed schemas')
+        checks.append(check_any_of)
+        
+    one_of = tuple(compile_schema(sub) for sub in schema.get('oneOf') or ())
+    if one_of:
+        def check_one_of(value: Any, path: str, errors: List[str]) -> None:
+            matches = 0
+            for validator in one_of:
+                attempt: List[str] = []
+                validator(value, path, attempt)
+                if not attempt:
+                    matches += 1
+            if matches != 1:
+                errors.append(f'{_label(path)} must match exactly one schema, matched {matches}')
+        checks.append(check_one_of)
+
+
+class ValidatorCache:
+    """LRU cache of compiled validators keyed by schema hash"""
+    
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._validators: 'OrderedDict[str, Validator]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+    def get(self, schema: Any) -> Validator:
+        """Return the compiled validator for a schema, compiling on a miss"""
+        key = schema_hash(schema)
+        validator = self._validators.get(key)
+        if validator is not None:
+            self._validators.move_to_end(key)
+            self.hits += 1
+            return validator
+            
+        self.misses += 1
+        validator = compile_schema(schema)
+        self._validators[key] = validator
+        if len(self._validators) > self.max_size:
+            self._validators.popitem(last=False)
+        return validator
+        
+    def clear(self) -> None:
+        """Drop every cached validator"""
+        self._validators.clear()
+        
+    def info(self) -> Dict[str, int]:
+        """Cache size and hit counters"""
+        return {
+            'size': len(self._validators),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+        
+    def __len__(self) -> int:
+        return len(self._validators)
+
+
+# Process-wide cache shared by all tool definitions
+validator_cache = ValidatorCache()
@@ -13,6 +13,8 @@ from enum import Enum
 from typing import Any, Dict, List, Optional, Callable
 from uuid import uuid4
 
+from .schema_validator import Validator, validator_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,6 +55,8 @@ class ToolDefinition:
     examples: List[Dict[str, Any]] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
     created_at: datetime = field(default_factory=datetime.now)
+    _validator: Optional[Validator] = field(default=None, init=False, repr=False, compare=False)
+    _compiled_schema: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert tool definition to dictionary"""
@@ -71,6 +75,22 @@ class ToolDefinition:
             'created_at': self.created_at.isoformat()
         }
         
+    def compile(self) -> None:
+        """
+        Compile input_schema into a validator
+        
+        Called by ToolRegistry.register; register the tool again after
+        changing its schema in place.
+        
+        Raises:
+            ValueError: If the schema cannot be compiled
+        """
+        try:
+            self._validator = validator_cache.get(self.input_schema)
+        except ValueError as e:
+            raise ValueError(f'Invalid input schema for tool {self.name}: {e}') from e
+        self._compiled_schema = self.input_schema
+        
     def validate_input(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
         Validate input arguments against schema
@@ -78,57 +98,16 @@ class ToolDefinition:
         Returns:
             Validation result with 'valid' boolean and optional 'errors' list
         """
-        errors = []
-        schema = self.input_schema
+        if self._validator is None or self._compiled_schema is not self.input_schema:
+            self.compile()
+            
+        errors: List[str] = []
+        self._validator(arguments, '', errors)
         
-        # Check required fields
-        required = schema.get('required', [])
-        for field_name in required:
-            if field_name not in arguments:
-                errors.append(f"Missing required field: {field_name}")
-                
-        # Validate property types
-        properties = schema.get('properties', {})
-        for key, value in arguments.items():
-            if key in properties:
-                prop_schema = properties[key]
-                type_error = self._validate_type(key, value, prop_schema)
-                if type_error:
-                    errors.append(type_error)
-                    
         return {
             'valid': len(errors) == 0,
             'errors': errors
         }
-        
-    def _validate_type(
-        self,
-        field_name: str,
-        value: Any,
-        schema: Dict[str, Any]
-    ) -> Optional[str]:
-        """Validate a single field type"""
-        expected_type = schema.get('type')
-        
-        type_map = {
-            'string': str,
-            'number': (int, float),
-            'integer': int,
-            'boolean': bool,
-            'array': list,
-            'object': dict
-        }
-        
-        if expected_type and expected_type in type_map:
-            expected = type_map[expected_type]
-            if not isinstance(value, expected):
-                return f"Field '{field_name}' expected type {expected_type}, got {type(value).__name__}"
-                
-        # Check enum values
-        if 'enum' in schema and value not in schema['enum']:
-            return f"Field '{field_name}' must be one of {schema['enum']}"
-            
-        return None
 
 
 @dataclass
@@ -181,7 +160,12 @@ class ToolRegistry:
         
         Args:
             tool: Tool definition to register
+            
+        Raises:
+            ValueError: If the tool's input schema cannot be compiled
         """
+        # Compile before storing so a bad schema leaves the registry unchanged
+        tool.compile()
         self._tools[tool.name] = tool
         
         # Update category index
@@ -364,7 +348,8 @@ class ToolRegistry:
             'total_servers': len(self._server_index),
             'total_aliases': len(self._aliases),
             'status_distribution': status_counts,
-            'category_distribution': category_counts
+            'category_distribution': category_counts,
+            'validator_cache': validator_cache.info()
         }
         
     def export_schema(self) -> Dict[str, Any]:
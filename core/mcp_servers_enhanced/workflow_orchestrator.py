@@ -9,10 +9,11 @@ and error handling.
 import asyncio
 import json
 import logging
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional
 from uuid import uuid4
 
 logger = logging.getLogger(__name__)
@@ -99,6 +100,25 @@ class StepResult:
             'started_at': self.started_at.isoformat() if self.started_at else None,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None
         }
+        
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'StepResult':
+        """Create step result from dictionary"""
+        return cls(
+            step_id=data['step_id'],
+            step_name=data['step_name'],
+            status=StepStatus(data['status']),
+            result=data.get('result'),
+            error=data.get('error'),
+            duration_ms=data.get('duration_ms', 0.0),
+            attempts=data.get('attempts', 1),
+            started_at=(
+                datetime.fromisoformat(data['started_at']) if data.get('started_at') else None
+            ),
+            completed_at=(
+                datetime.fromisoformat(data['completed_at']) if data.get('completed_at') else None
+            )
+        )
 
 
 @dataclass
@@ -129,6 +149,34 @@ class WorkflowResult:
             'error': self.error,
             'metadata': self.metadata
         }
+        
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'WorkflowResult':
+        """Create workflow result from dictionary (e.g. to resume a stored run)"""
+        return cls(
+            workflow_id=data['workflow_id'],
+            workflow_name=data['workflow_name'],
+            status=WorkflowStatus(data['status']),
+            steps=[StepResult.from_dict(s) for s in data.get('steps', [])],
+            total_duration_ms=data.get('total_duration_ms', 0.0),
+            started_at=(
+                datetime.fromisoformat(data['started_at']) if data.get('started_at') else None
+            ),
+            completed_at=(
+                datetime.fromisoformat(data['completed_at']) if data.get('completed_at') else None
+            ),
+            output=data.get('output'),
+            error=data.get('error'),
+            metadata=data.get('metadata', {})
+        )
+
+
+@dataclass
+class WorkflowGraph:
+    """Dependency graph of a workflow, built once at registration"""
+    steps: Dict[str, 'WorkflowStep']
+    in_degree: Dict[str, int]
+    dependents: Dict[str, List[str]]
 
 
 @dataclass
@@ -167,7 +215,9 @@ class WorkflowOrchestrator:
     
     Features:
     - Step dependency management
-    - Parallel execution with limits
+    - Parallel execution with limits (a sliding window of max_parallel
+      steps, refilled as each step completes)
+    - Resuming partially completed runs
     - Retry logic
     - Conditional execution
     - Error handling and recovery
@@ -186,11 +236,12 @@ class WorkflowOrchestrator:
         self._running_workflows: Dict[str, asyncio.Task] = {}
         self._workflow_results: Dict[str, WorkflowResult] = {}
         self._event_handlers: Dict[str, List[Callable]] = {}
+        self._graphs: Dict[str, WorkflowGraph] = {}
         
     async def register_workflow(self, workflow: Workflow) -> None:
         """Register a workflow definition"""
         # Validate workflow
-        self._validate_workflow(workflow)
+        self._graphs[workflow.id] = self._validate_workflow(workflow)
         self._workflows[workflow.id] = workflow
         logger.info(f'Registered workflow: {workflow.name} (id: {workflow.id})')
         
@@ -201,7 +252,8 @@ class WorkflowOrchestrator:
     async def execute_workflow(
         self,
         workflow_id: str,
-        input_data: Optional[Dict[str, Any]] = None
+        input_data: Optional[Dict[str, Any]] = None,
+        resume_from: Optional[WorkflowResult] = None
     ) -> WorkflowResult:
         """
         Execute a workflow
@@ -209,6 +261,8 @@ class WorkflowOrchestrator:
         Args:
             workflow_id: ID of workflow to execute
             input_data: Optional input data for the workflow
+            resume_from: Optional earlier result of this workflow; its
+                completed and skipped steps are reused instead of re-run
             
         Returns:
             Workflow execution result
@@ -222,6 +276,20 @@ class WorkflowOrchestrator:
                 error=f'Workflow not found: {workflow_id}'
             )
             
+        previous_steps = None
+        if resume_from is not None:
+            if resume_from.workflow_id != workflow_id:
+                raise ValueError(
+                    f'Cannot resume workflow {workflow_id} from a result of '
+                    f'{resume_from.workflow_id}'
+                )
+            previous_steps = {
+                s.step_id: s for s in resume_from.steps
+                if s.status in (StepStatus.COMPLETED, StepStatus.SKIPPED)
+            }
+            if input_data is None:
+                input_data = resume_from.metadata.get('input')
+            
         result = WorkflowResult(
             workflow_id=workflow_id,
             workflow_name=workflow.name,
@@ -229,18 +297,25 @@ class WorkflowOrchestrator:
             started_at=datetime.now(),
             metadata={'input': input_data}
         )
+        if previous_steps is not None:
+            result.metadata['resumed_steps'] = [
+                step_id for step_id in previous_steps if step_id in self._graph(workflow).steps
+            ]
         
         try:
             await self._emit_event('workflow_started', result)
             
             # Execute steps
-            step_results = await self._execute_steps(workflow, input_data or {})
+            step_results = await self._execute_steps(
+                workflow, dict(input_data or {}), previous_steps
+            )
             result.steps = step_results
             
             # Check if all steps succeeded
+            steps = self._graph(workflow).steps
             failed_steps = [s for s in step_results if s.status == StepStatus.FAILED]
             if failed_steps and not all(
-                self._get_step(workflow, s.step_id).continue_on_failure
+                steps[s.step_id].continue_on_failure
                 for s in failed_steps
             ):
                 result.status = WorkflowStatus.FAILED
@@ -274,6 +349,21 @@ class WorkflowOrchestrator:
         self._workflow_results[workflow_id] = result
         return result
         
+    async def resume_workflow(
+        self,
+        previous: WorkflowResult,
+        input_data: Optional[Dict[str, Any]] = None
+    ) -> WorkflowResult:
+        """
+        Re-run a partially completed workflow
+        
+        Steps that completed (or were skipped) in ``previous`` keep their
+        results and outputs; only the remaining steps are executed.
+        """
+        return await self.execute_workflow(
+            previous.workflow_id, input_data, resume_from=previous
+        )
+        
     async def execute_workflow_async(
         self,
         workflow_id: str,
@@ -314,63 +404,90 @@ class WorkflowOrchestrator:
             self._event_handlers[event] = []
         self._event_handlers[event].append(handler)
         
+    def _graph(self, workflow: Workflow) -> WorkflowGraph:
+        """
+        Dependency graph of a workflow
+        
+        Built by ``register_workflow``; re-register a workflow after changing
+        its steps so the graph is rebuilt.
+        """
+        graph = self._graphs.get(workflow.id)
+        if graph is None:
+            graph = self._graphs[workflow.id] = self._validate_workflow(workflow)
+        return graph
+        
     async def _execute_steps(
         self,
         workflow: Workflow,
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        previous_results: Optional[Dict[str, StepResult]] = None
     ) -> List[StepResult]:
-        """Execute all steps in a workflow"""
+        """
+        Execute all steps in a workflow
+        
+        Event-driven: exactly ``max_parallel`` steps are kept in flight and
+        each completion releases its dependents and refills the window, so
+        a slow step only delays the steps that depend on it.
+        """
+        graph = self._graph(workflow)
         results: Dict[str, StepResult] = {}
-        completed: Set[str] = set()
-        pending_steps = list(workflow.steps)
-        
-        while pending_steps:
-            # Find steps that can be executed (all dependencies met)
-            ready_steps = [
-                step for step in pending_steps
-                if all(dep in completed for dep in step.dependencies)
-            ]
-            
-            if not ready_steps:
-                # No steps ready but pending steps exist - circular dependency
-                for step in pending_steps:
-                    results[step.id] = StepResult(
-                        step_id=step.id,
-                        step_name=step.name,
-                        status=StepStatus.FAILED,
-                        error='Circular dependency detected'
-                    )
-                break
+        in_degree = dict(graph.in_degree)
+        ready: deque = deque()
+        
+        def finish(step_id: str, step_result: StepResult) -> None:
+            results[step_id] = step_result
+            # Update context with step output
+            if step_result.result:
+                context[f'step.{step_id}'] = step_result.result
+            for dependent in graph.dependents[step_id]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    ready.append(dependent)
+                    
+        # Reuse results of a resumed run
+        for step_id, previous in (previous_results or {}).items():
+            if step_id in graph.steps:
+                finish(step_id, previous)
                 
-            # Execute ready steps in parallel (with limit)
-            parallel_batch = ready_steps[:workflow.max_parallel]
-            
-            batch_tasks = [
-                self._execute_step(step, context, results)
-                for step in parallel_batch
-            ]
-            
-            batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-            
-            # Process results
-            for step, result in zip(parallel_batch, batch_results):
-                if isinstance(result, Exception):
-                    results[step.id] = StepResult(
-                        step_id=step.id,
-                        step_name=step.name,
-                        status=StepStatus.FAILED,
-                        error=str(result)
+        ready.clear()
+        ready.extend(
+            step.id for step in workflow.steps
+            if in_degree[step.id] == 0 and step.id not in results
+        )
+        window = max(1, workflow.max_parallel)
+        in_flight: Dict[asyncio.Task, str] = {}
+        
+        try:
+            while ready or in_flight:
+                while ready and len(in_flight) < window:
+                    step_id = ready.popleft()
+                    if step_id in results:
+                        continue
+                    task = asyncio.ensure_future(
+                        self._execute_step(graph.steps[step_id], context, results)
                     )
-                else:
-                    results[step.id] = result
+                    in_flight[task] = step_id
                     
-                completed.add(step.id)
-                pending_steps.remove(step)
+                if not in_flight:
+                    break
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step_id = in_flight.pop(task)
+                    if task.exception() is not None:
+                        step = graph.steps[step_id]
+                        step_result = StepResult(
+                            step_id=step.id,
+                            step_name=step.name,
+                            status=StepStatus.FAILED,
+                            error=str(task.exception())
+                        )
+                    else:
+                        step_result = task.result()
+                    finish(step_id, step_result)
+        finally:
+            for task in in_flight:
+                task.cancel()
                 
-                # Update context with step output
-                if result and not isinstance(result, Exception) and result.result:
-                    context[f'step.{step.id}'] = result.result
-                    
         return list(results.values())
         
     async def _execute_step(
@@ -438,9 +555,22 @@ class WorkflowOrchestrator:
         
         return result
         
-    def _validate_workflow(self, workflow: Workflow) -> None:
-        """Validate workflow definition"""
+    def _validate_workflow(self, workflow: Workflow) -> WorkflowGraph:
+        """
+        Validate workflow definition and build its dependency graph
+        
+        Unknown references and dependency cycles are rejected here, once,
+        so execution never has to look for them.
+        """
         step_ids = {step.id for step in workflow.steps}
+        if len(step_ids) != len(workflow.steps):
+            raise ValueError(f'Workflow {workflow.id} has duplicate step ids')
+            
+        graph = WorkflowGraph(
+            steps={step.id: step for step in workflow.steps},
+            in_degree={step.id: 0 for step in workflow.steps},
+            dependents={step.id: [] for step in workflow.steps}
+        )
         
         for step in workflow.steps:
             # Check dependencies exist
@@ -460,12 +590,33 @@ class WorkflowOrchestrator:
                     f'Step {step.id} has unknown on_failure reference: {step.on_failure}'
                 )
                 
+            for dep in dict.fromkeys(step.dependencies):
+                graph.dependents[dep].append(step.id)
+                graph.in_degree[step.id] += 1
+                
+        # Kahn's algorithm: steps never reaching in-degree zero sit on a cycle
+        in_degree = dict(graph.in_degree)
+        queue = deque(step_id for step_id, degree in in_degree.items() if degree == 0)
+        visited = 0
+        while queue:
+            step_id = queue.popleft()
+            visited += 1
+            for dependent in graph.dependents[step_id]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    queue.append(dependent)
+        if visited != len(step_ids):
+            cyclic = sorted(step_id for step_id, degree in in_degree.items() if degree > 0)
+            raise ValueError(
+                f'Workflow {workflow.id} has circular dependencies among steps: '
+                f'{", ".join(cyclic)}'
+            )
+            
+        return graph
+        
     def _get_step(self, workflow: Workflow, step_id: str) -> Optional[WorkflowStep]:
         """Get a step by ID from workflow"""
-        for step in workflow.steps:
-            if step.id == step_id:
-                return step
-        return None
+        return self._graph(workflow).steps.get(step_id)
         
     def _evaluate_condition(
         self,
@@ -3,6 +3,7 @@ SynergyMesh Intelligent Monitoring and Auto-Remediation System (Phase 11)
 
 Core modules:
 - intelligent_monitoring: 24/7 intelligent monitoring system
+- time_series_store: Columnar metric storage with rollups
 - smart_anomaly_detector: AI-driven anomaly detection
 - auto_diagnosis: Automatic root cause analysis
 - auto_remediation: Self-healing capabilities
@@ -18,6 +19,11 @@ from .intelligent_monitoring import (
     AlertSeverity,
     IntelligentMonitoringSystem
 )
+from .time_series_store import (
+    SeriesSummary,
+    TimeSeries,
+    TimeSeriesStore
+)
 from .smart_anomaly_detector import (
     AnomalyDetectionStrategy,
     AnomalyCategory,
@@ -51,7 +57,8 @@ from .observability_platform import (
     TraceSpan,
     CorrelatedEvent,
     ObservabilityPlatform,
-    CorrelationEngine
+    CorrelationEngine,
+    IndexedRingBuffer
 )
 
 __all__ = [
@@ -62,6 +69,9 @@ __all__ = [
     'Alert',
     'AlertSeverity',
     'IntelligentMonitoringSystem',
+    'SeriesSummary',
+    'TimeSeries',
+    'TimeSeriesStore',
     # Smart Anomaly Detection
     'AnomalyDetectionStrategy',
     'AnomalyCategory',
@@ -92,4 +102,5 @@ __all__ = [
     'CorrelatedEvent',
     'ObservabilityPlatform',
     'CorrelationEngine',
+    'IndexedRingBuffer',
 ]
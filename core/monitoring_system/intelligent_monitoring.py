@@ -9,10 +9,13 @@ Reference: Self-healing systems with continuous monitoring, intelligent anomaly
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 import uuid
 import asyncio
-import statistics
+
+import numpy as np
+
+from .time_series_store import DEFAULT_CHUNK_SIZE, DEFAULT_ROLLUP_TIERS, TimeSeriesStore
 
 
 class MetricType(Enum):
@@ -83,15 +86,32 @@ class MetricsCollector:
     """
     Continuous metrics collection system
     
-    Collects metrics from various sources and stores them for analysis
+    Collects metrics from various sources and stores them for analysis.
+    Samples are kept in a columnar TimeSeriesStore (16 bytes per sample,
+    retention by chunk drop, 1m/1h rollups); ``Metric`` objects are only
+    built when a caller asks for them.
     """
     
-    def __init__(self, retention_seconds: int = 3600):
-        self._metrics: Dict[str, List[Metric]] = {}
+    def __init__(
+        self,
+        retention_seconds: int = 3600,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        rollup_tiers: Sequence[Tuple[float, float]] = DEFAULT_ROLLUP_TIERS
+    ):
+        self._store = TimeSeriesStore(
+            retention_seconds=retention_seconds,
+            chunk_size=chunk_size,
+            rollup_tiers=rollup_tiers
+        )
         self._collectors: Dict[str, Callable[[], float]] = {}
         self._retention_seconds = retention_seconds
         self._running = False
     
+    @property
+    def store(self) -> TimeSeriesStore:
+        """Get the underlying time series store"""
+        return self._store
+    
     def register_collector(
         self,
         name: str,
@@ -109,35 +129,32 @@ class MetricsCollector:
             'unit': unit,
             'description': description
         }
-        if name not in self._metrics:
-            self._metrics[name] = []
     
-    def collect(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> Metric:
-        """Manually collect a metric value"""
-        config = self._collectors.get(name, {
+    def _config(self, name: str) -> Dict[str, Any]:
+        return self._collectors.get(name, {
             'type': MetricType.GAUGE,
             'labels': {},
             'unit': '',
             'description': ''
         })
-        
-        metric = Metric(
+    
+    def _to_metric(self, name: str, timestamp: float, value: float, labels: Dict[str, str]) -> Metric:
+        config = self._config(name)
+        return Metric(
             name=name,
             value=value,
             metric_type=config.get('type', MetricType.GAUGE),
-            labels={**config.get('labels', {}), **(labels or {})},
+            timestamp=datetime.fromtimestamp(timestamp),
+            labels=labels,
             unit=config.get('unit', ''),
             description=config.get('description', '')
         )
-        
-        if name not in self._metrics:
-            self._metrics[name] = []
-        self._metrics[name].append(metric)
-        
-        # Cleanup old metrics
-        self._cleanup_old_metrics(name)
-        
-        return metric
+    
+    def collect(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> Metric:
+        """Manually collect a metric value"""
+        merged_labels = {**self._config(name).get('labels', {}), **(labels or {})}
+        timestamp = self._store.append(name, value, merged_labels)
+        return self._to_metric(name, timestamp, value, merged_labels)
     
     def collect_all(self) -> List[Metric]:
         """Collect all registered metrics"""
@@ -151,42 +168,82 @@ class MetricsCollector:
                 pass  # Skip failed collectors
         return collected
     
+    def query(
+        self,
+        name: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        labels: Optional[Dict[str, str]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Range-scan a metric
+        
+        Returns:
+            (timestamps, values) NumPy arrays; timestamps are Unix seconds
+        """
+        return self._store.query(
+            name,
+            start=start.timestamp() if start else None,
+            end=end.timestamp() if end else None,
+            labels=labels
+        )
+    
+    def get_rollups(
+        self,
+        name: str,
+        resolution: float = 60.0,
+        since: Optional[datetime] = None
+    ) -> Dict[str, np.ndarray]:
+        """Get min/max/sum/count rollup buckets of a metric"""
+        return self._store.rollups(
+            name,
+            resolution=resolution,
+            start=since.timestamp() if since else None
+        )
+    
     def get_metrics(self, name: str, since: Optional[datetime] = None) -> List[Metric]:
         """Get metrics by name, optionally filtered by time"""
-        metrics = self._metrics.get(name, [])
-        if since:
-            metrics = [m for m in metrics if m.timestamp >= since]
-        return metrics
+        start = since.timestamp() if since else None
+        points = []
+        for series in self._store.series(name):
+            labels = dict(series.labels)
+            timestamps, values = self._store.query(name, start=start, labels=labels)
+            points.extend(
+                (ts, value, labels) for ts, value in zip(timestamps.tolist(), values.tolist())
+            )
+        points.sort(key=lambda point: point[0])
+        return [self._to_metric(name, ts, value, labels) for ts, value, labels in points]
     
     def get_latest(self, name: str) -> Optional[Metric]:
         """Get the latest metric value"""
-        metrics = self._metrics.get(name, [])
-        return metrics[-1] if metrics else None
+        latest = self._store.latest(name)
+        if latest is None:
+            return None
+        timestamp, value, labels = latest
+        return self._to_metric(name, timestamp, value, dict(labels))
     
     def get_statistics(self, name: str) -> Dict[str, float]:
-        """Get statistical summary of a metric"""
-        metrics = self._metrics.get(name, [])
-        if not metrics:
+        """
+        Get statistical summary of a metric
+        
+        count/min/max/mean/stdev come from the 1m rollups (plus the raw
+        samples of the partial bucket at the retention boundary); only the
+        median needs a scan of the raw values.
+        """
+        summary = self._store.summary(name)
+        if not summary.count:
             return {}
         
-        values = [m.value for m in metrics]
+        _, values = self._store.query(name)
         return {
-            'count': len(values),
-            'min': min(values),
-            'max': max(values),
-            'mean': statistics.mean(values),
-            'median': statistics.median(values),
-            'stdev': statistics.stdev(values) if len(values) > 1 else 0.0
+            'count': summary.count,
+            'min': summary.min,
+            'max': summary.max,
+            'mean': summary.mean,
+            'median': float(np.median(values)) if len(values) else summary.mean,
+            'stdev': summary.stdev
         }
     
-    def _cleanup_old_metrics(self, name: str) -> None:
-        """Remove metrics older than retention period"""
-        cutoff = datetime.now().timestamp() - self._retention_seconds
-        self._metrics[name] = [
-            m for m in self._metrics.get(name, [])
-            if m.timestamp.timestamp() > cutoff
-        ]
-    
     async def start_collection(self, interval_seconds: float = 10.0) -> None:
         """Start continuous metric collection"""
         self._running = True
@@ -6,10 +6,12 @@ Unified observability with metrics, logs, and traces
 Reference: Uber's uMonitor - AI anomaly detection pinpoints faulty services in real-time [10]
 """
 
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, Generic, Hashable, Iterator, List, Optional, Sequence, TypeVar, Union
 import uuid
 
 
@@ -150,6 +152,217 @@ class CorrelatedEvent:
         }
 
 
+T = TypeVar('T')
+
+
+class IndexedRingBuffer(Generic[T]):
+    """
+    Fixed-capacity ring buffer with secondary indexes
+    
+    Every item gets a sequence number. Each index maps a key value (and
+    each time bucket maps a bucket number) to a deque of sequence numbers
+    in insertion order; the evicted item is always the oldest, so eviction
+    pops the left end of each of its deques in O(1). Time-window queries
+    only visit the buckets overlapping the window.
+    """
+    
+    def __init__(
+        self,
+        capacity: int,
+        index_keys: Dict[str, Callable[[T], Optional[Hashable]]],
+        time_key: Callable[[T], datetime],
+        bucket_seconds: int = 60
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.bucket_seconds = bucket_seconds
+        self._index_keys = index_keys
+        self._time_key = time_key
+        self._items: List[Optional[T]] = [None] * capacity
+        self._times: List[float] = [0.0] * capacity
+        self._keys: List[tuple] = [()] * capacity   # Index keys captured at insert
+        self._index_names = tuple(index_keys)
+        self._next_seq = 0
+        self._indexes: Dict[str, Dict[Hashable, Deque[int]]] = {name: {} for name in index_keys}
+        self._buckets: Dict[int, Deque[int]] = {}
+        self._bucket_keys: List[int] = []   # Sorted bucket numbers
+    
+    def __len__(self) -> int:
+        return min(self._next_seq, self.capacity)
+    
+    def __iter__(self) -> Iterator[T]:
+        for seq in range(self._next_seq - len(self), self._next_seq):
+            yield self._items[seq % self.capacity]
+    
+    def _bucket(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
+    
+    def append(self, item: T) -> Optional[T]:
+        """Add an item, returning the evicted one (if any)"""
+        seq = self._next_seq
+        slot = seq % self.capacity
+        evicted = self._items[slot] if seq >= self.capacity else None
+        if evicted is not None:
+            self._unindex(slot)
+        
+        timestamp = self._time_key(item).timestamp()
+        keys = tuple(key_func(item) for key_func in self._index_keys.values())
+        self._items[slot] = item
+        self._times[slot] = timestamp
+        self._keys[slot] = keys
+        self._next_seq = seq + 1
+        
+        for name, key in zip(self._index_names, keys):
+            if key is not None:
+                self._indexes[name].setdefault(key, deque()).append(seq)
+        
+        bucket = self._bucket(timestamp)
+        seqs = self._buckets.get(bucket)
+        if seqs is None:
+            seqs = self._buckets[bucket] = deque()
+            if not self._bucket_keys or bucket > self._bucket_keys[-1]:
+                self._bucket_keys.append(bucket)
+            else:
+                insort(self._bucket_keys, bucket)
+        seqs.append(seq)
+        return evicted
+    
+    def _unindex(self, slot: int) -> None:
+        for name, key in zip(self._index_names, self._keys[slot]):
+            if key is None:
+                continue
+            seqs = self._indexes[name][key]
+            seqs.popleft()
+            if not seqs:
+                del self._indexes[name][key]
+        
+        bucket = self._bucket(self._times[slot])
+        seqs = self._buckets[bucket]
+        seqs.popleft()
+        if not seqs:
+            del self._buckets[bucket]
+            del self._bucket_keys[bisect_left(self._bucket_keys, bucket)]
+    
+    def _resolve(self, seqs: Sequence[int]) -> List[T]:
+        capacity = self.capacity
+        items = self._items
+        return [items[seq % capacity] for seq in seqs]
+    
+    def keys(self, index: str) -> List[Hashable]:
+        """Distinct values present in an index"""
+        return list(self._indexes[index])
+    
+    def count(self, index: str, key: Hashable) -> int:
+        """Number of retained items with ``key`` in ``index``"""
+        seqs = self._indexes[index].get(key)
+        return len(seqs) if seqs else 0
+    
+    def lookup(self, index: str, key: Hashable) -> List[T]:
+        """Items with ``key`` in ``index``, oldest first"""
+        return self._resolve(self._indexes[index].get(key, ()))
+    
+    def _window_seqs(self, start: Optional[float], end: Optional[float]) -> List[int]:
+        lo = 0 if start is None else bisect_left(self._bucket_keys, self._bucket(start))
+        hi = len(self._bucket_keys) if end is None else bisect_right(self._bucket_keys, self._bucket(end))
+        buckets = self._bucket_keys[lo:hi]
+        times = self._times
+        capacity = self.capacity
+        seqs: List[int] = []
+        for i, bucket in enumerate(buckets):
+            bucket_seqs = self._buckets[bucket]
+            if (i == 0 and start is not None) or (i == len(buckets) - 1 and end is not None):
+                seqs.extend(
+                    seq for seq in bucket_seqs
+                    if (start is None or times[seq % capacity] >= start)
+                    and (end is None or times[seq % capacity] <= end)
+                )
+            else:
+                seqs.extend(bucket_seqs)
+        if len(buckets) > 1:
+            # Buckets are in time order; restore insertion order
+            seqs.sort()
+        return seqs
+    
+    def in_window(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[T]:
+        """Items with ``start <= time <= end``, oldest first"""
+        return self._resolve(self._window_seqs(
+            start.timestamp() if start else None,
+            end.timestamp() if end else None
+        ))
+    
+    def query(
+        self,
+        filters: Optional[Dict[str, Hashable]] = None,
+        since: Optional[datetime] = None
+    ) -> List[T]:
+        """
+        Items matching every ``index -> key`` filter and newer than ``since``
+        
+        Candidates come from the smallest matching index (or from the time
+        buckets when only ``since`` is given); the other predicates are
+        checked per candidate.
+        """
+        filters = {name: key for name, key in (filters or {}).items() if key is not None}
+        start = since.timestamp() if since else None
+        
+        if filters:
+            candidates = min(
+                (self._indexes[name].get(key, ()) for name, key in filters.items()),
+                key=len
+            )
+        elif start is not None:
+            candidates = self._window_seqs(start, None)
+            start = None
+        else:
+            return list(self)
+        
+        checks = [
+            (self._index_names.index(name), key) for name, key in filters.items()
+        ]
+        capacity = self.capacity
+        results = []
+        for seq in candidates:
+            slot = seq % capacity
+            if start is not None and self._times[slot] < start:
+                continue
+            keys = self._keys[slot]
+            if all(keys[position] == key for position, key in checks):
+                results.append(self._items[slot])
+        return results
+
+
+LogStore = IndexedRingBuffer[LogEntry]
+SpanStore = IndexedRingBuffer[TraceSpan]
+
+
+def create_log_store(capacity: int = 10000, bucket_seconds: int = 60) -> LogStore:
+    """Ring buffer of logs indexed by service, level and trace_id"""
+    return IndexedRingBuffer(
+        capacity,
+        index_keys={
+            'service': lambda entry: entry.service or None,
+            'level': lambda entry: entry.level,
+            'trace_id': lambda entry: entry.trace_id,
+        },
+        time_key=lambda entry: entry.timestamp,
+        bucket_seconds=bucket_seconds
+    )
+
+
+def create_span_store(capacity: int = 10000, bucket_seconds: int = 60) -> SpanStore:
+    """Ring buffer of spans indexed by service and trace_id"""
+    return IndexedRingBuffer(
+        capacity,
+        index_keys={
+            'service': lambda span: span.service or None,
+            'trace_id': lambda span: span.trace_id,
+        },
+        time_key=lambda span: span.start_time,
+        bucket_seconds=bucket_seconds
+    )
+
+
 class CorrelationEngine:
     """
     Correlation Engine
@@ -163,33 +376,47 @@ class CorrelationEngine:
     
     def correlate_by_time(
         self,
-        logs: List[LogEntry],
-        traces: List[TraceSpan],
+        logs: Union[Sequence[LogEntry], LogStore],
+        traces: Union[Sequence[TraceSpan], SpanStore],
         metric_names: List[str],
         reference_time: datetime
     ) -> CorrelatedEvent:
-        """Correlate events by time proximity"""
+        """
+        Correlate events by time proximity
+        
+        With indexed stores only the time buckets inside the window are
+        visited; plain sequences are scanned.
+        """
         event = CorrelatedEvent(
             event_type=EventType.INCIDENT,
             title="Time-correlated event",
             timestamp=reference_time
         )
+        window = timedelta(seconds=self._time_window)
+        start, end = reference_time - window, reference_time + window
+        services = set()
         
         # Find logs within time window
-        for log in logs:
-            time_diff = abs((log.timestamp - reference_time).total_seconds())
-            if time_diff <= self._time_window:
-                event.related_logs.append(log.log_id)
-                if log.service and log.service not in event.related_services:
-                    event.related_services.append(log.service)
+        if isinstance(logs, IndexedRingBuffer):
+            window_logs = logs.in_window(start, end)
+        else:
+            window_logs = [log for log in logs if start <= log.timestamp <= end]
+        for log in window_logs:
+            event.related_logs.append(log.log_id)
+            if log.service and log.service not in services:
+                services.add(log.service)
+                event.related_services.append(log.service)
         
         # Find traces within time window
-        for trace in traces:
-            time_diff = abs((trace.start_time - reference_time).total_seconds())
-            if time_diff <= self._time_window:
-                event.related_traces.append(trace.trace_id)
-                if trace.service and trace.service not in event.related_services:
-                    event.related_services.append(trace.service)
+        if isinstance(traces, IndexedRingBuffer):
+            window_spans = traces.in_window(start, end)
+        else:
+            window_spans = [trace for trace in traces if start <= trace.start_time <= end]
+        for trace in window_spans:
+            event.related_traces.append(trace.trace_id)
+            if trace.service and trace.service not in services:
+                services.add(trace.service)
+                event.related_services.append(trace.service)
         
         event.related_metrics = metric_names
         
@@ -198,28 +425,37 @@ class CorrelationEngine:
     
     def correlate_by_trace(
         self,
-        logs: List[LogEntry],
-        traces: List[TraceSpan],
+        logs: Union[Sequence[LogEntry], LogStore],
+        traces: Union[Sequence[TraceSpan], SpanStore],
         trace_id: str
     ) -> CorrelatedEvent:
-        """Correlate events by trace ID"""
+        """Correlate events by trace ID (direct index lookups for stores)"""
         event = CorrelatedEvent(
             event_type=EventType.INCIDENT,
             title=f"Trace-correlated event: {trace_id}"
         )
         
         # Find all spans in trace
-        trace_spans = [t for t in traces if t.trace_id == trace_id]
+        if isinstance(traces, IndexedRingBuffer):
+            trace_spans = traces.lookup('trace_id', trace_id)
+        else:
+            trace_spans = [t for t in traces if t.trace_id == trace_id]
+        span_ids = set()
+        services = set()
         for span in trace_spans:
-            if span.span_id not in event.related_traces:
+            if span.span_id not in span_ids:
+                span_ids.add(span.span_id)
                 event.related_traces.append(span.span_id)
-            if span.service and span.service not in event.related_services:
+            if span.service and span.service not in services:
+                services.add(span.service)
                 event.related_services.append(span.service)
         
         # Find logs with matching trace ID
-        for log in logs:
-            if log.trace_id == trace_id:
-                event.related_logs.append(log.log_id)
+        if isinstance(logs, IndexedRingBuffer):
+            trace_logs = logs.lookup('trace_id', trace_id)
+        else:
+            trace_logs = [log for log in logs if log.trace_id == trace_id]
+        event.related_logs.extend(log.log_id for log in trace_logs)
         
         self._events.append(event)
         return event
@@ -238,12 +474,17 @@ class ObservabilityPlatform:
     Reference: Uber's uMonitor for real-time AI anomaly detection [10]
     """
     
-    def __init__(self):
-        self._logs: List[LogEntry] = []
-        self._traces: Dict[str, List[TraceSpan]] = {}  # trace_id -> spans
+    def __init__(
+        self,
+        max_retention: int = 10000,
+        max_spans: int = 10000,
+        bucket_seconds: int = 60
+    ):
+        self._max_retention = max_retention  # Max entries to retain
+        self._logs = create_log_store(max_retention, bucket_seconds)
+        self._spans = create_span_store(max_spans, bucket_seconds)
         self._events: List[CorrelatedEvent] = []
         self._correlation_engine = CorrelationEngine()
-        self._max_retention = 10000  # Max entries to retain
     
     @property
     def correlation_engine(self) -> CorrelationEngine:
@@ -272,7 +513,6 @@ class ObservabilityPlatform:
             attributes=attributes or {}
         )
         self._logs.append(entry)
-        self._cleanup_logs()
         return entry
     
     def log_info(self, message: str, **kwargs) -> LogEntry:
@@ -291,21 +531,11 @@ class ObservabilityPlatform:
         since: Optional[datetime] = None
     ) -> List[LogEntry]:
         """Get logs with optional filters"""
-        logs = self._logs
-        
-        if service:
-            logs = [l for l in logs if l.service == service]
-        if level:
-            logs = [l for l in logs if l.level == level]
-        if since:
-            logs = [l for l in logs if l.timestamp >= since]
-        
-        return logs
+        return self._logs.query({'service': service or None, 'level': level}, since=since)
     
-    def _cleanup_logs(self) -> None:
-        """Clean up old logs"""
-        if len(self._logs) > self._max_retention:
-            self._logs = self._logs[-self._max_retention:]
+    def get_logs_in_window(self, start: datetime, end: datetime) -> List[LogEntry]:
+        """Get logs with ``start <= timestamp <= end``"""
+        return self._logs.in_window(start, end)
     
     # === Tracing ===
     
@@ -324,10 +554,7 @@ class ObservabilityPlatform:
             attributes=attributes or {}
         )
         
-        if span.trace_id not in self._traces:
-            self._traces[span.trace_id] = []
-        self._traces[span.trace_id].append(span)
-        
+        self._spans.append(span)
         return span
     
     def start_span(
@@ -349,10 +576,7 @@ class ObservabilityPlatform:
             attributes=attributes or {}
         )
         
-        if trace_id not in self._traces:
-            self._traces[trace_id] = []
-        self._traces[trace_id].append(span)
-        
+        self._spans.append(span)
         return span
     
     def end_span(self, span: TraceSpan, status: TraceStatus = TraceStatus.OK) -> None:
@@ -361,14 +585,14 @@ class ObservabilityPlatform:
     
     def get_trace(self, trace_id: str) -> List[TraceSpan]:
         """Get all spans in a trace"""
-        return self._traces.get(trace_id, [])
+        return self._spans.lookup('trace_id', trace_id)
     
     def get_slow_traces(self, threshold_ms: float = 1000) -> List[TraceSpan]:
         """Get traces slower than threshold"""
         slow = []
-        for trace_id, spans in self._traces.items():
+        for trace_id in self._spans.keys('trace_id'):
             # Find root span
-            root = next((s for s in spans if s.parent_span_id is None), None)
+            root = next((s for s in self.get_trace(trace_id) if s.parent_span_id is None), None)
             if root and root.duration_ms() and root.duration_ms() > threshold_ms:
                 slow.append(root)
         return slow
@@ -413,6 +637,22 @@ class ObservabilityPlatform:
         
         return events
     
+    # === Correlation ===
+    
+    def correlate_by_time(
+        self,
+        reference_time: datetime,
+        metric_names: Optional[List[str]] = None
+    ) -> CorrelatedEvent:
+        """Correlate retained logs and spans around a point in time"""
+        return self._correlation_engine.correlate_by_time(
+            self._logs, self._spans, metric_names or [], reference_time
+        )
+    
+    def correlate_by_trace(self, trace_id: str) -> CorrelatedEvent:
+        """Correlate retained logs and spans of a trace"""
+        return self._correlation_engine.correlate_by_trace(self._logs, self._spans, trace_id)
+    
     # === Analysis ===
     
     def get_service_health(self, service: str) -> Dict[str, Any]:
@@ -421,13 +661,13 @@ class ObservabilityPlatform:
         error_logs = self.get_logs(service=service, level=LogLevel.ERROR)
         warning_logs = self.get_logs(service=service, level=LogLevel.WARNING)
         
-        # Get traces for service
+        # Get traces for service (first span of each trace)
         service_traces = []
-        for trace_id, spans in self._traces.items():
-            for span in spans:
-                if span.service == service:
-                    service_traces.append(span)
-                    break
+        seen_traces = set()
+        for span in self._spans.lookup('service', service):
+            if span.trace_id not in seen_traces:
+                seen_traces.add(span.trace_id)
+                service_traces.append(span)
         
         error_traces = [t for t in service_traces if t.status == TraceStatus.ERROR]
         
@@ -455,18 +695,12 @@ class ObservabilityPlatform:
     
     def get_platform_summary(self) -> Dict[str, Any]:
         """Get overall platform summary"""
-        services = set()
-        for spans in self._traces.values():
-            for span in spans:
-                if span.service:
-                    services.add(span.service)
-        for log in self._logs:
-            if log.service:
-                services.add(log.service)
+        services = set(self._spans.keys('service'))
+        services.update(self._logs.keys('service'))
         
         return {
             'total_logs': len(self._logs),
-            'total_traces': len(self._traces),
+            'total_traces': len(self._spans.keys('trace_id')),
             'total_events': len(self._events),
             'services': list(services),
             'timestamp': datetime.now().isoformat()
@@ -9,9 +9,18 @@ Reference: AI-driven infrastructure that detects anomalies, neutralizes risks, a
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+import hashlib
+import json
+import os
 import uuid
 
+import numpy as np
+
+# Mersenne prime used by the MinHash universal hash family
+_MINHASH_PRIME = (1 << 31) - 1
+
 
 class PatternType(Enum):
     """Types of learned patterns"""
@@ -106,16 +115,130 @@ class LearningOutcome:
         }
 
 
+def condition_features(conditions: List[Dict[str, Any]]) -> FrozenSet[str]:
+    """
+    Feature set of a list of conditions
+    
+    Every condition key is a feature; categorical values (strings and
+    booleans) additionally contribute a ``key=value`` feature. Numeric
+    values are measurements and do not, so ``cpu = 95`` and ``cpu = 90``
+    describe the same pattern.
+    """
+    features: Set[str] = set()
+    for cond in conditions or ():
+        if not isinstance(cond, dict):
+            continue
+        for key, value in cond.items():
+            features.add(str(key))
+            if isinstance(value, (str, bool)):
+                features.add(f"{key}={value}")
+    return frozenset(features)
+
+
+class MinHashLSHIndex:
+    """
+    MinHash signatures with banded locality-sensitive hashing
+    
+    Items whose feature sets have Jaccard similarity ``s`` share at least
+    one band with probability ``1 - (1 - s**rows)**bands``; with the
+    defaults (128 permutations, 32 bands of 4 rows) that is >99.9% at 0.7
+    and ~99% at 0.6, while pairs below 0.1 almost never collide.
+    Hash parameters derive from ``seed`` so signatures are stable across
+    processes.
+    """
+    
+    def __init__(self, num_perm: int = 128, bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MINHASH_PRIME, size=(num_perm, 1), dtype=np.int64)
+        self._b = rng.integers(0, _MINHASH_PRIME, size=(num_perm, 1), dtype=np.int64)
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(bands)]
+        self._band_keys: Dict[str, List[bytes]] = {}
+    
+    @staticmethod
+    def _feature_id(feature: str) -> int:
+        digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') % _MINHASH_PRIME
+    
+    def signature(self, features: Iterable[str]) -> np.ndarray:
+        """MinHash signature of a non-empty feature set"""
+        ids = np.fromiter((self._feature_id(f) for f in features), dtype=np.int64)
+        return ((self._a * ids + self._b) % _MINHASH_PRIME).min(axis=1)
+    
+    def _bands(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[i * self.rows:(i + 1) * self.rows].tobytes()
+            for i in range(self.bands)
+        ]
+    
+    def add(self, key: str, features: FrozenSet[str]) -> None:
+        """Index an item (items without features are not indexed)"""
+        if not features or key in self._band_keys:
+            return
+        band_keys = self._bands(self.signature(features))
+        for bucket, band_key in zip(self._buckets, band_keys):
+            bucket.setdefault(band_key, set()).add(key)
+        self._band_keys[key] = band_keys
+    
+    def remove(self, key: str) -> None:
+        band_keys = self._band_keys.pop(key, None)
+        if band_keys is None:
+            return
+        for bucket, band_key in zip(self._buckets, band_keys):
+            members = bucket[band_key]
+            members.discard(key)
+            if not members:
+                del bucket[band_key]
+    
+    def candidates(self, features: FrozenSet[str]) -> Set[str]:
+        """Keys sharing at least one band with ``features``"""
+        if not features:
+            return set()
+        found: Set[str] = set()
+        for bucket, band_key in zip(self._buckets, self._bands(self.signature(features))):
+            members = bucket.get(band_key)
+            if members:
+                found |= members
+        return found
+    
+    def __len__(self) -> int:
+        return len(self._band_keys)
+
+
 class PatternLearner:
     """
     Pattern Learner
     
-    Identifies and learns patterns from incidents
+    Identifies and learns patterns from incidents.
+    
+    Similar patterns are shortlisted through a MinHash/LSH index over
+    condition features and only the shortlist is scored exactly, so
+    matching cost does not grow with the number of learned patterns.
+    With a ``storage_path`` every change is appended to a JSONL journal
+    that is replayed on startup.
     """
     
-    def __init__(self, similarity_threshold: float = 0.7):
+    def __init__(
+        self,
+        similarity_threshold: float = 0.7,
+        storage_path: Optional[Path] = None,
+        num_perm: int = 128,
+        bands: int = 32
+    ):
         self._patterns: Dict[str, IncidentPattern] = {}
         self._similarity_threshold = similarity_threshold
+        self._features: Dict[str, FrozenSet[str]] = {}
+        self._order: Dict[str, int] = {}
+        self._index = MinHashLSHIndex(num_perm=num_perm, bands=bands)
+        self._storage_path = Path(storage_path) if storage_path is not None else None
+        self._journal_records = 0
+        
+        if self._storage_path is not None:
+            self._load()
     
     def _calculate_similarity(
         self,
@@ -123,42 +246,33 @@ class PatternLearner:
         conditions2: List[Dict[str, Any]]
     ) -> float:
         """Calculate similarity between two sets of conditions"""
-        if not conditions1 or not conditions2:
-            return 0.0
-        
-        # Simple key-based similarity
-        keys1 = set()
-        keys2 = set()
-        
-        for cond in conditions1:
-            if isinstance(cond, dict):
-                keys1.update(cond.keys())
-        
-        for cond in conditions2:
-            if isinstance(cond, dict):
-                keys2.update(cond.keys())
-        
-        if not keys1 or not keys2:
+        return self._jaccard(condition_features(conditions1), condition_features(conditions2))
+    
+    @staticmethod
+    def _jaccard(features1: FrozenSet[str], features2: FrozenSet[str]) -> float:
+        if not features1 or not features2:
             return 0.0
-        
-        intersection = len(keys1 & keys2)
-        union = len(keys1 | keys2)
-        
-        return intersection / union if union > 0 else 0.0
+        intersection = len(features1 & features2)
+        return intersection / (len(features1) + len(features2) - intersection)
     
     def find_similar_pattern(
         self,
         conditions: List[Dict[str, Any]]
     ) -> Optional[IncidentPattern]:
         """Find a similar existing pattern"""
+        return self._find_similar(condition_features(conditions))
+    
+    def _find_similar(self, features: FrozenSet[str]) -> Optional[IncidentPattern]:
         best_match = None
         best_similarity = 0.0
         
-        for pattern in self._patterns.values():
-            similarity = self._calculate_similarity(conditions, pattern.conditions)
+        # Earlier patterns win ties
+        shortlist = sorted(self._index.candidates(features), key=self._order.__getitem__)
+        for pattern_id in shortlist:
+            similarity = self._jaccard(features, self._features[pattern_id])
             if similarity > best_similarity and similarity >= self._similarity_threshold:
                 best_similarity = similarity
-                best_match = pattern
+                best_match = self._patterns[pattern_id]
         
         return best_match
     
@@ -170,10 +284,12 @@ class PatternLearner:
         tags: Optional[List[str]] = None
     ) -> IncidentPattern:
         """Learn from conditions - create new pattern or update existing"""
-        existing = self.find_similar_pattern(conditions)
+        features = condition_features(conditions)
+        existing = self._find_similar(features)
         
         if existing:
             existing.increment()
+            self._persist(existing)
             return existing
         
         # Create new pattern
@@ -183,9 +299,39 @@ class PatternLearner:
             conditions=conditions,
             tags=tags or []
         )
-        self._patterns[pattern.pattern_id] = pattern
+        self._add(pattern, features)
+        self._persist(pattern)
         return pattern
     
+    def _add(self, pattern: IncidentPattern, features: Optional[FrozenSet[str]] = None) -> None:
+        if features is None:
+            features = condition_features(pattern.conditions)
+        self._patterns[pattern.pattern_id] = pattern
+        self._features[pattern.pattern_id] = features
+        self._order.setdefault(pattern.pattern_id, len(self._order))
+        self._index.add(pattern.pattern_id, features)
+    
+    def get_pattern(self, pattern_id: str) -> Optional[IncidentPattern]:
+        """Get a learned pattern by ID"""
+        return self._patterns.get(pattern_id)
+    
+    def record_remediation(self, pattern_id: str, remediation_id: str, success: bool) -> bool:
+        """
+        Record a remediation result on a pattern
+        
+        Returns:
+            False if the pattern is unknown
+        """
+        pattern = self._patterns.get(pattern_id)
+        if pattern is None:
+            return False
+        if success:
+            pattern.add_successful_remediation(remediation_id)
+        else:
+            pattern.add_failed_remediation(remediation_id)
+        self._persist(pattern)
+        return True
+    
     def get_patterns(self) -> List[IncidentPattern]:
         """Get all learned patterns"""
         return list(self._patterns.values())
@@ -193,6 +339,76 @@ class PatternLearner:
     def get_frequent_patterns(self, min_frequency: int = 3) -> List[IncidentPattern]:
         """Get frequently occurring patterns"""
         return [p for p in self._patterns.values() if p.frequency >= min_frequency]
+    
+    # === Persistence ===
+    
+    @staticmethod
+    def _to_record(pattern: IncidentPattern) -> Dict[str, Any]:
+        return {
+            'pattern_id': pattern.pattern_id,
+            'type': pattern.pattern_type.value,
+            'description': pattern.description,
+            'conditions': pattern.conditions,
+            'frequency': pattern.frequency,
+            'last_seen': pattern.last_seen.isoformat(),
+            'first_seen': pattern.first_seen.isoformat(),
+            'successful_remediations': pattern.successful_remediations,
+            'failed_remediations': pattern.failed_remediations,
+            'tags': pattern.tags
+        }
+    
+    @staticmethod
+    def _from_record(record: Dict[str, Any]) -> IncidentPattern:
+        return IncidentPattern(
+            pattern_id=record['pattern_id'],
+            pattern_type=PatternType(record['type']),
+            description=record.get('description', ''),
+            conditions=record.get('conditions', []),
+            frequency=record.get('frequency', 1),
+            last_seen=datetime.fromisoformat(record['last_seen']),
+            first_seen=datetime.fromisoformat(record['first_seen']),
+            successful_remediations=record.get('successful_remediations', []),
+            failed_remediations=record.get('failed_remediations', []),
+            tags=record.get('tags', [])
+        )
+    
+    def _persist(self, pattern: IncidentPattern) -> None:
+        """Append the pattern's current state to the journal"""
+        if self._storage_path is None:
+            return
+        with open(self._storage_path, 'a', encoding='utf-8') as journal:
+            journal.write(json.dumps(self._to_record(pattern), default=str) + '\n')
+        self._journal_records += 1
+        if self._journal_records > 2 * len(self._patterns) + 64:
+            self.compact()
+    
+    def _load(self) -> None:
+        """Replay the journal (later records of a pattern win)"""
+        if not self._storage_path.exists():
+            self._storage_path.parent.mkdir(parents=True, exist_ok=True)
+            return
+        records: Dict[str, Dict[str, Any]] = {}
+        with open(self._storage_path, encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn write
+                records[record['pattern_id']] = record
+                self._journal_records += 1
+        for record in records.values():
+            self._add(self._from_record(record))
+    
+    def compact(self) -> None:
+        """Rewrite the journal with one record per pattern"""
+        if self._storage_path is None:
+            return
+        temp_path = self._storage_path.with_suffix(self._storage_path.suffix + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as journal:
+            for pattern in self._patterns.values():
+                journal.write(json.dumps(self._to_record(pattern), default=str) + '\n')
+        os.replace(temp_path, self._storage_path)
+        self._journal_records = len(self._patterns)
 
 
 class EffectivenessTracker:
@@ -293,8 +509,8 @@ class SelfLearningEngine:
     Reference: AI-driven infrastructure learns from each incident [5]
     """
     
-    def __init__(self):
-        self._pattern_learner = PatternLearner()
+    def __init__(self, storage_path: Optional[Path] = None):
+        self._pattern_learner = PatternLearner(storage_path=storage_path)
         self._effectiveness_tracker = EffectivenessTracker()
         self._learning_outcomes: List[LearningOutcome] = []
     
@@ -340,14 +556,7 @@ class SelfLearningEngine:
         
         # Update pattern if provided
         if pattern_id:
-            patterns = self._pattern_learner.get_patterns()
-            for pattern in patterns:
-                if pattern.pattern_id == pattern_id:
-                    if success:
-                        pattern.add_successful_remediation(playbook_id)
-                    else:
-                        pattern.add_failed_remediation(playbook_id)
-                    break
+            self._pattern_learner.record_remediation(pattern_id, playbook_id, success)
     
     def analyze_and_learn(self) -> LearningOutcome:
         """Analyze data and generate learning outcomes"""
@@ -0,0 +1,472 @@
+"""
+Time Series Store (時間序列存儲)
+
+Columnar in-memory storage for monitoring metrics.
+
+Each series (metric name + interned label set) keeps its raw samples in
+fixed-size chunks of two ``array('d')`` columns, so a sample costs 16 bytes
+(timestamp + value) instead of a Python object. Retention drops whole
+chunks once every sample in them has expired, and each sample is also
+folded into rollup tiers (1 minute and 1 hour buckets by default) that
+hold count/sum/min/max and the within-bucket sum of squared deviations,
+so summaries are computed from buckets instead of raw samples.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import math
+import time
+
+import numpy as np
+
+# Samples per raw chunk
+DEFAULT_CHUNK_SIZE = 512
+
+# (resolution_seconds, retention_seconds) per rollup tier, finest first
+DEFAULT_ROLLUP_TIERS: Tuple[Tuple[float, float], ...] = (
+    (60.0, 24 * 3600.0),
+    (3600.0, 30 * 24 * 3600.0),
+)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class SeriesChunk:
+    """A block of raw samples stored column-wise"""
+
+    __slots__ = ('timestamps', 'values')
+
+    def __init__(self):
+        self.timestamps = array('d')
+        self.values = array('d')
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def column_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Zero-copy NumPy views of the timestamp and value columns"""
+        return (
+            np.frombuffer(self.timestamps, dtype=np.float64),
+            np.frombuffer(self.values, dtype=np.float64),
+        )
+
+
+class RollupTier:
+    """Fixed-resolution aggregate buckets for one series"""
+
+    __slots__ = ('resolution', 'retention', 'starts', 'counts', 'sums', 'mins', 'maxs', 'm2s')
+
+    def __init__(self, resolution: float, retention: float):
+        self.resolution = resolution
+        self.retention = retention
+        self.starts = array('d')
+        self.counts = array('d')
+        self.sums = array('d')
+        self.mins = array('d')
+        self.maxs = array('d')
+        self.m2s = array('d')   # Sum of squared deviations from the bucket mean
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Fold a sample into its bucket (timestamps must be non-decreasing)"""
+        start = math.floor(timestamp / self.resolution) * self.resolution
+        if not self.starts or start > self.starts[-1]:
+            self.starts.append(start)
+            self.counts.append(1.0)
+            self.sums.append(value)
+            self.mins.append(value)
+            self.maxs.append(value)
+            self.m2s.append(0.0)
+            self._trim(start - self.retention)
+            return
+
+        count = self.counts[-1]
+        mean = self.sums[-1] / count
+        count += 1.0
+        delta = value - mean
+        self.counts[-1] = count
+        self.sums[-1] += value
+        self.m2s[-1] += delta * (value - (mean + delta / count))
+        if value < self.mins[-1]:
+            self.mins[-1] = value
+        if value > self.maxs[-1]:
+            self.maxs[-1] = value
+
+    def _trim(self, cutoff: float) -> None:
+        """Drop buckets that started before ``cutoff``"""
+        expired = bisect_left(self.starts, cutoff)
+        if expired:
+            for column in (self.starts, self.counts, self.sums, self.mins, self.maxs, self.m2s):
+                del column[:expired]
+
+    def bucket_slice(self, start: Optional[float] = None, end: Optional[float] = None) -> slice:
+        """Buckets whose start lies in ``[start, end)``"""
+        lo = 0 if start is None else bisect_left(self.starts, start)
+        hi = len(self.starts) if end is None else bisect_left(self.starts, end)
+        return slice(lo, hi)
+
+    def columns(self, window: slice) -> Dict[str, np.ndarray]:
+        """Bucket columns for a slice as NumPy arrays"""
+        return {
+            'timestamp': np.asarray(self.starts[window], dtype=np.float64),
+            'count': np.asarray(self.counts[window], dtype=np.float64),
+            'sum': np.asarray(self.sums[window], dtype=np.float64),
+            'min': np.asarray(self.mins[window], dtype=np.float64),
+            'max': np.asarray(self.maxs[window], dtype=np.float64),
+            'm2': np.asarray(self.m2s[window], dtype=np.float64),
+        }
+
+
+@dataclass
+class SeriesSummary:
+    """Aggregate statistics over a time range"""
+    count: int = 0
+    sum: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+    m2: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """Sample standard deviation"""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def merge_columns(self, counts: np.ndarray, sums: np.ndarray, mins: np.ndarray,
+                      maxs: np.ndarray, m2s: np.ndarray) -> None:
+        """Merge grouped aggregates (parallel variance formula)"""
+        keep = counts > 0
+        if not keep.any():
+            return
+        counts, sums, m2s = counts[keep], sums[keep], m2s[keep]
+        counts = np.append(counts, self.count)
+        sums = np.append(sums, self.sum)
+        m2s = np.append(m2s, self.m2)
+        total = counts.sum()
+        mean = sums.sum() / total
+        means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+        self.m2 = float(m2s.sum() + (counts * (means - mean) ** 2).sum())
+        self.count = int(total)
+        self.sum = float(sums.sum())
+        self.min = min(self.min, float(mins[keep].min()))
+        self.max = max(self.max, float(maxs[keep].max()))
+
+    def merge_values(self, values: np.ndarray) -> None:
+        """Merge raw samples"""
+        if not len(values):
+            return
+        mean = values.mean()
+        self.merge_columns(
+            np.array([float(len(values))]), np.array([values.sum()]),
+            np.array([values.min()]), np.array([values.max()]),
+            np.array([((values - mean) ** 2).sum()]),
+        )
+
+
+class TimeSeries:
+    """Raw chunks and rollup tiers for one (name, labels) series"""
+
+    __slots__ = ('name', 'labels', 'chunks', 'chunk_starts', 'rollups', 'chunk_size', 'last_timestamp')
+
+    def __init__(self, name: str, labels: LabelSet, chunk_size: int,
+                 rollup_tiers: Sequence[Tuple[float, float]]):
+        self.name = name
+        self.labels = labels
+        self.chunks: List[SeriesChunk] = []
+        self.chunk_starts: List[float] = []
+        self.rollups = [RollupTier(resolution, retention) for resolution, retention in rollup_tiers]
+        self.chunk_size = chunk_size
+        self.last_timestamp = -math.inf
+
+    def append(self, timestamp: float, value: float) -> float:
+        """Append a sample, returning the timestamp actually stored"""
+        # Columns stay sorted so range queries can binary-search
+        timestamp = max(timestamp, self.last_timestamp)
+        if not self.chunks or len(self.chunks[-1]) >= self.chunk_size:
+            self.chunks.append(SeriesChunk())
+            self.chunk_starts.append(timestamp)
+        chunk = self.chunks[-1]
+        chunk.timestamps.append(timestamp)
+        chunk.values.append(value)
+        self.last_timestamp = timestamp
+        for tier in self.rollups:
+            tier.add(timestamp, value)
+        return timestamp
+
+    def drop_before(self, cutoff: float) -> int:
+        """Drop whole chunks whose newest sample is older than ``cutoff``"""
+        dropped = 0
+        while len(self.chunks) > dropped + 1 and self.chunks[dropped].timestamps[-1] < cutoff:
+            dropped += 1
+        if len(self.chunks) == dropped + 1 and self.last_timestamp < cutoff:
+            dropped += 1
+        if dropped:
+            del self.chunks[:dropped]
+            del self.chunk_starts[:dropped]
+        return dropped
+
+    @property
+    def sample_count(self) -> int:
+        return sum(len(chunk) for chunk in self.chunks)
+
+    @property
+    def oldest_timestamp(self) -> Optional[float]:
+        return self.chunks[0].timestamps[0] if self.chunks else None
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        if not self.chunks:
+            return None
+        chunk = self.chunks[-1]
+        return chunk.timestamps[-1], chunk.values[-1]
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples with ``start <= timestamp < end`` as (timestamps, values)"""
+        first = 0 if start is None else max(0, bisect_right(self.chunk_starts, start) - 1)
+        last = len(self.chunks) if end is None else bisect_left(self.chunk_starts, end)
+        times, values = [], []
+        for chunk in self.chunks[first:last]:
+            ts, vals = chunk.column_arrays()
+            lo = 0 if start is None else int(np.searchsorted(ts, start, side='left'))
+            hi = len(ts) if end is None else int(np.searchsorted(ts, end, side='left'))
+            if lo < hi:
+                times.append(ts[lo:hi])
+                values.append(vals[lo:hi])
+        if not times:
+            return np.empty(0), np.empty(0)
+        return np.concatenate(times), np.concatenate(values)
+
+    def summary(self, since: Optional[float] = None) -> SeriesSummary:
+        """
+        Summarize samples from ``since`` (inclusive) to the newest sample
+
+        Whole buckets of the finest rollup tier are used where the range
+        covers them; the leading partial bucket is read from raw chunks.
+        """
+        result = SeriesSummary()
+        if not self.rollups:
+            result.merge_values(self.range(since)[1])
+            return result
+
+        tier = self.rollups[0]
+        if since is None:
+            aligned = None
+        else:
+            aligned = math.ceil(since / tier.resolution) * tier.resolution
+            result.merge_values(self.range(since, aligned)[1])
+        cols = tier.columns(tier.bucket_slice(aligned))
+        result.merge_columns(cols['count'], cols['sum'], cols['min'], cols['max'], cols['m2'])
+        return result
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by raw and rollup columns"""
+        total = 0
+        for chunk in self.chunks:
+            total += chunk.timestamps.buffer_info()[1] * chunk.timestamps.itemsize
+            total += chunk.values.buffer_info()[1] * chunk.values.itemsize
+        for tier in self.rollups:
+            total += 6 * len(tier.starts) * tier.starts.itemsize
+        return total
+
+
+class TimeSeriesStore:
+    """
+    時間序列存儲 - Columnar Time Series Store
+
+    Example:
+        store = TimeSeriesStore(retention_seconds=3600)
+        store.append('cpu', 42.0, labels={'host': 'a'})
+        timestamps, values = store.query('cpu', start=time.time() - 300)
+        per_minute = store.rollups('cpu', resolution=60)
+    """
+
+    def __init__(
+        self,
+        retention_seconds: float = 3600,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        rollup_tiers: Sequence[Tuple[float, float]] = DEFAULT_ROLLUP_TIERS
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.retention_seconds = retention_seconds
+        self.chunk_size = chunk_size
+        self.rollup_tiers = tuple(sorted(rollup_tiers))
+        self._series: Dict[Tuple[str, LabelSet], TimeSeries] = {}
+        self._series_by_name: Dict[str, List[TimeSeries]] = {}
+        self._label_sets: Dict[LabelSet, LabelSet] = {}
+
+    def _intern_labels(self, labels: Optional[Dict[str, str]]) -> LabelSet:
+        """Return the shared tuple for a label set"""
+        key: LabelSet = tuple(sorted(labels.items())) if labels else ()
+        return self._label_sets.setdefault(key, key)
+
+    def _get_series(self, name: str, labels: Optional[Dict[str, str]]) -> TimeSeries:
+        label_set = self._intern_labels(labels)
+        series = self._series.get((name, label_set))
+        if series is None:
+            series = TimeSeries(name, label_set, self.chunk_size, self.rollup_tiers)
+            self._series[(name, label_set)] = series
+            self._series_by_name.setdefault(name, []).append(series)
+        return series
+
+    def append(
+        self,
+        name: str,
+        value: float,
+        labels: Optional[Dict[str, str]] = None,
+        timestamp: Optional[float] = None
+    ) -> float:
+        """
+        Append a sample
+
+        Args:
+            name: Metric name
+            value: Sample value
+            labels: Label set (interned per series)
+            timestamp: Unix timestamp (default: now); clamped so a series
+                never goes back in time
+
+        Returns:
+            The stored timestamp
+        """
+        series = self._get_series(name, labels)
+        stored = series.append(time.time() if timestamp is None else float(timestamp), float(value))
+        series.drop_before(stored - self.retention_seconds)
+        return stored
+
+    def series(self, name: str, labels: Optional[Dict[str, str]] = None) -> List[TimeSeries]:
+        """Series of a metric, optionally restricted to an exact label set"""
+        if labels is None:
+            return list(self._series_by_name.get(name, ()))
+        series = self._series.get((name, self._intern_labels(labels)))
+        return [series] if series else []
+
+    def names(self) -> List[str]:
+        return list(self._series_by_name)
+
+    def _cutoff(self, start: Optional[float]) -> float:
+        cutoff = time.time() - self.retention_seconds
+        return cutoff if start is None else max(start, cutoff)
+
+    def query(
+        self,
+        name: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        labels: Optional[Dict[str, str]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Range-scan raw samples within the retention period
+
+        Returns:
+            (timestamps, values) arrays sorted by timestamp; samples of
+            several label sets are merged
+        """
+        parts = [s.range(self._cutoff(start), end) for s in self.series(name, labels)]
+        parts = [part for part in parts if len(part[0])]
+        if not parts:
+            return np.empty(0), np.empty(0)
+        if len(parts) == 1:
+            return parts[0]
+        times = np.concatenate([p[0] for p in parts])
+        values = np.concatenate([p[1] for p in parts])
+        order = np.argsort(times, kind='stable')
+        return times[order], values[order]
+
+    def latest(self, name: str) -> Optional[Tuple[float, float, LabelSet]]:
+        """Newest (timestamp, value, labels) across the metric's series"""
+        best = None
+        for series in self._series_by_name.get(name, ()):
+            point = series.latest()
+            if point is not None and (best is None or point[0] >= best[0]):
+                best = (point[0], point[1], series.labels)
+        return best
+
+    def rollups(
+        self,
+        name: str,
+        resolution: float = 60.0,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        labels: Optional[Dict[str, str]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Rollup buckets of a metric at one of the configured resolutions
+
+        Returns:
+            Column arrays 'timestamp' (bucket start), 'count', 'sum',
+            'min', 'max', 'mean'; buckets of several label sets are merged
+        """
+        tier_index = next(
+            (i for i, (res, _) in enumerate(self.rollup_tiers) if res == resolution), None
+        )
+        if tier_index is None:
+            raise ValueError(f"No rollup tier with resolution {resolution}s")
+
+        parts = []
+        for series in self.series(name, labels):
+            tier = series.rollups[tier_index]
+            parts.append(tier.columns(tier.bucket_slice(start, end)))
+        keys = ('timestamp', 'count', 'sum', 'min', 'max')
+        if not parts:
+            merged = {key: np.empty(0) for key in keys}
+        elif len(parts) == 1:
+            merged = {key: parts[0][key] for key in keys}
+        else:
+            stacked = {key: np.concatenate([p[key] for p in parts]) for key in keys}
+            starts, group = np.unique(stacked['timestamp'], return_inverse=True)
+            merged = {'timestamp': starts}
+            for key in ('count', 'sum'):
+                merged[key] = np.bincount(group, weights=stacked[key], minlength=len(starts))
+            merged['min'] = np.full(len(starts), np.inf)
+            np.minimum.at(merged['min'], group, stacked['min'])
+            merged['max'] = np.full(len(starts), -np.inf)
+            np.maximum.at(merged['max'], group, stacked['max'])
+        merged['mean'] = np.divide(
+            merged['sum'], merged['count'],
+            out=np.zeros_like(merged['sum']), where=merged['count'] > 0
+        )
+        return merged
+
+    def summary(self, name: str, since: Optional[float] = None) -> SeriesSummary:
+        """Aggregate statistics of a metric from ``since`` (default: retention start) to now"""
+        cutoff = self._cutoff(since)
+        result = SeriesSummary()
+        for series in self._series_by_name.get(name, ()):
+            part = series.summary(cutoff)
+            if part.count:
+                result.merge_columns(
+                    np.array([float(part.count)]), np.array([part.sum]),
+                    np.array([part.min]), np.array([part.max]), np.array([part.m2]),
+                )
+        return result
+
+    def drop_expired(self, now: Optional[float] = None) -> int:
+        """Drop expired chunks from every series, returning chunks dropped"""
+        cutoff = (time.time() if now is None else now) - self.retention_seconds
+        return sum(series.drop_before(cutoff) for series in self._series.values())
+
+    def get_stats(self) -> Dict[str, int]:
+        """Storage statistics"""
+        samples = sum(series.sample_count for series in self._series.values())
+        return {
+            'series': len(self._series),
+            'label_sets': len(self._label_sets),
+            'samples': samples,
+            'chunks': sum(len(series.chunks) for series in self._series.values()),
+            'memory_bytes': sum(series.memory_bytes() for series in self._series.values()),
+        }
+
+
+__all__ = [
+    'DEFAULT_CHUNK_SIZE',
+    'DEFAULT_ROLLUP_TIERS',
+    'RollupTier',
+    'SeriesChunk',
+    'SeriesSummary',
+    'TimeSeries',
+    'TimeSeriesStore',
+]
@@ -22,6 +22,10 @@ from .circuit_breaker import (
     CircuitBreakerState,
     CircuitBreakerConfig,
     CircuitBreakerRegistry,
+    CircuitStateBackend,
+    InMemoryStateBackend,
+    SQLiteStateBackend,
+    SlidingWindowType,
 )
 
 from .escalation_ladder import (
@@ -68,6 +72,10 @@ __all__ = [
     'CircuitBreakerState',
     'CircuitBreakerConfig',
     'CircuitBreakerRegistry',
+    'CircuitStateBackend',
+    'InMemoryStateBackend',
+    'SQLiteStateBackend',
+    'SlidingWindowType',
     # Escalation Ladder
     'EscalationLadder',
     'EscalationLevel',
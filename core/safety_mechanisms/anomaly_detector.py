@@ -8,11 +8,14 @@ detect anomalies, neutralize risks, and learn from each incident [5]
 """
 
 from enum import Enum, auto
-from typing import Any, Callable, Dict, List, Optional, Tuple
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-import statistics
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass
+from datetime import datetime
 import asyncio
+import math
+import time
+
+import numpy as np
 
 
 class AnomalyType(Enum):
@@ -59,40 +62,158 @@ class AnomalyAlert:
     acknowledged: bool = False
 
 
-@dataclass
 class MetricWindow:
-    """Sliding window of metric values"""
-    values: List[float] = field(default_factory=list)
-    timestamps: List[datetime] = field(default_factory=list)
-    max_size: int = 1000
-    
-    def add(self, value: float, timestamp: Optional[datetime] = None) -> None:
-        """Add a value to the window"""
-        self.values.append(value)
-        self.timestamps.append(timestamp or datetime.now())
+    """
+    Sliding window of metric values
+    
+    Values live in a preallocated NumPy ring buffer alongside monotonic
+    float timestamps (``time.monotonic()``), so adding a sample never
+    copies the window. A running sum and sum of squares (shifted by a
+    reference value for numerical stability) make ``mean`` and
+    ``std_dev`` O(1); they are recomputed exactly from the buffer once
+    per ``max_size`` evictions to stop rounding drift. Timestamps are
+    kept non-decreasing, which lets time-range queries binary-search the
+    two sorted halves of the ring.
+    """
+    
+    def __init__(self, max_size: int = 1000):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self._values = np.zeros(max_size, dtype=np.float64)
+        self._times = np.zeros(max_size, dtype=np.float64)
+        self._next = 0          # Slot the next sample is written to
+        self._count = 0
+        self._shift = 0.0       # Reference value the running sums are taken around
+        self._sum = 0.0         # sum(x - shift)
+        self._sum_sq = 0.0      # sum((x - shift) ** 2)
+        self._evictions = 0
+    
+    def add(self, value: float, timestamp: Optional[Union[float, datetime]] = None) -> None:
+        """
+        Add a value to the window
+        
+        Args:
+            value: Metric value
+            timestamp: ``time.monotonic()`` reading (default: now); a
+                datetime is converted relative to the current wall clock
+        """
+        if timestamp is None:
+            ts = time.monotonic()
+        elif isinstance(timestamp, datetime):
+            ts = time.monotonic() - (datetime.now() - timestamp).total_seconds()
+        else:
+            ts = float(timestamp)
+        if self._count:
+            # Keep the time order sorted for bisect-based queries
+            ts = max(ts, self._times[self._next - 1])
+        
+        value = float(value)
+        if self._count == 0:
+            self._shift = value
+        slot = self._next
+        if self._count == self.max_size:
+            old = self._values[slot] - self._shift
+            self._sum -= old
+            self._sum_sq -= old * old
+            self._evictions += 1
+        else:
+            self._count += 1
+        
+        self._values[slot] = value
+        self._times[slot] = ts
+        self._next = (slot + 1) % self.max_size
+        delta = value - self._shift
+        self._sum += delta
+        self._sum_sq += delta * delta
         
-        # Trim if needed
-        if len(self.values) > self.max_size:
-            self.values = self.values[-self.max_size:]
-            self.timestamps = self.timestamps[-self.max_size:]
+        if self._evictions >= self.max_size:
+            self._resync()
     
-    def get_recent(self, seconds: float) -> List[float]:
+    def _resync(self) -> None:
+        """Recompute the running sums exactly from the buffer"""
+        data = self._ordered(self._values)
+        self._shift = float(data.mean())
+        centered = data - self._shift
+        self._sum = float(centered.sum())
+        self._sum_sq = float(np.dot(centered, centered))
+        self._evictions = 0
+    
+    def _ordered(self, array: np.ndarray) -> np.ndarray:
+        """Return the live part of ``array`` in insertion order"""
+        if self._count < self.max_size:
+            return array[:self._count]
+        return np.concatenate((array[self._next:], array[:self._next]))
+    
+    def _index_since(self, cutoff: float) -> int:
+        """Number of samples (oldest first) with timestamp before ``cutoff``"""
+        if self._count < self.max_size or self._next == 0:
+            return int(np.searchsorted(self._times[:self._count], cutoff, side='left'))
+        older = self._times[self._next:]
+        skipped = int(np.searchsorted(older, cutoff, side='left'))
+        if skipped < len(older):
+            return skipped
+        return len(older) + int(np.searchsorted(self._times[:self._next], cutoff, side='left'))
+    
+    def count_recent(self, seconds: float, now: Optional[float] = None) -> int:
+        """Count values from the last N seconds in O(log n)"""
+        if not self._count:
+            return 0
+        cutoff = (time.monotonic() if now is None else now) - seconds
+        return self._count - self._index_since(cutoff)
+    
+    def get_recent(self, seconds: float, now: Optional[float] = None) -> List[float]:
         """Get values from the last N seconds"""
-        cutoff = datetime.now() - timedelta(seconds=seconds)
-        return [
-            v for v, t in zip(self.values, self.timestamps)
-            if t >= cutoff
-        ]
+        recent = self.count_recent(seconds, now)
+        if not recent:
+            return []
+        return self._ordered(self._values)[-recent:].tolist()
+    
+    @property
+    def values(self) -> List[float]:
+        """Values in insertion order (oldest first)"""
+        return self._ordered(self._values).tolist()
+    
+    @property
+    def timestamps(self) -> List[float]:
+        """Monotonic timestamps in insertion order (oldest first)"""
+        return self._ordered(self._times).tolist()
+    
+    @property
+    def latest(self) -> Optional[float]:
+        """Most recently added value"""
+        return float(self._values[self._next - 1]) if self._count else None
     
     @property
     def mean(self) -> float:
         """Calculate mean of values"""
-        return statistics.mean(self.values) if self.values else 0.0
+        if not self._count:
+            return 0.0
+        return self._shift + self._sum / self._count
+    
+    @property
+    def variance(self) -> float:
+        """Calculate sample variance"""
+        n = self._count
+        if n < 2:
+            return 0.0
+        return max(0.0, (self._sum_sq - self._sum * self._sum / n) / (n - 1))
     
     @property
     def std_dev(self) -> float:
         """Calculate standard deviation"""
-        return statistics.stdev(self.values) if len(self.values) > 1 else 0.0
+        return math.sqrt(self.variance)
+    
+    def min(self) -> Optional[float]:
+        """Smallest value in the window"""
+        return float(self._ordered(self._values).min()) if self._count else None
+    
+    def max(self) -> Optional[float]:
+        """Largest value in the window"""
+        return float(self._ordered(self._values).max()) if self._count else None
+    
+    def __len__(self) -> int:
+        return self._count
 
 
 class AnomalyDetector:
@@ -251,7 +372,7 @@ class AnomalyDetector:
         
         # Statistical check
         if strategy in [DetectionStrategy.STATISTICAL, DetectionStrategy.HYBRID]:
-            if len(window.values) >= 10:
+            if len(window) >= 10:
                 mean = window.mean
                 std_dev = window.std_dev
                 factor = config.get("std_dev_factor", 2.0)
@@ -269,12 +390,12 @@ class AnomalyDetector:
         rate_limit = config.get("rate_limit")
         if rate_limit:
             count, seconds = rate_limit
-            recent = window.get_recent(seconds)
-            if len(recent) > count:
+            recent = window.count_recent(seconds)
+            if recent > count:
                 is_anomaly = True
                 anomaly_type = AnomalyType.RATE_ANOMALY
-                description = f"Rate limit exceeded: {len(recent)} events in {seconds}s (limit: {count})"
-                details["rate_count"] = len(recent)
+                description = f"Rate limit exceeded: {recent} events in {seconds}s (limit: {count})"
+                details["rate_count"] = recent
                 details["rate_limit"] = count
                 details["rate_window"] = seconds
         
@@ -403,14 +524,14 @@ class AnomalyDetector:
         """Get summary of all monitored metrics"""
         summary = {}
         for name, window in self._metrics.items():
-            if window.values:
+            if len(window):
                 summary[name] = {
-                    "count": len(window.values),
+                    "count": len(window),
                     "mean": window.mean,
                     "std_dev": window.std_dev,
-                    "min": min(window.values),
-                    "max": max(window.values),
-                    "latest": window.values[-1] if window.values else None
+                    "min": window.min(),
+                    "max": window.max(),
+                    "latest": window.latest
                 }
         return summary
     
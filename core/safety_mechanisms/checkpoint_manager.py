@@ -6,20 +6,46 @@ functionality with copy-on-write strategy and retention policies.
 
 This module provides checkpoint management for safe state restoration
 in case of failures during execution.
+
+Storage layout:
+    A checkpoint's state is serialized once to canonical JSON and split
+    into one fragment per top-level key. Fragments are content-addressed
+    (SHA-256) and compressed (zstd when available, gzip otherwise), so
+    consecutive checkpoints of an execution only store the keys that
+    changed. With a ``storage_path`` the fragments live in an append-only
+    pack file that is memory-mapped for restores, and checkpoint metadata
+    is appended to an index log that is replayed on startup; without one
+    the compressed fragments are kept in memory.
 """
 
 import gzip
 import hashlib
 import json
 import logging
+import mmap
+import os
+import struct
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
 from typing import Any
 
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
+PACK_FILENAME = "checkpoints.pack"
+INDEX_FILENAME = "checkpoints.idx"
+
+# Pack record header: fragment digest, codec, payload length
+_RECORD_HEADER = struct.Struct(">32scI")
+_CODEC_GZIP = b"g"
+_CODEC_ZSTD = b"z"
+
 
 class CheckpointStatus(Enum):
     """Status of a checkpoint."""
@@ -37,22 +63,245 @@ class Checkpoint:
     execution_id: str
     phase_id: str
     timestamp: datetime
-    state: dict[str, Any]
+    state: dict[str, Any] | None
     status: CheckpointStatus = CheckpointStatus.CREATED
     compressed: bool = False
     compressed_size: int | None = None
     original_size: int = 0
     checksum: str = ""
     metadata: dict[str, Any] = field(default_factory=dict)
-
+    # (key, fragment digest) pairs once the state lives in the fragment store
+    manifest: list[tuple[str, str]] | None = None
+    
     def __post_init__(self):
         """Calculate checksum after initialization."""
-        if not self.checksum:
+        if not self.checksum and self.state is not None:
             state_str = json.dumps(self.state, sort_keys=True)
             self.checksum = hashlib.sha256(state_str.encode()).hexdigest()
             self.original_size = len(state_str.encode())
 
 
+def _serialize_state(state: dict[str, Any]) -> tuple[str, list[tuple[str, str]]]:
+    """
+    Serialize a state to canonical JSON in a single pass.
+    
+    Returns:
+        The canonical document (identical to ``json.dumps(state, sort_keys=True)``)
+        and its ``(key, fragment)`` pairs in key order
+    """
+    if not all(isinstance(key, str) for key in state):
+        # Non-string keys are coerced by json; let it define the order
+        state = json.loads(json.dumps(state))
+    fragments = [
+        (key, json.dumps(state[key], sort_keys=True))
+        for key in sorted(state)
+    ]
+    return _assemble_document(fragments), fragments
+
+
+def _assemble_document(fragments: list[tuple[str, str]]) -> str:
+    """Join ``(key, fragment)`` pairs into a canonical JSON object."""
+    return "{" + ", ".join(f"{json.dumps(key)}: {value}" for key, value in fragments) + "}"
+
+
+class FragmentStore:
+    """
+    Content-addressed, reference-counted store of compressed state fragments.
+    
+    With a ``path`` the fragments are appended to a pack file and read back
+    through ``mmap``; without one the compressed bytes stay in memory.
+    """
+    
+    def __init__(self, path: Path | None = None, compaction_min_bytes: int = 1 << 20):
+        self.path = path
+        self.compaction_min_bytes = compaction_min_bytes
+        self._codec = _CODEC_ZSTD if zstandard is not None else _CODEC_GZIP
+        self._locations: dict[str, tuple[int, int, bytes]] = {}  # digest -> (offset, length, codec)
+        self._memory: dict[str, tuple[bytes, bytes]] = {}        # digest -> (codec, payload)
+        self._refcounts: dict[str, int] = {}
+        self._live_bytes = 0
+        self._dead_bytes = 0
+        self._dedup_hits = 0
+        self._pack = None
+        self._map: mmap.mmap | None = None
+        if path is not None:
+            path.mkdir(parents=True, exist_ok=True)
+            self._load_pack()
+            self._pack = open(self._pack_path, "ab")
+    
+    @property
+    def _pack_path(self) -> Path:
+        return self.path / PACK_FILENAME
+    
+    def _load_pack(self) -> None:
+        """Rebuild fragment locations by scanning the pack file."""
+        if not self._pack_path.exists():
+            return
+        size = self._pack_path.stat().st_size
+        offset = 0
+        if size:
+            with open(self._pack_path, "rb") as pack, \
+                    mmap.mmap(pack.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                while offset + _RECORD_HEADER.size <= size:
+                    digest, codec, length = _RECORD_HEADER.unpack_from(data, offset)
+                    start = offset + _RECORD_HEADER.size
+                    if start + length > size:
+                        break  # Torn write at the tail
+                    self._locations[digest.hex()] = (start, length, codec)
+                    offset = start + length
+        if offset < size:
+            with open(self._pack_path, "r+b") as pack:
+                pack.truncate(offset)
+        # Nothing is referenced until checkpoints are replayed
+        self._dead_bytes = sum(
+            length + _RECORD_HEADER.size for _, length, _ in self._locations.values()
+        )
+    
+    def _compress(self, data: bytes) -> bytes:
+        if self._codec == _CODEC_ZSTD:
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return gzip.compress(data, compresslevel=6)
+    
+    @staticmethod
+    def _decompress(codec: bytes, payload: bytes) -> bytes:
+        if codec == _CODEC_ZSTD:
+            if zstandard is None:
+                raise ValueError("Fragment is zstd-compressed but zstandard is not installed")
+            return zstandard.ZstdDecompressor().decompress(payload)
+        return gzip.decompress(payload)
+    
+    def _record_size(self, digest: str) -> int:
+        if self.path is None:
+            return len(self._memory[digest][1])
+        return self._locations[digest][1] + _RECORD_HEADER.size
+    
+    def payload_size(self, digest: str) -> int:
+        """Compressed size of a fragment."""
+        if self.path is None:
+            return len(self._memory[digest][1])
+        return self._locations[digest][1]
+    
+    def put(self, fragment: str) -> str:
+        """Store a fragment (or add a reference to an identical one) and return its digest."""
+        data = fragment.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        if self._refcounts.get(digest):
+            self._refcounts[digest] += 1
+            self._dedup_hits += 1
+            return digest
+        
+        known = digest in self._memory or digest in self._locations
+        if not known:
+            payload = self._compress(data)
+            if self.path is None:
+                self._memory[digest] = (self._codec, payload)
+            else:
+                offset = self._pack.tell()
+                self._pack.write(_RECORD_HEADER.pack(bytes.fromhex(digest), self._codec, len(payload)))
+                self._pack.write(payload)
+                self._pack.flush()
+                self._locations[digest] = (offset + _RECORD_HEADER.size, len(payload), self._codec)
+        else:
+            # Revived from dead space
+            self._dead_bytes -= self._record_size(digest)
+        self._refcounts[digest] = 1
+        self._live_bytes += self._record_size(digest)
+        return digest
+    
+    def acquire(self, digest: str) -> None:
+        """Add a reference to a stored fragment (used when replaying the index)."""
+        if digest not in self._memory and digest not in self._locations:
+            raise ValueError(f"Unknown checkpoint fragment: {digest}")
+        if not self._refcounts.get(digest):
+            size = self._record_size(digest)
+            self._dead_bytes -= size
+            self._live_bytes += size
+            self._refcounts[digest] = 0
+        self._refcounts[digest] += 1
+    
+    def release(self, digest: str) -> None:
+        """Drop a reference; unreferenced fragments become reclaimable."""
+        count = self._refcounts.get(digest, 0) - 1
+        if count > 0:
+            self._refcounts[digest] = count
+            return
+        self._refcounts.pop(digest, None)
+        size = self._record_size(digest)
+        self._live_bytes -= size
+        if self.path is None:
+            del self._memory[digest]
+        else:
+            self._dead_bytes += size
+    
+    def get(self, digest: str) -> str:
+        """Load and decompress a fragment."""
+        if self.path is None:
+            codec, payload = self._memory[digest]
+            return self._decompress(codec, payload).decode("utf-8")
+        
+        offset, length, codec = self._locations[digest]
+        if self._map is None or offset + length > len(self._map):
+            self._remap()
+        return self._decompress(codec, self._map[offset:offset + length]).decode("utf-8")
+    
+    def _remap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        with open(self._pack_path, "rb") as pack:
+            self._map = mmap.mmap(pack.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def needs_compaction(self) -> bool:
+        return (
+            self.path is not None
+            and self._dead_bytes >= self.compaction_min_bytes
+            and self._dead_bytes > self._live_bytes
+        )
+    
+    def compact(self) -> int:
+        """Rewrite the pack file with live fragments only; returns bytes reclaimed."""
+        if self.path is None or not self._dead_bytes:
+            return 0
+        reclaimed = self._dead_bytes
+        # The map may predate fragments appended since the last restore
+        self._remap()
+        temp_path = self._pack_path.with_suffix(".tmp")
+        locations = {}
+        with open(temp_path, "wb") as out:
+            for digest in self._refcounts:
+                offset, length, codec = self._locations[digest]
+                out.write(_RECORD_HEADER.pack(bytes.fromhex(digest), codec, length))
+                locations[digest] = (out.tell(), length, codec)
+                out.write(self._map[offset:offset + length])
+            out.flush()
+            os.fsync(out.fileno())
+        self._map.close()
+        self._map = None
+        self._pack.close()
+        os.replace(temp_path, self._pack_path)
+        self._pack = open(self._pack_path, "ab")
+        self._locations = locations
+        self._dead_bytes = 0
+        return reclaimed
+    
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": "pack" if self.path is not None else "memory",
+            "codec": "zstd" if self._codec == _CODEC_ZSTD else "gzip",
+            "fragments": len(self._refcounts),
+            "live_bytes": self._live_bytes,
+            "dead_bytes": self._dead_bytes,
+            "dedup_hits": self._dedup_hits,
+        }
+    
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._pack is not None:
+            self._pack.close()
+            self._pack = None
+
+
 class CheckpointManager:
     """
     Manages checkpoint lifecycle including creation, compression, restoration,
@@ -60,7 +309,9 @@ class CheckpointManager:
     
     Features:
     - Copy-on-Write strategy for efficient storage
-    - Automatic compression with gzip
+    - Automatic compression with zstd/gzip into a fragment store
+    - Structural sharing of unchanged top-level keys between checkpoints
+    - Disk-backed storage under ``storage_path``
     - Retention policy (keep last N checkpoints)
     - Checksum verification
     - Automatic cleanup of old checkpoints
@@ -82,13 +333,20 @@ class CheckpointManager:
             compression_enabled: Whether to compress checkpoints automatically
             auto_cleanup: Whether to automatically clean up old checkpoints
         """
-        self.storage_path = storage_path
+        self.storage_path = Path(storage_path) if storage_path is not None else None
         self.retention_count = retention_count
         self.compression_enabled = compression_enabled
         self.auto_cleanup = auto_cleanup
         
-        # In-memory storage
         self._checkpoints: dict[str, list[Checkpoint]] = {}
+        # checkpoint_id -> checkpoint
+        self._index: dict[str, Checkpoint] = {}
+        self._fragments = FragmentStore(self.storage_path)
+        self._index_log = None
+        
+        if self.storage_path is not None:
+            self._replay_index()
+            self._index_log = open(self.storage_path / INDEX_FILENAME, "a", encoding="utf-8")
         
         logger.info(
             "CheckpointManager initialized: storage_path=%s, retention=%d, compression=%s",
@@ -119,16 +377,19 @@ class CheckpointManager:
         """
         checkpoint_id = self._generate_checkpoint_id(execution_id, phase_id)
         
-        # Deep copy state using copy-on-write strategy
-        state_copy = self._copy_on_write(state)
+        # The serialized fragments are the immutable snapshot
+        document, fragments = _serialize_state(state)
+        encoded = document.encode()
         
         checkpoint = Checkpoint(
             checkpoint_id=checkpoint_id,
             execution_id=execution_id,
             phase_id=phase_id,
             timestamp=datetime.utcnow(),
-            state=state_copy,
-            status=CheckpointStatus.CREATED
+            state=None,
+            status=CheckpointStatus.CREATED,
+            original_size=len(encoded),
+            checksum=hashlib.sha256(encoded).hexdigest()
         )
         
         # Store checkpoint
@@ -136,10 +397,12 @@ class CheckpointManager:
             self._checkpoints[execution_id] = []
         
         self._checkpoints[execution_id].append(checkpoint)
+        self._index[checkpoint_id] = checkpoint
         
-        # Compress if enabled
         if self.compression_enabled:
-            self.compress_checkpoint(checkpoint_id)
+            self._store_fragments(checkpoint, fragments)
+        else:
+            checkpoint.state = json.loads(document)
         
         # Auto cleanup if enabled
         if self.auto_cleanup:
@@ -188,12 +451,13 @@ class CheckpointManager:
         if not checkpoint:
             raise ValueError(f"Checkpoint not found: {checkpoint_id}")
         
-        # Decompress if compressed
         if checkpoint.compressed:
-            self._decompress_checkpoint(checkpoint)
+            document = self._load_document(checkpoint)
+        else:
+            document = json.dumps(checkpoint.state, sort_keys=True)
         
         # Verify checksum
-        if not self._verify_checksum(checkpoint):
+        if hashlib.sha256(document.encode()).hexdigest() != checkpoint.checksum:
             raise ValueError(f"Checksum verification failed for checkpoint: {checkpoint_id}")
         
         # Update status
@@ -206,8 +470,8 @@ class CheckpointManager:
             checkpoint.phase_id
         )
         
-        # Return deep copy to prevent modification
-        return self._copy_on_write(checkpoint.state)
+        # Parsing yields a fresh copy that shares nothing with stored state
+        return json.loads(document)
     
     def cleanup_old_checkpoints(
         self,
@@ -245,9 +509,10 @@ class CheckpointManager:
         
         # Mark removed checkpoints as deleted
         for checkpoint in to_remove:
-            checkpoint.status = CheckpointStatus.DELETED
+            self._discard(checkpoint, CheckpointStatus.DELETED)
         
         removed_count = len(to_remove)
+        self._maybe_compact()
         
         logger.info(
             "Cleaned up %d old checkpoints for execution=%s (kept %d)",
@@ -260,7 +525,7 @@ class CheckpointManager:
     
     def compress_checkpoint(self, checkpoint_id: str) -> int:
         """
-        Compress a checkpoint using gzip.
+        Compress a checkpoint into the fragment store.
         
         Args:
             checkpoint_id: Checkpoint identifier
@@ -280,30 +545,10 @@ class CheckpointManager:
             logger.debug("Checkpoint already compressed: %s", checkpoint_id)
             return checkpoint.compressed_size or 0
         
-        # Serialize state
-        state_json = json.dumps(checkpoint.state, sort_keys=True)
-        state_bytes = state_json.encode('utf-8')
-        
-        # Compress
-        compressed_data = gzip.compress(state_bytes, compresslevel=6)
-        compressed_size = len(compressed_data)
-        
-        # Update checkpoint
-        checkpoint.compressed = True
-        checkpoint.compressed_size = compressed_size
-        checkpoint.status = CheckpointStatus.COMPRESSED
-        
-        compression_ratio = (1 - compressed_size / checkpoint.original_size) * 100
+        _, fragments = _serialize_state(checkpoint.state)
+        self._store_fragments(checkpoint, fragments)
         
-        logger.info(
-            "Compressed checkpoint: %s (original=%d bytes, compressed=%d bytes, ratio=%.1f%%)",
-            checkpoint_id,
-            checkpoint.original_size,
-            compressed_size,
-            compression_ratio
-        )
-        
-        return compressed_size
+        return checkpoint.compressed_size or 0
     
     def get_checkpoint_stats(self, execution_id: str) -> dict[str, Any]:
         """
@@ -340,52 +585,182 @@ class CheckpointManager:
             "newest_checkpoint": max(cp.timestamp for cp in checkpoints)
         }
     
-    def _generate_checkpoint_id(self, execution_id: str, phase_id: str) -> str:
-        """Generate a unique checkpoint ID."""
-        timestamp = int(datetime.utcnow().timestamp() * 1000)
-        return f"cp_{execution_id}_{phase_id}_{timestamp}"
+    def get_storage_stats(self) -> dict[str, Any]:
+        """
+        Get statistics about the fragment store.
+        
+        Returns:
+            Dictionary with backend, codec, fragment count, live/dead bytes
+            and the number of fragments shared instead of stored again
+        """
+        stats = self._fragments.stats()
+        stats["checkpoints"] = len(self._index)
+        return stats
     
-    def _copy_on_write(self, state: dict[str, Any]) -> dict[str, Any]:
+    def compact_storage(self) -> int:
         """
-        Implement copy-on-write strategy for state.
+        Rewrite the pack file without unreferenced fragments.
         
-        Creates a deep copy of the state to prevent shared references.
+        Returns:
+            Number of bytes reclaimed
         """
-        return json.loads(json.dumps(state))
+        reclaimed = self._fragments.compact()
+        if reclaimed and self._index_log is not None:
+            self._rewrite_index()
+        return reclaimed
+    
+    def close(self) -> None:
+        """Flush and close storage files."""
+        if self._index_log is not None:
+            self._index_log.close()
+            self._index_log = None
+        self._fragments.close()
+    
+    def _generate_checkpoint_id(self, execution_id: str, phase_id: str) -> str:
+        """Generate a unique checkpoint ID."""
+        timestamp = int(datetime.utcnow().timestamp() * 1000)
+        checkpoint_id = f"cp_{execution_id}_{phase_id}_{timestamp}"
+        suffix = 1
+        while checkpoint_id in self._index:
+            checkpoint_id = f"cp_{execution_id}_{phase_id}_{timestamp}_{suffix}"
+            suffix += 1
+        return checkpoint_id
     
     def _find_checkpoint_by_id(self, checkpoint_id: str) -> Checkpoint | None:
         """Find a checkpoint by its ID across all executions."""
-        for checkpoints in self._checkpoints.values():
-            for checkpoint in checkpoints:
-                if checkpoint.checkpoint_id == checkpoint_id:
-                    return checkpoint
-        return None
+        return self._index.get(checkpoint_id)
     
     def _verify_checksum(self, checkpoint: Checkpoint) -> bool:
         """Verify the checksum of a checkpoint."""
-        state_str = json.dumps(checkpoint.state, sort_keys=True)
+        if checkpoint.compressed:
+            state_str = self._load_document(checkpoint)
+        else:
+            state_str = json.dumps(checkpoint.state, sort_keys=True)
         calculated_checksum = hashlib.sha256(state_str.encode()).hexdigest()
         return calculated_checksum == checkpoint.checksum
     
-    def _decompress_checkpoint(self, checkpoint: Checkpoint) -> None:
-        """
-        Decompress a checkpoint state.
+    def _store_fragments(self, checkpoint: Checkpoint, fragments: list[tuple[str, str]]) -> None:
+        """Move a checkpoint's state into the fragment store."""
+        manifest = [(key, self._fragments.put(fragment)) for key, fragment in fragments]
         
-        In a production implementation with persistent storage, this would:
-        1. Read compressed data from storage
-        2. Decompress using gzip.decompress()
-        3. Deserialize JSON back to state dict
+        checkpoint.manifest = manifest
+        checkpoint.state = None
+        checkpoint.compressed = True
+        checkpoint.compressed_size = sum(
+            self._fragments.payload_size(digest) for _, digest in manifest
+        )
+        checkpoint.status = CheckpointStatus.COMPRESSED
+        self._append_index({"op": "put", **self._index_record(checkpoint)})
         
-        For in-memory storage, state is already decompressed.
-        """
-        # For in-memory storage, state is already available
-        # In production with file storage, implement:
-        # 1. Read compressed file from self.storage_path
-        # 2. compressed_data = read_file(checkpoint_file)
-        # 3. decompressed = gzip.decompress(compressed_data)
-        # 4. checkpoint.state = json.loads(decompressed)
+        compression_ratio = (
+            (1 - checkpoint.compressed_size / checkpoint.original_size) * 100
+            if checkpoint.original_size else 0.0
+        )
+        logger.info(
+            "Compressed checkpoint: %s (original=%d bytes, compressed=%d bytes, ratio=%.1f%%)",
+            checkpoint.checkpoint_id,
+            checkpoint.original_size,
+            checkpoint.compressed_size,
+            compression_ratio
+        )
+    
+    def _load_document(self, checkpoint: Checkpoint) -> str:
+        """Reassemble a compressed checkpoint's canonical JSON document."""
         logger.debug("Decompressing checkpoint: %s", checkpoint.checkpoint_id)
-        checkpoint.compressed = False
+        return _assemble_document([
+            (key, self._fragments.get(digest)) for key, digest in checkpoint.manifest
+        ])
+    
+    def _discard(self, checkpoint: Checkpoint, status: CheckpointStatus) -> None:
+        """Drop a checkpoint from the index and release its fragments."""
+        checkpoint.status = status
+        self._index.pop(checkpoint.checkpoint_id, None)
+        if checkpoint.manifest:
+            for _, digest in checkpoint.manifest:
+                self._fragments.release(digest)
+            self._append_index({"op": "delete", "checkpoint_id": checkpoint.checkpoint_id})
+    
+    def _maybe_compact(self) -> None:
+        if self._fragments.needs_compaction():
+            self.compact_storage()
+    
+    @staticmethod
+    def _index_record(checkpoint: Checkpoint) -> dict[str, Any]:
+        return {
+            "checkpoint_id": checkpoint.checkpoint_id,
+            "execution_id": checkpoint.execution_id,
+            "phase_id": checkpoint.phase_id,
+            "timestamp": checkpoint.timestamp.isoformat(),
+            "compressed_size": checkpoint.compressed_size,
+            "original_size": checkpoint.original_size,
+            "checksum": checkpoint.checksum,
+            "metadata": checkpoint.metadata,
+            "manifest": checkpoint.manifest,
+        }
+    
+    def _append_index(self, record: dict[str, Any]) -> None:
+        if self._index_log is None:
+            return
+        self._index_log.write(json.dumps(record) + "\n")
+        self._index_log.flush()
+    
+    def _rewrite_index(self) -> None:
+        """Rewrite the index log with the live checkpoints only."""
+        index_path = self.storage_path / INDEX_FILENAME
+        temp_path = index_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as out:
+            for checkpoint in self._index.values():
+                if checkpoint.manifest:
+                    out.write(json.dumps({"op": "put", **self._index_record(checkpoint)}) + "\n")
+        self._index_log.close()
+        os.replace(temp_path, index_path)
+        self._index_log = open(index_path, "a", encoding="utf-8")
+    
+    def _replay_index(self) -> None:
+        """Rebuild checkpoints persisted under ``storage_path``."""
+        index_path = self.storage_path / INDEX_FILENAME
+        if not index_path.exists():
+            return
+        
+        records: dict[str, dict[str, Any]] = {}
+        with open(index_path, encoding="utf-8") as log:
+            for line in log:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping corrupt checkpoint index entry")
+                    continue
+                if record.get("op") == "put":
+                    records[record["checkpoint_id"]] = record
+                elif record.get("op") == "delete":
+                    records.pop(record["checkpoint_id"], None)
+        
+        for record in records.values():
+            manifest = [(key, digest) for key, digest in record["manifest"]]
+            try:
+                for _, digest in manifest:
+                    self._fragments.acquire(digest)
+            except ValueError:
+                logger.warning("Checkpoint %s references missing fragments", record["checkpoint_id"])
+                continue
+            checkpoint = Checkpoint(
+                checkpoint_id=record["checkpoint_id"],
+                execution_id=record["execution_id"],
+                phase_id=record["phase_id"],
+                timestamp=datetime.fromisoformat(record["timestamp"]),
+                state=None,
+                status=CheckpointStatus.COMPRESSED,
+                compressed=True,
+                compressed_size=record["compressed_size"],
+                original_size=record["original_size"],
+                checksum=record["checksum"],
+                metadata=record.get("metadata", {}),
+                manifest=manifest
+            )
+            self._checkpoints.setdefault(checkpoint.execution_id, []).append(checkpoint)
+            self._index[checkpoint.checkpoint_id] = checkpoint
+        
+        logger.info("Loaded %d checkpoints from %s", len(records), self.storage_path)
     
     def delete_checkpoint(self, checkpoint_id: str) -> bool:
         """
@@ -397,14 +772,18 @@ class CheckpointManager:
         Returns:
             True if deleted, False if not found
         """
-        for execution_id, checkpoints in self._checkpoints.items():
-            for i, checkpoint in enumerate(checkpoints):
-                if checkpoint.checkpoint_id == checkpoint_id:
-                    checkpoint.status = CheckpointStatus.DELETED
-                    checkpoints.pop(i)
-                    logger.info("Deleted checkpoint: %s", checkpoint_id)
-                    return True
-        return False
+        checkpoint = self._index.get(checkpoint_id)
+        if checkpoint is None:
+            return False
+        
+        checkpoints = self._checkpoints.get(checkpoint.execution_id, [])
+        checkpoints.remove(checkpoint)
+        if not checkpoints:
+            self._checkpoints.pop(checkpoint.execution_id, None)
+        self._discard(checkpoint, CheckpointStatus.DELETED)
+        self._maybe_compact()
+        logger.info("Deleted checkpoint: %s", checkpoint_id)
+        return True
     
     def cleanup_expired_checkpoints(self, max_age_days: int = 7) -> int:
         """
@@ -423,14 +802,16 @@ class CheckpointManager:
             expired = [cp for cp in checkpoints if cp.timestamp < cutoff_time]
             
             for checkpoint in expired:
-                checkpoint.status = CheckpointStatus.EXPIRED
                 checkpoints.remove(checkpoint)
+                self._discard(checkpoint, CheckpointStatus.EXPIRED)
                 removed_count += 1
             
             # Remove empty execution entries
             if not checkpoints:
                 del self._checkpoints[execution_id]
         
+        self._maybe_compact()
+        
         logger.info(
             "Cleaned up %d expired checkpoints (older than %d days)",
             removed_count,
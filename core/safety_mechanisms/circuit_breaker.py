@@ -3,14 +3,26 @@ Circuit Breaker System (斷路器系統)
 
 When anomalies are detected, automatically cut off operations to prevent disaster spread.
 
+Failures and slow calls are accounted in a sliding window (count- or
+time-based) and the breaker opens on failure/slow-call *rates* rather than
+consecutive counts. Breaker state lives in a pluggable backend: in process
+by default, or in a SQLite file so every worker on a host shares one state.
+
 Reference: Circuit breakers trigger automatically when AI executes unauthorized operations [2]
 """
 
+from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, TypeVar, Generic
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Generic
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
+import inspect
+import os
+import sqlite3
+import threading
 import time
 
 
@@ -21,22 +33,33 @@ class CircuitBreakerState(Enum):
     HALF_OPEN = "half_open"  # Testing - allowing limited requests
 
 
+class SlidingWindowType(Enum):
+    """How the failure accounting window is bounded"""
+    COUNT_BASED = "count_based"  # Last N calls
+    TIME_BASED = "time_based"    # Calls in the last monitoring_period seconds
+
+
 @dataclass
 class CircuitBreakerConfig:
     """Configuration for circuit breaker"""
     name: str = "default"
-    failure_threshold: int = 5          # Number of failures before opening
+    failure_threshold: int = 5          # Minimum failures in the window before opening
     success_threshold: int = 2          # Successes needed to close from half-open
     timeout: float = 60.0               # Seconds before trying half-open
     monitoring_period: float = 10.0     # Window for counting failures
     slow_call_threshold: float = 5.0    # Seconds to consider a call "slow"
     slow_call_rate_threshold: float = 0.5  # Rate of slow calls to trigger
     excluded_exceptions: List[type] = field(default_factory=list)
+    failure_rate_threshold: float = 0.5    # Rate of failed calls to trigger
+    sliding_window_type: SlidingWindowType = SlidingWindowType.TIME_BASED
+    sliding_window_size: int = 100      # Calls kept by a count-based window
+    window_buckets: int = 10            # Buckets a time-based window is split into
+    permitted_calls_in_half_open: int = 2  # Concurrent probes while half-open
 
 
 @dataclass
 class CircuitBreakerMetrics:
-    """Metrics for circuit breaker"""
+    """Metrics for circuit breaker (local to this process)"""
     total_calls: int = 0
     successful_calls: int = 0
     failed_calls: int = 0
@@ -48,6 +71,411 @@ class CircuitBreakerMetrics:
     last_state_change: Optional[datetime] = None
 
 
+# ============ Sliding Windows ============
+
+class CountBasedWindow:
+    """
+    Outcomes of the last ``size`` calls
+    
+    Each call occupies one byte of a ring; running totals are kept in a
+    small header so recording and reading are O(1). The whole window
+    serializes to ``32 + size`` bytes.
+    """
+    
+    _RECORDED = 1
+    _FAILED = 2
+    _SLOW = 4
+    
+    def __init__(self, size: int):
+        self.size = max(1, int(size))
+        self._ring = bytearray(self.size)
+        self._header = array('q', [0, 0, 0, 0])  # position, calls, failures, slow
+    
+    def record(self, now: float, failed: bool, slow: bool) -> None:
+        """Record one call outcome, evicting the oldest once full"""
+        header = self._header
+        position = header[0]
+        old = self._ring[position]
+        if old & self._RECORDED:
+            header[1] -= 1
+            header[2] -= bool(old & self._FAILED)
+            header[3] -= bool(old & self._SLOW)
+        
+        code = self._RECORDED
+        if failed:
+            code |= self._FAILED
+        if slow:
+            code |= self._SLOW
+        self._ring[position] = code
+        header[0] = (position + 1) % self.size
+        header[1] += 1
+        header[2] += failed
+        header[3] += slow
+    
+    def totals(self, now: float) -> Tuple[int, int, int]:
+        """Return ``(calls, failures, slow_calls)`` in the window"""
+        return self._header[1], self._header[2], self._header[3]
+    
+    def reset(self) -> None:
+        """Forget every recorded call"""
+        self._ring = bytearray(self.size)
+        self._header = array('q', [0, 0, 0, 0])
+    
+    def dumps(self) -> bytes:
+        """Serialize the window"""
+        return self._header.tobytes() + bytes(self._ring)
+    
+    def loads(self, data: bytes) -> None:
+        """Restore a serialized window; a mismatched size starts empty"""
+        header_size = self._header.itemsize * len(self._header)
+        if len(data) != header_size + self.size:
+            self.reset()
+            return
+        self._header = array('q')
+        self._header.frombytes(data[:header_size])
+        self._ring = bytearray(data[header_size:])
+
+
+class TimeBasedWindow:
+    """
+    Calls within the last ``period`` seconds, aggregated in buckets
+    
+    The period is split into ``buckets`` slots of ``period / buckets``
+    seconds. A slot is recycled lazily when a call lands in a newer epoch,
+    so recording is O(1) and reading is O(buckets).
+    """
+    
+    def __init__(self, period: float, buckets: int):
+        self.buckets = max(1, int(buckets))
+        self.width = max(float(period), 1e-3) / self.buckets
+        self._slots = self._empty()
+    
+    def _empty(self) -> array:
+        # Per bucket: epoch, calls, failures, slow
+        return array('q', [-1, 0, 0, 0] * self.buckets)
+    
+    def _epoch(self, now: float) -> int:
+        return int(now // self.width)
+    
+    def record(self, now: float, failed: bool, slow: bool) -> None:
+        """Record one call outcome in the bucket covering ``now``"""
+        epoch = self._epoch(now)
+        offset = (epoch % self.buckets) * 4
+        slots = self._slots
+        if slots[offset] != epoch:
+            slots[offset] = epoch
+            slots[offset + 1] = 0
+            slots[offset + 2] = 0
+            slots[offset + 3] = 0
+        slots[offset + 1] += 1
+        slots[offset + 2] += failed
+        slots[offset + 3] += slow
+    
+    def totals(self, now: float) -> Tuple[int, int, int]:
+        """Return ``(calls, failures, slow_calls)`` in the window"""
+        current = self._epoch(now)
+        slots = self._slots
+        calls = failures = slow = 0
+        for offset in range(0, len(slots), 4):
+            if 0 <= current - slots[offset] < self.buckets:
+                calls += slots[offset + 1]
+                failures += slots[offset + 2]
+                slow += slots[offset + 3]
+        return calls, failures, slow
+    
+    def reset(self) -> None:
+        """Forget every recorded call"""
+        self._slots = self._empty()
+    
+    def dumps(self) -> bytes:
+        """Serialize the window"""
+        return self._slots.tobytes()
+    
+    def loads(self, data: bytes) -> None:
+        """Restore a serialized window; a mismatched size starts empty"""
+        if len(data) != self._slots.itemsize * len(self._slots):
+            self.reset()
+            return
+        self._slots = array('q')
+        self._slots.frombytes(data)
+
+
+SlidingWindow = Any  # CountBasedWindow or TimeBasedWindow
+
+
+def create_window(config: CircuitBreakerConfig) -> SlidingWindow:
+    """Create the sliding window described by ``config``"""
+    if config.sliding_window_type == SlidingWindowType.COUNT_BASED:
+        return CountBasedWindow(config.sliding_window_size)
+    return TimeBasedWindow(config.monitoring_period, config.window_buckets)
+
+
+# ============ State Backends ============
+
+@dataclass
+class BreakerSnapshot:
+    """
+    Complete state of one breaker as held by a backend
+    
+    ``generation`` increases on every transition, so the result of a call
+    admitted under an older generation can be recognised and dropped.
+    """
+    state: CircuitBreakerState
+    changed_at: float
+    window: SlidingWindow
+    generation: int = 0
+    half_open_in_flight: int = 0
+    half_open_successes: int = 0
+
+
+R = TypeVar('R')
+
+
+class CircuitStateBackend(ABC):
+    """
+    Storage for breaker snapshots
+    
+    ``update`` must apply ``mutate`` to the named snapshot atomically with
+    respect to every other user of the same backend.
+    """
+    
+    @abstractmethod
+    def update(
+        self,
+        name: str,
+        window_factory: Callable[[], SlidingWindow],
+        mutate: Callable[[BreakerSnapshot], R]
+    ) -> R:
+        """Apply ``mutate`` to the named snapshot and return its result"""
+        pass
+    
+    async def update_async(
+        self,
+        name: str,
+        window_factory: Callable[[], SlidingWindow],
+        mutate: Callable[[BreakerSnapshot], R]
+    ) -> R:
+        """
+        ``update`` for callers running on an event loop
+        
+        The default runs ``update`` inline, which suits backends that never
+        block; backends doing I/O override it.
+        """
+        return self.update(name, window_factory, mutate)
+    
+    def read(
+        self,
+        name: str,
+        window_factory: Callable[[], SlidingWindow]
+    ) -> BreakerSnapshot:
+        """Return the named snapshot (callers must not mutate it)"""
+        return self.update(name, window_factory, lambda snapshot: snapshot)
+    
+    def close(self) -> None:
+        """Release backend resources"""
+        pass
+
+
+class InMemoryStateBackend(CircuitStateBackend):
+    """
+    Process-local backend
+    
+    Snapshots are plain objects mutated in place; an update never awaits,
+    so it is atomic within one event loop without any lock.
+    """
+    
+    def __init__(self):
+        self._snapshots: Dict[str, BreakerSnapshot] = {}
+    
+    def update(
+        self,
+        name: str,
+        window_factory: Callable[[], SlidingWindow],
+        mutate: Callable[[BreakerSnapshot], R]
+    ) -> R:
+        snapshot = self._snapshots.get(name)
+        if snapshot is None:
+            snapshot = BreakerSnapshot(
+                state=CircuitBreakerState.CLOSED,
+                changed_at=time.time(),
+                window=window_factory(),
+            )
+            self._snapshots[name] = snapshot
+        return mutate(snapshot)
+
+
+class SQLiteStateBackend(CircuitStateBackend):
+    """
+    Host-wide backend stored in a SQLite file
+    
+    Every worker pointing at the same path sees one state per breaker.
+    Updates run in ``BEGIN IMMEDIATE`` transactions, which serialize
+    writers across processes; the window travels as a single BLOB so an
+    update is one SELECT and one write. Connections are kept per thread
+    and re-opened after a fork.
+    
+    Blocking: an update waits up to ``busy_timeout`` seconds for the
+    database write lock held by other processes. ``update_async`` (used by
+    ``CircuitBreaker.execute``) therefore runs updates on a single writer
+    thread owned by the backend, so lock waits never stall the event loop.
+    The synchronous entry points run on the calling thread: reads
+    (``state``, ``get_stats``) do not wait for writers under WAL, but
+    ``reset`` and ``trip`` may block for up to ``busy_timeout``.
+    
+    Example:
+        registry = CircuitBreakerRegistry(SQLiteStateBackend("/run/app/breakers.db"))
+    """
+    
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = str(path)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._writer_lock = threading.Lock()
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._writer_pid = 0
+        with self._connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS circuit_breakers (
+                    name TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    changed_at REAL NOT NULL,
+                    generation INTEGER NOT NULL,
+                    half_open_in_flight INTEGER NOT NULL,
+                    half_open_successes INTEGER NOT NULL,
+                    window BLOB NOT NULL
+                )
+                """
+            )
+    
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    @staticmethod
+    def _load(
+        row: Optional[tuple],
+        window_factory: Callable[[], SlidingWindow]
+    ) -> BreakerSnapshot:
+        window = window_factory()
+        if row is None:
+            return BreakerSnapshot(
+                state=CircuitBreakerState.CLOSED,
+                changed_at=time.time(),
+                window=window,
+            )
+        window.loads(row[5])
+        return BreakerSnapshot(
+            state=CircuitBreakerState(row[0]),
+            changed_at=row[1],
+            window=window,
+            generation=row[2],
+            half_open_in_flight=row[3],
+            half_open_successes=row[4],
+        )
+    
+    _SELECT = (
+        "SELECT state, changed_at, generation, half_open_in_flight, "
+        "half_open_successes, window FROM circuit_breakers WHERE name = ?"
+    )
+    
+    def update(
+        self,
+        name: str,
+        window_factory: Callable[[], SlidingWindow],
+        mutate: Callable[[BreakerSnapshot], R]
+    ) -> R:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(self._SELECT, (name,)).fetchone()
+            snapshot = self._load(row, window_factory)
+            result = mutate(snapshot)
+            conn.execute(
+                "INSERT OR REPLACE INTO circuit_breakers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    name,
+                    snapshot.state.value,
+                    snapshot.changed_at,
+                    snapshot.generation,
+                    snapshot.half_open_in_flight,
+                    snapshot.half_open_successes,
+                    snapshot.window.dumps(),
+                ),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+    
+    def _writer_thread(self) -> ThreadPoolExecutor:
+        with self._writer_lock:
+            if self._writer is None or self._writer_pid != os.getpid():
+                self._writer = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="circuit-state"
+                )
+                self._writer_pid = os.getpid()
+            return self._writer
+    
+    async def update_async(
+        self,
+        name: str,
+        window_factory: Callable[[], SlidingWindow],
+        mutate: Callable[[BreakerSnapshot], R]
+    ) -> R:
+        """Run ``update`` on the writer thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._writer_thread(), self.update, name, window_factory, mutate
+        )
+    
+    def read(
+        self,
+        name: str,
+        window_factory: Callable[[], SlidingWindow]
+    ) -> BreakerSnapshot:
+        row = self._connection().execute(self._SELECT, (name,)).fetchone()
+        return self._load(row, window_factory)
+    
+    def _close_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+    
+    def close(self) -> None:
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None and self._writer_pid == os.getpid():
+            writer.submit(self._close_connection).result()
+            writer.shutdown()
+        self._close_connection()
+
+
+# ============ Circuit Breaker ============
+
+@dataclass
+class _Permit:
+    """Admission decision for one call"""
+    allowed: bool
+    generation: int
+    probe: bool = False
+
+
+Transition = Tuple[CircuitBreakerState, CircuitBreakerState]
+
 T = TypeVar('T')
 
 
@@ -61,28 +489,46 @@ class CircuitBreaker(Generic[T]):
     States:
     - CLOSED: Normal operation, requests flow through
     - OPEN: Tripped, all requests are blocked
-    - HALF_OPEN: Testing recovery, limited requests allowed
+    - HALF_OPEN: Testing recovery, at most ``permitted_calls_in_half_open``
+      concurrent probes are admitted
+    
+    The breaker opens once the sliding window holds at least
+    ``failure_threshold`` failed (or slow) calls and their rate reaches
+    ``failure_rate_threshold`` (or ``slow_call_rate_threshold``). No lock
+    is held while the operation runs; admission and result accounting are
+    each one atomic backend update.
     
     Example:
         breaker = CircuitBreaker(CircuitBreakerConfig(name="database"))
         result = await breaker.execute(lambda: db.query("SELECT * FROM users"))
     """
     
-    def __init__(self, config: Optional[CircuitBreakerConfig] = None):
+    def __init__(
+        self,
+        config: Optional[CircuitBreakerConfig] = None,
+        backend: Optional[CircuitStateBackend] = None
+    ):
         self.config = config or CircuitBreakerConfig()
-        self._state = CircuitBreakerState.CLOSED
-        self._failure_count = 0
-        self._success_count = 0
-        self._last_failure_time: Optional[float] = None
-        self._last_state_change_time = time.time()
+        self._backend = backend or InMemoryStateBackend()
         self._metrics = CircuitBreakerMetrics()
         self._listeners: List[Callable[[CircuitBreakerState, CircuitBreakerState], None]] = []
-        self._lock = asyncio.Lock()
+    
+    def _new_window(self) -> SlidingWindow:
+        return create_window(self.config)
+    
+    def _snapshot(self) -> BreakerSnapshot:
+        return self._backend.read(self.config.name, self._new_window)
+    
+    def _update(self, mutate: Callable[[BreakerSnapshot], R]) -> R:
+        return self._backend.update(self.config.name, self._new_window, mutate)
+    
+    async def _update_async(self, mutate: Callable[[BreakerSnapshot], R]) -> R:
+        return await self._backend.update_async(self.config.name, self._new_window, mutate)
     
     @property
     def state(self) -> CircuitBreakerState:
         """Get current state"""
-        return self._state
+        return self._snapshot().state
     
     @property
     def metrics(self) -> CircuitBreakerMetrics:
@@ -92,28 +538,28 @@ class CircuitBreaker(Generic[T]):
     @property
     def is_closed(self) -> bool:
         """Check if circuit is closed (normal operation)"""
-        return self._state == CircuitBreakerState.CLOSED
+        return self.state == CircuitBreakerState.CLOSED
     
     @property
     def is_open(self) -> bool:
         """Check if circuit is open (blocking)"""
-        return self._state == CircuitBreakerState.OPEN
+        return self.state == CircuitBreakerState.OPEN
     
     @property
     def is_half_open(self) -> bool:
         """Check if circuit is half-open (testing)"""
-        return self._state == CircuitBreakerState.HALF_OPEN
+        return self.state == CircuitBreakerState.HALF_OPEN
     
     def add_state_change_listener(
-        self, 
+        self,
         listener: Callable[[CircuitBreakerState, CircuitBreakerState], None]
     ) -> None:
         """Add listener for state changes"""
         self._listeners.append(listener)
     
     def _notify_state_change(
-        self, 
-        old_state: CircuitBreakerState, 
+        self,
+        old_state: CircuitBreakerState,
         new_state: CircuitBreakerState
     ) -> None:
         """Notify listeners of state change"""
@@ -123,66 +569,125 @@ class CircuitBreaker(Generic[T]):
             except Exception:
                 pass  # Don't let listener errors affect circuit breaker
     
-    def _transition_to(self, new_state: CircuitBreakerState) -> None:
-        """Transition to a new state"""
-        if self._state != new_state:
-            old_state = self._state
-            self._state = new_state
-            self._last_state_change_time = time.time()
-            self._metrics.state_changes += 1
-            self._metrics.last_state_change = datetime.now()
-            
-            # Reset counters on state change
-            if new_state == CircuitBreakerState.HALF_OPEN:
-                self._success_count = 0
-            elif new_state == CircuitBreakerState.CLOSED:
-                self._failure_count = 0
-            
-            self._notify_state_change(old_state, new_state)
-    
-    def _should_attempt_reset(self) -> bool:
-        """Check if we should try to reset from OPEN to HALF_OPEN"""
-        if self._state != CircuitBreakerState.OPEN:
+    def _apply_transition(self, transition: Optional[Transition]) -> None:
+        """Account for a transition made by this process"""
+        if transition is None:
+            return
+        self._metrics.state_changes += 1
+        self._metrics.last_state_change = datetime.now()
+        self._notify_state_change(*transition)
+    
+    @staticmethod
+    def _move(
+        snapshot: BreakerSnapshot,
+        new_state: CircuitBreakerState,
+        now: float
+    ) -> Optional[Transition]:
+        """Move a snapshot to a new state, starting a new generation"""
+        old_state = snapshot.state
+        if old_state == new_state:
+            return None
+        snapshot.state = new_state
+        snapshot.changed_at = now
+        snapshot.generation += 1
+        snapshot.half_open_in_flight = 0
+        snapshot.half_open_successes = 0
+        if new_state == CircuitBreakerState.CLOSED:
+            snapshot.window.reset()
+        return old_state, new_state
+    
+    def _should_trip(self, snapshot: BreakerSnapshot, now: float) -> bool:
+        """Check the window against the failure and slow-call rates"""
+        calls, failures, slow = snapshot.window.totals(now)
+        if not calls:
             return False
-        
-        time_since_open = time.time() - self._last_state_change_time
-        return time_since_open >= self.config.timeout
+        if (failures >= self.config.failure_threshold
+                and failures / calls >= self.config.failure_rate_threshold):
+            return True
+        return (slow >= self.config.failure_threshold
+                and slow / calls >= self.config.slow_call_rate_threshold)
     
-    def _record_success(self) -> None:
-        """Record a successful call"""
-        self._metrics.successful_calls += 1
-        self._metrics.last_success_time = datetime.now()
+    def _acquire(
+        self,
+        snapshot: BreakerSnapshot,
+        now: float
+    ) -> Tuple[_Permit, Optional[Transition]]:
+        """Decide whether a call may proceed"""
+        transition = None
+        elapsed = now - snapshot.changed_at
+        if snapshot.state == CircuitBreakerState.OPEN and elapsed >= self.config.timeout:
+            transition = self._move(snapshot, CircuitBreakerState.HALF_OPEN, now)
+        elif (snapshot.state == CircuitBreakerState.HALF_OPEN
+                and snapshot.half_open_in_flight
+                and elapsed >= self.config.timeout):
+            # Probes never reported back (hung or their worker died):
+            # start a fresh probing round instead of staying wedged.
+            snapshot.changed_at = now
+            snapshot.generation += 1
+            snapshot.half_open_in_flight = 0
+            snapshot.half_open_successes = 0
         
-        if self._state == CircuitBreakerState.HALF_OPEN:
-            self._success_count += 1
-            if self._success_count >= self.config.success_threshold:
-                self._transition_to(CircuitBreakerState.CLOSED)
-    
-    def _record_failure(self, exception: Exception) -> None:
-        """Record a failed call"""
-        # Check if exception is excluded
-        if any(isinstance(exception, exc) for exc in self.config.excluded_exceptions):
-            return
+        if snapshot.state == CircuitBreakerState.OPEN:
+            return _Permit(False, snapshot.generation), transition
         
-        self._metrics.failed_calls += 1
-        self._metrics.last_failure_time = datetime.now()
-        self._last_failure_time = time.time()
+        if snapshot.state == CircuitBreakerState.HALF_OPEN:
+            if snapshot.half_open_in_flight >= self.config.permitted_calls_in_half_open:
+                return _Permit(False, snapshot.generation), transition
+            snapshot.half_open_in_flight += 1
+            return _Permit(True, snapshot.generation, probe=True), transition
         
-        if self._state == CircuitBreakerState.HALF_OPEN:
-            # Any failure in half-open goes back to open
-            self._transition_to(CircuitBreakerState.OPEN)
-        elif self._state == CircuitBreakerState.CLOSED:
-            self._failure_count += 1
-            if self._failure_count >= self.config.failure_threshold:
-                self._transition_to(CircuitBreakerState.OPEN)
-    
-    def _record_slow_call(self, duration: float) -> None:
-        """Record a slow call"""
-        if duration >= self.config.slow_call_threshold:
-            self._metrics.slow_calls += 1
+        return _Permit(True, snapshot.generation), transition
+    
+    def _complete(
+        self,
+        snapshot: BreakerSnapshot,
+        permit: _Permit,
+        now: float,
+        failed: bool,
+        slow: bool,
+        ignored: bool
+    ) -> Optional[Transition]:
+        """Account for a finished call"""
+        if permit.generation != snapshot.generation:
+            return None  # The breaker moved on while the call was running
+        
+        if permit.probe:
+            snapshot.half_open_in_flight = max(0, snapshot.half_open_in_flight - 1)
+            if ignored:
+                return None
+            if failed:
+                # Any failure in half-open goes back to open
+                return self._move(snapshot, CircuitBreakerState.OPEN, now)
+            snapshot.half_open_successes += 1
+            if snapshot.half_open_successes >= self.config.success_threshold:
+                return self._move(snapshot, CircuitBreakerState.CLOSED, now)
+            return None
+        
+        if ignored:
+            return None
+        snapshot.window.record(now, failed, slow)
+        if self._should_trip(snapshot, now):
+            return self._move(snapshot, CircuitBreakerState.OPEN, now)
+        return None
+    
+    async def _finish(
+        self,
+        permit: _Permit,
+        failed: bool = False,
+        slow: bool = False,
+        ignored: bool = False
+    ) -> None:
+        now = time.time()
+        transition = await self._update_async(
+            lambda snapshot: self._complete(snapshot, permit, now, failed, slow, ignored)
+        )
+        self._apply_transition(transition)
+    
+    def _is_excluded(self, exception: BaseException) -> bool:
+        return any(isinstance(exception, exc) for exc in self.config.excluded_exceptions)
     
     async def execute(
-        self, 
+        self,
         operation: Callable[[], T],
         fallback: Optional[Callable[[], T]] = None
     ) -> T:
@@ -192,65 +697,101 @@ class CircuitBreaker(Generic[T]):
         Args:
             operation: The operation to execute
             fallback: Optional fallback function if circuit is open
-            
+        
         Returns:
             Result of the operation or fallback
-            
+        
         Raises:
             CircuitBreakerOpenError: If circuit is open and no fallback provided
         """
-        async with self._lock:
-            self._metrics.total_calls += 1
-            
-            # Check if we should try to reset
-            if self._should_attempt_reset():
-                self._transition_to(CircuitBreakerState.HALF_OPEN)
-            
-            # If open, reject or use fallback
-            if self._state == CircuitBreakerState.OPEN:
-                self._metrics.rejected_calls += 1
-                if fallback:
-                    return fallback()
-                raise CircuitBreakerOpenError(
-                    f"Circuit breaker '{self.config.name}' is OPEN"
-                )
-            
-            # Execute the operation
-            start_time = time.time()
-            try:
-                if asyncio.iscoroutinefunction(operation):
-                    result = await operation()
-                else:
-                    result = operation()
-                
-                duration = time.time() - start_time
-                self._record_slow_call(duration)
-                self._record_success()
-                return result
-                
-            except Exception as e:
-                self._record_failure(e)
-                if fallback:
-                    return fallback()
-                raise
+        self._metrics.total_calls += 1
+        now = time.time()
+        permit, transition = await self._update_async(
+            lambda snapshot: self._acquire(snapshot, now)
+        )
+        self._apply_transition(transition)
+        
+        # If open (or half-open with every probe slot taken), reject or use fallback
+        if not permit.allowed:
+            self._metrics.rejected_calls += 1
+            if fallback:
+                return fallback()
+            raise CircuitBreakerOpenError(
+                f"Circuit breaker '{self.config.name}' is OPEN"
+            )
+        
+        # Execute the operation
+        start_time = time.monotonic()
+        try:
+            if asyncio.iscoroutinefunction(operation):
+                result = await operation()
+            else:
+                result = operation()
+                if inspect.isawaitable(result):
+                    result = await result
+        except Exception as e:
+            if self._is_excluded(e):
+                await self._finish(permit, ignored=True)
+            else:
+                slow = time.monotonic() - start_time >= self.config.slow_call_threshold
+                self._metrics.failed_calls += 1
+                self._metrics.last_failure_time = datetime.now()
+                if slow:
+                    self._metrics.slow_calls += 1
+                await self._finish(permit, failed=True, slow=slow)
+            if fallback:
+                return fallback()
+            raise
+        except BaseException:
+            # Cancelled: give the probe slot back without judging the dependency
+            await self._finish(permit, ignored=True)
+            raise
+        
+        slow = time.monotonic() - start_time >= self.config.slow_call_threshold
+        self._metrics.successful_calls += 1
+        self._metrics.last_success_time = datetime.now()
+        if slow:
+            self._metrics.slow_calls += 1
+        await self._finish(permit, slow=slow)
+        return result
+    
+    def _force(self, new_state: CircuitBreakerState) -> None:
+        now = time.time()
+        
+        def mutate(snapshot: BreakerSnapshot) -> Optional[Transition]:
+            transition = self._move(snapshot, new_state, now)
+            if new_state == CircuitBreakerState.CLOSED:
+                snapshot.window.reset()
+            return transition
+        
+        self._apply_transition(self._update(mutate))
     
     def reset(self) -> None:
         """Manually reset the circuit breaker to CLOSED state"""
-        self._transition_to(CircuitBreakerState.CLOSED)
-        self._failure_count = 0
-        self._success_count = 0
+        self._force(CircuitBreakerState.CLOSED)
     
     def trip(self) -> None:
         """Manually trip the circuit breaker to OPEN state"""
-        self._transition_to(CircuitBreakerState.OPEN)
+        self._force(CircuitBreakerState.OPEN)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get circuit breaker statistics"""
+        snapshot = self._snapshot()
+        calls, failures, slow = snapshot.window.totals(time.time())
         return {
             "name": self.config.name,
-            "state": self._state.value,
-            "failure_count": self._failure_count,
-            "success_count": self._success_count,
+            "state": snapshot.state.value,
+            "failure_count": failures,
+            "success_count": snapshot.half_open_successes,
+            "half_open_in_flight": snapshot.half_open_in_flight,
+            "window": {
+                "type": self.config.sliding_window_type.value,
+                "calls": calls,
+                "failed_calls": failures,
+                "slow_calls": slow,
+                "failure_rate": failures / calls if calls else 0.0,
+                "slow_call_rate": slow / calls if calls else 0.0,
+            },
             "metrics": {
                 "total_calls": self._metrics.total_calls,
                 "successful_calls": self._metrics.successful_calls,
@@ -271,18 +812,28 @@ class CircuitBreakerRegistry:
     """
     Registry for managing multiple circuit breakers
     
+    All breakers share the registry's state backend; pass a
+    ``SQLiteStateBackend`` so every worker process on the host trips
+    and recovers together.
+    
     Example:
         registry = CircuitBreakerRegistry()
         registry.register("database", CircuitBreakerConfig(failure_threshold=3))
         await registry.execute("database", lambda: db.query(...))
     """
     
-    def __init__(self):
+    def __init__(self, backend: Optional[CircuitStateBackend] = None):
+        self._backend = backend or InMemoryStateBackend()
         self._breakers: Dict[str, CircuitBreaker] = {}
     
+    @property
+    def backend(self) -> CircuitStateBackend:
+        """State backend shared by the registered breakers"""
+        return self._backend
+    
     def register(
-        self, 
-        name: str, 
+        self,
+        name: str,
         config: Optional[CircuitBreakerConfig] = None
     ) -> CircuitBreaker:
         """Register a new circuit breaker"""
@@ -291,7 +842,7 @@ class CircuitBreakerRegistry:
         else:
             config.name = name
         
-        breaker = CircuitBreaker(config)
+        breaker = CircuitBreaker(config, self._backend)
         self._breakers[name] = breaker
         return breaker
     
@@ -300,8 +851,8 @@ class CircuitBreakerRegistry:
         return self._breakers.get(name)
     
     def get_or_create(
-        self, 
-        name: str, 
+        self,
+        name: str,
         config: Optional[CircuitBreakerConfig] = None
     ) -> CircuitBreaker:
         """Get existing or create new circuit breaker"""
@@ -310,8 +861,8 @@ class CircuitBreakerRegistry:
         return self._breakers[name]
     
     async def execute(
-        self, 
-        name: str, 
+        self,
+        name: str,
         operation: Callable[[], T],
         fallback: Optional[Callable[[], T]] = None
     ) -> T:
@@ -332,3 +883,7 @@ class CircuitBreakerRegistry:
         """Trip all circuit breakers (emergency stop)"""
         for breaker in self._breakers.values():
             breaker.trip()
+    
+    def close(self) -> None:
+        """Release the state backend"""
+        self._backend.close()
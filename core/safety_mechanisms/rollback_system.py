@@ -5,15 +5,22 @@ Support safe rollback strategies for recovering from errors.
 
 Reference: Strategies supporting safe rollback are particularly important,
 allowing institutions to revert changes like files, databases, configurations [4]
+
+Snapshots are stored as a base plus a chain of structural diffs, so keeping
+many snapshots of a large state costs roughly one copy per chain rather than
+one copy per snapshot. Payloads can optionally spill to an append-only file.
 """
 
 from enum import Enum, auto
-from typing import Any, Callable, Dict, List, Optional, TypeVar
-from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+from dataclasses import dataclass, field, replace
 from datetime import datetime
+from pathlib import Path
 import json
 import asyncio
 import copy
+import os
+import pickle
 
 
 class SnapshotType(Enum):
@@ -66,6 +73,330 @@ class Snapshot:
         )
 
 
+# ============ Structural Diffs ============
+
+def diff_state(old: Any, new: Any) -> List[Dict[str, Any]]:
+    """
+    Structural diff turning ``old`` into ``new``
+    
+    Returns JSON-patch-like operations whose paths are lists of dict keys
+    and list indices: ``add``/``replace``/``remove`` address a member,
+    ``extend``/``truncate`` address a list whose tail grew or shrank.
+    """
+    ops: List[Dict[str, Any]] = []
+    _diff_into(old, new, [], ops)
+    return ops
+
+
+def _diff_into(old: Any, new: Any, path: List[Any], ops: List[Dict[str, Any]]) -> None:
+    if old is new:
+        return
+    
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            if key in old:
+                _diff_into(old[key], value, path + [key], ops)
+            else:
+                ops.append({"op": "add", "path": path + [key], "value": value})
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": path + [key]})
+        return
+    
+    if isinstance(old, list) and isinstance(new, list):
+        list_ops: List[Dict[str, Any]] = []
+        for index in range(min(len(old), len(new))):
+            _diff_into(old[index], new[index], path + [index], list_ops)
+        if len(new) > len(old):
+            list_ops.append({"op": "extend", "path": path, "value": new[len(old):]})
+        elif len(new) < len(old):
+            list_ops.append({"op": "truncate", "path": path, "length": len(new)})
+        # Shifted lists diff element by element; past half the list a
+        # plain replacement is smaller and cheaper to apply.
+        if len(list_ops) <= len(new) // 2 + 1:
+            ops.extend(list_ops)
+            return
+        ops.append({"op": "replace", "path": path, "value": new})
+        return
+    
+    if type(old) is type(new) and old == new:
+        return
+    ops.append({"op": "replace", "path": path, "value": new})
+
+
+def apply_diff(state: Any, ops: List[Dict[str, Any]]) -> Any:
+    """
+    Apply ``diff_state`` operations to ``state`` in place
+    
+    Returns the resulting state (a new object only when the root itself
+    was replaced). Inserted values are copied, so the result never aliases
+    the diff.
+    """
+    for op in ops:
+        kind = op["op"]
+        path = op["path"]
+        
+        if kind in ("extend", "truncate"):
+            target = state
+            for key in path:
+                target = target[key]
+            if kind == "extend":
+                target.extend(copy.deepcopy(op["value"]))
+            else:
+                del target[op["length"]:]
+            continue
+        
+        if not path:
+            state = copy.deepcopy(op["value"])
+            continue
+        
+        parent = state
+        for key in path[:-1]:
+            parent = parent[key]
+        if kind == "remove":
+            del parent[path[-1]]
+        else:
+            parent[path[-1]] = copy.deepcopy(op["value"])
+    return state
+
+
+# ============ Snapshot Store ============
+
+@dataclass
+class _StoredSnapshot:
+    """Snapshot metadata plus where its data lives"""
+    snapshot: Snapshot  # data left empty; materialized on demand
+    components: List[str]
+    base_id: Optional[str]  # Snapshot this entry diffs against (None: full base)
+    depth: int  # Upper bound on diffs replayed to materialize this entry
+    payload: Any = None  # Base data or diff ops when held in memory
+    offset: int = -1  # Position in the spill file when spilled
+    length: int = 0
+
+
+class SnapshotStore:
+    """
+    Snapshot data stored as bases plus chains of structural diffs
+    
+    Each snapshot diffs against the one stored before it; once a chain
+    reaches ``max_chain_length`` diffs the next snapshot is stored in full,
+    so materializing any snapshot replays at most that many diffs. Removing
+    a snapshot re-bases its successor onto the removed snapshot's base.
+    
+    With ``spill_path``, payloads are pickled to an append-only scratch
+    file (truncated on open) and only metadata plus the newest state stay
+    in memory. Superseded payloads become dead bytes; the file is rewritten
+    once they outweigh the live ones.
+    """
+    
+    def __init__(
+        self,
+        max_chain_length: int = 10,
+        spill_path: Optional[Union[str, Path]] = None,
+        compaction_min_bytes: int = 1 << 20
+    ):
+        self.max_chain_length = max(0, max_chain_length)
+        self.compaction_min_bytes = compaction_min_bytes
+        self._entries: Dict[str, _StoredSnapshot] = {}
+        self._order: List[str] = []
+        self._tip_data: Optional[Dict[str, Any]] = None
+        
+        self._spill_path = Path(spill_path) if spill_path is not None else None
+        self._spill_file = None
+        self._live_bytes = 0
+        self._dead_bytes = 0
+        if self._spill_path is not None:
+            self._spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self._spill_file = open(self._spill_path, "w+b")
+    
+    def __len__(self) -> int:
+        return len(self._order)
+    
+    def __contains__(self, snapshot_id: object) -> bool:
+        return snapshot_id in self._entries
+    
+    def ids(self) -> List[str]:
+        """Snapshot ids, oldest first"""
+        return list(self._order)
+    
+    @property
+    def tip_data(self) -> Optional[Dict[str, Any]]:
+        """Data of the newest snapshot (shared; do not mutate)"""
+        return self._tip_data
+    
+    def _store_payload(self, entry: _StoredSnapshot, payload: Any) -> None:
+        if self._spill_file is None:
+            entry.payload = payload
+            return
+        encoded = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        self._spill_file.seek(0, os.SEEK_END)
+        entry.offset = self._spill_file.tell()
+        entry.length = len(encoded)
+        self._spill_file.write(encoded)
+        self._live_bytes += entry.length
+    
+    def _load_payload(self, entry: _StoredSnapshot) -> Any:
+        if entry.offset < 0:
+            return entry.payload
+        self._spill_file.seek(entry.offset)
+        return pickle.loads(self._spill_file.read(entry.length))
+    
+    def _release_payload(self, entry: _StoredSnapshot) -> None:
+        if entry.offset >= 0:
+            self._live_bytes -= entry.length
+            self._dead_bytes += entry.length
+        entry.payload = None
+        entry.offset = -1
+        entry.length = 0
+    
+    def _set_data(
+        self,
+        entry: _StoredSnapshot,
+        data: Dict[str, Any],
+        base_id: Optional[str],
+        base_data: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """(Re)store an entry's data as a base or as a diff against ``base_id``"""
+        self._release_payload(entry)
+        if base_id is None:
+            entry.base_id = None
+            entry.depth = 0
+            self._store_payload(entry, data)
+        else:
+            entry.base_id = base_id
+            entry.depth = self._entries[base_id].depth + 1
+            self._store_payload(entry, diff_state(base_data, data))
+    
+    def add(self, snapshot: Snapshot) -> None:
+        """Store a snapshot; its data is copied"""
+        data = copy.deepcopy(snapshot.data)
+        entry = _StoredSnapshot(
+            snapshot=replace(snapshot, data={}),
+            components=list(data.keys()),
+            base_id=None,
+            depth=0
+        )
+        
+        tip_id = self._order[-1] if self._order else None
+        if tip_id is not None and self._entries[tip_id].depth < self.max_chain_length:
+            self._set_data(entry, data, tip_id, self._tip_data)
+        else:
+            self._set_data(entry, data, None)
+        
+        self._entries[snapshot.id] = entry
+        self._order.append(snapshot.id)
+        self._tip_data = data
+    
+    def materialize(self, snapshot_id: str) -> Dict[str, Any]:
+        """Reconstruct a snapshot's data (a fresh copy the caller may mutate)"""
+        if self._order and snapshot_id == self._order[-1]:
+            return copy.deepcopy(self._tip_data)
+        
+        entry = self._entries[snapshot_id]
+        chain: List[_StoredSnapshot] = []
+        while entry.base_id is not None:
+            chain.append(entry)
+            entry = self._entries[entry.base_id]
+        
+        state = copy.deepcopy(self._load_payload(entry))
+        for diff_entry in reversed(chain):
+            state = apply_diff(state, self._load_payload(diff_entry))
+        return state
+    
+    def get(self, snapshot_id: str) -> Optional[Snapshot]:
+        """Get a snapshot with its data materialized"""
+        entry = self._entries.get(snapshot_id)
+        if entry is None:
+            return None
+        return replace(entry.snapshot, data=self.materialize(snapshot_id))
+    
+    def components(self, snapshot_id: str) -> List[str]:
+        """Components captured by a snapshot, without materializing it"""
+        return list(self._entries[snapshot_id].components)
+    
+    def metadata(self, snapshot_id: str) -> Snapshot:
+        """Snapshot metadata with empty data"""
+        return self._entries[snapshot_id].snapshot
+    
+    def remove(self, snapshot_id: str) -> None:
+        """Remove a snapshot, re-basing the one stored after it"""
+        index = self._order.index(snapshot_id)
+        entry = self._entries[snapshot_id]
+        
+        if index + 1 < len(self._order):
+            successor = self._entries[self._order[index + 1]]
+            if successor.base_id == snapshot_id:
+                successor_data = self.materialize(self._order[index + 1])
+                base_data = (
+                    self.materialize(entry.base_id) if entry.base_id is not None else None
+                )
+                self._set_data(successor, successor_data, entry.base_id, base_data)
+        elif index > 0:
+            self._tip_data = self.materialize(self._order[index - 1])
+        else:
+            self._tip_data = None
+        
+        self._release_payload(entry)
+        del self._entries[snapshot_id]
+        del self._order[index]
+        self._maybe_compact()
+    
+    def clear(self) -> None:
+        """Remove every snapshot"""
+        self._entries.clear()
+        self._order.clear()
+        self._tip_data = None
+        if self._spill_file is not None:
+            self._spill_file.seek(0)
+            self._spill_file.truncate()
+        self._live_bytes = 0
+        self._dead_bytes = 0
+    
+    def _maybe_compact(self) -> None:
+        if (self._dead_bytes >= self.compaction_min_bytes
+                and self._dead_bytes > self._live_bytes):
+            self.compact()
+    
+    def compact(self) -> int:
+        """Rewrite the spill file without dead payloads; returns bytes reclaimed"""
+        if self._spill_file is None or not self._dead_bytes:
+            return 0
+        
+        reclaimed = self._dead_bytes
+        temp_path = self._spill_path.with_name(self._spill_path.name + ".tmp")
+        with open(temp_path, "wb") as temp:
+            for snapshot_id in self._order:
+                entry = self._entries[snapshot_id]
+                self._spill_file.seek(entry.offset)
+                encoded = self._spill_file.read(entry.length)
+                entry.offset = temp.tell()
+                temp.write(encoded)
+        self._spill_file.close()
+        os.replace(temp_path, self._spill_path)
+        self._spill_file = open(self._spill_path, "r+b")
+        self._dead_bytes = 0
+        return reclaimed
+    
+    def stats(self) -> Dict[str, Any]:
+        """Storage statistics"""
+        bases = sum(1 for entry in self._entries.values() if entry.base_id is None)
+        return {
+            "snapshots": len(self._order),
+            "bases": bases,
+            "diffs": len(self._order) - bases,
+            "max_chain_length": self.max_chain_length,
+            "spilled": self._spill_file is not None,
+            "spill_live_bytes": self._live_bytes,
+            "spill_dead_bytes": self._dead_bytes,
+        }
+    
+    def close(self) -> None:
+        """Close the spill file"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+
 @dataclass
 class RollbackResult:
     """Result of a rollback operation"""
@@ -87,6 +418,7 @@ class RollbackSystem:
     
     Features:
     - Multiple snapshot types (full, incremental, selective)
+    - Diff-chained snapshot storage with optional disk spill
     - Multiple rollback strategies
     - Component-level restoration
     - Compensating transactions
@@ -101,9 +433,13 @@ class RollbackSystem:
             await rollback.rollback(snapshot_id)
     """
     
-    def __init__(self, max_snapshots: int = 100):
-        self._snapshots: Dict[str, Snapshot] = {}
-        self._snapshot_order: List[str] = []
+    def __init__(
+        self,
+        max_snapshots: int = 100,
+        max_chain_length: int = 10,
+        spill_path: Optional[Union[str, Path]] = None
+    ):
+        self._store = SnapshotStore(max_chain_length, spill_path)
         self._max_snapshots = max_snapshots
         self._component_handlers: Dict[str, ComponentHandler] = {}
         self._listeners: List[Callable[[RollbackResult], None]] = []
@@ -173,14 +509,14 @@ class RollbackSystem:
                     state = handler.save()
                     if asyncio.iscoroutine(state):
                         state = await state
-                    data[name] = copy.deepcopy(state)
+                    data[name] = state  # Copied once by the store
                 except Exception as e:
                     data[name] = {"error": str(e)}
         
         # Get parent for incremental
         parent_id = None
-        if snapshot_type == SnapshotType.INCREMENTAL and self._snapshot_order:
-            parent_id = self._snapshot_order[-1]
+        if snapshot_type == SnapshotType.INCREMENTAL and len(self._store):
+            parent_id = self._store.ids()[-1]
         
         # Create snapshot
         snapshot = Snapshot(
@@ -193,11 +529,10 @@ class RollbackSystem:
         )
         
         # Store snapshot
-        self._snapshots[snapshot_id] = snapshot
-        self._snapshot_order.append(snapshot_id)
+        self._store.add(snapshot)
         
-        # Update current state
-        self._current_state = copy.deepcopy(data)
+        # Update current state (the store's copy is never mutated in place)
+        self._current_state = self._store.tip_data
         
         # Cleanup old snapshots
         await self._cleanup_old_snapshots()
@@ -224,7 +559,7 @@ class RollbackSystem:
         import time
         start_time = time.time()
         
-        if snapshot_id not in self._snapshots:
+        if snapshot_id not in self._store:
             return RollbackResult(
                 success=False,
                 snapshot_id=snapshot_id,
@@ -234,7 +569,7 @@ class RollbackSystem:
                 errors=[f"Snapshot {snapshot_id} not found"]
             )
         
-        snapshot = self._snapshots[snapshot_id]
+        snapshot = self._store.get(snapshot_id)
         errors: List[str] = []
         restored: List[str] = []
         
@@ -247,7 +582,7 @@ class RollbackSystem:
         if strategy == RollbackStrategy.FULL:
             restored, errors = await self._rollback_full(snapshot, data_keys)
         elif strategy == RollbackStrategy.INCREMENTAL:
-            restored, errors = await self._rollback_incremental(snapshot_id, data_keys)
+            restored, errors = await self._rollback_incremental(snapshot, data_keys)
         elif strategy == RollbackStrategy.SELECTIVE:
             restored, errors = await self._rollback_selective(snapshot, data_keys)
         elif strategy == RollbackStrategy.COMPENSATING:
@@ -304,42 +639,43 @@ class RollbackSystem:
     
     async def _rollback_incremental(
         self, 
-        target_snapshot_id: str, 
+        snapshot: Snapshot, 
         components: set
     ) -> tuple:
-        """Incremental rollback - reverse changes one by one"""
+        """
+        Incremental rollback - restore components back to the snapshot
+        
+        Components with a handler are always restored: the live component
+        may have drifted since the last snapshot, so matching recorded
+        state does not prove it is already at the target. The diff against
+        the recorded state only lets unchanged components without a handler
+        skip the copy.
+        """
         restored = []
         errors = []
+        changed = []
         
-        # Find path from current to target
-        current_idx = len(self._snapshot_order) - 1
-        target_idx = self._snapshot_order.index(target_snapshot_id)
-        
-        # Roll back through each intermediate snapshot
-        for idx in range(current_idx, target_idx, -1):
-            snap_id = self._snapshot_order[idx]
-            snapshot = self._snapshots[snap_id]
+        for name in components:
+            target = snapshot.data[name]
+            if name not in self._component_handlers:
+                restored.append(name)
+                if self._current_state.get(name) != target:
+                    changed.append(name)
+                continue
             
-            # Apply reverse changes
-            for name in components.intersection(snapshot.data.keys()):
-                if name in self._component_handlers:
-                    handler = self._component_handlers[name]
-                    try:
-                        # Get previous state
-                        if snapshot.parent_id and snapshot.parent_id in self._snapshots:
-                            prev_state = self._snapshots[snapshot.parent_id].data.get(name)
-                        else:
-                            prev_state = snapshot.data.get(name)
-                        
-                        result = handler.restore(prev_state)
-                        if asyncio.iscoroutine(result):
-                            await result
-                        
-                        if name not in restored:
-                            restored.append(name)
-                    except Exception as e:
-                        errors.append(f"{name}: {str(e)}")
+            handler = self._component_handlers[name]
+            try:
+                result = handler.restore(target)
+                if asyncio.iscoroutine(result):
+                    await result
+                restored.append(name)
+                changed.append(name)
+            except Exception as e:
+                errors.append(f"{name}: {str(e)}")
         
+        self._current_state = {**self._current_state, **copy.deepcopy({
+            name: snapshot.data[name] for name in changed
+        })}
         return restored, errors
     
     async def _rollback_selective(
@@ -367,7 +703,7 @@ class RollbackSystem:
                 handler = self._component_handlers[name]
                 if handler.compensate:
                     try:
-                        current = self._current_state.get(name, {})
+                        current = copy.deepcopy(self._current_state.get(name, {}))
                         target = snapshot.data[name]
                         result = handler.compensate(current, target)
                         if asyncio.iscoroutine(result):
@@ -389,36 +725,44 @@ class RollbackSystem:
     
     async def _cleanup_old_snapshots(self) -> None:
         """Remove old snapshots beyond max limit"""
-        while len(self._snapshot_order) > self._max_snapshots:
-            old_id = self._snapshot_order.pop(0)
-            del self._snapshots[old_id]
+        while len(self._store) > self._max_snapshots:
+            self._store.remove(self._store.ids()[0])
     
     def get_snapshot(self, snapshot_id: str) -> Optional[Snapshot]:
-        """Get a snapshot by ID"""
-        return self._snapshots.get(snapshot_id)
+        """Get a snapshot by ID (data is reconstructed from the diff chain)"""
+        return self._store.get(snapshot_id)
     
     def list_snapshots(self) -> List[Dict[str, Any]]:
         """List all snapshots"""
-        return [
-            {
+        snapshots = []
+        for snapshot_id in self._store.ids():
+            s = self._store.metadata(snapshot_id)
+            snapshots.append({
                 "id": s.id,
                 "type": s.type.value,
                 "timestamp": s.timestamp.isoformat(),
-                "components": list(s.data.keys())
-            }
-            for s in [self._snapshots[sid] for sid in self._snapshot_order]
-        ]
+                "components": self._store.components(snapshot_id)
+            })
+        return snapshots
     
     def get_latest_snapshot(self) -> Optional[Snapshot]:
         """Get the most recent snapshot"""
-        if not self._snapshot_order:
+        ids = self._store.ids()
+        if not ids:
             return None
-        return self._snapshots[self._snapshot_order[-1]]
+        return self._store.get(ids[-1])
+    
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """Get snapshot storage statistics"""
+        return self._store.stats()
     
     def clear_history(self) -> None:
         """Clear all snapshots"""
-        self._snapshots.clear()
-        self._snapshot_order.clear()
+        self._store.clear()
+    
+    def close(self) -> None:
+        """Release the snapshot spill file"""
+        self._store.close()
 
 
 @dataclass
@@ -3,15 +3,24 @@ Safety Net System (多層安全網)
 
 Multi-layer safety net providing defense in depth.
 
+Layers run in order; checks within a layer run concurrently with per-check
+timeouts, and verdicts of pure checks are cached by payload content hash.
+
 Reference: Three-layer architecture with human-in-the-loop oversight,
 machine learning safety net, and automatic safeguards [9]
 """
 
 from enum import Enum, auto
-from typing import Any, Callable, Dict, List, Optional, TypeVar
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
 from dataclasses import dataclass, field
 from datetime import datetime
+from collections import OrderedDict, deque
+from itertools import islice
 import asyncio
+import hashlib
+import inspect
+import json
+import time
 
 
 class SafetyLayer(Enum):
@@ -35,6 +44,8 @@ class SafetyCheck:
     enabled: bool = True
     blocking: bool = True  # If True, failure blocks the operation
     priority: int = 0
+    timeout: Optional[float] = None  # Seconds for async checks (None: config default)
+    pure: bool = False  # Verdict depends only on the payload and may be cached
 
 
 @dataclass
@@ -46,6 +57,7 @@ class SafetyCheckResult:
     timestamp: datetime
     details: Dict[str, Any] = field(default_factory=dict)
     error: Optional[str] = None
+    blocking: bool = True
 
 
 @dataclass
@@ -56,6 +68,53 @@ class SafetyNetConfig:
     require_all_layers: bool = False  # Require checks in all layers
     log_all_checks: bool = True
     max_retries: int = 0
+    check_timeout: float = 5.0  # Default per-check timeout for async checks
+    cache_ttl: float = 60.0  # Seconds a pure check verdict stays valid (0 disables)
+    cache_size: int = 1024  # Maximum cached verdicts
+    history_size: int = 1000  # Validation runs kept for get_recent_results
+
+
+@dataclass
+class CheckLatency:
+    """Per-check execution accounting"""
+    calls: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    cache_hits: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    
+    def record(self, duration: float, passed: bool) -> None:
+        self.calls += 1
+        self.total_time += duration
+        if duration > self.max_time:
+            self.max_time = duration
+        if not passed:
+            self.failures += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "cache_hits": self.cache_hits,
+            "avg_ms": self.total_time / self.calls * 1000 if self.calls else 0.0,
+            "max_ms": self.max_time * 1000,
+        }
+
+
+def payload_digest(data: Any) -> Optional[str]:
+    """
+    Content hash of a payload for verdict caching
+    
+    Only canonical-JSON-encodable payloads are hashed; anything else
+    returns None and is never served from the cache.
+    """
+    try:
+        encoded = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
 
 
 T = TypeVar('T')
@@ -91,9 +150,13 @@ class SafetyNet:
         self._checks: Dict[SafetyLayer, List[SafetyCheck]] = {
             layer: [] for layer in SafetyLayer
         }
-        self._results_history: List[List[SafetyCheckResult]] = []
+        self._results_history: Deque[List[SafetyCheckResult]] = deque(
+            maxlen=self.config.history_size
+        )
         self._blocked_count = 0
         self._passed_count = 0
+        self._verdict_cache: "OrderedDict[Tuple[str, str], Tuple[bool, float]]" = OrderedDict()
+        self._latency: Dict[str, CheckLatency] = {}
         
         # Register default checks
         self._register_default_checks()
@@ -133,6 +196,7 @@ class SafetyNet:
         self._checks[check.layer].append(check)
         # Sort by priority within layer
         self._checks[check.layer].sort(key=lambda c: c.priority)
+        self.clear_cache()
     
     def remove_check(self, name: str) -> bool:
         """Remove a safety check by name"""
@@ -140,6 +204,7 @@ class SafetyNet:
             for check in layer_checks:
                 if check.name == name:
                     layer_checks.remove(check)
+                    self.clear_cache()
                     return True
         return False
     
@@ -161,6 +226,33 @@ class SafetyNet:
                     return True
         return False
     
+    def clear_cache(self) -> None:
+        """Drop every cached verdict"""
+        self._verdict_cache.clear()
+    
+    def _cached_verdict(self, key: Tuple[str, str]) -> Optional[bool]:
+        entry = self._verdict_cache.get(key)
+        if entry is None:
+            return None
+        passed, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._verdict_cache[key]
+            return None
+        self._verdict_cache.move_to_end(key)
+        return passed
+    
+    def _store_verdict(self, key: Tuple[str, str], passed: bool) -> None:
+        self._verdict_cache[key] = (passed, time.monotonic() + self.config.cache_ttl)
+        self._verdict_cache.move_to_end(key)
+        while len(self._verdict_cache) > self.config.cache_size:
+            self._verdict_cache.popitem(last=False)
+    
+    def _latency_for(self, name: str) -> CheckLatency:
+        latency = self._latency.get(name)
+        if latency is None:
+            latency = self._latency[name] = CheckLatency()
+        return latency
+    
     async def validate(self, data: Any) -> List[SafetyCheckResult]:
         """
         Run all safety checks on data
@@ -172,26 +264,30 @@ class SafetyNet:
             List of SafetyCheckResult for all checks
         """
         results: List[SafetyCheckResult] = []
+        digest: Optional[str] = None
+        if self.config.cache_ttl > 0 and any(
+            check.pure and check.enabled
+            for layer_checks in self._checks.values()
+            for check in layer_checks
+        ):
+            digest = payload_digest(data)
         
         # Process each layer in order
         for layer in SafetyLayer:
-            layer_results = await self._run_layer_checks(layer, data)
+            layer_results = await self._run_layer_checks(layer, data, digest)
             results.extend(layer_results)
             
-            # Check for blocking failures
-            if self.config.fail_fast:
-                blocking_failures = [
-                    r for r in layer_results 
-                    if not r.passed and self._is_blocking(r.check_name)
-                ]
-                if blocking_failures:
-                    break
+            # Blocking failures short-circuit the remaining layers
+            if self.config.fail_fast and any(
+                not r.passed and r.blocking for r in layer_results
+            ):
+                break
         
         # Store results
         self._results_history.append(results)
         
         # Update counters
-        all_passed = all(r.passed for r in results if self._is_blocking(r.check_name))
+        all_passed = all(r.passed for r in results if r.blocking)
         if all_passed:
             self._passed_count += 1
         else:
@@ -202,60 +298,138 @@ class SafetyNet:
     async def _run_layer_checks(
         self, 
         layer: SafetyLayer, 
-        data: Any
+        data: Any,
+        digest: Optional[str] = None
     ) -> List[SafetyCheckResult]:
-        """Run all checks for a specific layer"""
-        results: List[SafetyCheckResult] = []
+        """
+        Run all checks for a specific layer
+        
+        Checks start in priority order. Synchronous checks complete inline
+        (cheap predicates would pay more for a thread hop than they cost);
+        checks returning awaitables run concurrently, each bounded by its
+        timeout. With fail_fast, a blocking failure cancels whatever is
+        still pending in the layer. Results keep priority order.
+        """
+        slots: List[Optional[SafetyCheckResult]] = []
+        pending: Dict["asyncio.Task[SafetyCheckResult]", int] = {}
+        stop = False
         
         for check in self._checks[layer]:
             if not check.enabled:
                 continue
             
-            try:
-                passed = check.check_function(data)
-                if asyncio.iscoroutine(passed):
-                    passed = await passed
-                
-                result = SafetyCheckResult(
-                    check_name=check.name,
-                    layer=layer,
-                    passed=passed,
-                    timestamp=datetime.now()
-                )
-                
-                if not passed and check.on_failure:
-                    try:
-                        if asyncio.iscoroutinefunction(check.on_failure):
-                            await check.on_failure(data)
-                        else:
-                            check.on_failure(data)
-                    except Exception:
-                        pass
-                
-            except Exception as e:
-                result = SafetyCheckResult(
-                    check_name=check.name,
-                    layer=layer,
-                    passed=False,
-                    timestamp=datetime.now(),
-                    error=str(e)
-                )
+            key = (check.name, digest) if check.pure and digest is not None else None
+            cached = self._cached_verdict(key) if key is not None else None
+            if cached is not None:
+                self._latency_for(check.name).cache_hits += 1
+                result = self._make_result(check, cached, details={"cached": True})
+                if not cached:
+                    await self._on_failure(check, data)
+            else:
+                start_time = time.perf_counter()
+                try:
+                    outcome = check.check_function(data)
+                except Exception as e:
+                    result = self._finish_check(check, start_time, False, key, error=str(e))
+                else:
+                    if inspect.isawaitable(outcome):
+                        task = asyncio.ensure_future(
+                            self._await_check(check, outcome, start_time, key, data)
+                        )
+                        pending[task] = len(slots)
+                        slots.append(None)
+                        continue
+                    result = self._finish_check(check, start_time, bool(outcome), key)
+                    if not result.passed:
+                        await self._on_failure(check, data)
             
-            results.append(result)
+            slots.append(result)
             
             # Fail fast if blocking check fails
             if self.config.fail_fast and not result.passed and check.blocking:
+                stop = True
                 break
         
-        return results
+        while pending and not stop:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                slots[pending.pop(task)] = result
+                if self.config.fail_fast and not result.passed and result.blocking:
+                    stop = True
+        
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        return [result for result in slots if result is not None]
     
-    def _is_blocking(self, check_name: str) -> bool:
-        """Check if a check is blocking"""
-        for layer_checks in self._checks.values():
-            for check in layer_checks:
-                if check.name == check_name:
-                    return check.blocking
-        return True
+    def _make_result(
+        self,
+        check: SafetyCheck,
+        passed: bool,
+        error: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None
+    ) -> SafetyCheckResult:
+        return SafetyCheckResult(
+            check_name=check.name,
+            layer=check.layer,
+            passed=passed,
+            timestamp=datetime.now(),
+            details=details or {},
+            error=error,
+            blocking=check.blocking
+        )
+    
+    def _finish_check(
+        self,
+        check: SafetyCheck,
+        start_time: float,
+        passed: bool,
+        key: Optional[Tuple[str, str]],
+        error: Optional[str] = None
+    ) -> SafetyCheckResult:
+        """Account latency and cache the verdict of a completed check"""
+        self._latency_for(check.name).record(time.perf_counter() - start_time, passed)
+        if key is not None and error is None:
+            self._store_verdict(key, passed)
+        return self._make_result(check, passed, error=error)
+    
+    async def _await_check(
+        self,
+        check: SafetyCheck,
+        outcome: Awaitable[Any],
+        start_time: float,
+        key: Optional[Tuple[str, str]],
+        data: Any
+    ) -> SafetyCheckResult:
+        timeout = check.timeout if check.timeout is not None else self.config.check_timeout
+        try:
+            passed = bool(await asyncio.wait_for(outcome, timeout))
+        except asyncio.TimeoutError:
+            self._latency_for(check.name).timeouts += 1
+            result = self._finish_check(
+                check, start_time, False, key, error=f"Timed out after {timeout}s"
+            )
+        except Exception as e:
+            result = self._finish_check(check, start_time, False, key, error=str(e))
+        else:
+            result = self._finish_check(check, start_time, passed, key)
+            if not passed:
+                await self._on_failure(check, data)
+        return result
+    
+    async def _on_failure(self, check: SafetyCheck, data: Any) -> None:
+        if not check.on_failure:
+            return
+        try:
+            if asyncio.iscoroutinefunction(check.on_failure):
+                await check.on_failure(data)
+            else:
+                check.on_failure(data)
+        except Exception:
+            pass
     
     async def execute(
         self, 
@@ -279,7 +453,7 @@ class SafetyNet:
         results = await self.validate(data)
         
         # Check for failures
-        failures = [r for r in results if not r.passed and self._is_blocking(r.check_name)]
+        failures = [r for r in results if not r.passed and r.blocking]
         
         if failures:
             raise SafetyCheckError(
@@ -315,12 +489,17 @@ class SafetyNet:
             "checks_by_layer": {
                 layer.name: len([c for c in self._checks[layer] if c.enabled])
                 for layer in SafetyLayer
+            },
+            "cached_verdicts": len(self._verdict_cache),
+            "check_latency": {
+                name: latency.to_dict() for name, latency in self._latency.items()
             }
         }
     
     def get_recent_results(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent validation results"""
-        recent = self._results_history[-limit:]
+        history = self._results_history
+        recent = islice(history, max(0, len(history) - limit), None)
         return [
             {
                 "timestamp": results[0].timestamp.isoformat() if results else None,
@@ -73,6 +73,11 @@ from .cognitive_processor import (
     ProofLayer,
     create_cognitive_processor
 )
+from .streaming_detectors import (
+    StreamingDetectorBank,
+    StreamingDetectorConfig,
+    StreamingScores,
+)
 from .configuration_optimizer import (
     ConfigurationOptimizer,
     OptimizerConfig,
@@ -144,6 +149,9 @@ __all__ = [
     'ExecutionLayer',
     'ProofLayer',
     'create_cognitive_processor',
+    'StreamingDetectorBank',
+    'StreamingDetectorConfig',
+    'StreamingScores',
     
     # Configuration Optimizer (NEW)
     'ConfigurationOptimizer',
@@ -22,13 +22,18 @@ Design Principles:
 """
 
 import asyncio
+import itertools
 import logging
+import time
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Tuple
 from uuid import uuid4
 
+from .streaming_detectors import StreamingDetectorBank, StreamingDetectorConfig
+
 logger = logging.getLogger(__name__)
 
 
@@ -166,6 +171,16 @@ class ProcessorConfig:
     processing_timeout_seconds: int = 30
     auto_decision_threshold: float = 0.85
     require_approval_threshold: float = 0.6
+    # Batching mode: drain up to batch_max_size signals or batch_max_wait_ms,
+    # then shard by session over worker_count workers (per-session order kept)
+    enable_batching: bool = False
+    batch_max_size: int = 64
+    batch_max_wait_ms: float = 10.0
+    worker_count: int = 4
+    latency_sample_size: int = 1024
+    # Built-in NumPy streaming detectors in the perception layer
+    enable_streaming_detectors: bool = False
+    streaming_detector_config: Optional[StreamingDetectorConfig] = None
 
 
 class PerceptionLayer:
@@ -176,6 +191,11 @@ class PerceptionLayer:
     - 遙測收集 (Telemetry collection)
     - 異常偵測 (Anomaly detection)
     - 時序漂移識別 (Time series drift detection)
+    
+    Besides user-registered detectors, the layer can run built-in streaming
+    detectors (``enable_streaming_detectors``) that score numeric telemetry
+    per metric key with vectorized z-score/MAD outlier and CUSUM/Page-Hinkley
+    drift statistics.
     """
     
     def __init__(self):
@@ -183,6 +203,11 @@ class PerceptionLayer:
         self._anomaly_detectors: List[Callable] = []
         self._drift_detectors: List[Callable] = []
         self._baselines: Dict[str, Any] = {}
+        self._streaming: Optional[StreamingDetectorBank] = None
+        
+        # Cheap unique IDs for generated signals
+        self._signal_prefix = uuid4().hex[:4]
+        self._signal_seq = itertools.count()
         
         # Statistics
         self._stats = {
@@ -223,8 +248,119 @@ class PerceptionLayer:
             self._stats['drifts_detected'] += len(drifts)
             output_signals.extend(drifts)
         
+        if self._streaming is not None:
+            self._run_streaming_detectors([signal], [output_signals])
+        
         return output_signals
     
+    async def process_batch(
+        self,
+        signals: List[CognitiveSignal],
+        contexts: List[CognitiveContext]
+    ) -> List[List[CognitiveSignal]]:
+        """
+        Process a batch of signals through the perception layer
+        
+        Each detector is resolved once and run over the whole batch, instead
+        of re-dispatching every detector for every signal.
+        
+        Args:
+            signals: Input signals
+            contexts: Processing context for each signal (aligned with signals)
+            
+        Returns:
+            Generated signals for each input signal (aligned with signals)
+        """
+        self._stats['signals_processed'] += len(signals)
+        outputs = [[signal] for signal in signals]
+        
+        anomaly_count = 0
+        for detector in self._anomaly_detectors:
+            is_async = asyncio.iscoroutinefunction(detector)
+            for index, (signal, context) in enumerate(zip(signals, contexts)):
+                try:
+                    result = await detector(signal, context) if is_async else detector(signal, context)
+                    if result:
+                        outputs[index].append(self._build_anomaly_signal(signal, result))
+                        anomaly_count += 1
+                except Exception as e:
+                    logger.warning(f"Anomaly detector error: {e}")
+        
+        drift_count = 0
+        for detector in self._drift_detectors:
+            is_async = asyncio.iscoroutinefunction(detector)
+            for index, (signal, context) in enumerate(zip(signals, contexts)):
+                try:
+                    if is_async:
+                        result = await detector(signal, context, self._baselines)
+                    else:
+                        result = detector(signal, context, self._baselines)
+                    if result:
+                        outputs[index].append(self._build_drift_signal(signal, result))
+                        drift_count += 1
+                except Exception as e:
+                    logger.warning(f"Drift detector error: {e}")
+        
+        self._stats['anomalies_detected'] += anomaly_count
+        self._stats['drifts_detected'] += drift_count
+        
+        if self._streaming is not None:
+            self._run_streaming_detectors(signals, outputs)
+        
+        return outputs
+    
+    def _run_streaming_detectors(
+        self,
+        signals: List[CognitiveSignal],
+        outputs: List[List[CognitiveSignal]]
+    ) -> None:
+        """Score numeric telemetry with the built-in detectors in one call"""
+        cfg = self._streaming.config
+        positions: List[int] = []
+        keys: List[str] = []
+        values: List[float] = []
+        for index, signal in enumerate(signals):
+            key = signal.payload.get(cfg.metric_field)
+            value = signal.payload.get(cfg.value_field)
+            if key is None or isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            positions.append(index)
+            keys.append(str(key))
+            values.append(float(value))
+        
+        if not keys:
+            return
+        
+        scores = self._streaming.score_batch(keys, values)
+        for hit in scores.anomalies.nonzero()[0].tolist():
+            z_score = float(scores.z_scores[hit])
+            mad_score = float(scores.mad_scores[hit])
+            outlier_type = 'zscore_outlier' if abs(z_score) > cfg.z_threshold else 'mad_outlier'
+            outputs[positions[hit]].append(self._build_anomaly_signal(signals[positions[hit]], {
+                'type': outlier_type,
+                'severity': 'high' if max(abs(z_score), abs(mad_score)) > 2 * cfg.z_threshold else 'medium',
+                'details': {
+                    'metric': keys[hit],
+                    'value': values[hit],
+                    'z_score': z_score,
+                    'mad_score': mad_score,
+                    'ewma': float(scores.ewma[hit])
+                },
+                'confidence': 0.8
+            }))
+            self._stats['anomalies_detected'] += 1
+        
+        for hit in scores.drifts.nonzero()[0].tolist():
+            state = self._streaming.get_state(keys[hit])
+            outputs[positions[hit]].append(self._build_drift_signal(signals[positions[hit]], {
+                'type': scores.drift_kinds[hit],
+                'magnitude': float(scores.ewma[hit]) - state['mean'],
+                'baseline': state['mean'],
+                'current': values[hit],
+                'confidence': 0.7
+            }))
+            self._stats['drifts_detected'] += 1
+    
     async def _detect_anomalies(
         self,
         signal: CognitiveSignal,
@@ -241,20 +377,7 @@ class PerceptionLayer:
                     result = detector(signal, context)
                 
                 if result:
-                    anomaly_signal = CognitiveSignal(
-                        signal_id=f"anomaly-{uuid4().hex[:8]}",
-                        signal_type=SignalType.ANOMALY,
-                        layer=CognitiveLayer.L1_PERCEPTION,
-                        source='perception-layer',
-                        payload={
-                            'original_signal': signal.signal_id,
-                            'anomaly_type': result.get('type', 'unknown'),
-                            'severity': result.get('severity', 'medium'),
-                            'details': result.get('details', {})
-                        },
-                        confidence=result.get('confidence', 0.7)
-                    )
-                    anomalies.append(anomaly_signal)
+                    anomalies.append(self._build_anomaly_signal(signal, result))
             except Exception as e:
                 logger.warning(f"Anomaly detector error: {e}")
         
@@ -276,26 +399,53 @@ class PerceptionLayer:
                     result = detector(signal, context, self._baselines)
                 
                 if result:
-                    drift_signal = CognitiveSignal(
-                        signal_id=f"drift-{uuid4().hex[:8]}",
-                        signal_type=SignalType.DRIFT,
-                        layer=CognitiveLayer.L1_PERCEPTION,
-                        source='perception-layer',
-                        payload={
-                            'original_signal': signal.signal_id,
-                            'drift_type': result.get('type', 'unknown'),
-                            'magnitude': result.get('magnitude', 0.0),
-                            'baseline': result.get('baseline'),
-                            'current': result.get('current')
-                        },
-                        confidence=result.get('confidence', 0.6)
-                    )
-                    drifts.append(drift_signal)
+                    drifts.append(self._build_drift_signal(signal, result))
             except Exception as e:
                 logger.warning(f"Drift detector error: {e}")
         
         return drifts
     
+    def _build_anomaly_signal(
+        self,
+        signal: CognitiveSignal,
+        result: Dict[str, Any]
+    ) -> CognitiveSignal:
+        """Build an anomaly signal from a detector result"""
+        return CognitiveSignal(
+            signal_id=f"anomaly-{self._signal_prefix}{next(self._signal_seq):04x}",
+            signal_type=SignalType.ANOMALY,
+            layer=CognitiveLayer.L1_PERCEPTION,
+            source='perception-layer',
+            payload={
+                'original_signal': signal.signal_id,
+                'anomaly_type': result.get('type', 'unknown'),
+                'severity': result.get('severity', 'medium'),
+                'details': result.get('details', {})
+            },
+            confidence=result.get('confidence', 0.7)
+        )
+    
+    def _build_drift_signal(
+        self,
+        signal: CognitiveSignal,
+        result: Dict[str, Any]
+    ) -> CognitiveSignal:
+        """Build a drift signal from a detector result"""
+        return CognitiveSignal(
+            signal_id=f"drift-{self._signal_prefix}{next(self._signal_seq):04x}",
+            signal_type=SignalType.DRIFT,
+            layer=CognitiveLayer.L1_PERCEPTION,
+            source='perception-layer',
+            payload={
+                'original_signal': signal.signal_id,
+                'drift_type': result.get('type', 'unknown'),
+                'magnitude': result.get('magnitude', 0.0),
+                'baseline': result.get('baseline'),
+                'current': result.get('current')
+            },
+            confidence=result.get('confidence', 0.6)
+        )
+    
     def add_anomaly_detector(self, detector: Callable) -> None:
         """Add an anomaly detector"""
         self._anomaly_detectors.append(detector)
@@ -308,9 +458,26 @@ class PerceptionLayer:
         """Set a baseline value for drift detection"""
         self._baselines[key] = value
     
+    def enable_streaming_detectors(
+        self,
+        config: Optional[StreamingDetectorConfig] = None
+    ) -> StreamingDetectorBank:
+        """Enable the built-in streaming anomaly and drift detectors"""
+        self._streaming = StreamingDetectorBank(config)
+        return self._streaming
+    
+    def get_metric_state(self, key: str) -> Optional[Dict[str, float]]:
+        """Get rolling statistics tracked by the streaming detectors"""
+        if self._streaming is None:
+            return None
+        return self._streaming.get_state(key)
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get layer statistics"""
-        return self._stats.copy()
+        return {
+            **self._stats,
+            'tracked_metrics': len(self._streaming) if self._streaming is not None else 0
+        }
 
 
 class ReasoningLayer:
@@ -916,6 +1083,12 @@ class EnhancedCognitiveProcessor:
     - L3 Execution: Action execution with rollback support
     - L4 Proof: Evidence generation and audit trail
     
+    With ``enable_batching`` the background loop drains up to
+    ``batch_max_size`` queued signals (or whatever arrives within
+    ``batch_max_wait_ms``), runs perception over the whole batch and shards
+    the remaining layers by session over ``worker_count`` workers, so signals
+    of one session keep their order while sessions proceed in parallel.
+    
     Usage:
         processor = EnhancedCognitiveProcessor()
         await processor.start()
@@ -927,12 +1100,16 @@ class EnhancedCognitiveProcessor:
         stats = processor.get_stats()
     """
     
+    LATENCY_LAYERS = ('perception', 'reasoning', 'execution', 'proof')
+    
     def __init__(self, config: Optional[ProcessorConfig] = None):
         """Initialize the cognitive processor"""
         self.config = config or ProcessorConfig()
         
         # Initialize layers
         self.perception = PerceptionLayer()
+        if self.config.enable_streaming_detectors:
+            self.perception.enable_streaming_detectors(self.config.streaming_detector_config)
         self.reasoning = ReasoningLayer()
         self.execution = ExecutionLayer()
         self.proof = ProofLayer()
@@ -941,6 +1118,11 @@ class EnhancedCognitiveProcessor:
         self._is_running = False
         self._signal_queue: asyncio.Queue = asyncio.Queue(maxsize=self.config.max_signal_queue)
         self._processor_task: Optional[asyncio.Task] = None
+        self._shard_queues: List[asyncio.Queue] = []
+        self._shard_tasks: List[asyncio.Task] = []
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
         
         # Contexts
         self._contexts: Dict[str, CognitiveContext] = {}
@@ -949,7 +1131,13 @@ class EnhancedCognitiveProcessor:
         self._stats = {
             'signals_received': 0,
             'signals_processed': 0,
-            'processing_errors': 0
+            'processing_errors': 0,
+            'batches_processed': 0
+        }
+        self._batch_sizes: deque = deque(maxlen=self.config.latency_sample_size)
+        self._layer_latencies: Dict[str, deque] = {
+            layer: deque(maxlen=self.config.latency_sample_size)
+            for layer in self.LATENCY_LAYERS
         }
         
         logger.info("EnhancedCognitiveProcessor initialized - 增強認知處理器已初始化")
@@ -960,7 +1148,22 @@ class EnhancedCognitiveProcessor:
             return
         
         self._is_running = True
-        self._processor_task = asyncio.create_task(self._processing_loop())
+        if self.config.enable_batching:
+            worker_count = max(1, self.config.worker_count)
+            # Shard queues share the max_signal_queue budget, so a slow shard
+            # blocks the batching loop and in turn submit_signal
+            shard_size = (
+                max(1, self.config.max_signal_queue // worker_count)
+                if self.config.max_signal_queue > 0 else 0
+            )
+            self._shard_queues = [asyncio.Queue(maxsize=shard_size) for _ in range(worker_count)]
+            self._shard_tasks = [
+                asyncio.create_task(self._shard_worker(queue))
+                for queue in self._shard_queues
+            ]
+            self._processor_task = asyncio.create_task(self._batching_loop())
+        else:
+            self._processor_task = asyncio.create_task(self._processing_loop())
         
         logger.info("EnhancedCognitiveProcessor started - 增強認知處理器已啟動")
     
@@ -968,12 +1171,28 @@ class EnhancedCognitiveProcessor:
         """Stop the cognitive processor"""
         self._is_running = False
         
-        if self._processor_task:
-            self._processor_task.cancel()
+        tasks = [self._processor_task] if self._processor_task else []
+        tasks.extend(self._shard_tasks)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
             try:
-                await self._processor_task
+                await task
             except asyncio.CancelledError:
                 pass
+        self._processor_task = None
+        self._shard_tasks = []
+        self._shard_queues = []
+        
+        # Signals taken off the submit queue but not processed (shard queues,
+        # a half-built batch) are dropped; only the submit queue is kept for
+        # a restart, so settle in-flight accounting and wake drain() waiters
+        dropped = self._in_flight - self._signal_queue.qsize()
+        if dropped > 0:
+            logger.warning(f"Processor stopped with {dropped} unprocessed signals dropped")
+        self._in_flight = self._signal_queue.qsize()
+        if not self._in_flight:
+            self._idle.set()
         
         logger.info("EnhancedCognitiveProcessor stopped - 增強認知處理器已停止")
     
@@ -1001,8 +1220,17 @@ class EnhancedCognitiveProcessor:
         context = self._get_or_create_context(session_id)
         context.signals.append(signal)
         
+        return await self._process_safely(signal, context)
+    
+    async def _process_safely(
+        self,
+        signal: CognitiveSignal,
+        context: CognitiveContext,
+        perception_signals: Optional[List[CognitiveSignal]] = None
+    ) -> Dict[str, Any]:
+        """Process a signal, converting failures into an error result"""
         try:
-            result = await self._process_through_layers(signal, context)
+            result = await self._process_through_layers(signal, context, perception_signals)
             self._stats['signals_processed'] += 1
             return result
         except Exception as e:
@@ -1014,10 +1242,16 @@ class EnhancedCognitiveProcessor:
                 'signal_id': signal.signal_id
             }
     
-    async def submit_signal(self, signal: CognitiveSignal) -> bool:
+    async def submit_signal(
+        self,
+        signal: CognitiveSignal,
+        session_id: Optional[str] = None
+    ) -> bool:
         """Submit a signal for asynchronous processing"""
         try:
-            await self._signal_queue.put(signal)
+            await self._signal_queue.put((signal, session_id))
+            self._in_flight += 1
+            self._idle.clear()
             return True
         except asyncio.QueueFull:
             logger.warning("Signal queue full, signal dropped")
@@ -1026,9 +1260,15 @@ class EnhancedCognitiveProcessor:
     async def _process_through_layers(
         self,
         signal: CognitiveSignal,
-        context: CognitiveContext
+        context: CognitiveContext,
+        perception_signals: Optional[List[CognitiveSignal]] = None
     ) -> Dict[str, Any]:
-        """Process signal through all enabled layers"""
+        """
+        Process signal through all enabled layers
+        
+        ``perception_signals`` carries L1 output already computed for the
+        signal as part of a batch; L1 is then not run again.
+        """
         result = {
             'signal_id': signal.signal_id,
             'success': True,
@@ -1040,7 +1280,10 @@ class EnhancedCognitiveProcessor:
         
         # L1: Perception
         if self.config.enable_perception:
-            perception_signals = await self.perception.process(signal, context)
+            if perception_signals is None:
+                started = time.perf_counter()
+                perception_signals = await self.perception.process(signal, context)
+                self._record_latency('perception', started)
             result['layers_processed'].append('perception')
             result['signals'].extend([s.to_dict() for s in perception_signals])
         else:
@@ -1048,7 +1291,9 @@ class EnhancedCognitiveProcessor:
         
         # L2: Reasoning
         if self.config.enable_reasoning:
+            started = time.perf_counter()
             decisions, reasoning_signals = await self.reasoning.process(perception_signals, context)
+            self._record_latency('reasoning', started)
             result['layers_processed'].append('reasoning')
             result['decisions'].extend([d.to_dict() for d in decisions])
             result['signals'].extend([s.to_dict() for s in reasoning_signals])
@@ -1059,7 +1304,9 @@ class EnhancedCognitiveProcessor:
         
         # L3: Execution
         if self.config.enable_execution and decisions:
+            started = time.perf_counter()
             action_signals = await self.execution.execute(decisions, context)
+            self._record_latency('execution', started)
             result['layers_processed'].append('execution')
             result['signals'].extend([s.to_dict() for s in action_signals])
         else:
@@ -1067,10 +1314,12 @@ class EnhancedCognitiveProcessor:
         
         # L4: Proof
         if self.config.enable_proof:
+            started = time.perf_counter()
             all_signals = perception_signals + reasoning_signals + action_signals
             evidence_signals = await self.proof.generate_evidence(
                 all_signals, decisions, context
             )
+            self._record_latency('proof', started)
             result['layers_processed'].append('proof')
             result['evidence'].extend([s.to_dict() for s in evidence_signals])
         
@@ -1084,21 +1333,130 @@ class EnhancedCognitiveProcessor:
         return result
     
     async def _processing_loop(self) -> None:
-        """Background processing loop"""
+        """Background processing loop (one signal at a time)"""
         while self._is_running:
             try:
-                signal = await asyncio.wait_for(
-                    self._signal_queue.get(),
-                    timeout=1.0
-                )
-                await self.process_signal(signal)
-            except asyncio.TimeoutError:
-                continue
+                signal, session_id = await self._signal_queue.get()
+                try:
+                    await self.process_signal(signal, session_id)
+                finally:
+                    self._signal_done()
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Processing loop error: {e}")
     
+    async def _batching_loop(self) -> None:
+        """Background loop collecting queued signals into batches"""
+        while self._is_running:
+            try:
+                batch = await self._collect_batch()
+                await self._process_batch(batch)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Batching loop error: {e}")
+    
+    async def _collect_batch(self) -> List[Tuple[CognitiveSignal, Optional[str]]]:
+        """Wait for one signal, then drain up to batch_max_size or batch_max_wait_ms"""
+        batch = [await self._signal_queue.get()]
+        max_size = max(1, self.config.batch_max_size)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.batch_max_wait_ms / 1000.0
+        
+        while len(batch) < max_size:
+            if not self._signal_queue.empty():
+                batch.append(self._signal_queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._signal_queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+    
+    async def _process_batch(
+        self,
+        batch: List[Tuple[CognitiveSignal, Optional[str]]]
+    ) -> None:
+        """
+        Run perception over a batch and hand signals to their session shards
+        
+        Args:
+            batch: (signal, session_id) pairs; a missing session_id gets a
+                fresh session as in ``process_signal``
+        """
+        if not batch:
+            return
+        
+        self._stats['batches_processed'] += 1
+        self._stats['signals_received'] += len(batch)
+        self._batch_sizes.append(len(batch))
+        
+        signals: List[CognitiveSignal] = []
+        contexts: List[CognitiveContext] = []
+        for signal, session_id in batch:
+            context = self._get_or_create_context(session_id or str(uuid4()))
+            context.signals.append(signal)
+            signals.append(signal)
+            contexts.append(context)
+        
+        perception_outputs: List[Optional[List[CognitiveSignal]]] = [None] * len(signals)
+        if self.config.enable_perception:
+            started = time.perf_counter()
+            try:
+                perception_outputs = await self.perception.process_batch(signals, contexts)
+            except Exception as e:
+                logger.error(f"Batch perception error: {e}")
+            else:
+                elapsed_ms = (time.perf_counter() - started) * 1000 / len(signals)
+                self._layer_latencies['perception'].extend([elapsed_ms] * len(signals))
+        
+        for signal, context, perception_signals in zip(signals, contexts, perception_outputs):
+            shard = hash(context.session_id) % len(self._shard_queues)
+            await self._shard_queues[shard].put((signal, context, perception_signals))
+    
+    async def _shard_worker(self, queue: asyncio.Queue) -> None:
+        """Process L2-L4 for the sessions routed to one shard, in order"""
+        while True:
+            signal, context, perception_signals = await queue.get()
+            try:
+                await self._process_safely(signal, context, perception_signals)
+            finally:
+                queue.task_done()
+                self._signal_done()
+    
+    def _signal_done(self) -> None:
+        """Account for a submitted signal that finished processing"""
+        self._in_flight = max(0, self._in_flight - 1)
+        if not self._in_flight:
+            self._idle.set()
+    
+    async def drain(self) -> None:
+        """Wait until every submitted signal has been processed"""
+        await self._idle.wait()
+    
+    def _record_latency(self, layer: str, started: float) -> None:
+        """Record a layer latency sample in milliseconds"""
+        self._layer_latencies[layer].append((time.perf_counter() - started) * 1000)
+    
+    @staticmethod
+    def _percentiles(samples: deque) -> Dict[str, float]:
+        """Summarize samples as count/p50/p95/p99"""
+        if not samples:
+            return {'count': 0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return {
+            'count': len(ordered),
+            'p50': ordered[round(last * 0.50)],
+            'p95': ordered[round(last * 0.95)],
+            'p99': ordered[round(last * 0.99)]
+        }
+    
     def _get_or_create_context(self, session_id: str) -> CognitiveContext:
         """Get or create a processing context"""
         if session_id not in self._contexts:
@@ -1122,6 +1480,15 @@ class EnhancedCognitiveProcessor:
             'proof': self.proof.get_stats(),
             'is_running': self._is_running,
             'queue_size': self._signal_queue.qsize(),
+            'shard_queue_sizes': [queue.qsize() for queue in self._shard_queues],
+            'batch_sizes': {
+                **self._percentiles(self._batch_sizes),
+                'max': max(self._batch_sizes, default=0)
+            },
+            'layer_latency_ms': {
+                layer: self._percentiles(samples)
+                for layer, samples in self._layer_latencies.items()
+            },
             'active_contexts': len(self._contexts)
         }
 
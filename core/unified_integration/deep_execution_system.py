@@ -23,13 +23,17 @@ Design Principles:
 """
 
 import asyncio
-import contextlib
+import heapq
+import itertools
+import json
 import logging
+from collections import deque
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from enum import Enum
-from typing import Any
+from pathlib import Path
+from typing import Any, TextIO
 from uuid import uuid4
 
 logger = logging.getLogger(__name__)
@@ -212,6 +216,8 @@ class DeepExecutionConfig:
     enable_deep_validation: bool = True
     enable_audit_logging: bool = True
     audit_retention_count: int = 10000
+    audit_spill_path: str | None = None
+    audit_segment_max_entries: int = 10000
     validation_timeout_seconds: float = 10.0
 
 
@@ -402,36 +408,115 @@ class OperationScheduler:
     """
     操作調度器 - Operation Scheduler
     
-    Schedules operations based on priority and dependencies.
+    Dependency-aware DAG scheduler. Operations register their dependencies
+    when scheduled; every ``mark_completed`` decrements the in-degree of the
+    operations waiting on it, and operations whose in-degree reaches zero are
+    pushed onto a priority heap. ``dispatch_ready`` releases operations from
+    that heap (highest priority first) while fewer than ``max_concurrent`` are
+    running, and ``mark_completed`` frees the slot and dispatches the next
+    ones itself, so no background loop is needed and a blocked high-priority
+    operation never holds back ready work.
     """
 
     def __init__(self, max_concurrent: int = 20):
         """Initialize the scheduler"""
         self.max_concurrent = max_concurrent
-        self._queues: dict[OperationPriority, asyncio.Queue] = {
-            priority: asyncio.Queue() for priority in OperationPriority
-        }
-        self._running: dict[str, asyncio.Task] = {}
+        self._ready: list[tuple[int, int, Operation]] = []
+        self._sequence = itertools.count()
+        self._waiting: dict[str, Operation] = {}
+        self._in_degree: dict[str, int] = {}
+        self._dependents: dict[str, list[str]] = {}
+        self._dispatch_futures: dict[str, asyncio.Future] = {}
+        self._blocked: dict[str, str] = {}  # operation_id -> failed dependency
+        self._running: set[str] = set()
         self._completed: dict[str, OperationResult] = {}
-        self._semaphore = asyncio.Semaphore(max_concurrent)
         self._stats = {
             'operations_scheduled': 0,
+            'operations_dispatched': 0,
             'operations_completed': 0,
-            'operations_failed': 0
+            'operations_failed': 0,
+            'operations_blocked': 0
         }
 
-    async def schedule(self, operation: Operation) -> None:
-        """Schedule an operation for execution"""
-        await self._queues[operation.priority].put(operation)
+    async def schedule(self, operation: Operation) -> asyncio.Future:
+        """
+        Schedule an operation for execution
+        
+        The operation is queued until ``dispatch_ready`` (or the completion
+        of one of its dependencies) releases it.
+        
+        Args:
+            operation: Operation to schedule
+            
+        Returns:
+            Future resolved with True once the operation is dispatched, or
+            with False if one of its dependencies failed
+        """
+        operation_id = operation.operation_id
+        future = self._dispatch_futures.get(operation_id)
+        if future is not None:
+            return future
+
+        future = asyncio.get_running_loop().create_future()
+        self._dispatch_futures[operation_id] = future
         self._stats['operations_scheduled'] += 1
 
+        pending = 0
+        failed_dependency = None
+        for dep_id in dict.fromkeys(operation.dependencies):
+            dep_result = self._completed.get(dep_id)
+            if dep_result is None:
+                self._dependents.setdefault(dep_id, []).append(operation_id)
+                pending += 1
+            elif dep_result.status != OperationStatus.COMPLETED:
+                failed_dependency = dep_id
+
+        if failed_dependency is not None:
+            self._block(operation_id, failed_dependency)
+        elif pending:
+            self._waiting[operation_id] = operation
+            self._in_degree[operation_id] = pending
+        else:
+            self._push_ready(operation)
+
+        return future
+
     async def get_next(self) -> Operation | None:
-        """Get the next operation to execute (highest priority first)"""
-        for priority in OperationPriority:
-            queue = self._queues[priority]
-            if not queue.empty():
-                return await queue.get()
-        return None
+        """Get the next ready operation (highest priority first) without waiting"""
+        if not self._ready:
+            return None
+        return heapq.heappop(self._ready)[2]
+
+    def dispatch_ready(self) -> int:
+        """
+        Release ready operations to their waiters while slots are free
+        
+        Each dispatched operation holds a slot until ``mark_completed`` is
+        called for it.
+        
+        Returns:
+            Number of operations dispatched
+        """
+        dispatched = 0
+        while self._ready and len(self._running) < self.max_concurrent:
+            operation = heapq.heappop(self._ready)[2]
+            future = self._dispatch_futures.get(operation.operation_id)
+            if future is None or future.done():
+                continue
+
+            self._running.add(operation.operation_id)
+            self._stats['operations_dispatched'] += 1
+            future.set_result(True)
+            dispatched += 1
+        return dispatched
+
+    def cancel(self, operation_id: str) -> None:
+        """Withdraw a scheduled operation that has not been dispatched yet"""
+        self._waiting.pop(operation_id, None)
+        self._in_degree.pop(operation_id, None)
+        future = self._dispatch_futures.get(operation_id)
+        if future is not None and not future.done():
+            future.cancel()
 
     def can_execute(self, operation: Operation) -> bool:
         """Check if an operation can be executed (dependencies satisfied)"""
@@ -442,23 +527,65 @@ class OperationScheduler:
                 return False
         return True
 
+    def get_blocking_dependency(self, operation_id: str) -> str | None:
+        """Get the failed dependency that blocked an operation, if any"""
+        return self._blocked.get(operation_id)
+
     def mark_completed(self, operation_id: str, result: OperationResult) -> None:
-        """Mark an operation as completed"""
+        """Mark an operation as completed, release its dependents and its slot"""
+        if operation_id in self._completed:
+            return
+
         self._completed[operation_id] = result
-        self._running.pop(operation_id, None)
-        if result.status == OperationStatus.COMPLETED:
+        self._dispatch_futures.pop(operation_id, None)
+        self._running.discard(operation_id)
+
+        succeeded = result.status == OperationStatus.COMPLETED
+        if succeeded:
             self._stats['operations_completed'] += 1
         else:
             self._stats['operations_failed'] += 1
 
+        for dependent_id in self._dependents.pop(operation_id, ()):
+            if dependent_id not in self._in_degree:
+                continue
+            if not succeeded:
+                self._block(dependent_id, operation_id)
+                continue
+            self._in_degree[dependent_id] -= 1
+            if self._in_degree[dependent_id] == 0:
+                del self._in_degree[dependent_id]
+                self._push_ready(self._waiting.pop(dependent_id))
+
+        self.dispatch_ready()
+
+    def _push_ready(self, operation: Operation) -> None:
+        """Push an operation with no pending dependencies onto the ready heap"""
+        heapq.heappush(
+            self._ready,
+            (operation.priority.value, next(self._sequence), operation)
+        )
+
+    def _block(self, operation_id: str, failed_dependency: str) -> None:
+        """Fail a waiting operation whose dependency did not complete"""
+        self._waiting.pop(operation_id, None)
+        self._in_degree.pop(operation_id, None)
+        self._blocked[operation_id] = failed_dependency
+        self._stats['operations_blocked'] += 1
+        future = self._dispatch_futures.get(operation_id)
+        if future is not None and not future.done():
+            future.set_result(False)
+
     def get_stats(self) -> dict[str, Any]:
         """Get scheduler statistics"""
-        queue_sizes = {
-            p.name: self._queues[p].qsize() for p in OperationPriority
-        }
+        queue_sizes = dict.fromkeys((p.name for p in OperationPriority), 0)
+        for priority_value, _, _ in self._ready:
+            queue_sizes[OperationPriority(priority_value).name] += 1
         return {
             **self._stats,
             'running_count': len(self._running),
+            'ready_count': len(self._ready),
+            'waiting_count': len(self._waiting),
             'queue_sizes': queue_sizes
         }
 
@@ -468,17 +595,50 @@ class AuditLogger:
     審計記錄器 - Audit Logger
     
     Provides comprehensive audit logging for all operations.
+    
+    Entries live in a fixed-capacity ring buffer with secondary indexes by
+    operation_id, context_id and status, so logging is O(1) and filtered
+    lookups only visit matching entries. When ``spill_path`` is set, entries
+    evicted from the ring are appended to JSONL segment files that can be
+    queried by time range with ``query_history``.
     """
 
-    def __init__(self, retention_count: int = 10000):
+    SEGMENT_PREFIX = 'audit-'
+    SEGMENT_SUFFIX = '.jsonl'
+
+    def __init__(
+        self,
+        retention_count: int = 10000,
+        spill_path: str | None = None,
+        segment_max_entries: int = 10000
+    ):
         """Initialize the audit logger"""
-        self.retention_count = retention_count
-        self._entries: list[AuditEntry] = []
+        self.retention_count = max(1, retention_count)
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.segment_max_entries = max(1, segment_max_entries)
+
+        # Ring buffer addressed by a monotonically increasing sequence number
+        self._ring: list[AuditEntry | None] = [None] * self.retention_count
+        self._next_seq = 0
+        self._index_by_operation: dict[str, deque[int]] = {}
+        self._index_by_context: dict[str, deque[int]] = {}
+        self._index_by_status: dict[OperationStatus, deque[int]] = {}
+
+        # Spill segments: path -> {'start': ts, 'end': ts, 'count': n}
+        self._segments: dict[Path, dict[str, float]] = {}
+        self._segment_file: TextIO | None = None
+        self._segment_path: Path | None = None
+
         self._stats = {
             'entries_logged': 0,
-            'entries_trimmed': 0
+            'entries_trimmed': 0,
+            'entries_spilled': 0
         }
 
+        if self.spill_path:
+            self.spill_path.mkdir(parents=True, exist_ok=True)
+            self._load_segments()
+
     def log(
         self,
         operation: Operation,
@@ -522,17 +682,89 @@ class AuditLogger:
             }
         )
 
-        self._entries.append(entry)
+        seq = self._next_seq
+        slot = seq % self.retention_count
+        evicted = self._ring[slot]
+        if evicted is not None:
+            self._evict(evicted)
+
+        self._ring[slot] = entry
+        self._next_seq += 1
+        self._index_by_operation.setdefault(entry.operation_id, deque()).append(seq)
+        self._index_by_context.setdefault(entry.context_id, deque()).append(seq)
+        self._index_by_status.setdefault(entry.status, deque()).append(seq)
         self._stats['entries_logged'] += 1
 
-        # Trim old entries if needed
-        if len(self._entries) > self.retention_count:
-            trim_count = len(self._entries) - self.retention_count
-            self._entries = self._entries[trim_count:]
-            self._stats['entries_trimmed'] += trim_count
-
         return entry.entry_id
 
+    def _evict(self, entry: AuditEntry) -> None:
+        """Drop the oldest entry from the indexes and spill it to disk"""
+        # The evicted entry is always the oldest, i.e. the head of each index
+        for index, key in (
+            (self._index_by_operation, entry.operation_id),
+            (self._index_by_context, entry.context_id),
+            (self._index_by_status, entry.status),
+        ):
+            seqs = index[key]
+            seqs.popleft()
+            if not seqs:
+                del index[key]
+
+        self._stats['entries_trimmed'] += 1
+        if self.spill_path:
+            self._spill(entry)
+
+    def _spill(self, entry: AuditEntry) -> None:
+        """Append an evicted entry to the current JSONL segment"""
+        timestamp = entry.timestamp.timestamp()
+        if self._segment_file is None:
+            self._segment_path = self.spill_path / (
+                f"{self.SEGMENT_PREFIX}{self._stats['entries_spilled']:012d}-"
+                f"{uuid4().hex[:6]}{self.SEGMENT_SUFFIX}"
+            )
+            self._segment_file = self._segment_path.open('a', encoding='utf-8')
+            self._segments[self._segment_path] = {
+                'start': timestamp, 'end': timestamp, 'count': 0
+            }
+
+        self._segment_file.write(json.dumps(entry.to_dict(), default=str) + '\n')
+        segment = self._segments[self._segment_path]
+        segment['start'] = min(segment['start'], timestamp)
+        segment['end'] = max(segment['end'], timestamp)
+        segment['count'] += 1
+        self._stats['entries_spilled'] += 1
+
+        if segment['count'] >= self.segment_max_entries:
+            self._close_segment()
+
+    def _close_segment(self) -> None:
+        """Close the segment currently being appended to"""
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+            self._segment_path = None
+
+    def _load_segments(self) -> None:
+        """Rebuild segment time ranges from segment files already on disk"""
+        pattern = f"{self.SEGMENT_PREFIX}*{self.SEGMENT_SUFFIX}"
+        for path in sorted(self.spill_path.glob(pattern)):
+            start = end = None
+            count = 0
+            with path.open(encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    timestamp = datetime.fromisoformat(json.loads(line)['timestamp']).timestamp()
+                    start = timestamp if start is None else min(start, timestamp)
+                    end = timestamp if end is None else max(end, timestamp)
+                    count += 1
+            if count:
+                self._segments[path] = {'start': start, 'end': end, 'count': count}
+
+    def close(self) -> None:
+        """Flush and close the open spill segment"""
+        self._close_segment()
+
     def _summarize_input(self, args: dict[str, Any]) -> dict[str, Any]:
         """Summarize input arguments for audit (redact sensitive data)"""
         # Specific sensitive field patterns using word boundaries
@@ -575,23 +807,116 @@ class AuditLogger:
         status: OperationStatus | None = None,
         limit: int = 100
     ) -> list[AuditEntry]:
-        """Get audit entries with optional filters"""
-        entries = self._entries
+        """Get in-memory audit entries with optional filters (oldest first)"""
+        if limit <= 0:
+            return []
 
-        if operation_id:
-            entries = [e for e in entries if e.operation_id == operation_id]
-        if context_id:
-            entries = [e for e in entries if e.context_id == context_id]
-        if status:
-            entries = [e for e in entries if e.status == status]
+        candidates = [
+            index.get(key, ())
+            for index, key in (
+                (self._index_by_operation, operation_id),
+                (self._index_by_context, context_id),
+                (self._index_by_status, status),
+            )
+            if key
+        ]
+
+        if not candidates:
+            first_seq = max(0, self._next_seq - self.retention_count, self._next_seq - limit)
+            return [
+                self._ring[seq % self.retention_count]
+                for seq in range(first_seq, self._next_seq)
+            ]
+
+        # Walk the most selective index newest-first and check the rest
+        seqs = min(candidates, key=len)
+        entries: list[AuditEntry] = []
+        for seq in reversed(seqs):
+            entry = self._ring[seq % self.retention_count]
+            if operation_id and entry.operation_id != operation_id:
+                continue
+            if context_id and entry.context_id != context_id:
+                continue
+            if status and entry.status != status:
+                continue
+            entries.append(entry)
+            if len(entries) >= limit:
+                break
+
+        entries.reverse()
+        return entries
+
+    def query_history(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        operation_id: str | None = None,
+        context_id: str | None = None,
+        status: OperationStatus | None = None,
+        limit: int | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Query spilled and in-memory audit entries by time range
+        
+        Only segments whose time range overlaps [start, end] are read.
+        
+        Args:
+            start: Inclusive lower bound on entry timestamp
+            end: Inclusive upper bound on entry timestamp
+            operation_id: Optional operation filter
+            context_id: Optional context filter
+            status: Optional status filter
+            limit: Optional maximum number of (most recent) entries
+            
+        Returns:
+            Matching entries as dictionaries, oldest first
+        """
+        start_ts = start.timestamp() if start else float('-inf')
+        end_ts = end.timestamp() if end else float('inf')
+        status_value = status.value if status else None
+
+        def matches(record: dict[str, Any], timestamp: float) -> bool:
+            return (
+                start_ts <= timestamp <= end_ts
+                and (not operation_id or record['operation_id'] == operation_id)
+                and (not context_id or record['context_id'] == context_id)
+                and (not status_value or record['status'] == status_value)
+            )
 
-        return entries[-limit:]
+        if self._segment_file is not None:
+            self._segment_file.flush()
+
+        results: list[dict[str, Any]] = []
+        for path, segment in self._segments.items():
+            if segment['end'] < start_ts or segment['start'] > end_ts:
+                continue
+            with path.open(encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    timestamp = datetime.fromisoformat(record['timestamp']).timestamp()
+                    if matches(record, timestamp):
+                        results.append(record)
+
+        first_seq = max(0, self._next_seq - self.retention_count)
+        for seq in range(first_seq, self._next_seq):
+            entry = self._ring[seq % self.retention_count]
+            record = entry.to_dict()
+            if matches(record, entry.timestamp.timestamp()):
+                results.append(record)
+
+        results.sort(key=lambda r: r['timestamp'])
+        if limit is not None:
+            results = results[-limit:] if limit > 0 else []
+        return results
 
     def get_stats(self) -> dict[str, Any]:
         """Get audit logger statistics"""
         return {
             **self._stats,
-            'current_entries': len(self._entries)
+            'current_entries': min(self._next_seq, self.retention_count),
+            'segments': len(self._segments)
         }
 
 
@@ -629,7 +954,11 @@ class DeepExecutionSystem:
         # Core components
         self.validator = OperationValidator(self.config)
         self.scheduler = OperationScheduler(self.config.max_concurrent_operations)
-        self.audit_logger = AuditLogger(self.config.audit_retention_count)
+        self.audit_logger = AuditLogger(
+            self.config.audit_retention_count,
+            spill_path=self.config.audit_spill_path,
+            segment_max_entries=self.config.audit_segment_max_entries
+        )
 
         # State management
         self._contexts: dict[str, ExecutionContext] = {}
@@ -639,7 +968,6 @@ class DeepExecutionSystem:
 
         # Runtime state
         self._is_running = False
-        self._processor_task: asyncio.Task | None = None
 
         # Statistics
         self._stats = {
@@ -658,18 +986,13 @@ class DeepExecutionSystem:
             return
 
         self._is_running = True
-        self._processor_task = asyncio.create_task(self._processing_loop())
 
         logger.info("DeepExecutionSystem started - 深度執行系統已啟動")
 
     async def stop(self) -> None:
         """Stop the deep execution system"""
         self._is_running = False
-
-        if self._processor_task:
-            self._processor_task.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
-                await self._processor_task
+        self.audit_logger.close()
 
         logger.info("DeepExecutionSystem stopped - 深度執行系統已停止")
 
@@ -809,24 +1132,31 @@ class DeepExecutionSystem:
         )
 
         try:
-            # Check dependencies
-            if not self.scheduler.can_execute(operation):
+            # Wait for dependencies and an execution slot through the DAG scheduler
+            dispatched = await self.scheduler.schedule(operation)
+            if not dispatched.done():
                 result.status = OperationStatus.QUEUED
-                await self.scheduler.schedule(operation)
-                # Wait for dependencies with exponential backoff
-                wait_time = 0.1  # Start with 100ms
-                max_wait = 2.0  # Max wait between checks
-                total_waited = 0.0
-                while total_waited < operation.timeout_seconds:
-                    if self.scheduler.can_execute(operation):
-                        break
-                    await asyncio.sleep(wait_time)
-                    total_waited += wait_time
-                    wait_time = min(wait_time * 1.5, max_wait)  # Exponential backoff
-                else:
-                    result.status = OperationStatus.FAILED
-                    result.error = "Dependency timeout"
-                    return result
+                self.scheduler.dispatch_ready()
+            try:
+                ready = await asyncio.wait_for(
+                    asyncio.shield(dispatched), timeout=operation.timeout_seconds
+                )
+            except TimeoutError:
+                self.scheduler.cancel(operation.operation_id)
+                result.status = OperationStatus.FAILED
+                result.error = (
+                    "Dependency timeout" if not self.scheduler.can_execute(operation)
+                    else "Timed out waiting for an execution slot"
+                )
+                return result
+
+            if not ready:
+                result.status = OperationStatus.FAILED
+                result.error = (
+                    "Dependency failed: "
+                    f"{self.scheduler.get_blocking_dependency(operation.operation_id)}"
+                )
+                return result
 
             # Validate operation
             if self.config.enable_deep_validation:
@@ -1000,27 +1330,6 @@ class DeepExecutionSystem:
         context.completed_at = datetime.now(UTC)
         return True
 
-    async def _processing_loop(self) -> None:
-        """Background processing loop for queued operations"""
-        while self._is_running:
-            try:
-                operation = await self.scheduler.get_next()
-                if operation and self.scheduler.can_execute(operation):
-                    # Find context using O(1) lookup
-                    context_id = self._operation_to_context.get(operation.operation_id)
-                    context = self._contexts.get(context_id) if context_id else None
-
-                    if context:
-                        await self._execute_operation(operation, context)
-
-                await asyncio.sleep(0.01)
-
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Processing loop error: {e}")
-                await asyncio.sleep(0.1)
-
     def get_audit_entries(
         self,
         operation_id: str | None = None,
@@ -0,0 +1,76 @@
+"""
+Latency Histogram - Fixed-bucket latency accounting
+
+Shared by the MCP real-time connector and the service registry so both
+report request and health check latencies with the same bucket layout.
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, Tuple
+
+
+# Histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (milliseconds)"""
+    
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+        
+    def observe(self, value_ms: float) -> None:
+        """Record a sample"""
+        self.counts[bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+            
+    def merge(self, other: 'LatencyHistogram') -> None:
+        """Add another histogram with the same buckets into this one"""
+        if other.buckets != self.buckets:
+            raise ValueError('Cannot merge histograms with different buckets')
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(float(bound), self.max)
+        return self.max
+        
+    def to_dict(self) -> Dict[str, Any]:
+        """Cumulative bucket counts plus summary statistics"""
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[f'le_{bound}'] = cumulative
+        buckets['le_inf'] = self.count
+        return {
+            'count': self.count,
+            'sum_ms': self.total,
+            'mean_ms': self.mean,
+            'max_ms': self.max,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'buckets': buckets
+        }
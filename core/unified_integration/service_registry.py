@@ -21,13 +21,18 @@ Design Principles:
 """
 
 import asyncio
+import heapq
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
 from uuid import uuid4
 
+from .latency_histogram import LatencyHistogram
+
 logger = logging.getLogger(__name__)
 
 
@@ -143,6 +148,9 @@ class RegistryConfig:
     max_consecutive_failures: int = 3
     enable_auto_deregistration: bool = True
     auto_deregister_after_seconds: int = 300
+    health_check_concurrency: int = 32
+    health_check_timeout_seconds: float = 5.0
+    health_check_thread_workers: int = 8
 
 
 class ServiceRegistry:
@@ -169,6 +177,11 @@ class ServiceRegistry:
         
         # Discover services
         services = registry.discover_by_category(ServiceCategory.EXECUTION)
+
+    Discovery results are immutable snapshot tuples served from a view cache
+    and rebuilt only after a mutation that changes membership (registration,
+    deregistration, a health status change). Tags and health status must be
+    changed through the registry so the indexes stay consistent.
     """
     
     def __init__(self, config: Optional[RegistryConfig] = None):
@@ -180,9 +193,26 @@ class ServiceRegistry:
         self._services_by_name: Dict[str, Set[str]] = {}
         self._services_by_category: Dict[ServiceCategory, Set[str]] = {}
         self._services_by_capability: Dict[str, Set[str]] = {}
+        self._services_by_tag: Dict[str, Set[str]] = {}
+        self._services_by_status: Dict[ServiceStatus, Set[str]] = {
+            status: set() for status in ServiceStatus
+        }
+        self._registration_order: Dict[str, int] = {}
+        self._registration_seq = 0
+        
+        # Snapshot views, cleared on every membership change
+        self._views: Dict[Hashable, Tuple[ServiceMetadata, ...]] = {}
         
         # Health checkers
         self._health_checkers: Dict[str, Callable] = {}
+        self._checker_executor: Optional[ThreadPoolExecutor] = None
+        self._check_round_histogram = LatencyHistogram()
+        self._checker_latency_histogram = LatencyHistogram()
+        
+        # Heartbeat expiry: min-heap of (deadline, service_id); _heartbeat_deadlines
+        # holds the live deadline so superseded heap entries are skipped lazily
+        self._heartbeat_heap: List[Tuple[float, str]] = []
+        self._heartbeat_deadlines: Dict[str, float] = {}
         
         # Event handlers
         self._event_handlers: Dict[str, List[Callable]] = {}
@@ -196,7 +226,10 @@ class ServiceRegistry:
             'registrations': 0,
             'deregistrations': 0,
             'health_checks': 0,
-            'discoveries': 0
+            'health_check_timeouts': 0,
+            'discoveries': 0,
+            'view_cache_hits': 0,
+            'view_cache_misses': 0
         }
         
         # Initialize category sets
@@ -226,6 +259,10 @@ class ServiceRegistry:
                 await self._health_check_task
             except asyncio.CancelledError:
                 pass
+        
+        if self._checker_executor:
+            self._checker_executor.shutdown(wait=False)
+            self._checker_executor = None
                 
         await self._emit_event('registry_stopped', {'timestamp': datetime.now(timezone.utc)})
         logger.info("ServiceRegistry stopped - 服務註冊表已停止")
@@ -280,22 +317,16 @@ class ServiceRegistry:
             config=config or {}
         )
         
-        # Store service
-        self._services[service_id] = service
-        
-        # Index by name
-        if name not in self._services_by_name:
-            self._services_by_name[name] = set()
-        self._services_by_name[name].add(service_id)
-        
-        # Index by category
-        self._services_by_category[category].add(service_id)
+        # Replace any previous registration under the same ID
+        previous = self._services.get(service_id)
+        if previous is not None:
+            self._unindex(previous)
         
-        # Index by capabilities
-        for capability in service.provides:
-            if capability not in self._services_by_capability:
-                self._services_by_capability[capability] = set()
-            self._services_by_capability[capability].add(service_id)
+        # Store and index service
+        self._services[service_id] = service
+        self._registration_seq += 1
+        self._registration_order[service_id] = self._registration_seq
+        self._index(service)
         
         # Register health checker
         if health_checker:
@@ -331,16 +362,9 @@ class ServiceRegistry:
             return False
         
         # Remove from indexes
-        if service.name in self._services_by_name:
-            self._services_by_name[service.name].discard(service_id)
-            if not self._services_by_name[service.name]:
-                del self._services_by_name[service.name]
-        
-        self._services_by_category[service.category].discard(service_id)
-        
-        for capability in service.provides:
-            if capability in self._services_by_capability:
-                self._services_by_capability[capability].discard(service_id)
+        self._unindex(service)
+        self._registration_order.pop(service_id, None)
+        self._heartbeat_deadlines.pop(service_id, None)
         
         # Remove health checker
         self._health_checkers.pop(service_id, None)
@@ -361,65 +385,134 @@ class ServiceRegistry:
         """Get service by ID"""
         return self._services.get(service_id)
     
-    def discover_by_name(self, name: str) -> List[ServiceMetadata]:
+    @staticmethod
+    def _index_add(index: Dict[Any, Set[str]], key: Any, service_id: str) -> None:
+        """Add a service ID to an inverted index bucket"""
+        bucket = index.get(key)
+        if bucket is None:
+            bucket = index[key] = set()
+        bucket.add(service_id)
+    
+    @staticmethod
+    def _index_discard(index: Dict[Any, Set[str]], key: Any, service_id: str) -> None:
+        """Remove a service ID from an inverted index bucket, dropping empty buckets"""
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        bucket.discard(service_id)
+        if not bucket:
+            del index[key]
+    
+    def _index(self, service: ServiceMetadata) -> None:
+        """Add a service to every index"""
+        service_id = service.service_id
+        self._index_add(self._services_by_name, service.name, service_id)
+        self._services_by_category[service.category].add(service_id)
+        self._services_by_status[service.health.status].add(service_id)
+        for capability in service.provides:
+            self._index_add(self._services_by_capability, capability, service_id)
+        for tag in service.tags:
+            self._index_add(self._services_by_tag, tag, service_id)
+        self._views.clear()
+    
+    def _unindex(self, service: ServiceMetadata) -> None:
+        """Remove a service from every index"""
+        service_id = service.service_id
+        self._index_discard(self._services_by_name, service.name, service_id)
+        self._services_by_category[service.category].discard(service_id)
+        self._services_by_status[service.health.status].discard(service_id)
+        for capability in service.provides:
+            self._index_discard(self._services_by_capability, capability, service_id)
+        for tag in service.tags:
+            self._index_discard(self._services_by_tag, tag, service_id)
+        self._views.clear()
+    
+    def _view(self, key: Hashable, build: Callable[[], Iterable[str]]) -> Tuple[ServiceMetadata, ...]:
+        """Return the cached snapshot for a view key, building it on a miss"""
+        self._stats['discoveries'] += 1
+        view = self._views.get(key)
+        if view is not None:
+            self._stats['view_cache_hits'] += 1
+            return view
+        
+        self._stats['view_cache_misses'] += 1
+        order = self._registration_order
+        service_ids = sorted(build(), key=order.__getitem__)
+        view = tuple(self._services[sid] for sid in service_ids)
+        self._views[key] = view
+        return view
+    
+    def set_tags(self, service_id: str, tags: Set[str]) -> bool:
+        """
+        Replace the tags of a registered service
+        
+        更新服務標籤
+        """
+        service = self._services.get(service_id)
+        if not service:
+            return False
+        for tag in service.tags - tags:
+            self._index_discard(self._services_by_tag, tag, service_id)
+        for tag in tags - service.tags:
+            self._index_add(self._services_by_tag, tag, service_id)
+        service.tags = set(tags)
+        self._views.clear()
+        return True
+    
+    def discover_by_name(self, name: str) -> Tuple[ServiceMetadata, ...]:
         """
         Discover services by name
         
         按名稱發現服務
         """
-        self._stats['discoveries'] += 1
-        service_ids = self._services_by_name.get(name, set())
-        return [self._services[sid] for sid in service_ids if sid in self._services]
+        return self._view(('name', name), lambda: self._services_by_name.get(name, ()))
     
-    def discover_by_category(self, category: ServiceCategory) -> List[ServiceMetadata]:
+    def discover_by_category(self, category: ServiceCategory) -> Tuple[ServiceMetadata, ...]:
         """
         Discover services by category
         
         按類別發現服務
         """
-        self._stats['discoveries'] += 1
-        service_ids = self._services_by_category.get(category, set())
-        return [self._services[sid] for sid in service_ids if sid in self._services]
+        return self._view(('category', category), lambda: self._services_by_category.get(category, ()))
     
-    def discover_by_capability(self, capability: str) -> List[ServiceMetadata]:
+    def discover_by_capability(self, capability: str) -> Tuple[ServiceMetadata, ...]:
         """
         Discover services by capability
         
         按能力發現服務
         """
-        self._stats['discoveries'] += 1
-        service_ids = self._services_by_capability.get(capability, set())
-        return [self._services[sid] for sid in service_ids if sid in self._services]
+        return self._view(
+            ('capability', capability), lambda: self._services_by_capability.get(capability, ())
+        )
     
-    def discover_by_tag(self, tag: str) -> List[ServiceMetadata]:
+    def discover_by_tag(self, tag: str) -> Tuple[ServiceMetadata, ...]:
         """
         Discover services by tag
         
         按標籤發現服務
         """
-        self._stats['discoveries'] += 1
-        return [
-            service for service in self._services.values()
-            if tag in service.tags
-        ]
+        return self._view(('tag', tag), lambda: self._services_by_tag.get(tag, ()))
+    
+    def discover_by_status(self, status: ServiceStatus) -> Tuple[ServiceMetadata, ...]:
+        """
+        Discover services by health status
+        
+        按健康狀態發現服務
+        """
+        return self._view(('status', status), lambda: self._services_by_status[status])
     
-    def discover_healthy(self, category: Optional[ServiceCategory] = None) -> List[ServiceMetadata]:
+    def discover_healthy(self, category: Optional[ServiceCategory] = None) -> Tuple[ServiceMetadata, ...]:
         """
         Discover healthy services
         
         發現健康的服務
         """
-        self._stats['discoveries'] += 1
-        services = self._services.values()
-        
-        if category:
-            service_ids = self._services_by_category.get(category, set())
-            services = [self._services[sid] for sid in service_ids if sid in self._services]
-        
-        return [
-            service for service in services
-            if service.health.status == ServiceStatus.HEALTHY
-        ]
+        healthy = self._services_by_status[ServiceStatus.HEALTHY]
+        if category is None:
+            return self._view(('status', ServiceStatus.HEALTHY), lambda: healthy)
+        return self._view(
+            ('healthy', category), lambda: healthy & self._services_by_category.get(category, set())
+        )
     
     def heartbeat(self, service_id: str) -> bool:
         """
@@ -438,8 +531,15 @@ class ServiceRegistry:
             return False
         
         service.last_heartbeat = datetime.now(timezone.utc)
+        self._schedule_heartbeat_deadline(service)
         return True
     
+    def _schedule_heartbeat_deadline(self, service: ServiceMetadata) -> None:
+        """Record when a service's heartbeat expires"""
+        deadline = service.last_heartbeat.timestamp() + self.config.auto_deregister_after_seconds
+        self._heartbeat_deadlines[service.service_id] = deadline
+        heapq.heappush(self._heartbeat_heap, (deadline, service.service_id))
+    
     def update_health(
         self,
         service_id: str,
@@ -457,6 +557,10 @@ class ServiceRegistry:
             return False
         
         old_status = service.health.status
+        if old_status != status:
+            self._services_by_status[old_status].discard(service_id)
+            self._services_by_status[status].add(service_id)
+            self._views.clear()
         service.health.status = status
         service.health.last_check = datetime.now(timezone.utc)
         service.health.latency_ms = latency_ms
@@ -492,14 +596,17 @@ class ServiceRegistry:
         if not service:
             return {}
         
+        healthy = self._services_by_status[ServiceStatus.HEALTHY]
+        order = self._registration_order
         resolved = {}
         for dep_name in service.dependencies:
-            candidates = self.discover_healthy()
-            matching = [
-                s for s in candidates
-                if s.name == dep_name or dep_name in s.provides
-            ]
-            resolved[dep_name] = matching[0] if matching else None
+            matching = healthy & (
+                self._services_by_name.get(dep_name, set())
+                | self._services_by_capability.get(dep_name, set())
+            )
+            resolved[dep_name] = (
+                self._services[min(matching, key=order.__getitem__)] if matching else None
+            )
         
         return resolved
     
@@ -538,10 +645,11 @@ class ServiceRegistry:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get registry statistics"""
-        status_counts = {}
-        for service in self._services.values():
-            status = service.health.status.value
-            status_counts[status] = status_counts.get(status, 0) + 1
+        status_counts = {
+            status.value: len(service_ids)
+            for status, service_ids in self._services_by_status.items()
+            if service_ids
+        }
         
         category_counts = {
             category.value: len(service_ids)
@@ -553,7 +661,14 @@ class ServiceRegistry:
             'registrations': self._stats['registrations'],
             'deregistrations': self._stats['deregistrations'],
             'health_checks': self._stats['health_checks'],
+            'health_check_timeouts': self._stats['health_check_timeouts'],
+            'health_check_round_ms': self._check_round_histogram.to_dict(),
+            'health_checker_latency_ms': self._checker_latency_histogram.to_dict(),
+            'pending_heartbeat_deadlines': len(self._heartbeat_deadlines),
             'discoveries': self._stats['discoveries'],
+            'view_cache_hits': self._stats['view_cache_hits'],
+            'view_cache_misses': self._stats['view_cache_misses'],
+            'cached_views': len(self._views),
             'status_counts': status_counts,
             'category_counts': category_counts,
             'is_running': self._is_running
@@ -573,52 +688,110 @@ class ServiceRegistry:
                 await asyncio.sleep(5)
     
     async def _run_health_checks(self) -> None:
-        """Run health checks for all services"""
-        for service_id, service in list(self._services.items()):
-            self._stats['health_checks'] += 1
-            
-            checker = self._health_checkers.get(service_id)
-            if checker:
-                try:
-                    start_time = asyncio.get_event_loop().time()
-                    
-                    if asyncio.iscoroutinefunction(checker):
-                        result = await checker()
-                    else:
-                        result = checker()
-                    
-                    latency_ms = (asyncio.get_event_loop().time() - start_time) * 1000
-                    
-                    if isinstance(result, bool):
-                        status = ServiceStatus.HEALTHY if result else ServiceStatus.UNHEALTHY
-                    elif isinstance(result, dict):
-                        status = ServiceStatus(result.get('status', 'healthy'))
-                    else:
-                        status = ServiceStatus.HEALTHY
-                    
-                    self.update_health(service_id, status, latency_ms)
-                    
-                except Exception as e:
-                    logger.warning(f"Health check failed for {service_id}: {e}")
-                    self.update_health(
-                        service_id,
-                        ServiceStatus.UNHEALTHY,
-                        details={'error': str(e)}
+        """
+        Run health checks for all services concurrently
+        
+        Checks are bounded by ``health_check_concurrency`` and each one by
+        ``health_check_timeout_seconds``; synchronous checkers run in a
+        thread pool so they cannot block the event loop.
+        """
+        started = time.perf_counter()
+        self._stats['health_checks'] += len(self._services)
+        
+        checks = [
+            (service_id, checker)
+            for service_id, checker in list(self._health_checkers.items())
+            if service_id in self._services
+        ]
+        if checks:
+            semaphore = asyncio.Semaphore(max(1, self.config.health_check_concurrency))
+            await asyncio.gather(*(
+                self._check_service(service_id, checker, semaphore)
+                for service_id, checker in checks
+            ))
+        
+        self._check_round_histogram.observe((time.perf_counter() - started) * 1000)
+    
+    async def _check_service(
+        self,
+        service_id: str,
+        checker: Callable,
+        semaphore: asyncio.Semaphore
+    ) -> None:
+        """Run one health checker and record the result"""
+        async with semaphore:
+            start_time = time.perf_counter()
+            try:
+                if asyncio.iscoroutinefunction(checker):
+                    pending = checker()
+                else:
+                    if self._checker_executor is None:
+                        self._checker_executor = ThreadPoolExecutor(
+                            max_workers=max(1, self.config.health_check_thread_workers),
+                            thread_name_prefix='health-check'
+                        )
+                    pending = asyncio.get_running_loop().run_in_executor(
+                        self._checker_executor, checker
                     )
+                result = await asyncio.wait_for(pending, self.config.health_check_timeout_seconds)
+            except asyncio.TimeoutError:
+                self._stats['health_check_timeouts'] += 1
+                self._checker_latency_histogram.observe((time.perf_counter() - start_time) * 1000)
+                logger.warning(f"Health check timed out for {service_id}")
+                self.update_health(
+                    service_id,
+                    ServiceStatus.UNHEALTHY,
+                    details={'error': 'timeout'}
+                )
+                return
+            except Exception as e:
+                self._checker_latency_histogram.observe((time.perf_counter() - start_time) * 1000)
+                logger.warning(f"Health check failed for {service_id}: {e}")
+                self.update_health(
+                    service_id,
+                    ServiceStatus.UNHEALTHY,
+                    details={'error': str(e)}
+                )
+                return
+            
+            latency_ms = (time.perf_counter() - start_time) * 1000
+            self._checker_latency_histogram.observe(latency_ms)
+            
+            if isinstance(result, bool):
+                status = ServiceStatus.HEALTHY if result else ServiceStatus.UNHEALTHY
+            elif isinstance(result, dict):
+                status = ServiceStatus(result.get('status', 'healthy'))
+            else:
+                status = ServiceStatus.HEALTHY
+            
+            self.update_health(service_id, status, latency_ms)
     
     async def _check_heartbeat_timeouts(self) -> None:
-        """Check for heartbeat timeouts and deregister stale services"""
+        """
+        Deregister services whose heartbeat deadline has passed
+        
+        Only heap entries that are due are popped; entries superseded by a
+        later heartbeat are discarded as they surface.
+        """
         if not self.config.enable_auto_deregistration:
             return
         
-        now = datetime.now(timezone.utc)
-        timeout = timedelta(seconds=self.config.auto_deregister_after_seconds)
-        
+        now = datetime.now(timezone.utc).timestamp()
+        heap = self._heartbeat_heap
         stale_services = []
-        for service_id, service in self._services.items():
-            if service.last_heartbeat:
-                if now - service.last_heartbeat > timeout:
-                    stale_services.append(service_id)
+        while heap and heap[0][0] <= now:
+            deadline, service_id = heapq.heappop(heap)
+            if self._heartbeat_deadlines.get(service_id) != deadline:
+                continue
+            del self._heartbeat_deadlines[service_id]
+            service = self._services.get(service_id)
+            if service is None or service.last_heartbeat is None:
+                continue
+            # last_heartbeat may have been refreshed without heartbeat()
+            if service.last_heartbeat.timestamp() + self.config.auto_deregister_after_seconds > now:
+                self._schedule_heartbeat_deadline(service)
+                continue
+            stale_services.append(service_id)
         
         for service_id in stale_services:
             logger.warning(f"Deregistering stale service: {service_id}")
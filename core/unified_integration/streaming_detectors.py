@@ -0,0 +1,256 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+                    SynergyMesh Streaming Detectors
+                    串流偵測器 - 向量化異常與漂移偵測
+═══════════════════════════════════════════════════════════════════════════════
+
+Built-in streaming anomaly and drift detectors for the perception layer (L1).
+
+Every metric key owns a fixed amount of state held in NumPy arrays
+(struct-of-arrays, one row per key):
+- Exponentially decayed mean/variance: exact (Welford-weighted) over the
+  first ``1 / stats_alpha`` samples, then weighted by ``stats_alpha`` so the
+  baseline follows level shifts instead of averaging over all history
+- EWMA (exponentially weighted moving average)
+- z-score and MAD (median absolute deviation) outlier scores over a ring
+  buffer of the last ``window_size`` values
+- Two-sided CUSUM and two-sided Page-Hinkley drift statistics
+
+A whole batch of samples is scored with one ``score_batch`` call. Samples for
+distinct keys are updated together; repeated samples of the same key within
+a batch are applied in successive vectorized rounds, so results are identical
+to feeding the samples one by one.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Scales MAD to be a consistent estimator of the standard deviation
+MAD_SCALE = 0.6745
+
+
+@dataclass
+class StreamingDetectorConfig:
+    """Configuration for the streaming detectors"""
+    window_size: int = 128
+    min_samples: int = 10
+    z_threshold: float = 3.0
+    mad_threshold: float = 3.5
+    ewma_alpha: float = 0.1
+    stats_alpha: Optional[float] = None  # Mean/variance decay, defaults to 2 / (window_size + 1)
+    cusum_k: float = 0.5        # Allowed slack, in standard deviations
+    cusum_h: float = 5.0        # Decision threshold, in standard deviations
+    ph_delta: float = 0.005     # Page-Hinkley tolerated change magnitude
+    ph_lambda: float = 50.0     # Page-Hinkley detection threshold
+    metric_field: str = 'metric'
+    value_field: str = 'value'
+
+
+@dataclass
+class StreamingScores:
+    """Per-sample scores returned by ``StreamingDetectorBank.score_batch``"""
+    z_scores: np.ndarray
+    mad_scores: np.ndarray
+    ewma: np.ndarray
+    anomalies: np.ndarray       # bool: z-score or MAD outlier
+    drifts: np.ndarray          # bool: CUSUM or Page-Hinkley drift
+    drift_kinds: List[Optional[str]]
+
+
+class StreamingDetectorBank:
+    """
+    串流偵測器組 - Streaming Detector Bank
+
+    Keeps O(1) detector state per metric key and scores batches of samples
+    with vectorized NumPy updates.
+    """
+
+    def __init__(self, config: Optional[StreamingDetectorConfig] = None, capacity: int = 64):
+        """Initialize the detector bank"""
+        self.config = config or StreamingDetectorConfig()
+        self._slots: Dict[str, int] = {}
+        self._capacity = 0
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity: int) -> None:
+        """Grow per-key state arrays to hold ``capacity`` keys"""
+        window = self.config.window_size
+
+        def grow(array: Optional[np.ndarray], fill: float, shape: tuple, dtype: Any) -> np.ndarray:
+            grown = np.full(shape, fill, dtype=dtype)
+            if array is not None:
+                grown[:self._capacity] = array
+            return grown
+
+        old = self._capacity > 0
+        self._count = grow(self._count if old else None, 0, (capacity,), np.int64)
+        self._mean = grow(self._mean if old else None, 0.0, (capacity,), np.float64)
+        self._var = grow(self._var if old else None, 0.0, (capacity,), np.float64)
+        self._ewma = grow(self._ewma if old else None, 0.0, (capacity,), np.float64)
+        self._cusum_pos = grow(self._cusum_pos if old else None, 0.0, (capacity,), np.float64)
+        self._cusum_neg = grow(self._cusum_neg if old else None, 0.0, (capacity,), np.float64)
+        self._ph_sum = grow(self._ph_sum if old else None, 0.0, (capacity,), np.float64)
+        self._ph_min = grow(self._ph_min if old else None, 0.0, (capacity,), np.float64)
+        self._ph_neg_sum = grow(self._ph_neg_sum if old else None, 0.0, (capacity,), np.float64)
+        self._ph_max = grow(self._ph_max if old else None, 0.0, (capacity,), np.float64)
+        self._ring = grow(self._ring if old else None, np.nan, (capacity, window), np.float64)
+        self._ring_pos = grow(self._ring_pos if old else None, 0, (capacity,), np.int64)
+        self._capacity = capacity
+
+    def _slot_for(self, key: str) -> int:
+        """Get (or assign) the state row for a metric key"""
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = len(self._slots)
+            if slot >= self._capacity:
+                self._allocate(self._capacity * 2)
+            self._slots[key] = slot
+        return slot
+
+    def score_batch(self, keys: Sequence[str], values: Sequence[float]) -> StreamingScores:
+        """
+        Score and absorb a batch of samples
+
+        Each sample is scored against its key's state as it was just before
+        that sample, then folded into the state.
+
+        Args:
+            keys: Metric key of each sample
+            values: Sample values (aligned with keys)
+
+        Returns:
+            Per-sample scores and detection flags
+        """
+        cfg = self.config
+        stats_alpha = cfg.stats_alpha if cfg.stats_alpha is not None else 2.0 / (cfg.window_size + 1)
+        x_all = np.asarray(values, dtype=np.float64)
+        n = len(x_all)
+        slots = np.fromiter((self._slot_for(k) for k in keys), dtype=np.int64, count=n)
+
+        z_scores = np.zeros(n)
+        mad_scores = np.zeros(n)
+        ewma = np.zeros(n)
+        anomalies = np.zeros(n, dtype=bool)
+        cusum_hits = np.zeros(n, dtype=bool)
+        ph_hits = np.zeros(n, dtype=bool)
+
+        # Rank of each sample among earlier samples of the same key
+        order = np.argsort(slots, kind='stable')
+        sorted_slots = slots[order]
+        group_start = np.r_[0, np.flatnonzero(np.diff(sorted_slots)) + 1]
+        run_lengths = np.diff(np.r_[group_start, n])
+        ranks = np.empty(n, dtype=np.int64)
+        ranks[order] = np.arange(n) - np.repeat(group_start, run_lengths)
+
+        for rank in range(int(ranks.max(initial=-1)) + 1):
+            idx = np.flatnonzero(ranks == rank)
+            s = slots[idx]
+            x = x_all[idx]
+            count = self._count[s]
+            mean = self._mean[s]
+
+            # Outlier scores against the state before this sample
+            ready = count >= max(cfg.min_samples, 2)
+            std = np.sqrt(self._var[s])
+            z = np.where(ready & (std > 0), (x - mean) / np.where(std > 0, std, 1.0), 0.0)
+
+            window = self._ring[s]
+            window = np.where(np.isnan(window).all(axis=1)[:, None], 0.0, window)
+            median = np.nanmedian(window, axis=1)
+            mad = np.nanmedian(np.abs(window - median[:, None]), axis=1)
+            mad_z = np.where(ready & (mad > 0), MAD_SCALE * (x - median) / np.where(mad > 0, mad, 1.0), 0.0)
+
+            z_scores[idx] = z
+            mad_scores[idx] = mad_z
+            anomalies[idx] = (np.abs(z) > cfg.z_threshold) | (np.abs(mad_z) > cfg.mad_threshold)
+
+            # CUSUM on the standardized sample
+            pos = np.maximum(0.0, self._cusum_pos[s] + z - cfg.cusum_k)
+            neg = np.maximum(0.0, self._cusum_neg[s] - z - cfg.cusum_k)
+            cusum_hit = ready & ((pos > cfg.cusum_h) | (neg > cfg.cusum_h))
+            self._cusum_pos[s] = np.where(cusum_hit, 0.0, pos)
+            self._cusum_neg[s] = np.where(cusum_hit, 0.0, neg)
+            cusum_hits[idx] = cusum_hit
+
+            # Decayed mean/variance update (plain averaging while warming up)
+            new_count = count + 1
+            weight = np.maximum(1.0 / new_count, stats_alpha)
+            delta = x - mean
+            new_mean = mean + weight * delta
+            self._var[s] = (1 - weight) * (self._var[s] + weight * delta * delta)
+            self._mean[s] = new_mean
+            self._count[s] = new_count
+
+            # EWMA (seeded with the first sample)
+            new_ewma = np.where(count == 0, x, cfg.ewma_alpha * x + (1 - cfg.ewma_alpha) * self._ewma[s])
+            self._ewma[s] = new_ewma
+            ewma[idx] = new_ewma
+
+            # Page-Hinkley, one arm for upward and one for downward shifts
+            ph_sum = self._ph_sum[s] + x - new_mean - cfg.ph_delta
+            ph_min = np.minimum(self._ph_min[s], ph_sum)
+            ph_neg_sum = self._ph_neg_sum[s] + x - new_mean + cfg.ph_delta
+            ph_max = np.maximum(self._ph_max[s], ph_neg_sum)
+            ph_hit = ready & ((ph_sum - ph_min > cfg.ph_lambda) | (ph_max - ph_neg_sum > cfg.ph_lambda))
+            self._ph_sum[s] = np.where(ph_hit, 0.0, ph_sum)
+            self._ph_min[s] = np.where(ph_hit, 0.0, ph_min)
+            self._ph_neg_sum[s] = np.where(ph_hit, 0.0, ph_neg_sum)
+            self._ph_max[s] = np.where(ph_hit, 0.0, ph_max)
+            ph_hits[idx] = ph_hit
+
+            # Ring buffer for MAD
+            pos_in_ring = self._ring_pos[s]
+            self._ring[s, pos_in_ring] = x
+            self._ring_pos[s] = (pos_in_ring + 1) % cfg.window_size
+
+        drifts = cusum_hits | ph_hits
+        drift_kinds = [
+            ('cusum' if c else 'page_hinkley') if d else None
+            for c, d in zip(cusum_hits.tolist(), drifts.tolist())
+        ]
+
+        return StreamingScores(
+            z_scores=z_scores,
+            mad_scores=mad_scores,
+            ewma=ewma,
+            anomalies=anomalies,
+            drifts=drifts,
+            drift_kinds=drift_kinds
+        )
+
+    def get_state(self, key: str) -> Optional[Dict[str, float]]:
+        """Get the current decayed statistics for a metric key"""
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        variance = float(self._var[slot])
+        return {
+            'count': int(self._count[slot]),
+            'mean': float(self._mean[slot]),
+            'variance': variance,
+            'std_dev': variance ** 0.5,
+            'ewma': float(self._ewma[slot])
+        }
+
+    def reset(self, key: str) -> None:
+        """Forget the state of a metric key"""
+        slot = self._slots.get(key)
+        if slot is None:
+            return
+        for array in (self._count, self._mean, self._var, self._ewma, self._cusum_pos,
+                      self._cusum_neg, self._ph_sum, self._ph_min, self._ph_neg_sum,
+                      self._ph_max, self._ring_pos):
+            array[slot] = 0
+        self._ring[slot] = np.nan
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+
+__all__ = [
+    'StreamingDetectorBank',
+    'StreamingDetectorConfig',
+    'StreamingScores',
+]
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+============================================================================
+工具參數驗證基準測試 (Tool Argument Validation Benchmark)
+============================================================================
+Compares ToolRegistry argument validation with compiled validators against
+the previous interpreted implementation, which walked ``input_schema`` on
+every call. jsonschema is included as a reference when it is installed.
+
+Usage:
+    python tests/performance/bench_tool_validation.py [--number N]
+============================================================================
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from core.mcp_servers_enhanced.schema_validator import compile_schema  # noqa: E402
+from core.mcp_servers_enhanced.tool_registry import (  # noqa: E402
+    ToolRegistry,
+    get_default_tool_definitions,
+)
+
+try:
+    import jsonschema
+except ImportError:  # Optional dependency
+    jsonschema = None
+
+
+_TYPE_MAP = {
+    'string': str,
+    'number': (int, float),
+    'integer': int,
+    'boolean': bool,
+    'array': list,
+    'object': dict
+}
+
+
+def interpreted_validate(schema: Dict[str, Any], arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """The pre-compilation ToolDefinition.validate_input, kept as the baseline"""
+    errors = []
+
+    for field_name in schema.get('required', []):
+        if field_name not in arguments:
+            errors.append(f"Missing required field: {field_name}")
+
+    properties = schema.get('properties', {})
+    for key, value in arguments.items():
+        if key in properties:
+            error = _interpreted_type(key, value, properties[key])
+            if error:
+                errors.append(error)
+
+    return {'valid': len(errors) == 0, 'errors': errors}
+
+
+def _interpreted_type(field_name: str, value: Any, schema: Dict[str, Any]) -> Optional[str]:
+    expected_type = schema.get('type')
+    type_map = dict(_TYPE_MAP)
+    if expected_type and expected_type in type_map:
+        if not isinstance(value, type_map[expected_type]):
+            return f"Field '{field_name}' expected type {expected_type}, got {type(value).__name__}"
+    if 'enum' in schema and value not in schema['enum']:
+        return f"Field '{field_name}' must be one of {schema['enum']}"
+    return None
+
+
+NESTED_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'service': {'type': 'string', 'pattern': '^[a-z][a-z0-9-]*$'},
+        'replicas': {'type': 'integer', 'minimum': 1, 'maximum': 100},
+        'target': {
+            'type': 'object',
+            'properties': {
+                'region': {'type': 'string', 'enum': ['eu', 'us', 'ap']},
+                'zones': {'type': 'array', 'items': {'type': 'string'}},
+            },
+            'required': ['region'],
+        },
+        'steps': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {'name': {'type': 'string'}, 'timeout': {'type': 'number'}},
+                'required': ['name'],
+            },
+        },
+    },
+    'required': ['service', 'target'],
+}
+
+NESTED_ARGUMENTS = {
+    'service': 'api-gateway',
+    'replicas': 3,
+    'target': {'region': 'eu', 'zones': ['a', 'b', 'c']},
+    'steps': [{'name': f'step-{i}', 'timeout': 1.5} for i in range(10)],
+}
+
+
+def _measure(label: str, func: Callable[[], Any], number: int) -> float:
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    per_call_us = best / number * 1e6
+    print(f'  {label:<28} {per_call_us:9.2f} µs/call')
+    return per_call_us
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument('--number', type=int, default=20000, help='calls per timing run')
+    args = parser.parse_args(argv)
+
+    registry = ToolRegistry()
+    for tool in get_default_tool_definitions():
+        registry.register(tool)
+
+    # Top-level schemas: the only shape the interpreted validator understood
+    tool = registry.get('generate-tests')
+    arguments = {'code': 'def f(): pass', 'framework': 'pytest', 'coverage_target': 80}
+    print('generate-tests (flat schema)')
+    interpreted = _measure('interpreted', lambda: interpreted_validate(tool.input_schema, arguments), args.number)
+    compiled = _measure('compiled', lambda: tool.validate_input(arguments), args.number)
+    _measure('compiled via registry', lambda: registry.validate_arguments('generate-tests', arguments), args.number)
+    if jsonschema is not None:
+        reference = jsonschema.Draft7Validator(tool.input_schema)
+        _measure('jsonschema Draft7Validator', lambda: list(reference.iter_errors(arguments)), args.number)
+    print(f'  speedup: {interpreted / compiled:.1f}x')
+
+    # Nested schema: the interpreted validator only checked top-level types
+    validator = compile_schema(NESTED_SCHEMA)
+    print('nested deploy schema')
+    _measure('interpreted (top level only)', lambda: interpreted_validate(NESTED_SCHEMA, NESTED_ARGUMENTS), args.number)
+    _measure('compiled (full depth)', lambda: validator(NESTED_ARGUMENTS, '', []), args.number)
+    if jsonschema is not None:
+        reference = jsonschema.Draft7Validator(NESTED_SCHEMA)
+        _measure('jsonschema Draft7Validator', lambda: list(reference.iter_errors(NESTED_ARGUMENTS)), args.number)
+
+    print('compile cost')
+    _measure('compile_schema (nested)', lambda: compile_schema(NESTED_SCHEMA), max(args.number // 20, 1))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Unit Tests for Action Executor
+行動執行器單元測試
+
+Tests for the ActionExecutor in core/execution_engine/action_executor.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from core.execution_engine.action_executor import (
+    ActionExecutor,
+    ActionPlan,
+    ActionStep,
+    StepStatus,
+)
+
+
+def sleeper(delay: float, log: list[str] | None = None, name: str = "", fail: bool = False):
+    async def handler(params: dict[str, Any], completed: dict[str, Any]) -> dict[str, Any]:
+        if log is not None:
+            log.append(f"start:{name}")
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError(f"{name} failed")
+        return {"step": name}
+
+    return handler
+
+
+def make_plan(specs: list[tuple[str, float, list[str]]], **kwargs: Any) -> ActionPlan:
+    """Build a parallel plan from (id, delay, depends_on) triples."""
+    log = kwargs.pop("log", None)
+    failing = kwargs.pop("failing", ())
+    plan = ActionPlan(name="test", parallel=True, **kwargs)
+    for step_id, delay, deps in specs:
+        plan.steps.append(ActionStep(
+            id=step_id,
+            name=step_id,
+            handler=sleeper(delay, log, step_id, fail=step_id in failing),
+            depends_on=deps,
+            max_retries=0,
+        ))
+    return plan
+
+
+class TestStreamingExecution:
+    """Steps start as soon as their own dependencies finish"""
+
+    @pytest.mark.asyncio
+    async def test_no_layer_barrier(self) -> None:
+        # slow and fast share a layer; after_fast only waits on fast.
+        plan = make_plan([
+            ("slow", 0.3, []),
+            ("fast", 0.01, []),
+            ("after_fast", 0.01, ["fast"]),
+            ("after_slow", 0.01, ["slow"]),
+        ])
+
+        await ActionExecutor().execute_plan(plan)
+
+        assert plan.status == "completed"
+        ids = [r.step_id for r in plan.results]
+        assert ids.index("after_fast") < ids.index("slow")
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap(self) -> None:
+        active = 0
+        peak = 0
+
+        async def handler(params: dict[str, Any], completed: dict[str, Any]) -> None:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        plan = ActionPlan(name="capped", parallel=True, max_concurrency=3)
+        plan.steps = [ActionStep(name=f"s{i}", handler=handler) for i in range(20)]
+
+        await ActionExecutor().execute_plan(plan)
+
+        assert plan.status == "completed"
+        assert peak == 3
+        assert len(plan.results) == 20
+
+    @pytest.mark.asyncio
+    async def test_failure_stops_new_launches_and_skips_dependents(self) -> None:
+        log: list[str] = []
+        plan = make_plan(
+            [
+                ("bad", 0.01, []),
+                ("long", 0.05, []),
+                ("child", 0.01, ["bad"]),
+            ],
+            log=log,
+            failing={"bad"},
+            stop_on_failure=False,
+        )
+
+        await ActionExecutor().execute_plan(plan)
+
+        statuses = {r.step_id: r.status for r in plan.results}
+        assert statuses == {
+            "bad": StepStatus.FAILED,
+            "long": StepStatus.COMPLETED,
+            "child": StepStatus.SKIPPED,
+        }
+        assert "start:child" not in log
+
+    @pytest.mark.asyncio
+    async def test_large_plan_runs_faster_than_layers(self) -> None:
+        # 20 independent chains with one slow head each; layering would
+        # serialize every slow head behind the slowest step of its layer.
+        specs = []
+        for chain in range(20):
+            previous: list[str] = []
+            for depth in range(5):
+                step_id = f"c{chain}_{depth}"
+                delay = 0.05 if depth == chain % 5 else 0.001
+                specs.append((step_id, delay, previous))
+                previous = [step_id]
+
+        plan = make_plan(specs)
+        start = time.perf_counter()
+        await ActionExecutor().execute_plan(plan)
+        elapsed = time.perf_counter() - start
+
+        assert plan.status == "completed"
+        assert elapsed < 0.2
+
+    def test_layers_ignore_cycles(self) -> None:
+        steps = [
+            ActionStep(id="a"),
+            ActionStep(id="b", depends_on=["a"]),
+            ActionStep(id="x", depends_on=["y"]),
+            ActionStep(id="y", depends_on=["x"]),
+        ]
+        layers = ActionExecutor()._build_execution_layers(steps)
+        assert [[s.id for s in layer] for layer in layers] == [["a"], ["b"]]
+
+    @pytest.mark.parametrize("limit", [0, -1])
+    def test_rejects_non_positive_concurrency(self, limit: int) -> None:
+        with pytest.raises(ValueError, match="max_concurrency"):
+            ActionExecutor(max_concurrency=limit)
+        with pytest.raises(ValueError, match="max_concurrency"):
+            ActionPlan(name="bad", parallel=True, max_concurrency=limit)
+
+
+class TestCriticalPath:
+    """Critical path reporting on finished plans"""
+
+    @pytest.mark.asyncio
+    async def test_critical_path_follows_longest_chain(self) -> None:
+        plan = make_plan([
+            ("build", 0.05, []),
+            ("lint", 0.01, []),
+            ("test", 0.05, ["build"]),
+            ("deploy", 0.01, ["test", "lint"]),
+        ])
+
+        await ActionExecutor().execute_plan(plan)
+
+        assert plan.critical_path == ["build", "test", "deploy"]
+        assert plan.critical_path_ms >= 100
@@ -0,0 +1,123 @@
+"""
+Unit Tests for Anomaly Detector
+異常檢測器單元測試
+
+Tests for MetricWindow and AnomalyDetector in core/safety_mechanisms/anomaly_detector.py
+"""
+
+from __future__ import annotations
+
+import random
+import statistics
+
+import pytest
+
+from core.safety_mechanisms.anomaly_detector import (
+    AnomalyDetector,
+    AnomalyType,
+    DetectionStrategy,
+    MetricWindow,
+)
+
+
+class TestMetricWindow:
+    """Tests for the ring-buffer metric window."""
+
+    def test_empty_window(self) -> None:
+        window = MetricWindow(max_size=4)
+        assert len(window) == 0
+        assert window.values == []
+        assert window.mean == 0.0
+        assert window.std_dev == 0.0
+        assert window.latest is None
+        assert window.get_recent(60) == []
+
+    def test_rejects_non_positive_size(self) -> None:
+        with pytest.raises(ValueError):
+            MetricWindow(max_size=0)
+
+    def test_wraps_and_keeps_insertion_order(self) -> None:
+        window = MetricWindow(max_size=3)
+        for i, value in enumerate([1.0, 2.0, 3.0, 4.0, 5.0]):
+            window.add(value, timestamp=float(i))
+
+        assert len(window) == 3
+        assert window.values == [3.0, 4.0, 5.0]
+        assert window.timestamps == [2.0, 3.0, 4.0]
+        assert window.latest == 5.0
+        assert window.min() == 3.0
+        assert window.max() == 5.0
+
+    def test_running_statistics_match_statistics_module(self) -> None:
+        rng = random.Random(7)
+        window = MetricWindow(max_size=50)
+        history = []
+        for i in range(1234):
+            value = 1e6 + rng.gauss(0, 3)
+            history.append(value)
+            window.add(value, timestamp=float(i))
+            if i % 97 == 0 and i > 1:
+                tail = history[-50:]
+                assert window.mean == pytest.approx(statistics.mean(tail), rel=1e-12)
+                assert window.std_dev == pytest.approx(statistics.stdev(tail), rel=1e-6)
+
+    def test_get_recent_uses_time_range(self) -> None:
+        window = MetricWindow(max_size=5)
+        for i in range(8):
+            window.add(float(i), timestamp=100.0 + i)
+
+        # Ring has wrapped: timestamps 103..107 remain
+        assert window.count_recent(2.5, now=107.0) == 3
+        assert window.get_recent(2.5, now=107.0) == [5.0, 6.0, 7.0]
+        assert window.get_recent(100, now=107.0) == [3.0, 4.0, 5.0, 6.0, 7.0]
+        assert window.get_recent(0.5, now=200.0) == []
+
+    def test_timestamps_are_kept_monotonic(self) -> None:
+        window = MetricWindow(max_size=4)
+        window.add(1.0, timestamp=10.0)
+        window.add(2.0, timestamp=5.0)
+        assert window.timestamps == [10.0, 10.0]
+
+
+class TestAnomalyDetectorWindow:
+    """Tests for detector behaviour on top of the window."""
+
+    @pytest.mark.asyncio
+    async def test_statistical_outlier(self) -> None:
+        detector = AnomalyDetector()
+        detector.add_metric("latency", detection_strategy=DetectionStrategy.STATISTICAL)
+        for value in [10, 11, 9, 10, 12, 8, 10, 11, 9, 10]:
+            assert await detector.record("latency", value) is None
+
+        alert = await detector.record("latency", 40)
+        assert alert is not None
+        assert alert.details["z_score"] > 2
+
+    @pytest.mark.asyncio
+    async def test_rate_limit(self) -> None:
+        detector = AnomalyDetector()
+        detector.add_metric(
+            "requests",
+            rate_limit=(3, 60.0),
+            detection_strategy=DetectionStrategy.RATE_LIMIT,
+        )
+        alerts = [await detector.record("requests", 1.0) for _ in range(4)]
+
+        assert alerts[:3] == [None, None, None]
+        assert alerts[3] is not None
+        assert alerts[3].type == AnomalyType.RATE_ANOMALY
+        assert alerts[3].details["rate_count"] == 4
+
+    @pytest.mark.asyncio
+    async def test_metrics_summary(self) -> None:
+        detector = AnomalyDetector()
+        detector.add_metric("cpu", window_size=3)
+        for value in [1.0, 5.0, 3.0, 2.0]:
+            await detector.record("cpu", value)
+
+        summary = detector.get_metrics_summary()["cpu"]
+        assert summary["count"] == 3
+        assert summary["min"] == 2.0
+        assert summary["max"] == 5.0
+        assert summary["latest"] == 2.0
+        assert summary["mean"] == pytest.approx(10.0 / 3)
@@ -0,0 +1,173 @@
+"""
+Unit Tests for Checkpoint Manager
+檢查點管理器單元測試
+
+Tests for the CheckpointManager in core/safety_mechanisms/checkpoint_manager.py
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from core.safety_mechanisms.checkpoint_manager import (
+    INDEX_FILENAME,
+    PACK_FILENAME,
+    CheckpointManager,
+    CheckpointStatus,
+)
+
+
+def make_state(phase: int) -> dict[str, Any]:
+    """A state whose large artifact section stays the same across phases."""
+    return {
+        "phase": phase,
+        "status": "running",
+        "artifacts": {f"file_{i}.py": "x" * 200 for i in range(50)},
+        "results": list(range(phase)),
+    }
+
+
+@pytest.fixture
+def manager() -> CheckpointManager:
+    """Create an in-memory CheckpointManager."""
+    return CheckpointManager(retention_count=10)
+
+
+class TestCheckpointStorage:
+    """Tests for compressed fragment storage."""
+
+    def test_restore_round_trip(self, manager: CheckpointManager) -> None:
+        state = make_state(3)
+        checkpoint_id = manager.create_checkpoint("exec-1", "phase-3", state)
+
+        checkpoint = manager.list_checkpoints("exec-1")[0]
+        assert checkpoint.compressed
+        assert checkpoint.state is None
+        assert checkpoint.status == CheckpointStatus.COMPRESSED
+        assert checkpoint.compressed_size < checkpoint.original_size
+        assert checkpoint.original_size == len(json.dumps(state, sort_keys=True).encode())
+
+        restored = manager.restore_checkpoint(checkpoint_id)
+        assert restored == state
+        assert restored is not state
+        assert checkpoint.status == CheckpointStatus.RESTORED
+
+    def test_state_is_snapshotted(self, manager: CheckpointManager) -> None:
+        state = make_state(1)
+        checkpoint_id = manager.create_checkpoint("exec-1", "phase-1", state)
+        state["results"].append(99)
+        assert manager.restore_checkpoint(checkpoint_id)["results"] == [0]
+
+    def test_unchanged_keys_are_shared(self, manager: CheckpointManager) -> None:
+        for phase in range(5):
+            manager.create_checkpoint("exec-1", f"phase-{phase}", make_state(phase))
+
+        stats = manager.get_storage_stats()
+        # "artifacts" and "status" are stored once and shared four times each
+        assert stats["dedup_hits"] == 8
+        assert stats["fragments"] == 2 + 5 * 2
+
+    def test_retention_releases_fragments(self) -> None:
+        manager = CheckpointManager(retention_count=2)
+        ids = [
+            manager.create_checkpoint("exec-1", f"phase-{phase}", make_state(phase))
+            for phase in range(4)
+        ]
+        assert manager.get_storage_stats()["fragments"] == 2 + 2 * 2
+        with pytest.raises(ValueError):
+            manager.restore_checkpoint(ids[0])
+        assert manager.restore_checkpoint(ids[-1]) == make_state(3)
+
+    def test_uncompressed_checkpoint(self) -> None:
+        manager = CheckpointManager(compression_enabled=False)
+        checkpoint_id = manager.create_checkpoint("exec-1", "phase-1", {"a": 1})
+        checkpoint = manager.list_checkpoints("exec-1")[0]
+        assert not checkpoint.compressed
+        assert checkpoint.state == {"a": 1}
+
+        assert manager.compress_checkpoint(checkpoint_id) > 0
+        assert checkpoint.state is None
+        assert manager.restore_checkpoint(checkpoint_id) == {"a": 1}
+
+    def test_non_string_keys(self, manager: CheckpointManager) -> None:
+        checkpoint_id = manager.create_checkpoint("exec-1", "phase-1", {1: "a", "b": [1, 2]})
+        assert manager.restore_checkpoint(checkpoint_id) == {"1": "a", "b": [1, 2]}
+
+    def test_unique_ids_within_same_millisecond(self, manager: CheckpointManager) -> None:
+        ids = {manager.create_checkpoint("exec-1", "phase", {"n": n}) for n in range(5)}
+        assert len(ids) == 5
+
+
+class TestDiskBackedCheckpoints:
+    """Tests for the pack file and index log under storage_path."""
+
+    def test_persists_across_instances(self, tmp_path: Path) -> None:
+        manager = CheckpointManager(storage_path=tmp_path, retention_count=3)
+        ids = [
+            manager.create_checkpoint("exec-1", f"phase-{phase}", make_state(phase))
+            for phase in range(5)
+        ]
+        manager.close()
+        assert (tmp_path / PACK_FILENAME).exists()
+        assert (tmp_path / INDEX_FILENAME).exists()
+
+        reopened = CheckpointManager(storage_path=tmp_path, retention_count=3)
+        assert [cp.checkpoint_id for cp in reopened.list_checkpoints("exec-1")] == ids[:1:-1]
+        assert reopened.restore_checkpoint(ids[-1]) == make_state(4)
+        reopened.close()
+
+    def test_compaction_reclaims_dead_fragments(self, tmp_path: Path) -> None:
+        manager = CheckpointManager(storage_path=tmp_path, retention_count=100)
+        ids = [
+            manager.create_checkpoint("exec-1", f"phase-{phase}", {"payload": str(phase) * 5000})
+            for phase in range(6)
+        ]
+        for checkpoint_id in ids[:-1]:
+            assert manager.delete_checkpoint(checkpoint_id)
+
+        size_before = (tmp_path / PACK_FILENAME).stat().st_size
+        assert manager.compact_storage() > 0
+        assert (tmp_path / PACK_FILENAME).stat().st_size < size_before
+        assert manager.get_storage_stats()["dead_bytes"] == 0
+        assert manager.restore_checkpoint(ids[-1]) == {"payload": "5" * 5000}
+
+        # New writes after compaction append to the rewritten pack
+        new_id = manager.create_checkpoint("exec-1", "phase-new", {"payload": "new"})
+        manager.close()
+
+        reopened = CheckpointManager(storage_path=tmp_path, retention_count=100)
+        assert reopened.restore_checkpoint(new_id) == {"payload": "new"}
+        assert reopened.restore_checkpoint(ids[-1]) == {"payload": "5" * 5000}
+        assert len(reopened.list_checkpoints("exec-1")) == 2
+        reopened.close()
+
+    def test_compaction_after_restore_keeps_later_fragments(self, tmp_path: Path) -> None:
+        manager = CheckpointManager(storage_path=tmp_path, retention_count=100)
+        first = manager.create_checkpoint("exec-1", "phase-a", {"payload": "a" * 5000})
+        assert manager.restore_checkpoint(first) == {"payload": "a" * 5000}
+
+        # Appended after the pack was mapped by the restore
+        second = manager.create_checkpoint("exec-1", "phase-b", {"payload": "b" * 5000})
+        third = manager.create_checkpoint("exec-1", "phase-c", {"payload": "c" * 5000})
+        assert manager.delete_checkpoint(first)
+        assert manager.compact_storage() > 0
+        assert manager.restore_checkpoint(second) == {"payload": "b" * 5000}
+        manager.close()
+
+        reopened = CheckpointManager(storage_path=tmp_path, retention_count=100)
+        assert reopened.restore_checkpoint(second) == {"payload": "b" * 5000}
+        assert reopened.restore_checkpoint(third) == {"payload": "c" * 5000}
+        reopened.close()
+
+    def test_checksum_mismatch_is_rejected(self, tmp_path: Path) -> None:
+        manager = CheckpointManager(storage_path=tmp_path)
+        checkpoint_id = manager.create_checkpoint("exec-1", "phase-1", {"a": 1})
+        checkpoint = manager.list_checkpoints("exec-1")[0]
+        checkpoint.checksum = "0" * 64
+        with pytest.raises(ValueError, match="Checksum verification failed"):
+            manager.restore_checkpoint(checkpoint_id)
+        manager.close()
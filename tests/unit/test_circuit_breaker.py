@@ -0,0 +1,235 @@
+"""
+Unit Tests for Circuit Breaker
+斷路器單元測試
+
+Tests for the CircuitBreaker in core/safety_mechanisms/circuit_breaker.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from core.safety_mechanisms.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitBreakerOpenError,
+    CircuitBreakerRegistry,
+    CircuitBreakerState,
+    CountBasedWindow,
+    SlidingWindowType,
+    SQLiteStateBackend,
+    TimeBasedWindow,
+)
+
+
+def fail() -> None:
+    raise RuntimeError("dependency down")
+
+
+async def call(breaker: CircuitBreaker, operation=fail) -> None:
+    try:
+        await breaker.execute(operation)
+    except (RuntimeError, CircuitBreakerOpenError):
+        pass
+
+
+def count_config(**overrides) -> CircuitBreakerConfig:
+    values = dict(
+        name="dep",
+        failure_threshold=3,
+        failure_rate_threshold=0.5,
+        sliding_window_type=SlidingWindowType.COUNT_BASED,
+        sliding_window_size=10,
+        timeout=0.05,
+    )
+    values.update(overrides)
+    return CircuitBreakerConfig(**values)
+
+
+class TestSlidingWindows:
+    """Window accounting"""
+
+    def test_count_window_evicts_oldest(self) -> None:
+        window = CountBasedWindow(3)
+        window.record(0, failed=True, slow=False)
+        window.record(0, failed=False, slow=True)
+        window.record(0, failed=False, slow=False)
+        assert window.totals(0) == (3, 1, 1)
+
+        window.record(0, failed=False, slow=False)
+        assert window.totals(0) == (3, 0, 1)
+
+    def test_time_window_expires_buckets(self) -> None:
+        window = TimeBasedWindow(period=10.0, buckets=10)
+        window.record(100.0, failed=True, slow=False)
+        window.record(105.0, failed=False, slow=False)
+        assert window.totals(105.0) == (2, 1, 0)
+        assert window.totals(110.5) == (1, 0, 0)
+        assert window.totals(120.0) == (0, 0, 0)
+
+    def test_round_trip(self) -> None:
+        window = CountBasedWindow(4)
+        window.record(0, failed=True, slow=True)
+        restored = CountBasedWindow(4)
+        restored.loads(window.dumps())
+        assert restored.totals(0) == (1, 1, 1)
+
+        mismatched = CountBasedWindow(5)
+        mismatched.loads(window.dumps())
+        assert mismatched.totals(0) == (0, 0, 0)
+
+
+class TestFailureRate:
+    """Tripping on rates instead of consecutive failures"""
+
+    @pytest.mark.asyncio
+    async def test_interleaved_failures_trip(self) -> None:
+        breaker = CircuitBreaker(count_config())
+        for _ in range(3):
+            await call(breaker, lambda: "ok")
+            await call(breaker)
+        assert breaker.state == CircuitBreakerState.OPEN
+
+    @pytest.mark.asyncio
+    async def test_low_failure_rate_stays_closed(self) -> None:
+        breaker = CircuitBreaker(count_config())
+        for _ in range(4):
+            await call(breaker)
+            for _ in range(4):
+                await call(breaker, lambda: "ok")
+        assert breaker.state == CircuitBreakerState.CLOSED
+        assert breaker.get_stats()["window"]["calls"] == 10
+
+    @pytest.mark.asyncio
+    async def test_slow_calls_trip(self) -> None:
+        breaker = CircuitBreaker(count_config(slow_call_threshold=0.0))
+        for _ in range(3):
+            await call(breaker, lambda: "ok")
+        assert breaker.state == CircuitBreakerState.OPEN
+        assert breaker.metrics.slow_calls == 3
+
+    @pytest.mark.asyncio
+    async def test_excluded_exceptions_are_ignored(self) -> None:
+        breaker = CircuitBreaker(count_config(excluded_exceptions=[RuntimeError]))
+        for _ in range(5):
+            await call(breaker)
+        assert breaker.state == CircuitBreakerState.CLOSED
+        assert breaker.get_stats()["window"]["calls"] == 0
+
+
+class TestHalfOpen:
+    """Bounded recovery probing"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_probes_are_bounded(self) -> None:
+        breaker = CircuitBreaker(count_config(permitted_calls_in_half_open=2))
+        breaker.trip()
+        await asyncio.sleep(0.06)
+
+        release = asyncio.Event()
+        admitted = 0
+
+        async def probe() -> str:
+            nonlocal admitted
+            admitted += 1
+            await release.wait()
+            return "ok"
+
+        tasks = [asyncio.ensure_future(breaker.execute(probe)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        assert admitted == 2
+        assert breaker.get_stats()["half_open_in_flight"] == 2
+
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        rejected = [r for r in results if isinstance(r, CircuitBreakerOpenError)]
+        assert len(rejected) == 3
+        assert breaker.state == CircuitBreakerState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_probe_failure_reopens(self) -> None:
+        breaker = CircuitBreaker(count_config())
+        breaker.trip()
+        await asyncio.sleep(0.06)
+        await call(breaker)
+        assert breaker.state == CircuitBreakerState.OPEN
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_releases_slot(self) -> None:
+        breaker = CircuitBreaker(count_config(permitted_calls_in_half_open=1))
+        breaker.trip()
+        await asyncio.sleep(0.06)
+
+        task = asyncio.ensure_future(breaker.execute(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert breaker.get_stats()["half_open_in_flight"] == 0
+        assert await breaker.execute(lambda: "ok") == "ok"
+
+
+def _fail_in_worker(path: str) -> None:
+    registry = CircuitBreakerRegistry(SQLiteStateBackend(path))
+    registry.register("dep", count_config(timeout=60.0))
+    asyncio.run(call(registry.get("dep")))
+    registry.close()
+
+
+class TestSharedState:
+    """Breaker state shared through SQLite"""
+
+    def test_state_is_shared_between_registries(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "breakers.db")
+        first = CircuitBreakerRegistry(SQLiteStateBackend(path))
+        second = CircuitBreakerRegistry(SQLiteStateBackend(path))
+        first.register("dep", count_config())
+        second.register("dep", count_config())
+
+        first.trip_all()
+        assert second.get("dep").is_open
+
+        second.reset_all()
+        assert first.get("dep").is_closed
+        first.close()
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_lock_wait_does_not_block_event_loop(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "breakers.db")
+        backend = SQLiteStateBackend(path)
+        breaker = CircuitBreaker(count_config(), backend)
+        holder = sqlite3.connect(path, isolation_level=None)
+        holder.execute("BEGIN IMMEDIATE")
+
+        task = asyncio.ensure_future(breaker.execute(lambda: "ok"))
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+        assert not task.done()
+
+        holder.execute("COMMIT")
+        assert await task == "ok"
+        holder.close()
+        backend.close()
+
+    def test_failures_accumulate_across_processes(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "breakers.db")
+        registry = CircuitBreakerRegistry(SQLiteStateBackend(path))
+        breaker = registry.register("dep", count_config(timeout=60.0))
+
+        context = multiprocessing.get_context("spawn")
+        for _ in range(3):
+            worker = context.Process(target=_fail_in_worker, args=(path,))
+            worker.start()
+            worker.join(30)
+            assert worker.exitcode == 0
+
+        assert breaker.is_open
+        with pytest.raises(CircuitBreakerOpenError):
+            asyncio.run(breaker.execute(lambda: "ok"))
+        registry.close()
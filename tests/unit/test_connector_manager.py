@@ -0,0 +1,249 @@
+"""
+Unit Tests for Connector Manager
+連接器管理器單元測試
+
+Tests for the pooled transports in core/execution_engine/connector_manager.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from core.execution_engine.connection_pool import (
+    ConnectionPool,
+    PoolConfig,
+    PoolTimeoutError,
+    Transport,
+)
+from core.execution_engine.connector_manager import (
+    ConnectionConfig,
+    ConnectorManager,
+    ConnectorType,
+)
+
+
+class CountingTransport(Transport):
+    """In-memory transport that records opens, closes and validations."""
+
+    name = "counting"
+
+    def __init__(self) -> None:
+        self.opened = 0
+        self.closed = 0
+        self.healthy = True
+
+    async def open(self) -> dict[str, Any]:
+        self.opened += 1
+        return {"id": self.opened}
+
+    async def close(self, connection: dict[str, Any]) -> None:
+        self.closed += 1
+
+    async def validate(self, connection: dict[str, Any]) -> bool:
+        return self.healthy
+
+    async def execute(self, connection: dict[str, Any], operation: str, params: dict[str, Any]) -> Any:
+        await asyncio.sleep(params.get("delay", 0))
+        if operation == "fail":
+            raise ConnectionResetError("peer reset")
+        return connection["id"]
+
+
+class TestConnectionPool:
+    """Pool sizing, waiting and validation"""
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self) -> None:
+        transport = CountingTransport()
+        pool = ConnectionPool(transport, PoolConfig(min_size=1, max_size=4))
+        await pool.start()
+
+        for _ in range(10):
+            assert await pool.execute("op", {}) == 1
+
+        assert transport.opened == 1
+        assert pool.stats()["checkouts"] == 10
+        await pool.close()
+        assert transport.closed == 1
+
+    @pytest.mark.asyncio
+    async def test_max_size_bounds_concurrency_and_waiters_are_served(self) -> None:
+        transport = CountingTransport()
+        pool = ConnectionPool(transport, PoolConfig(min_size=0, max_size=2))
+
+        results = await asyncio.gather(*(pool.execute("op", {"delay": 0.02}) for _ in range(6)))
+
+        assert sorted(set(results)) == [1, 2]
+        stats = pool.stats()
+        assert stats["size"] == 2
+        assert stats["in_use"] == 0
+        assert stats["idle"] == 2
+        assert stats["waits"] == 4
+        assert stats["wait_time_ms"]["max"] >= 15
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_acquire_times_out(self) -> None:
+        pool = ConnectionPool(CountingTransport(), PoolConfig(min_size=0, max_size=1))
+        held = await pool.acquire()
+
+        with pytest.raises(PoolTimeoutError):
+            await pool.acquire(timeout=0.02)
+
+        assert pool.stats()["timeouts"] == 1
+        assert pool.waiting == 0
+        await pool.release(held)
+        assert (await pool.acquire(timeout=0.02)) is held
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_invalid_connections_are_replaced_on_checkout(self) -> None:
+        transport = CountingTransport()
+        pool = ConnectionPool(transport, PoolConfig(min_size=1, max_size=2))
+        await pool.start()
+
+        transport.healthy = False
+        assert await pool.execute("op", {}) == 2
+
+        stats = pool.stats()
+        assert stats["validation_failures"] == 1
+        assert stats["size"] == 1
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_broken_connection_is_discarded(self) -> None:
+        transport = CountingTransport()
+        pool = ConnectionPool(transport, PoolConfig(min_size=0, max_size=1))
+
+        with pytest.raises(ConnectionResetError):
+            await pool.execute("fail", {})
+
+        assert pool.size == 0
+        assert await pool.execute("op", {}) == 2
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_idle_connections_above_min_are_evicted(self) -> None:
+        transport = CountingTransport()
+        pool = ConnectionPool(transport, PoolConfig(min_size=1, max_size=3, idle_timeout=0.05))
+        await pool.start()
+        await asyncio.gather(*(pool.execute("op", {"delay": 0.01}) for _ in range(3)))
+        assert pool.size == 3
+
+        await asyncio.sleep(0.15)
+
+        assert pool.size == 1
+        assert pool.stats()["evicted"] == 2
+        await pool.close()
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def setup(self) -> None:
+        type(self).connections += 1
+        super().setup()
+
+    def do_GET(self) -> None:
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def http_server() -> Iterator[ThreadingHTTPServer]:
+    RecordingHandler.connections = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestPooledConnectors:
+    """Reference transports through ConnectorManager"""
+
+    @pytest.mark.asyncio
+    async def test_http_keep_alive(self, http_server: ThreadingHTTPServer) -> None:
+        manager = ConnectorManager()
+        config = ConnectionConfig(host="127.0.0.1", port=http_server.server_address[1], pool_size=2)
+        await manager.create("api", ConnectorType.HTTP, config)
+        assert await manager.connect("api")
+
+        for i in range(5):
+            result = await manager.execute("api", "GET", {"path": f"/items/{i}"})
+            assert result["success"]
+            assert result["result"]["status"] == 200
+            assert result["result"]["body"] == {"path": f"/items/{i}"}
+
+        assert RecordingHandler.connections == 1
+        assert manager.get_stats()["pools"]["api"]["checkouts"] == 5
+        health = await manager.health_check("api")
+        assert health["healthy"]
+        assert health["pool"]["size"] == 1
+        await manager.disconnect("api")
+
+    @pytest.mark.asyncio
+    async def test_sqlite_database(self, tmp_path: Path) -> None:
+        manager = ConnectorManager()
+        config = ConnectionConfig(extra={"driver": "sqlite", "database": str(tmp_path / "app.db")})
+        await manager.create("db", ConnectorType.DATABASE, config)
+        assert await manager.connect("db")
+
+        await manager.execute("db", "execute", {"sql": "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)"})
+        await manager.execute("db", "executemany", {
+            "sql": "INSERT INTO users (name) VALUES (?)",
+            "parameters": [("ada",), ("grace",)],
+        })
+        bad = await manager.execute("db", "query", {"sql": "SELECT * FROM missing"})
+        result = await manager.execute("db", "query", {"sql": "SELECT name FROM users ORDER BY id"})
+
+        assert not bad["success"]
+        assert result["result"]["rows"] == [{"name": "ada"}, {"name": "grace"}]
+        # A failed statement does not cost the pooled connection.
+        assert manager.get_stats()["pools"]["db"]["created"] == 1
+        await manager.disconnect("db")
+
+    @pytest.mark.asyncio
+    async def test_file_system(self, tmp_path: Path) -> None:
+        manager = ConnectorManager()
+        config = ConnectionConfig(extra={"base_path": str(tmp_path)})
+        await manager.create("fs", ConnectorType.FILE_SYSTEM, config)
+        assert await manager.connect("fs")
+
+        await manager.execute("fs", "write", {"path": "logs/a.txt", "content": "hello"})
+        read = await manager.execute("fs", "read", {"path": "logs/a.txt"})
+        listing = await manager.execute("fs", "list", {"path": "logs"})
+        escape = await manager.execute("fs", "read", {"path": "../outside.txt"})
+
+        assert read["result"] == "hello"
+        assert listing["result"] == ["a.txt"]
+        assert not escape["success"]
+        await manager.disconnect("fs")
+
+    @pytest.mark.asyncio
+    async def test_connectors_without_endpoint_are_simulated(self) -> None:
+        manager = ConnectorManager()
+        await manager.create("api", ConnectorType.HTTP)
+        assert await manager.connect("api")
+
+        result = await manager.execute("api", "get_users", {"expected_result": {"users": []}})
+
+        assert result["result"] == {"users": []}
+        assert manager.get("api").pool is None
+        assert manager.get_stats()["pools"] == {}
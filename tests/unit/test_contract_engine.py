@@ -12,3 +12,143 @@ def test_contract_registration():
     """Test contract registration"""
     # TODO: Implement test
     pass
+
+
+def _make_contract(name, version="1.0.0", dependencies=None, contract_type=None):
+    """Build a minimal contract definition"""
+    from core.contract_engine import ContractMetadata, ContractType
+    return ContractDefinition(
+        metadata=ContractMetadata(
+            name=name,
+            version=version,
+            contract_type=contract_type or ContractType.SERVICE,
+            description=f"{name} contract",
+            author="tests",
+            dependencies=dependencies or []
+        ),
+        schema={"type": "object", "name": name},
+        validation_rules=[],
+        execution_config={},
+        lifecycle_config={}
+    )
+
+
+def test_sqlite_registry_persists_across_restart(tmp_path):
+    """Test the sqlite backend reloads contracts, indexes and dependencies"""
+    from core.contract_engine import ContractStatus, ContractType
+    db_path = str(tmp_path / "contracts.db")
+
+    registry = ContractRegistry(storage_backend="sqlite", storage_path=db_path)
+    base = _make_contract("base")
+    api = _make_contract("api", dependencies=[base.contract_id], contract_type=ContractType.API)
+    registry.register_many([base, api])
+    registry.update_status(base.contract_id, ContractStatus.ACTIVE)
+    registry.close()
+
+    reopened = ContractRegistry(storage_backend="sqlite", storage_path=db_path)
+    assert reopened.count() == 2
+    assert reopened.get_by_name("api", "1.0.0").contract_id == api.contract_id
+    assert [c.contract_id for c in reopened.get_by_type(ContractType.API)] == [api.contract_id]
+    assert reopened.get(base.contract_id).status == ContractStatus.ACTIVE
+    assert reopened.resolve_dependencies(api.contract_id) == [base.contract_id, api.contract_id]
+    assert reopened.get(api.contract_id).checksum == api.checksum
+    reopened.close()
+
+
+def test_sqlite_registry_bounds_cache(tmp_path):
+    """Test only cache_size hot contracts are held in memory"""
+    registry = ContractRegistry(
+        storage_backend="sqlite", storage_path=str(tmp_path / "contracts.db"), cache_size=2
+    )
+    contracts = [_make_contract(f"contract-{i}") for i in range(5)]
+    registry.register_many(contracts)
+
+    assert len(registry._contracts) == 2
+    assert registry.get(contracts[0].contract_id).metadata.name == "contract-0"
+    assert len(registry._contracts) == 2
+    registry.close()
+
+
+def test_register_many_is_atomic(tmp_path):
+    """Test a rejected bulk registration stores nothing"""
+    registry = ContractRegistry(storage_backend="sqlite", storage_path=str(tmp_path / "contracts.db"))
+    existing = _make_contract("existing")
+    registry.register(existing)
+
+    duplicate = _make_contract("existing")
+    with pytest.raises(ValueError):
+        registry.register_many([_make_contract("fresh"), duplicate])
+
+    assert registry.count() == 1
+    assert registry.get_by_name("fresh", "1.0.0") is None
+    registry.close()
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_register_rejects_duplicate_contract_id(tmp_path, backend):
+    """Test both backends reject a second contract with a taken ID"""
+    registry = ContractRegistry(storage_backend=backend, storage_path=str(tmp_path / "contracts.db"))
+    original = _make_contract("original")
+    registry.register(original)
+
+    clash = _make_contract("clash")
+    clash.contract_id = original.contract_id
+    with pytest.raises(ValueError, match="Contract ID .* already registered"):
+        registry.register(clash)
+    twin = _make_contract("twin")
+    with pytest.raises(ValueError, match="Contract ID .* already registered"):
+        registry.register_many([twin, twin])
+
+    assert registry.count() == 1
+    assert registry.get(original.contract_id).metadata.name == "original"
+    registry.close()
+
+
+def test_register_rejects_dependency_cycle():
+    """Test a registration that closes a dependency cycle is rejected"""
+    from core.contract_engine import ContractDependencyError
+    registry = ContractRegistry()
+    first = _make_contract("first", dependencies=["second-id"])
+    registry.register(first)
+
+    second = _make_contract("second", dependencies=[first.contract_id])
+    second.contract_id = "second-id"
+    with pytest.raises(ContractDependencyError) as exc_info:
+        registry.register(second)
+
+    assert exc_info.value.cycle[0] == "second-id"
+    assert exc_info.value.cycle[-1] == "second-id"
+    assert registry.get("second-id") is None
+
+
+def test_resolve_deep_dependency_chain():
+    """Test resolution of chains deeper than the recursion limit"""
+    registry = ContractRegistry()
+    previous = None
+    contracts = []
+    for i in range(3000):
+        contract = _make_contract(f"chain-{i}", dependencies=[previous] if previous else [])
+        contracts.append(contract)
+        previous = contract.contract_id
+    registry.register_many(contracts)
+
+    order = registry.resolve_dependencies(previous)
+
+    assert order == [c.contract_id for c in contracts]
+
+
+def test_resolution_cache_invalidated_for_dependents():
+    """Test registering a missing dependency refreshes cached closures"""
+    registry = ContractRegistry()
+    app = _make_contract("app", dependencies=["lib-id"])
+    registry.register(app)
+    assert registry.resolve_dependencies(app.contract_id) == ["lib-id", app.contract_id]
+
+    core = _make_contract("core")
+    lib = _make_contract("lib", dependencies=[core.contract_id])
+    lib.contract_id = "lib-id"
+    registry.register_many([core, lib])
+
+    assert registry.resolve_dependencies(app.contract_id) == [
+        core.contract_id, "lib-id", app.contract_id
+    ]
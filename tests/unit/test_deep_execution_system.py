@@ -4,6 +4,7 @@ Test suite for Deep Execution System
 """
 
 import asyncio
+from datetime import UTC, datetime, timedelta
 
 import pytest
 
@@ -547,6 +548,111 @@ class TestOperationScheduler:
         stats = scheduler.get_stats()
         assert stats['operations_completed'] == 1
 
+    @pytest.mark.asyncio
+    async def test_dependents_released_on_completion(self, scheduler):
+        """Test dependents are dispatched once their in-degree reaches zero"""
+        dependent_op = Operation(
+            operation_id='dependent-op',
+            name='dependent',
+            handler=lambda: None,
+            dependencies=['dep-a', 'dep-b']
+        )
+        dispatched = await scheduler.schedule(dependent_op)
+        assert await scheduler.get_next() is None
+
+        scheduler.mark_completed(
+            'dep-a', OperationResult(operation_id='dep-a', status=OperationStatus.COMPLETED)
+        )
+        assert not dispatched.done()
+
+        scheduler.mark_completed(
+            'dep-b', OperationResult(operation_id='dep-b', status=OperationStatus.COMPLETED)
+        )
+        assert dispatched.result() is True
+        assert scheduler.get_stats()['running_count'] == 1
+
+    @pytest.mark.asyncio
+    async def test_blocked_operation_does_not_stall_ready_work(self, scheduler):
+        """Test a blocked high-priority operation does not hold back ready ones"""
+        blocked_op = Operation(
+            operation_id='blocked-op',
+            name='blocked',
+            handler=lambda: None,
+            priority=OperationPriority.CRITICAL,
+            dependencies=['never-completes']
+        )
+        ready_op = Operation(
+            operation_id='ready-op',
+            name='ready',
+            handler=lambda: None,
+            priority=OperationPriority.LOW
+        )
+        await scheduler.schedule(blocked_op)
+        await scheduler.schedule(ready_op)
+
+        next_op = await scheduler.get_next()
+        assert next_op.operation_id == 'ready-op'
+
+    @pytest.mark.asyncio
+    async def test_failed_dependency_blocks_dependents(self, scheduler):
+        """Test dependents of a failed operation are resolved as blocked"""
+        dependent_op = Operation(
+            operation_id='dependent-op',
+            name='dependent',
+            handler=lambda: None,
+            dependencies=['dep-op']
+        )
+        dispatched = await scheduler.schedule(dependent_op)
+
+        scheduler.mark_completed(
+            'dep-op', OperationResult(operation_id='dep-op', status=OperationStatus.FAILED)
+        )
+
+        assert dispatched.done()
+        assert dispatched.result() is False
+        assert scheduler.get_blocking_dependency('dependent-op') == 'dep-op'
+        assert scheduler.get_stats()['operations_blocked'] == 1
+
+    @pytest.mark.asyncio
+    async def test_dispatch_respects_max_concurrent(self):
+        """Test dispatch holds a slot until the operation completes"""
+        scheduler = OperationScheduler(max_concurrent=1)
+        first = Operation(operation_id='first', name='first', handler=lambda: None)
+        second = Operation(operation_id='second', name='second', handler=lambda: None)
+        first_dispatched = await scheduler.schedule(first)
+        second_dispatched = await scheduler.schedule(second)
+
+        assert scheduler.dispatch_ready() == 1
+        assert first_dispatched.result() is True
+        assert not second_dispatched.done()
+
+        scheduler.mark_completed(
+            'first', OperationResult(operation_id='first', status=OperationStatus.COMPLETED)
+        )
+        assert second_dispatched.result() is True
+
+    @pytest.mark.asyncio
+    async def test_dispatch_by_priority_when_slot_frees(self):
+        """Test the highest-priority ready operation gets the next free slot"""
+        scheduler = OperationScheduler(max_concurrent=1)
+        running = Operation(operation_id='running', name='running', handler=lambda: None)
+        await scheduler.schedule(running)
+        scheduler.dispatch_ready()
+
+        low = await scheduler.schedule(Operation(
+            operation_id='low', name='low', handler=lambda: None, priority=OperationPriority.LOW
+        ))
+        high = await scheduler.schedule(Operation(
+            operation_id='high', name='high', handler=lambda: None, priority=OperationPriority.HIGH
+        ))
+        assert scheduler.dispatch_ready() == 0
+
+        scheduler.mark_completed(
+            'running', OperationResult(operation_id='running', status=OperationStatus.COMPLETED)
+        )
+        assert high.result() is True
+        assert not low.done()
+
 
 class TestAuditLogger:
     """Tests for AuditLogger"""
@@ -671,6 +777,48 @@ class TestAuditLogger:
         stats = small_logger.get_stats()
         assert stats['entries_trimmed'] == 5
 
+    def test_indexes_follow_ring_eviction(self, sample_context):
+        """Test filtered lookups only return entries still in the ring"""
+        small_logger = AuditLogger(retention_count=3)
+        for i in range(5):
+            op = Operation(operation_id=f'op-{i % 2}', name='ring', handler=lambda: None)
+            small_logger.log(op, sample_context, f'action-{i}', OperationStatus.COMPLETED)
+
+        # Entries 2, 3 and 4 remain; op-0 owns 2 and 4, op-1 owns 3
+        assert [e.action for e in small_logger.get_entries(operation_id='op-0')] == [
+            'action-2', 'action-4'
+        ]
+        assert [e.action for e in small_logger.get_entries(operation_id='op-1')] == ['action-3']
+        assert [e.action for e in small_logger.get_entries()] == [
+            'action-2', 'action-3', 'action-4'
+        ]
+        assert [e.action for e in small_logger.get_entries(limit=1)] == ['action-4']
+
+    def test_evicted_entries_spill_to_segments(self, tmp_path, sample_operation, sample_context):
+        """Test evicted entries are spilled and queryable by time range"""
+        spill_logger = AuditLogger(
+            retention_count=2, spill_path=str(tmp_path), segment_max_entries=2
+        )
+        for i in range(7):
+            spill_logger.log(
+                sample_operation, sample_context, f'action-{i}', OperationStatus.COMPLETED
+            )
+
+        stats = spill_logger.get_stats()
+        assert stats['entries_spilled'] == 5
+        assert stats['segments'] == 3
+        assert len(spill_logger.get_entries()) == 2
+
+        history = spill_logger.query_history()
+        assert [r['action'] for r in history] == [f'action-{i}' for i in range(7)]
+
+        future = datetime.now(UTC) + timedelta(hours=1)
+        assert spill_logger.query_history(start=future) == []
+
+        spill_logger.close()
+        reopened = AuditLogger(retention_count=2, spill_path=str(tmp_path))
+        assert len(reopened.query_history(operation_id=sample_operation.operation_id)) == 5
+
     def test_get_stats(self, logger, sample_operation, sample_context):
         """Test getting logger statistics"""
         logger.log(sample_operation, sample_context, 'test', OperationStatus.COMPLETED)
@@ -739,6 +887,139 @@ class TestIntegrationFlow:
         finally:
             await system.stop()
 
+    @pytest.mark.asyncio
+    async def test_dependent_operation_waits_for_dependency(self):
+        """Test an operation queued on a dependency runs once it completes"""
+        system = create_deep_execution_system()
+        await system.start()
+
+        try:
+            workflow = system.create_context('dependency-workflow')
+            release = asyncio.Event()
+
+            async def slow_handler():
+                await release.wait()
+                return 'first'
+
+            first_task = asyncio.create_task(system.execute(
+                name='first', handler=slow_handler, context_id=workflow.context_id
+            ))
+            await asyncio.sleep(0)
+            first_id = workflow.operations[0]
+
+            second_task = asyncio.create_task(system.execute(
+                name='second',
+                handler=lambda: 'second',
+                context_id=workflow.context_id,
+                dependencies=[first_id]
+            ))
+            await asyncio.sleep(0.01)
+            assert not second_task.done()
+
+            release.set()
+            first_result = await first_task
+            second_result = await second_task
+
+            assert first_result.status == OperationStatus.COMPLETED
+            assert second_result.status == OperationStatus.COMPLETED
+            assert second_result.output == 'second'
+
+        finally:
+            await system.stop()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('started', [True, False])
+    async def test_dependency_chain_completes(self, started):
+        """Test a dependent operation completes with or without start()"""
+        system = create_deep_execution_system()
+        if started:
+            await system.start()
+
+        try:
+            workflow = system.create_context('chain')
+            release = asyncio.Event()
+
+            async def first_handler():
+                await release.wait()
+                return 'first'
+
+            first_task = asyncio.create_task(system.execute(
+                name='first', handler=first_handler, context_id=workflow.context_id
+            ))
+            await asyncio.sleep(0)
+            second_task = asyncio.create_task(system.execute(
+                name='second',
+                handler=lambda: 'second',
+                context_id=workflow.context_id,
+                dependencies=[workflow.operations[0]],
+                timeout_seconds=1.0
+            ))
+            await asyncio.sleep(0.01)
+            release.set()
+            first, second = await asyncio.gather(first_task, second_task)
+
+            assert first.status == OperationStatus.COMPLETED
+            assert second.status == OperationStatus.COMPLETED
+            assert second.output == 'second'
+
+        finally:
+            await system.stop()
+
+    @pytest.mark.asyncio
+    async def test_execute_respects_max_concurrent(self):
+        """Test operations without dependencies share the concurrency cap"""
+        system = create_deep_execution_system(
+            DeepExecutionConfig(max_concurrent_operations=2)
+        )
+        running = 0
+        peak = 0
+
+        async def handler():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return 'done'
+
+        results = await asyncio.gather(*(
+            system.execute(name=f'op-{i}', handler=handler) for i in range(6)
+        ))
+
+        assert all(r.status == OperationStatus.COMPLETED for r in results)
+        assert peak == 2
+        await system.stop()
+
+    @pytest.mark.asyncio
+    async def test_dependent_operation_fails_fast_on_failed_dependency(self):
+        """Test a failed dependency fails its dependents without waiting"""
+        system = create_deep_execution_system()
+        await system.start()
+
+        try:
+            workflow = system.create_context('failing-workflow')
+
+            def failing_handler():
+                raise RuntimeError('boom')
+
+            failed = await system.execute(
+                name='failing', handler=failing_handler, context_id=workflow.context_id
+            )
+            assert failed.status == OperationStatus.FAILED
+
+            dependent = await system.execute(
+                name='dependent',
+                handler=lambda: 'never',
+                context_id=workflow.context_id,
+                dependencies=[failed.operation_id],
+                timeout_seconds=5.0
+            )
+            assert dependent.status == OperationStatus.FAILED
+            assert dependent.error == f"Dependency failed: {failed.operation_id}"
+
+        finally:
+            await system.stop()
+
     @pytest.mark.asyncio
     async def test_nested_context_execution(self):
         """Test execution across nested contexts"""
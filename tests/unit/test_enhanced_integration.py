@@ -4,8 +4,9 @@ Test suite for Enhanced Integration Components
 """
 
 import asyncio
+import time
 import pytest
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from core.unified_integration import (
     # Service Registry
@@ -25,6 +26,8 @@ from core.unified_integration import (
     CognitiveLayer,
     SignalType,
     create_cognitive_processor,
+    StreamingDetectorBank,
+    StreamingDetectorConfig,
     
     # Configuration Optimizer
     ConfigurationOptimizer,
@@ -170,6 +173,160 @@ class TestServiceRegistry:
         assert 'registrations' in stats
         assert stats['registrations'] >= 1
 
+    def test_discover_by_tag_uses_index(self, registry):
+        """Test tag discovery and tag updates through the inverted index"""
+        first = registry.register_service(
+            name='tagged-a', version='1.0.0', category=ServiceCategory.CORE, tags={'edge', 'critical'}
+        )
+        second = registry.register_service(
+            name='tagged-b', version='1.0.0', category=ServiceCategory.CORE, tags={'edge'}
+        )
+
+        assert [s.service_id for s in registry.discover_by_tag('edge')] == [first, second]
+        assert [s.service_id for s in registry.discover_by_tag('critical')] == [first]
+
+        registry.set_tags(second, {'critical'})
+        assert [s.service_id for s in registry.discover_by_tag('edge')] == [first]
+        assert [s.service_id for s in registry.discover_by_tag('critical')] == [first, second]
+
+        registry.deregister_service(first)
+        assert [s.service_id for s in registry.discover_by_tag('critical')] == [second]
+        assert registry.discover_by_tag('missing') == ()
+
+    def test_discover_healthy_tracks_status_changes(self, registry):
+        """Test health-partitioned views follow update_health"""
+        core = registry.register_service(name='core-svc', version='1.0.0', category=ServiceCategory.CORE)
+        gateway = registry.register_service(
+            name='gateway-svc', version='1.0.0', category=ServiceCategory.GATEWAY
+        )
+        assert registry.discover_healthy() == ()
+
+        registry.update_health(core, ServiceStatus.HEALTHY)
+        registry.update_health(gateway, ServiceStatus.HEALTHY)
+        assert [s.service_id for s in registry.discover_healthy()] == [core, gateway]
+        assert [s.service_id for s in registry.discover_healthy(ServiceCategory.GATEWAY)] == [gateway]
+
+        registry.update_health(core, ServiceStatus.DEGRADED)
+        assert [s.service_id for s in registry.discover_healthy()] == [gateway]
+        assert [s.service_id for s in registry.discover_by_status(ServiceStatus.DEGRADED)] == [core]
+        assert registry.get_stats()['status_counts'] == {'healthy': 1, 'degraded': 1}
+
+    def test_discovery_views_cached_until_mutation(self, registry):
+        """Test discovery returns the cached snapshot until membership changes"""
+        registry.register_service(name='cached', version='1.0.0', category=ServiceCategory.STORAGE)
+
+        first = registry.discover_by_category(ServiceCategory.STORAGE)
+        assert registry.discover_by_category(ServiceCategory.STORAGE) is first
+        assert isinstance(first, tuple)
+        assert registry.get_stats()['view_cache_hits'] == 1
+
+        registry.register_service(name='cached-2', version='1.0.0', category=ServiceCategory.STORAGE)
+        second = registry.discover_by_category(ServiceCategory.STORAGE)
+        assert second is not first
+        assert len(second) == 2
+
+    def test_resolve_dependencies_uses_healthy_index(self, registry):
+        """Test dependency resolution by name or capability among healthy services"""
+        provider = registry.register_service(
+            name='store', version='1.0.0', category=ServiceCategory.STORAGE, provides=['blob']
+        )
+        consumer = registry.register_service(
+            name='app', version='1.0.0', category=ServiceCategory.CORE, dependencies=['store', 'blob']
+        )
+        assert registry.validate_dependencies(consumer) == {'store': False, 'blob': False}
+
+        registry.update_health(provider, ServiceStatus.HEALTHY)
+        resolved = registry.resolve_dependencies(consumer)
+        assert resolved['store'].service_id == provider
+        assert resolved['blob'].service_id == provider
+
+
+class TestServiceRegistryHealthChecks:
+    """Tests for concurrent health checking and heartbeat expiry"""
+
+    @pytest.mark.asyncio
+    async def test_health_checks_run_concurrently_with_timeout(self):
+        """A slow checker times out without delaying the rest of the round"""
+        registry = create_service_registry(RegistryConfig(health_check_timeout_seconds=0.2))
+
+        async def slow():
+            await asyncio.sleep(5)
+            return True
+
+        def blocking():
+            time.sleep(0.1)
+            return True
+
+        async def fast():
+            return {'status': 'degraded'}
+
+        slow_id = registry.register_service('slow', '1.0.0', ServiceCategory.CORE, health_checker=slow)
+        sync_ids = [
+            registry.register_service(f'sync-{i}', '1.0.0', ServiceCategory.CORE, health_checker=blocking)
+            for i in range(4)
+        ]
+        fast_id = registry.register_service('fast', '1.0.0', ServiceCategory.CORE, health_checker=fast)
+
+        started = time.perf_counter()
+        await registry._run_health_checks()
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.35  # round is bounded by the timeout, not the sum of checkers
+        slow_health = registry.get_service(slow_id).health
+        assert slow_health.status == ServiceStatus.UNHEALTHY
+        assert slow_health.details == {'error': 'timeout'}
+        assert all(registry.get_service(sid).health.status == ServiceStatus.HEALTHY for sid in sync_ids)
+        assert registry.get_service(fast_id).health.status == ServiceStatus.DEGRADED
+
+        stats = registry.get_stats()
+        assert stats['health_check_timeouts'] == 1
+        assert stats['health_check_round_ms']['count'] == 1
+        assert stats['health_checker_latency_ms']['count'] == 6
+        assert stats['health_checker_latency_ms']['buckets']['le_inf'] == 6
+        await registry.stop()
+
+    @pytest.mark.asyncio
+    async def test_health_check_concurrency_cap(self):
+        """No more than health_check_concurrency checkers run at once"""
+        registry = create_service_registry(RegistryConfig(health_check_concurrency=2))
+        active = []
+        peak = []
+
+        async def checker():
+            active.append(1)
+            peak.append(len(active))
+            await asyncio.sleep(0.01)
+            active.pop()
+            return True
+
+        for i in range(6):
+            registry.register_service(f'svc-{i}', '1.0.0', ServiceCategory.CORE, health_checker=checker)
+
+        await registry._run_health_checks()
+        assert max(peak) == 2
+        assert len(registry.discover_healthy()) == 6
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_expiry_only_touches_due_services(self):
+        """Stale services are deregistered; refreshed heartbeats supersede old deadlines"""
+        registry = create_service_registry(RegistryConfig(auto_deregister_after_seconds=60))
+        stale = registry.register_service('stale', '1.0.0', ServiceCategory.CORE)
+        fresh = registry.register_service('fresh', '1.0.0', ServiceCategory.CORE)
+        silent = registry.register_service('silent', '1.0.0', ServiceCategory.CORE)
+
+        registry.heartbeat(stale)
+        registry.heartbeat(fresh)
+        past = datetime.now(timezone.utc) - timedelta(seconds=120)
+        registry.get_service(stale).last_heartbeat = past
+        registry._schedule_heartbeat_deadline(registry.get_service(stale))
+        registry.heartbeat(fresh)
+
+        await registry._check_heartbeat_timeouts()
+
+        assert registry.get_service(stale) is None
+        assert registry.get_service(fresh) is not None
+        assert registry.get_service(silent) is not None  # never sent a heartbeat
+        assert registry.get_stats()['pending_heartbeat_deadlines'] == 1
 
 class TestCognitiveProcessor:
     """Tests for EnhancedCognitiveProcessor"""
@@ -245,6 +402,230 @@ class TestCognitiveProcessor:
         assert 'reasoning' in stats
         assert 'execution' in stats
         assert 'proof' in stats
+    
+    @pytest.mark.asyncio
+    async def test_batching_mode_keeps_session_order(self):
+        """Test batched processing keeps per-session signal order"""
+        processor = create_cognitive_processor(ProcessorConfig(
+            enable_batching=True,
+            batch_max_size=8,
+            batch_max_wait_ms=5.0,
+            worker_count=3
+        ))
+        await processor.start()
+        
+        try:
+            for i in range(20):
+                signal = CognitiveSignal(
+                    signal_id=f'batch-signal-{i:02d}',
+                    signal_type=SignalType.TELEMETRY,
+                    layer=CognitiveLayer.L1_PERCEPTION,
+                    source='test',
+                    payload={'value': i}
+                )
+                await processor.submit_signal(signal, session_id=f'session-{i % 4}')
+            
+            await asyncio.wait_for(processor.drain(), timeout=5.0)
+            
+            for session in range(4):
+                context = processor.get_context(f'session-{session}')
+                processed = [h['signal_id'] for h in context.history]
+                assert processed == sorted(processed)
+                assert len(processed) == 5
+            
+            stats = processor.get_stats()
+            assert stats['processor']['signals_processed'] == 20
+            assert stats['processor']['batches_processed'] >= 3
+            assert stats['batch_sizes']['max'] <= 8
+            assert len(stats['shard_queue_sizes']) == 3
+            assert stats['layer_latency_ms']['reasoning']['count'] == 20
+        finally:
+            await processor.stop()
+    
+    @pytest.mark.asyncio
+    async def test_batching_mode_applies_backpressure(self):
+        """Test slow shard workers block submit_signal instead of buffering"""
+        processor = create_cognitive_processor(ProcessorConfig(
+            enable_batching=True,
+            max_signal_queue=4,
+            batch_max_size=4,
+            batch_max_wait_ms=1.0,
+            worker_count=2
+        ))
+        release = asyncio.Event()
+        
+        async def blocked(signal, context, perception_signals=None):
+            await release.wait()
+            return {'success': True}
+        
+        processor._process_safely = blocked
+        await processor.start()
+        
+        async def submit_all():
+            for i in range(50):
+                await processor.submit_signal(CognitiveSignal(
+                    signal_id=f'bp-{i}',
+                    signal_type=SignalType.TELEMETRY,
+                    layer=CognitiveLayer.L1_PERCEPTION,
+                    source='test',
+                    payload={'value': i}
+                ), session_id=f'session-{i % 2}')
+        
+        try:
+            submitter = asyncio.create_task(submit_all())
+            await asyncio.sleep(0.05)
+            assert not submitter.done()
+            assert processor._in_flight < 20
+            assert all(size <= 2 for size in processor.get_stats()['shard_queue_sizes'])
+            
+            release.set()
+            await asyncio.wait_for(submitter, timeout=5.0)
+            await asyncio.wait_for(processor.drain(), timeout=5.0)
+        finally:
+            await processor.stop()
+    
+    @pytest.mark.asyncio
+    async def test_stop_releases_drain_waiters(self):
+        """Test signals dropped by stop() no longer hold drain() open"""
+        processor = create_cognitive_processor(ProcessorConfig(
+            enable_batching=True,
+            batch_max_wait_ms=1.0,
+            worker_count=1
+        ))
+        
+        async def blocked(signal, context, perception_signals=None):
+            await asyncio.Event().wait()
+        
+        processor._process_safely = blocked
+        await processor.start()
+        for i in range(3):
+            await processor.submit_signal(CognitiveSignal(
+                signal_id=f'stop-{i}',
+                signal_type=SignalType.TELEMETRY,
+                layer=CognitiveLayer.L1_PERCEPTION,
+                source='test',
+                payload={'value': i}
+            ), session_id='session')
+        await asyncio.sleep(0.02)
+        
+        drainer = asyncio.create_task(processor.drain())
+        await processor.stop()
+        
+        await asyncio.wait_for(drainer, timeout=1.0)
+        assert processor._in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_perception_process_batch(self, processor):
+        """Test perception detectors run over a whole batch"""
+        processor.perception.add_anomaly_detector(
+            lambda signal, context: {'type': 'spike'} if signal.payload['value'] > 5 else None
+        )
+        signals = [
+            CognitiveSignal(
+                signal_id=f'p-{i}',
+                signal_type=SignalType.TELEMETRY,
+                layer=CognitiveLayer.L1_PERCEPTION,
+                source='test',
+                payload={'value': i}
+            )
+            for i in range(8)
+        ]
+        contexts = [processor._get_or_create_context('batch-session')] * len(signals)
+        
+        outputs = await processor.perception.process_batch(signals, contexts)
+        
+        assert [len(o) for o in outputs] == [1, 1, 1, 1, 1, 1, 2, 2]
+        assert outputs[7][1].signal_type == SignalType.ANOMALY
+        assert processor.perception.get_stats()['anomalies_detected'] == 2
+
+
+class TestStreamingDetectors:
+    """Tests for the built-in streaming perception detectors"""
+    
+    def test_rolling_statistics(self):
+        """Test decayed mean/variance and EWMA per metric key"""
+        bank = StreamingDetectorBank()
+        bank.score_batch(['cpu'] * 4 + ['mem'], [1.0, 2.0, 3.0, 4.0, 50.0])
+        
+        cpu = bank.get_state('cpu')
+        assert cpu['count'] == 4
+        assert cpu['mean'] == pytest.approx(2.5)
+        assert cpu['variance'] == pytest.approx(1.25)
+        assert bank.get_state('mem')['ewma'] == pytest.approx(50.0)
+        assert len(bank) == 2
+    
+    def test_batch_matches_sequential_scoring(self):
+        """Test one vectorized batch call equals feeding samples one by one"""
+        keys = [f'metric-{i % 3}' for i in range(60)]
+        values = [float((i * 7) % 11) + (40.0 if i == 50 else 0.0) for i in range(60)]
+        
+        batched = StreamingDetectorBank(capacity=1).score_batch(keys, values)
+        sequential_bank = StreamingDetectorBank(capacity=1)
+        sequential = [sequential_bank.score_batch([k], [v]) for k, v in zip(keys, values)]
+        
+        assert batched.z_scores.tolist() == pytest.approx([r.z_scores[0] for r in sequential])
+        assert batched.anomalies.tolist() == [bool(r.anomalies[0]) for r in sequential]
+        assert batched.drifts.tolist() == [bool(r.drifts[0]) for r in sequential]
+        assert batched.anomalies[50]
+    
+    def test_cusum_detects_level_shift(self):
+        """Test a sustained shift is reported as drift"""
+        bank = StreamingDetectorBank(StreamingDetectorConfig(min_samples=5))
+        baseline = [10.0 + (i % 3) * 0.5 for i in range(30)]
+        shifted = [12.0 + (i % 3) * 0.5 for i in range(20)]
+        
+        scores = bank.score_batch(['latency'] * 50, baseline + shifted)
+        
+        assert not scores.drifts[:30].any()
+        assert scores.drifts[30:].any()
+    
+    def test_baseline_follows_level_shift(self):
+        """Test outliers stop being flagged once the baseline adapts to a shift"""
+        bank = StreamingDetectorBank(StreamingDetectorConfig(min_samples=5))
+        baseline = [10.0 + (i % 3) * 0.5 for i in range(2000)]
+        shifted = [20.0 + (i % 3) * 0.5 for i in range(400)]
+        
+        scores = bank.score_batch(['latency'] * 2400, baseline + shifted)
+        
+        assert scores.anomalies[2000]
+        assert not scores.anomalies[2200:].any()
+        assert bank.get_state('latency')['mean'] == pytest.approx(20.5, abs=0.1)
+    
+    @pytest.mark.parametrize('shift', [5.0, -5.0])
+    def test_page_hinkley_detects_both_directions(self, shift):
+        """Test Page-Hinkley reports upward and downward mean shifts"""
+        bank = StreamingDetectorBank(StreamingDetectorConfig(min_samples=5, cusum_h=1e9))
+        baseline = [10.0 + (i % 3) * 0.5 for i in range(100)]
+        shifted = [10.0 + shift + (i % 3) * 0.5 for i in range(100)]
+        
+        scores = bank.score_batch(['latency'] * 200, baseline + shifted)
+        
+        assert not scores.drifts[:100].any()
+        assert 'page_hinkley' in scores.drift_kinds[100:]
+    
+    @pytest.mark.asyncio
+    async def test_perception_layer_streaming_detection(self):
+        """Test the perception layer emits anomaly signals from built-in detectors"""
+        processor = create_cognitive_processor(ProcessorConfig(enable_streaming_detectors=True))
+        context = processor._get_or_create_context('streaming-session')
+        signals = [
+            CognitiveSignal(
+                signal_id=f'telemetry-{i}',
+                signal_type=SignalType.TELEMETRY,
+                layer=CognitiveLayer.L1_PERCEPTION,
+                source='test',
+                payload={'metric': 'cpu_usage', 'value': 50.0 + (i % 5) + (100.0 if i == 40 else 0.0)}
+            )
+            for i in range(41)
+        ]
+        
+        outputs = await processor.perception.process_batch(signals, [context] * len(signals))
+        
+        anomalies = [s for s in outputs[40] if s.signal_type == SignalType.ANOMALY]
+        assert len(anomalies) == 1
+        assert anomalies[0].payload['details']['metric'] == 'cpu_usage'
+        assert processor.perception.get_metric_state('cpu_usage')['count'] == 41
+        assert processor.perception.get_stats()['tracked_metrics'] == 1
 
 
 class TestConfigurationOptimizer:
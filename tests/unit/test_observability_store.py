@@ -0,0 +1,153 @@
+"""
+Unit Tests for the Observability Platform Store
+可觀測性平台存儲單元測試
+
+Tests for IndexedRingBuffer and indexed correlation in
+core/monitoring_system/observability_platform.py
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.monitoring_system.observability_platform import (
+    CorrelationEngine,
+    LogEntry,
+    LogLevel,
+    ObservabilityPlatform,
+    TraceSpan,
+    create_log_store,
+    create_span_store,
+)
+
+
+@pytest.fixture
+def base_time() -> datetime:
+    """A minute-aligned reference time."""
+    return datetime(2025, 1, 1, 12, 0, 0)
+
+
+def make_log(base_time: datetime, seconds: float, **kwargs) -> LogEntry:
+    return LogEntry(timestamp=base_time + timedelta(seconds=seconds), **kwargs)
+
+
+class TestIndexedRingBuffer:
+    """Tests for the ring buffer and its indexes."""
+
+    def test_rejects_non_positive_capacity(self) -> None:
+        with pytest.raises(ValueError):
+            create_log_store(capacity=0)
+
+    def test_eviction_updates_indexes(self, base_time: datetime) -> None:
+        store = create_log_store(capacity=3)
+        entries = [
+            make_log(base_time, i * 90, service=f"svc{i % 2}", trace_id=f"t{i}")
+            for i in range(5)
+        ]
+        evicted = [store.append(entry) for entry in entries]
+
+        assert evicted[:3] == [None, None, None]
+        assert evicted[3] is entries[0]
+        assert list(store) == entries[2:]
+        assert len(store) == 3
+        assert store.lookup("trace_id", "t0") == []
+        assert store.lookup("service", "svc0") == [entries[2], entries[4]]
+        assert sorted(store.keys("trace_id")) == ["t2", "t3", "t4"]
+        assert store.in_window(base_time, base_time + timedelta(seconds=200)) == [entries[2]]
+
+    def test_query_combines_filters(self, base_time: datetime) -> None:
+        store = create_log_store()
+        entries = [
+            make_log(base_time, 0, service="a", level=LogLevel.ERROR),
+            make_log(base_time, 10, service="a", level=LogLevel.INFO),
+            make_log(base_time, 20, service="b", level=LogLevel.ERROR),
+            make_log(base_time, 130, service="a", level=LogLevel.ERROR),
+        ]
+        for entry in entries:
+            store.append(entry)
+
+        assert store.query({"service": "a", "level": LogLevel.ERROR}) == [entries[0], entries[3]]
+        assert store.query({"level": LogLevel.ERROR}, since=base_time + timedelta(seconds=5)) == entries[2:]
+        assert store.query(since=base_time + timedelta(seconds=10)) == entries[1:]
+        assert store.query({"service": "missing"}) == []
+        assert store.count("service", "a") == 3
+
+    def test_window_spans_buckets_and_keeps_insertion_order(self, base_time: datetime) -> None:
+        store = create_log_store(bucket_seconds=60)
+        # Out-of-order timestamps across buckets
+        offsets = [150, 30, 61, 59, 240]
+        entries = [make_log(base_time, offset, message=str(offset)) for offset in offsets]
+        for entry in entries:
+            store.append(entry)
+
+        window = store.in_window(base_time + timedelta(seconds=30), base_time + timedelta(seconds=150))
+        assert [e.message for e in window] == ["150", "30", "61", "59"]
+
+    def test_index_keys_are_captured_on_insert(self, base_time: datetime) -> None:
+        store = create_log_store(capacity=1)
+        entry = make_log(base_time, 0, service="a")
+        store.append(entry)
+        entry.service = "b"
+        store.append(make_log(base_time, 1, service="c"))
+        assert store.keys("service") == ["c"]
+
+
+class TestIndexedCorrelation:
+    """Tests for correlation over indexed stores."""
+
+    def test_store_and_list_correlation_agree(self, base_time: datetime) -> None:
+        logs = [
+            make_log(base_time, offset, service=f"svc{offset % 3}", trace_id=f"t{offset % 4}")
+            for offset in range(0, 3600, 7)
+        ]
+        spans = [
+            TraceSpan(trace_id=f"t{i % 4}", service=f"svc{i % 5}", start_time=base_time + timedelta(seconds=i * 11))
+            for i in range(300)
+        ]
+        log_store = create_log_store(capacity=len(logs))
+        span_store = create_span_store(capacity=len(spans))
+        for entry in logs:
+            log_store.append(entry)
+        for span in spans:
+            span_store.append(span)
+
+        engine = CorrelationEngine(time_window_seconds=300)
+        reference = base_time + timedelta(minutes=30)
+        indexed = engine.correlate_by_time(log_store, span_store, ["cpu"], reference)
+        scanned = engine.correlate_by_time(logs, spans, ["cpu"], reference)
+        assert indexed.related_logs == scanned.related_logs
+        assert indexed.related_traces == scanned.related_traces
+        assert indexed.related_services == scanned.related_services
+        assert len(indexed.related_logs) == len(range(1505, 2101, 7))
+
+        by_trace_indexed = engine.correlate_by_trace(log_store, span_store, "t1")
+        by_trace_scanned = engine.correlate_by_trace(logs, spans, "t1")
+        assert by_trace_indexed.related_logs == by_trace_scanned.related_logs
+        assert by_trace_indexed.related_traces == by_trace_scanned.related_traces
+        assert by_trace_indexed.related_services == by_trace_scanned.related_services
+
+    def test_platform_correlation(self) -> None:
+        platform = ObservabilityPlatform(max_retention=100)
+        span = platform.start_trace("checkout", service="orders")
+        child = platform.start_span(span.trace_id, span.span_id, "charge", service="payments")
+        platform.log_error("card declined", service="payments", trace_id=span.trace_id)
+        platform.log_info("unrelated", service="search")
+
+        event = platform.correlate_by_trace(span.trace_id)
+        assert event.related_traces == [span.span_id, child.span_id]
+        assert event.related_services == ["orders", "payments"]
+        assert len(event.related_logs) == 1
+
+        event = platform.correlate_by_time(datetime.now(), ["latency"])
+        assert len(event.related_logs) == 2
+        assert set(event.related_services) == {"orders", "payments", "search"}
+
+    def test_platform_retention(self) -> None:
+        platform = ObservabilityPlatform(max_retention=5)
+        for i in range(12):
+            platform.log_info(f"message {i}", service="svc")
+        logs = platform.get_logs(service="svc")
+        assert [entry.message for entry in logs] == [f"message {i}" for i in range(7, 12)]
+        assert platform.get_platform_summary()["total_logs"] == 5
@@ -0,0 +1,144 @@
+"""
+Unit Tests for Pattern Learner
+模式學習器單元測試
+
+Tests for the MinHash/LSH index and persistence of PatternLearner in
+core/monitoring_system/self_learning.py
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from core.monitoring_system.self_learning import (
+    MinHashLSHIndex,
+    PatternLearner,
+    PatternType,
+    SelfLearningEngine,
+    condition_features,
+)
+
+
+class TestConditionFeatures:
+    """Tests for feature extraction."""
+
+    def test_keys_and_categorical_values(self) -> None:
+        features = condition_features([
+            {"metric": "cpu", "value": 95},
+            {"degraded": True},
+            "not-a-dict",
+        ])
+        assert features == {"metric", "value", "metric=cpu", "degraded", "degraded=True"}
+
+    def test_numeric_values_are_ignored(self) -> None:
+        assert condition_features([{"value": 95}]) == condition_features([{"value": 90}])
+
+
+class TestMinHashLSHIndex:
+    """Tests for the LSH index."""
+
+    def test_rejects_uneven_bands(self) -> None:
+        with pytest.raises(ValueError):
+            MinHashLSHIndex(num_perm=64, bands=10)
+
+    def test_signatures_are_deterministic(self) -> None:
+        features = frozenset({"a", "b", "c"})
+        assert (MinHashLSHIndex().signature(features) == MinHashLSHIndex().signature(features)).all()
+
+    def test_candidates(self) -> None:
+        index = MinHashLSHIndex()
+        base = frozenset(f"f{i}" for i in range(20))
+        index.add("same", base)
+        index.add("close", frozenset(list(base)[:18]) | {"x", "y"})
+        index.add("far", frozenset(f"g{i}" for i in range(20)))
+
+        found = index.candidates(base)
+        assert {"same", "close"} <= found
+        assert "far" not in found
+
+        index.remove("same")
+        assert "same" not in index.candidates(base)
+        assert len(index) == 2
+
+
+class TestPatternLearnerIndex:
+    """Tests for LSH-backed pattern matching."""
+
+    def test_similar_conditions_update_pattern(self) -> None:
+        learner = PatternLearner()
+        first = learner.learn([{"metric": "cpu", "value": 95}], description="High CPU")
+        second = learner.learn([{"metric": "cpu", "value": 90}])
+        assert second is first
+        assert first.frequency == 2
+
+    def test_different_categories_do_not_merge(self) -> None:
+        learner = PatternLearner()
+        cpu = learner.learn([{"metric": "cpu", "value": 95}])
+        memory = learner.learn([{"metric": "memory", "value": 95}])
+        assert memory is not cpu
+        assert len(learner.get_patterns()) == 2
+
+    def test_matches_brute_force(self) -> None:
+        learner = PatternLearner()
+        services = [f"svc{i}" for i in range(40)]
+        for i, service in enumerate(services):
+            learner.learn([{"service": service, "kind": f"k{i}", "region": "eu"}])
+        assert len(learner.get_patterns()) == 40
+
+        for i, service in enumerate(services):
+            conditions = [{"service": service, "kind": f"k{i}", "region": "eu", "extra": 1}]
+            features = condition_features(conditions)
+            expected = max(
+                learner.get_patterns(),
+                key=lambda p: learner._jaccard(features, condition_features(p.conditions))
+            )
+            assert learner.find_similar_pattern(conditions) is expected
+
+    def test_conditionless_patterns_never_match(self) -> None:
+        learner = PatternLearner()
+        first = learner.learn([])
+        second = learner.learn([])
+        assert first is not second
+
+
+class TestPatternPersistence:
+    """Tests for the pattern journal."""
+
+    def test_patterns_survive_restart(self, tmp_path: Path) -> None:
+        path = tmp_path / "patterns.jsonl"
+        engine = SelfLearningEngine(storage_path=path)
+        pattern = engine.learn_from_incident([{"type": "cpu_spike"}], description="CPU spike")
+        engine.learn_from_incident([{"type": "cpu_spike"}])
+        engine.record_remediation_outcome(
+            remediation_id="rem-1",
+            playbook_id="pb-scale",
+            success=True,
+            execution_time_ms=100,
+            anomaly_resolved=True,
+            pattern_id=pattern.pattern_id,
+        )
+
+        restored = PatternLearner(storage_path=path)
+        loaded = restored.get_pattern(pattern.pattern_id)
+        assert loaded.frequency == 2
+        assert loaded.pattern_type == PatternType.INCIDENT
+        assert loaded.successful_remediations == ["pb-scale"]
+        assert restored.find_similar_pattern([{"type": "cpu_spike"}]) is loaded
+
+    def test_journal_is_compacted(self, tmp_path: Path) -> None:
+        path = tmp_path / "patterns.jsonl"
+        learner = PatternLearner(storage_path=path)
+        for _ in range(200):
+            learner.learn([{"type": "disk_full"}])
+
+        assert len(path.read_text().splitlines()) <= 2 * 1 + 64 + 1
+        assert PatternLearner(storage_path=path).get_patterns()[0].frequency == 200
+
+    def test_torn_journal_line_is_skipped(self, tmp_path: Path) -> None:
+        path = tmp_path / "patterns.jsonl"
+        PatternLearner(storage_path=path).learn([{"type": "oom"}])
+        with open(path, "a", encoding="utf-8") as journal:
+            journal.write('{"pattern_id": "trunc')
+        assert len(PatternLearner(storage_path=path).get_patterns()) == 1
@@ -0,0 +1,206 @@
+"""
+Unit Tests for Real-Time Connector
+
+Tests for the stdio JSON-RPC transport in core/mcp_servers_enhanced/realtime_connector.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from core.mcp_servers_enhanced.realtime_connector import (
+    ConnectionConfig,
+    ConnectionStatus,
+    LatencyHistogram,
+    RealTimeConnector,
+    RPCError,
+    TransportType,
+)
+
+# Answers requests concurrently, so responses come back out of order.
+SERVER = r'''
+import asyncio, json, sys
+
+in_flight = 0
+peak = 0
+
+async def handle(request, write):
+    global in_flight, peak
+    in_flight += 1
+    peak = max(peak, in_flight)
+    params = request.get("params") or {}
+    await asyncio.sleep(params.get("delay", 0))
+    in_flight -= 1
+    method = request["method"]
+    if method == "fail":
+        return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32000, "message": "nope"}}
+    if method == "exit":
+        sys.exit(0)
+    if method == "ask":
+        write({"jsonrpc": "2.0", "id": "srv-1", "method": "sampling", "params": {"q": 1}})
+    return {"jsonrpc": "2.0", "id": request["id"], "result": {"echo": params, "peak": peak}}
+
+async def main():
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    def write(message):
+        sys.stdout.write(json.dumps(message) + "\n")
+        sys.stdout.flush()
+
+    async def answer(request):
+        write(await handle(request, write))
+
+    async def answer_batch(requests):
+        write(list(await asyncio.gather(*(handle(r, write) for r in requests))))
+
+    while line := await reader.readline():
+        message = json.loads(line)
+        if isinstance(message, list):
+            asyncio.ensure_future(answer_batch(message))
+        elif "method" in message and "id" in message:
+            asyncio.ensure_future(answer(message))
+        elif message.get("id") == "srv-1":
+            sys.stderr.write("client answered\n")
+            write({"jsonrpc": "2.0", "method": "answered", "params": message})
+
+asyncio.run(main())
+'''
+
+
+@pytest.fixture
+def server_script(tmp_path: Path) -> Path:
+    path = tmp_path / "server.py"
+    path.write_text(SERVER)
+    return path
+
+
+async def connect(connector: RealTimeConnector, script: Path, **overrides):
+    config = ConnectionConfig(
+        server_name="echo",
+        transport=TransportType.STDIO,
+        command=sys.executable,
+        args=[str(script)],
+        heartbeat_interval=0,
+        reconnect=False,
+        **overrides,
+    )
+    return await connector.connect(config)
+
+
+class TestStdioTransport:
+    """JSON-RPC over a server subprocess"""
+
+    @pytest.mark.asyncio
+    async def test_requests_are_pipelined(self, server_script: Path) -> None:
+        connector = RealTimeConnector()
+        await connector.start()
+        connection = await connect(connector, server_script)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            connector.send_request(connection.id, "echo", {"i": i, "delay": 0.2 - i * 0.01})
+            for i in range(20)
+        ))
+        elapsed = time.perf_counter() - start
+
+        assert [r["echo"]["i"] for r in results] == list(range(20))
+        assert elapsed < 1.0
+        assert max(r["peak"] for r in results) > 1
+        assert connection.latency.count == 20
+        assert connector.get_stats()["latency"]["buckets"]["le_inf"] == 20
+        await connector.stop()
+
+    @pytest.mark.asyncio
+    async def test_batch_request(self, server_script: Path) -> None:
+        connector = RealTimeConnector()
+        await connector.start()
+        connection = await connect(connector, server_script)
+
+        results = await connector.send_batch(
+            connection.id, [("echo", {"i": 1}), ("fail", None), ("echo", {"i": 3})]
+        )
+
+        assert results[0]["echo"] == {"i": 1}
+        assert isinstance(results[1], RPCError) and results[1].code == -32000
+        assert results[2]["echo"] == {"i": 3}
+        await connector.stop()
+
+    @pytest.mark.asyncio
+    async def test_error_response_raises(self, server_script: Path) -> None:
+        connector = RealTimeConnector()
+        await connector.start()
+        connection = await connect(connector, server_script)
+
+        with pytest.raises(RPCError, match="nope"):
+            await connector.send_request(connection.id, "fail")
+        await connector.stop()
+
+    @pytest.mark.asyncio
+    async def test_in_flight_limit_applies_backpressure(self, server_script: Path) -> None:
+        connector = RealTimeConnector()
+        await connector.start()
+        connection = await connect(connector, server_script, max_in_flight=2)
+
+        results = await asyncio.gather(*(
+            connector.send_request(connection.id, "echo", {"delay": 0.02}) for _ in range(8)
+        ))
+
+        assert max(r["peak"] for r in results) == 2
+        await connector.stop()
+
+    @pytest.mark.asyncio
+    async def test_server_exit_fails_pending_requests(self, server_script: Path) -> None:
+        connector = RealTimeConnector()
+        await connector.start()
+        connection = await connect(connector, server_script)
+
+        slow = asyncio.ensure_future(connector.send_request(connection.id, "echo", {"delay": 5}))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ConnectionError):
+            await asyncio.gather(connector.send_request(connection.id, "exit"), slow)
+
+        assert connection.status == ConnectionStatus.ERROR
+        assert connector.get_stats()["pending_requests"] == 0
+        await connector.stop()
+
+    @pytest.mark.asyncio
+    async def test_server_requests_are_answered(self, server_script: Path) -> None:
+        connector = RealTimeConnector()
+        await connector.start()
+        answered = asyncio.get_running_loop().create_future()
+        connector.on_message("sampling", lambda params: {"a": params["q"] + 1})
+        connector.on_message("answered", answered.set_result)
+        connection = await connect(connector, server_script)
+
+        await connector.send_request(connection.id, "ask")
+
+        reply = await asyncio.wait_for(answered, 2)
+        assert reply == {"jsonrpc": "2.0", "id": "srv-1", "result": {"a": 2}}
+        await connector.stop()
+
+
+class TestLatencyHistogram:
+    """Histogram accounting"""
+
+    def test_percentiles_and_merge(self) -> None:
+        first = LatencyHistogram()
+        for value in (0.5, 3, 3, 40):
+            first.observe(value)
+        second = LatencyHistogram()
+        second.observe(700)
+
+        first.merge(second)
+
+        data = first.to_dict()
+        assert data["count"] == 5
+        assert data["buckets"]["le_5"] == 3
+        assert data["p50_ms"] == 5
+        assert data["p99_ms"] == 700
+        assert data["max_ms"] == 700
@@ -0,0 +1,170 @@
+"""
+Unit Tests for Rollback System
+回滾系統單元測試
+
+Tests for the RollbackSystem in core/safety_mechanisms/rollback_system.py
+"""
+
+from __future__ import annotations
+
+import copy
+import random
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from core.safety_mechanisms.rollback_system import (
+    RollbackStrategy,
+    RollbackSystem,
+    Snapshot,
+    SnapshotStore,
+    SnapshotType,
+    apply_diff,
+    diff_state,
+)
+
+
+def make_state(version: int) -> dict[str, Any]:
+    """A large state where each version touches a few fields."""
+    return {
+        "config": {"version": version, "flags": {"a": True, "b": version % 2 == 0}},
+        "database": {f"row_{i}": {"value": i, "tag": "x" * 50} for i in range(200)},
+        "events": list(range(version)),
+        f"extra_{version % 3}": {"note": "rotating component"},
+    }
+
+
+def random_value(rng: random.Random, depth: int = 0) -> Any:
+    kind = rng.randrange(5 if depth < 3 else 3)
+    if kind == 0:
+        return rng.randrange(10)
+    if kind == 1:
+        return rng.choice(["a", "b", None, True])
+    if kind == 2:
+        return rng.random()
+    if kind == 3:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(5))]
+    return {f"k{rng.randrange(6)}": random_value(rng, depth + 1) for _ in range(rng.randrange(5))}
+
+
+def snapshot(snapshot_id: str, data: dict[str, Any]) -> Snapshot:
+    return Snapshot(id=snapshot_id, type=SnapshotType.FULL, timestamp=datetime.now(), data=data)
+
+
+class TestDiff:
+    """Structural diff round trips"""
+
+    def test_random_round_trips(self) -> None:
+        rng = random.Random(7)
+        for _ in range(500):
+            old, new = random_value(rng), random_value(rng)
+            ops = diff_state(old, new)
+            assert apply_diff(copy.deepcopy(old), ops) == new
+
+    def test_small_change_gives_small_diff(self) -> None:
+        ops = diff_state(make_state(1), make_state(2))
+        paths = [op["path"] for op in ops]
+        assert ["config", "version"] in paths
+        assert all(path[:1] != ["database"] for path in paths)
+
+    def test_appended_list_uses_extend(self) -> None:
+        ops = diff_state({"log": [1, 2]}, {"log": [1, 2, 3]})
+        assert ops == [{"op": "extend", "path": ["log"], "value": [3]}]
+
+    def test_applied_values_do_not_alias_diff(self) -> None:
+        ops = diff_state({}, {"a": {"b": 1}})
+        state = apply_diff({}, ops)
+        state["a"]["b"] = 2
+        assert ops[0]["value"] == {"b": 1}
+
+
+class TestSnapshotStore:
+    """Diff-chained storage"""
+
+    def test_every_snapshot_materializes(self) -> None:
+        store = SnapshotStore(max_chain_length=4)
+        for version in range(20):
+            store.add(snapshot(f"s{version}", make_state(version)))
+
+        for version in range(20):
+            assert store.materialize(f"s{version}") == make_state(version)
+        stats = store.stats()
+        assert stats["bases"] == 4
+        assert stats["diffs"] == 16
+
+    def test_removal_rebases_successor(self) -> None:
+        store = SnapshotStore(max_chain_length=3)
+        for version in range(10):
+            store.add(snapshot(f"s{version}", make_state(version)))
+
+        for removed in ["s0", "s5", "s9", "s2"]:
+            store.remove(removed)
+        for snapshot_id in store.ids():
+            assert store.materialize(snapshot_id) == make_state(int(snapshot_id[1:]))
+
+        store.add(snapshot("s10", make_state(10)))
+        assert store.materialize("s10") == make_state(10)
+
+    def test_stored_data_is_isolated(self) -> None:
+        store = SnapshotStore()
+        data = {"a": {"b": 1}}
+        store.add(snapshot("s0", data))
+        data["a"]["b"] = 2
+        restored = store.materialize("s0")
+        restored["a"]["b"] = 3
+        assert store.materialize("s0") == {"a": {"b": 1}}
+
+    def test_spill_and_compaction(self, tmp_path: Path) -> None:
+        path = tmp_path / "snapshots.bin"
+        store = SnapshotStore(max_chain_length=3, spill_path=path, compaction_min_bytes=1)
+        for version in range(12):
+            store.add(snapshot(f"s{version}", make_state(version)))
+            if len(store) > 5:
+                store.remove(store.ids()[0])
+
+        assert store.stats()["spill_dead_bytes"] <= store.stats()["spill_live_bytes"]
+        assert path.stat().st_size < 12 * len(str(make_state(0)))
+        for snapshot_id in store.ids():
+            assert store.materialize(snapshot_id) == make_state(int(snapshot_id[1:]))
+        store.close()
+
+
+class TestRollbackSystemStorage:
+    """RollbackSystem on top of the diff chain"""
+
+    @pytest.mark.asyncio
+    async def test_eviction_keeps_latest(self) -> None:
+        rollback = RollbackSystem(max_snapshots=5, max_chain_length=2)
+        ids = [await rollback.create_snapshot(make_state(v)) for v in range(12)]
+
+        assert [s["id"] for s in rollback.list_snapshots()] == ids[-5:]
+        assert rollback.get_snapshot(ids[-5]).data == make_state(7)
+        assert rollback.get_snapshot(ids[0]) is None
+
+    @pytest.mark.asyncio
+    async def test_incremental_rollback_always_restores_handled_components(self) -> None:
+        state = {"config": {"v": 1}, "cache": {"hits": 0}}
+        restores: list[str] = []
+        rollback = RollbackSystem()
+        for name in state:
+            rollback.register_component(
+                name=name,
+                save_handler=lambda name=name: copy.deepcopy(state[name]),
+                restore_handler=lambda value, name=name: (
+                    restores.append(name), state.__setitem__(name, value)
+                ),
+            )
+
+        target = await rollback.create_snapshot()
+        state["config"]["v"] = 2
+        await rollback.create_snapshot()
+        state["cache"]["hits"] = 5  # Drift after the last snapshot
+
+        result = await rollback.rollback(target, RollbackStrategy.INCREMENTAL)
+
+        assert result.success
+        assert sorted(result.components_restored) == ["cache", "config"]
+        assert sorted(restores) == ["cache", "config"]
+        assert state == {"config": {"v": 1}, "cache": {"hits": 0}}
@@ -0,0 +1,156 @@
+"""
+Unit Tests for Safety Net
+多層安全網單元測試
+
+Tests for the SafetyNet in core/safety_mechanisms/safety_net.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from core.safety_mechanisms.safety_net import (
+    SafetyCheck,
+    SafetyCheckError,
+    SafetyLayer,
+    SafetyNet,
+    SafetyNetConfig,
+    payload_digest,
+)
+
+
+def async_check(name: str, delay: float, verdict: bool = True, **kwargs: Any) -> SafetyCheck:
+    async def check_function(data: Any) -> bool:
+        await asyncio.sleep(delay)
+        return verdict
+
+    return SafetyCheck(
+        name=name,
+        description=name,
+        layer=kwargs.pop("layer", SafetyLayer.LAYER_3_RESOURCE_LIMIT),
+        check_function=check_function,
+        **kwargs,
+    )
+
+
+class TestParallelLayers:
+    """Concurrent checks within a layer"""
+
+    @pytest.mark.asyncio
+    async def test_layer_checks_run_concurrently(self) -> None:
+        safety = SafetyNet()
+        for i in range(5):
+            safety.add_check(async_check(f"slow_{i}", 0.1))
+
+        start = time.perf_counter()
+        results = await safety.validate({"value": 1})
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.3
+        names = [r.check_name for r in results]
+        assert names[names.index("slow_0"):names.index("slow_0") + 5] == [
+            f"slow_{i}" for i in range(5)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_timeout_fails_check(self) -> None:
+        safety = SafetyNet(SafetyNetConfig(check_timeout=0.05))
+        safety.add_check(async_check("hang", 10))
+
+        results = await safety.validate({"value": 1})
+        hang = next(r for r in results if r.check_name == "hang")
+
+        assert not hang.passed
+        assert "Timed out" in hang.error
+        assert safety.get_stats()["check_latency"]["hang"]["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_blocking_failure_cancels_layer_and_later_layers(self) -> None:
+        safety = SafetyNet()
+        safety.add_check(async_check("deny", 0.01, verdict=False))
+        safety.add_check(async_check("slow", 5))
+        safety.add_check(async_check(
+            "output", 0, layer=SafetyLayer.LAYER_5_OUTPUT_VALIDATION
+        ))
+
+        start = time.perf_counter()
+        with pytest.raises(SafetyCheckError):
+            await safety.execute(lambda x: x, {"value": 1})
+
+        assert time.perf_counter() - start < 1
+        names = [r.check_name for r in safety._results_history[-1]]
+        assert "deny" in names
+        assert "slow" not in names
+        assert "output" not in names
+
+    @pytest.mark.asyncio
+    async def test_non_blocking_failure_does_not_block(self) -> None:
+        safety = SafetyNet()
+        safety.add_check(async_check("advisory", 0, verdict=False, blocking=False))
+
+        assert await safety.execute(lambda x: x["value"], {"value": 3}) == 3
+
+
+class TestVerdictCache:
+    """Content-hash keyed caching of pure checks"""
+
+    @pytest.mark.asyncio
+    async def test_pure_verdicts_are_cached(self) -> None:
+        calls = []
+        safety = SafetyNet()
+        safety.add_check(SafetyCheck(
+            name="schema",
+            description="schema",
+            layer=SafetyLayer.LAYER_1_INPUT_VALIDATION,
+            check_function=lambda x: calls.append(x) or True,
+            pure=True,
+        ))
+
+        await safety.validate({"a": 1, "b": 2})
+        await safety.validate({"b": 2, "a": 1})
+        await safety.validate({"a": 2})
+
+        assert len(calls) == 2
+        latency = safety.get_stats()["check_latency"]["schema"]
+        assert latency["cache_hits"] == 1
+        assert latency["calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_expires(self) -> None:
+        calls = []
+        safety = SafetyNet(SafetyNetConfig(cache_ttl=0.05))
+        safety.add_check(SafetyCheck(
+            name="schema",
+            description="schema",
+            layer=SafetyLayer.LAYER_1_INPUT_VALIDATION,
+            check_function=lambda x: calls.append(x) or True,
+            pure=True,
+        ))
+
+        await safety.validate({"a": 1})
+        await asyncio.sleep(0.06)
+        await safety.validate({"a": 1})
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_impure_checks_always_run(self) -> None:
+        calls = []
+        safety = SafetyNet()
+        safety.add_check(SafetyCheck(
+            name="quota",
+            description="quota",
+            layer=SafetyLayer.LAYER_3_RESOURCE_LIMIT,
+            check_function=lambda x: calls.append(x) or True,
+        ))
+
+        await safety.validate({"a": 1})
+        await safety.validate({"a": 1})
+        assert len(calls) == 2
+
+    def test_unencodable_payloads_are_not_hashed(self) -> None:
+        assert payload_digest({"a": [1, 2]}) == payload_digest({"a": [1, 2]})
+        assert payload_digest({"a": object()}) is None
@@ -0,0 +1,152 @@
+"""
+Unit Tests for Time Series Store
+時間序列存儲單元測試
+
+Tests for TimeSeriesStore in core/monitoring_system/time_series_store.py
+and the MetricsCollector built on top of it.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from core.monitoring_system.intelligent_monitoring import MetricsCollector
+from core.monitoring_system.time_series_store import TimeSeriesStore
+
+
+@pytest.fixture
+def base_time() -> float:
+    """A minute-aligned timestamp inside the default retention window."""
+    return math.floor((time.time() - 1800) / 60) * 60
+
+
+class TestTimeSeriesStore:
+    """Tests for columnar storage, retention and rollups."""
+
+    def test_query_returns_sorted_arrays(self, base_time: float) -> None:
+        store = TimeSeriesStore(chunk_size=4)
+        for i in range(10):
+            store.append("cpu", float(i), timestamp=base_time + i)
+
+        timestamps, values = store.query("cpu", start=base_time + 3, end=base_time + 7)
+        assert isinstance(values, np.ndarray)
+        assert values.tolist() == [3.0, 4.0, 5.0, 6.0]
+        assert timestamps.tolist() == [base_time + i for i in range(3, 7)]
+
+    def test_append_after_query(self, base_time: float) -> None:
+        store = TimeSeriesStore(chunk_size=8)
+        store.append("cpu", 1.0, timestamp=base_time)
+        _, values = store.query("cpu")
+        store.append("cpu", 2.0, timestamp=base_time + 1)
+        assert values.tolist() == [1.0]
+        assert store.query("cpu")[1].tolist() == [1.0, 2.0]
+
+    def test_timestamps_never_go_back(self, base_time: float) -> None:
+        store = TimeSeriesStore()
+        store.append("cpu", 1.0, timestamp=base_time + 10)
+        assert store.append("cpu", 2.0, timestamp=base_time) == base_time + 10
+
+    def test_label_sets_are_interned(self, base_time: float) -> None:
+        store = TimeSeriesStore()
+        store.append("cpu", 1.0, labels={"host": "a", "dc": "x"}, timestamp=base_time)
+        store.append("mem", 2.0, labels={"dc": "x", "host": "a"}, timestamp=base_time)
+        store.append("cpu", 3.0, labels={"host": "b"}, timestamp=base_time + 1)
+
+        cpu_a, = store.series("cpu", {"host": "a", "dc": "x"})
+        mem_a, = store.series("mem", {"host": "a", "dc": "x"})
+        assert cpu_a.labels is mem_a.labels
+        assert store.get_stats()["label_sets"] == 2
+        assert store.query("cpu")[1].tolist() == [1.0, 3.0]
+        assert store.query("cpu", labels={"host": "b"})[1].tolist() == [3.0]
+        assert store.latest("cpu") == (base_time + 1, 3.0, (("host", "b"),))
+
+    def test_retention_drops_whole_chunks(self) -> None:
+        store = TimeSeriesStore(retention_seconds=100, chunk_size=10)
+        now = time.time()
+        for i in range(50):
+            store.append("cpu", float(i), timestamp=now - 200 + i * 4)
+
+        stats = store.get_stats()
+        # Samples span 196s; only chunks fully older than the cutoff go
+        assert stats["chunks"] == 3
+        assert stats["samples"] == 30
+        timestamps, _ = store.query("cpu")
+        assert timestamps.min() >= now - 100
+
+    def test_memory_per_sample(self, base_time: float) -> None:
+        store = TimeSeriesStore(chunk_size=1024, rollup_tiers=())
+        for i in range(4096):
+            store.append("cpu", float(i), timestamp=base_time + i * 0.1)
+        assert store.get_stats()["memory_bytes"] / 4096 < 20
+
+    def test_rollups(self, base_time: float) -> None:
+        store = TimeSeriesStore()
+        for i in range(180):
+            store.append("cpu", float(i), labels={"host": "a"}, timestamp=base_time + i)
+            store.append("cpu", float(i) * 2, labels={"host": "b"}, timestamp=base_time + i)
+
+        minute = store.rollups("cpu", resolution=60)
+        assert minute["timestamp"].tolist() == [base_time, base_time + 60, base_time + 120]
+        assert minute["count"].tolist() == [120, 120, 120]
+        assert minute["min"][1] == 60.0
+        assert minute["max"][1] == 238.0
+        assert minute["sum"][0] == sum(range(60)) * 3
+
+        hourly = store.rollups("cpu", resolution=3600, labels={"host": "a"})
+        assert hourly["count"].sum() == 180
+
+        with pytest.raises(ValueError):
+            store.rollups("cpu", resolution=5)
+
+    def test_summary_matches_raw_statistics(self, base_time: float) -> None:
+        rng = np.random.default_rng(3)
+        samples = 1000 + rng.normal(0, 5, size=900)
+        store = TimeSeriesStore()
+        for i, value in enumerate(samples):
+            store.append("lat", float(value), timestamp=base_time + i * 0.7)
+
+        since = base_time + 95.5
+        summary = store.summary("lat", since=since)
+        expected = samples[np.arange(900) * 0.7 + base_time >= since]
+        assert summary.count == len(expected)
+        assert summary.min == expected.min()
+        assert summary.max == expected.max()
+        assert summary.mean == pytest.approx(expected.mean(), rel=1e-12)
+        assert summary.stdev == pytest.approx(expected.std(ddof=1), rel=1e-9)
+
+
+class TestMetricsCollectorStore:
+    """Tests for MetricsCollector on the columnar store."""
+
+    def test_statistics_and_metrics(self) -> None:
+        collector = MetricsCollector()
+        for value in [10, 20, 30, 40, 50]:
+            collector.collect("test", value, labels={"host": "a"})
+
+        stats = collector.get_statistics("test")
+        assert stats == {
+            "count": 5, "min": 10.0, "max": 50.0,
+            "mean": 30.0, "median": 30.0, "stdev": pytest.approx(15.811388, rel=1e-6),
+        }
+        metrics = collector.get_metrics("test")
+        assert [m.value for m in metrics] == [10, 20, 30, 40, 50]
+        assert metrics[0].labels == {"host": "a"}
+        assert isinstance(metrics[0].timestamp, datetime)
+        assert collector.get_latest("test").value == 50
+        assert collector.get_statistics("missing") == {}
+
+    def test_query_and_rollups(self) -> None:
+        collector = MetricsCollector()
+        collector.collect("cpu", 1.0)
+        collector.collect("cpu", 3.0)
+
+        _, values = collector.query("cpu")
+        assert values.tolist() == [1.0, 3.0]
+        rollups = collector.get_rollups("cpu", resolution=3600)
+        assert rollups["count"].sum() == 2
+        assert rollups["sum"].sum() == 4.0
@@ -0,0 +1,195 @@
+"""
+Unit Tests for Tool Registry
+
+Tests for compiled argument validation in core/mcp_servers_enhanced/tool_registry.py
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from core.mcp_servers_enhanced.schema_validator import (
+    ValidatorCache,
+    compile_schema,
+    schema_hash,
+    validator_cache,
+)
+from core.mcp_servers_enhanced.tool_registry import (
+    ToolDefinition,
+    ToolRegistry,
+    get_default_tool_definitions,
+)
+
+DEPLOY_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "service": {"type": "string", "pattern": "^[a-z][a-z0-9-]*$"},
+        "replicas": {"type": "integer", "minimum": 1, "maximum": 10},
+        "owner": {"type": "string", "format": "email"},
+        "target": {
+            "type": "object",
+            "properties": {
+                "region": {"type": "string", "enum": ["eu", "us"]},
+                "zones": {"type": "array", "items": {"type": "string"}, "minItems": 1, "uniqueItems": True},
+            },
+            "required": ["region"],
+            "additionalProperties": False,
+        },
+        "steps": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"name": {"type": "string"}, "timeout": {"type": "number"}},
+                "required": ["name"],
+            },
+        },
+        "notes": {"type": ["string", "null"]},
+    },
+    "required": ["service", "target"],
+}
+
+
+def validate(schema: dict[str, Any], value: Any) -> list[str]:
+    errors: list[str] = []
+    compile_schema(schema)(value, "", errors)
+    return errors
+
+
+class TestCompiledValidation:
+    """Keyword coverage of compiled validators"""
+
+    def test_valid_nested_arguments(self) -> None:
+        arguments = {
+            "service": "api-gateway",
+            "replicas": 3,
+            "owner": "ops@example.com",
+            "target": {"region": "eu", "zones": ["a", "b"]},
+            "steps": [{"name": "build", "timeout": 1.5}, {"name": "ship"}],
+            "notes": None,
+        }
+        assert validate(DEPLOY_SCHEMA, arguments) == []
+
+    def test_nested_errors_report_paths(self) -> None:
+        errors = validate(DEPLOY_SCHEMA, {
+            "service": "API",
+            "replicas": 0,
+            "owner": "nobody",
+            "target": {"region": "asia", "zones": ["a", "a"], "extra": 1},
+            "steps": [{"timeout": "slow"}],
+            "notes": 5,
+        })
+
+        assert errors == [
+            "Field 'service' must match pattern '^[a-z][a-z0-9-]*$'",
+            "Field 'replicas' must be >= 1",
+            "Field 'owner' is not a valid email",
+            "Field 'target.region' must be one of ['eu', 'us']",
+            "Field 'target.zones' must not contain duplicate items",
+            "Unexpected field: target.extra",
+            "Missing required field: steps[0].name",
+            "Field 'steps[0].timeout' expected type number, got str",
+            "Field 'notes' expected type string or null, got int",
+        ]
+
+    def test_booleans_are_not_numbers(self) -> None:
+        assert validate({"type": "integer"}, True) == ["Arguments expected type integer, got bool"]
+        assert validate({"type": "number"}, 2.5) == []
+        assert validate({"enum": [1, 2]}, True) == ["Arguments must be one of [1, 2]"]
+
+    @pytest.mark.parametrize("fmt, good, bad", [
+        ("date-time", "2024-05-01T12:00:00Z", "2024-05-01"),
+        ("date", "2024-05-01", "05/01/2024"),
+        ("uri", "https://example.com/x", "example"),
+        ("uuid", "12345678-1234-5678-1234-567812345678", "1234"),
+        ("ipv4", "10.0.0.1", "::1"),
+        ("ipv6", "::1", "10.0.0.1"),
+        ("hostname", "api.example.com", "-bad-.com"),
+    ])
+    def test_formats(self, fmt: str, good: str, bad: str) -> None:
+        schema = {"type": "string", "format": fmt}
+        assert validate(schema, good) == []
+        assert validate(schema, bad) == [f"Arguments is not a valid {fmt}"]
+
+    def test_combinators(self) -> None:
+        schema = {"anyOf": [{"type": "string"}, {"type": "integer", "minimum": 0}]}
+        assert validate(schema, "x") == []
+        assert validate(schema, -1) == ["Arguments does not match any of the allowed schemas"]
+
+        one_of = {"oneOf": [{"type": "number"}, {"type": "integer"}]}
+        assert validate(one_of, 1.5) == []
+        assert validate(one_of, 1) == ["Arguments must match exactly one schema, matched 2"]
+
+    def test_invalid_pattern_is_rejected_at_compile_time(self) -> None:
+        with pytest.raises(ValueError, match="Invalid pattern"):
+            compile_schema({"type": "string", "pattern": "("})
+
+
+class TestValidatorCache:
+    """Caching by schema hash"""
+
+    def test_hash_ignores_key_order(self) -> None:
+        assert schema_hash({"a": 1, "b": [1, 2]}) == schema_hash({"b": [1, 2], "a": 1})
+
+    def test_equal_schemas_share_a_validator(self) -> None:
+        cache = ValidatorCache(max_size=2)
+        first = cache.get({"type": "string"})
+        assert cache.get({"type": "string"}) is first
+        cache.get({"type": "integer"})
+        cache.get({"type": "boolean"})
+
+        assert cache.info() == {"size": 2, "max_size": 2, "hits": 1, "misses": 3}
+        assert cache.get({"type": "string"}) is not first
+
+
+class TestToolRegistryValidation:
+    """Validators compiled at registration"""
+
+    def test_register_compiles_and_reregister_invalidates(self) -> None:
+        registry = ToolRegistry()
+        schema = {"type": "object", "properties": {"n": {"type": "integer"}}}
+        tool = ToolDefinition(name="count", description="count", input_schema=schema)
+        registry.register(tool)
+        compiled = tool._validator
+
+        assert registry.validate_arguments("count", {"n": 1})["valid"]
+        assert tool._validator is compiled
+
+        schema["properties"]["n"]["maximum"] = 5
+        registry.register(tool)
+
+        assert tool._validator is not compiled
+        assert registry.validate_arguments("count", {"n": 6})["errors"] == ["Field 'n' must be <= 5"]
+
+    def test_replacing_schema_recompiles_on_next_validation(self) -> None:
+        tool = ToolDefinition(name="t", description="t", input_schema={"required": ["a"]})
+        assert not tool.validate_input({})["valid"]
+
+        tool.input_schema = {}
+        assert tool.validate_input({})["valid"]
+
+    def test_bad_schema_is_not_registered(self) -> None:
+        registry = ToolRegistry()
+        tool = ToolDefinition(
+            name="bad",
+            description="bad",
+            input_schema={"properties": {"x": {"type": "string", "pattern": "["}}},
+        )
+
+        with pytest.raises(ValueError, match="Invalid input schema for tool bad"):
+            registry.register(tool)
+        assert not registry.exists("bad")
+
+    def test_default_tools_keep_previous_messages(self) -> None:
+        registry = ToolRegistry()
+        for tool in get_default_tool_definitions():
+            registry.register(tool)
+
+        result = registry.validate_arguments("scan-vulnerabilities", {"severity_threshold": "urgent"})
+
+        assert result["errors"] == [
+            "Missing required field: code",
+            "Field 'severity_threshold' must be one of ['low', 'medium', 'high', 'critical']",
+        ]
+        assert registry.get_stats()["validator_cache"]["size"] == len(validator_cache)
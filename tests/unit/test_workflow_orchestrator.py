@@ -0,0 +1,157 @@
+"""
+Unit Tests for Workflow Orchestrator
+
+Tests for the WorkflowOrchestrator in core/mcp_servers_enhanced/workflow_orchestrator.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from core.mcp_servers_enhanced.workflow_orchestrator import (
+    StepStatus,
+    Workflow,
+    WorkflowOrchestrator,
+    WorkflowResult,
+    WorkflowStatus,
+    WorkflowStep,
+)
+
+
+class RecordingExecutor:
+    """Tool executor whose tool name encodes a delay, e.g. ``sleep:0.1``."""
+
+    def __init__(self, failing: set[str] | None = None) -> None:
+        self.calls: list[str] = []
+        self.active = 0
+        self.peak = 0
+        self.failing = failing or set()
+
+    async def __call__(self, tool: str, arguments: dict[str, Any]) -> dict[str, Any]:
+        self.calls.append(arguments["id"])
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(float(tool.split(":")[1]))
+        finally:
+            self.active -= 1
+        if arguments["id"] in self.failing:
+            return {"success": False, "error": "boom"}
+        return {"success": True, "result": {"id": arguments["id"]}}
+
+
+def step(step_id: str, delay: float = 0.0, deps: list[str] | None = None) -> WorkflowStep:
+    return WorkflowStep(
+        id=step_id,
+        name=step_id,
+        tool=f"sleep:{delay}",
+        arguments={"id": step_id},
+        dependencies=deps or [],
+    )
+
+
+class TestScheduling:
+    """Sliding-window execution"""
+
+    @pytest.mark.asyncio
+    async def test_window_is_refilled_on_each_completion(self) -> None:
+        executor = RecordingExecutor()
+        orchestrator = WorkflowOrchestrator(executor)
+        # One slow step plus many fast ones: a batch barrier would hold
+        # every batch behind the slow step.
+        steps = [step("slow", 0.2)] + [step(f"f{i}", 0.02) for i in range(12)]
+        await orchestrator.register_workflow(Workflow(id="wf", name="wf", steps=steps, max_parallel=3))
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await orchestrator.execute_workflow("wf")
+        elapsed = loop.time() - start
+
+        assert result.status == WorkflowStatus.COMPLETED
+        assert executor.peak == 3
+        assert elapsed < 0.3
+
+    @pytest.mark.asyncio
+    async def test_dependencies_are_respected(self) -> None:
+        executor = RecordingExecutor()
+        orchestrator = WorkflowOrchestrator(executor)
+        steps = [
+            step("c", 0.0, ["b"]),
+            step("b", 0.01, ["a"]),
+            step("a", 0.01),
+        ]
+        await orchestrator.register_workflow(Workflow(id="wf", name="wf", steps=steps))
+
+        result = await orchestrator.execute_workflow("wf")
+
+        assert executor.calls == ["a", "b", "c"]
+        assert [s.step_id for s in result.steps] == ["a", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_cycles_are_rejected_at_registration(self) -> None:
+        orchestrator = WorkflowOrchestrator(RecordingExecutor())
+        steps = [step("a", deps=["c"]), step("b", deps=["a"]), step("c", deps=["b"]), step("d")]
+
+        with pytest.raises(ValueError, match="circular dependencies among steps: a, b, c"):
+            await orchestrator.register_workflow(Workflow(id="wf", name="wf", steps=steps))
+
+    @pytest.mark.asyncio
+    async def test_reregistering_rebuilds_graph(self) -> None:
+        executor = RecordingExecutor()
+        orchestrator = WorkflowOrchestrator(executor)
+        await orchestrator.register_workflow(
+            Workflow(id="wf", name="wf", steps=[step("a"), step("b", deps=["a"])])
+        )
+        await orchestrator.execute_workflow("wf")
+
+        await orchestrator.register_workflow(
+            Workflow(id="wf", name="wf", steps=[step("x", deps=["y"]), step("y")])
+        )
+        result = await orchestrator.execute_workflow("wf")
+
+        assert executor.calls == ["a", "b", "y", "x"]
+        assert result.status == WorkflowStatus.COMPLETED
+
+
+class TestResume:
+    """Resuming partially completed runs"""
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_finished_steps(self) -> None:
+        executor = RecordingExecutor(failing={"b"})
+        orchestrator = WorkflowOrchestrator(executor)
+        steps = [step("a"), step("b", deps=["a"]), step("c", deps=["b"])]
+        await orchestrator.register_workflow(Workflow(id="wf", name="wf", steps=steps))
+
+        first = await orchestrator.execute_workflow("wf", {"run": 1})
+        assert first.status == WorkflowStatus.FAILED
+
+        executor.failing.clear()
+        executor.calls.clear()
+        stored = WorkflowResult.from_dict(first.to_dict())
+        resumed = await orchestrator.resume_workflow(stored)
+
+        assert resumed.status == WorkflowStatus.COMPLETED
+        # Dependencies order steps but do not gate them on success, so
+        # "c" already completed in the first run and is reused too.
+        assert executor.calls == ["b"]
+        assert resumed.metadata["resumed_steps"] == ["a", "c"]
+        assert resumed.metadata["input"] == {"run": 1}
+        assert {s.step_id: s.status for s in resumed.steps} == {
+            "a": StepStatus.COMPLETED,
+            "b": StepStatus.COMPLETED,
+            "c": StepStatus.COMPLETED,
+        }
+        assert resumed.output["a"] == {"id": "a"}
+
+    @pytest.mark.asyncio
+    async def test_resume_rejects_foreign_result(self) -> None:
+        orchestrator = WorkflowOrchestrator(RecordingExecutor())
+        await orchestrator.register_workflow(Workflow(id="wf", name="wf", steps=[step("a")]))
+        foreign = WorkflowResult(workflow_id="other", workflow_name="other", status=WorkflowStatus.FAILED)
+
+        with pytest.raises(ValueError):
+            await orchestrator.execute_workflow("wf", resume_from=foreign)